@@ -0,0 +1,40 @@
+"""add fingerprint to semantic search documents
+
+Revision ID: d3a1c5e7f902
+Revises: 58eb03c92396
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d3a1c5e7f902"
+down_revision = "58eb03c92396"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "semantic_search_documents",
+        sa.Column("fingerprint", sa.String, nullable=True),
+    )
+    # Covers the fingerprint lookups by document id, and by document id
+    # prefix for the zingtree nodes
+    op.create_index(
+        "ix_ssd_org_id_document_id",
+        "semantic_search_documents",
+        ["org_id", "document_id"],
+        postgresql_ops={"document_id": "text_pattern_ops"},
+        postgresql_include=["fingerprint"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_ssd_org_id_document_id", table_name="semantic_search_documents"
+    )
+    op.drop_column("semantic_search_documents", "fingerprint")
@@ -0,0 +1,71 @@
+"""create semantic search shadow items table
+
+Revision ID: e4b2d6f8a013
+Revises: d3a1c5e7f902
+Create Date: 2026-10-19 14:03:27.519311
+
+"""
+
+import os
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4b2d6f8a013"
+down_revision = "d3a1c5e7f902"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    embeddings_size = int(
+        os.environ.get(
+            "EMBEDDINGS_SHADOW_DIMENSIONS",
+            os.environ.get("EMBEDDINGS_DIMENSIONS", "4096"),
+        ).strip("\"'")
+    )
+
+    op.create_table(
+        "semantic_search_shadow_items",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("item_id", sa.BigInteger, nullable=False),
+        sa.Column("version", sa.String, nullable=False),
+        sa.Column("embeddings", sa.ARRAY(sa.Float()), nullable=False),
+    )
+    op.execute(
+        "ALTER TABLE semantic_search_shadow_items"
+        f" ALTER COLUMN embeddings TYPE VECTOR({embeddings_size})"
+    )
+
+    # Shadow vectors go away with their item
+    op.create_foreign_key(
+        "fk_sssi_ssi_item_id",
+        "semantic_search_shadow_items",
+        "semantic_search_items",
+        ["item_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    # Also serves the joins of the searches on a version
+    op.create_unique_constraint(
+        "uq_sssi_item_version",
+        "semantic_search_shadow_items",
+        ["item_id", "version"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_sssi_item_version",
+        "semantic_search_shadow_items",
+        type_="unique",
+    )
+    op.drop_constraint(
+        "fk_sssi_ssi_item_id",
+        "semantic_search_shadow_items",
+        type_="foreignkey",
+    )
+
+    op.drop_table("semantic_search_shadow_items")
@@ -0,0 +1,50 @@
+"""add embeddings index to semantic search shadow items
+
+Revision ID: f1c3e5a7b9d2
+Revises: e4b2d6f8a013
+Create Date: 2026-10-19 16:41:08.204517
+
+"""
+
+import os
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1c3e5a7b9d2"
+down_revision = "e4b2d6f8a013"
+branch_labels = None
+depends_on = None
+
+# pgvector indexes vectors of at most this many dimensions
+MAX_INDEXED_DIMENSIONS = 2000
+
+
+def _embeddings_size() -> int:
+    return int(
+        os.environ.get(
+            "EMBEDDINGS_SHADOW_DIMENSIONS",
+            os.environ.get("EMBEDDINGS_DIMENSIONS", "4096"),
+        ).strip("\"'")
+    )
+
+
+def upgrade() -> None:
+    # Like semantic_search_items, vectors too large to be indexed are
+    # searched sequentially
+    if _embeddings_size() > MAX_INDEXED_DIMENSIONS:
+        return
+
+    # The searches order by cosine distance
+    op.create_index(
+        "ix_sssi_embeddings",
+        "semantic_search_shadow_items",
+        ["embeddings"],
+        postgresql_using="hnsw",
+        postgresql_ops={"embeddings": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    # Not created for vectors too large to be indexed
+    op.execute("DROP INDEX IF EXISTS ix_sssi_embeddings")
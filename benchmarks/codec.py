@@ -0,0 +1,87 @@
+"""Compare the JSON codecs on representative payloads.
+
+The payloads are the test templates scaled to production sizes: a tree of
+a few thousand nodes, as stored on S3 at every medallion stage, an article
+with a long body, and a batch of embeddings as returned by the embedders.
+
+Run with::
+
+    python -m benchmarks.codec [--repeat 20]
+"""
+
+import argparse
+import copy
+import random
+import timeit
+
+from src.util.codec import JSONCodec, ORJSONCodec, orjson
+from tests.__stubs__.article_kb_templates import (
+    BRONZE_SALESFORCE_KB_TEMPLATE,
+)
+from tests.__stubs__.tree_templates import (
+    SILVER_TREE_METADATA_TEMPLATE,
+    SILVER_TREE_NODES_TEMPLATE,
+)
+
+
+def make_tree(nodes: int = 5000) -> dict:
+    node = SILVER_TREE_NODES_TEMPLATE
+    return {
+        "meta": SILVER_TREE_METADATA_TEMPLATE,
+        "nodes": {str(i): copy.deepcopy(node) for i in range(1, nodes + 1)},
+    }
+
+
+def make_article(paragraphs: int = 2000) -> dict:
+    article = copy.deepcopy(BRONZE_SALESFORCE_KB_TEMPLATE)
+    article["details"][1]["value"] = "<p>Ceci est une réponse.</p>" * (
+        paragraphs
+    )
+    return article
+
+
+def make_embeddings(count: int = 64, dimensions: int = 4096) -> dict:
+    rng = random.Random(0)
+    return {
+        "embeddings": [
+            [rng.uniform(-1, 1) for _ in range(dimensions)]
+            for _ in range(count)
+        ]
+    }
+
+
+def bench(codec: JSONCodec, payload: dict, repeat: int) -> tuple:
+    encoded = codec.dumpb(payload)
+    dumps = min(
+        timeit.repeat(lambda: codec.dumpb(payload), number=1, repeat=repeat)
+    )
+    loads = min(
+        timeit.repeat(lambda: codec.loads(encoded), number=1, repeat=repeat)
+    )
+    return len(encoded), dumps, loads
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.codec")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    codecs = [JSONCodec()] + ([ORJSONCodec()] if orjson is not None else [])
+    payloads = {
+        "tree": make_tree(),
+        "article": make_article(),
+        "embeddings": make_embeddings(),
+    }
+
+    print(f"{'payload':<12}{'codec':<8}{'size':>12}{'dumps':>11}{'loads':>11}")
+    for name, payload in payloads.items():
+        for codec in codecs:
+            size, dumps, loads = bench(codec, payload, args.repeat)
+            print(
+                f"{name:<12}{codec.name:<8}{size:>12,}"
+                f"{dumps * 1000:>9.2f}ms{loads * 1000:>9.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
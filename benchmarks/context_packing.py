@@ -0,0 +1,99 @@
+"""Compare the prompts of the summaries with and without context packing.
+
+The options summarized are made up: each search finds `--options` snippets
+of about 1000 characters, as the sentence chunker makes them, some from
+the same document and overlapping it by a few sentences. The endpoint is
+simulated: its latency is a fixed overhead plus a time per prompt token,
+the answer taking the same time either way.
+
+Run with::
+
+    python -m benchmarks.context_packing [--searches 500] [--budget 600]
+"""
+
+import argparse
+import random
+import time
+
+from src.builders.context import ContextPacker
+
+WORDS = (
+    "the a connector article widget search answer user document page "
+    "account settings select click open save update access team report "
+    "export import sync delete create admin permission"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 20))
+    return " ".join(words).capitalize() + "."
+
+
+def make_search(
+    rng: random.Random, options: int, snippet_length: int
+) -> list[tuple[int, str]]:
+    documents: dict[int, list[str]] = {}
+    snippets = []
+    for _ in range(options):
+        document = rng.randint(0, options // 2)
+        sentences = documents.setdefault(
+            document, [sentence(rng) for _ in range(200)]
+        )
+        # Overlapping the other snippets of the document found, if any
+        start = rng.randint(0, 3)
+        text = ""
+        for s in sentences[start:]:
+            if len(text) + len(s) >= snippet_length:
+                break
+            text = f"{text} {s}".strip()
+        snippets.append((document, text))
+    return snippets
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.context_packing"
+    )
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--snippet-length", type=int, default=1000)
+    parser.add_argument("--budget", type=int, default=600)
+    parser.add_argument("--overhead-ms", type=float, default=300.0)
+    parser.add_argument("--per-token-ms", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    searches = [
+        make_search(rng, args.options, args.snippet_length)
+        for _ in range(args.searches)
+    ]
+    counter = ContextPacker(0)
+
+    print(
+        f"{'mode':<10}{'tokens':>10}{'packing':>12}{'latency':>12}"
+        f"{'p95':>12}"
+    )
+    for mode, budget in (("joined", 0), ("packed", args.budget)):
+        packer = ContextPacker(budget)
+        tokens = []
+        start = time.perf_counter()
+        for snippets in searches:
+            context = " ".join(packer.pack(snippets))
+            tokens.append(counter.count_tokens(context))
+        packing = (time.perf_counter() - start) / len(searches)
+
+        latencies = sorted(
+            args.overhead_ms + args.per_token_ms * t for t in tokens
+        )
+        mean_tokens = sum(tokens) / len(tokens)
+        mean_latency = sum(latencies) / len(latencies)
+        p95 = latencies[int(len(latencies) * 0.95)]
+        print(
+            f"{mode:<10}{mean_tokens:>10.0f}{packing * 1e6:>10.1f}us"
+            f"{mean_latency:>10.1f}ms{p95:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare the HTML to text normalization with the BeautifulSoup one.
+
+The bronze article and tree templates are scaled up: an article whose
+answer is a long HTML page, and a tree with thousands of content nodes.
+Both normalizations are checked to return the same text.
+
+Run with::
+
+    python -m benchmarks.html_text [--repeat 5]
+"""
+
+import argparse
+import copy
+import re
+import string
+import timeit
+
+from bs4 import BeautifulSoup
+
+from src.data.transformations.article_kb import (
+    BronzeToSilverTransformation as ArticleKbBronzeToSilver,
+)
+from src.data.transformations.zt_trees import (
+    BronzeToSilverTransformation as TreeBronzeToSilver,
+)
+from tests.__stubs__.article_kb_templates import BRONZE_SALESFORCE_KB_TEMPLATE
+from tests.__stubs__.tree_templates import BRONZE_TREE_TEMPLATE
+
+PARAGRAPH = (
+    "<p>To reset the <b>router</b>, hold the button for 10&nbsp;seconds."
+    "</p>\n<ul><li>Step&nbsp;1 &amp; 2</li><li>Café – done</li>"
+    "</ul>\n"
+)
+
+
+def make_article(paragraphs: int = 2000) -> dict:
+    article = copy.deepcopy(BRONZE_SALESFORCE_KB_TEMPLATE)
+    article["details"][1]["value"] = PARAGRAPH * paragraphs
+    return article
+
+
+def make_tree_fields(nodes: int = 5000) -> list[str]:
+    node = BRONZE_TREE_TEMPLATE["nodes"]["1"]
+    fields = [BRONZE_TREE_TEMPLATE["meta"]["name"]]
+    for _ in range(nodes):
+        fields.extend(node[key] for key in ("page_title", "content"))
+        fields.append(node["question"])
+    return fields
+
+
+def soup_article(text: str) -> str:
+    text = BeautifulSoup(text, "html.parser").get_text()
+    printable = set(string.printable)
+    return "".join(filter(lambda x: x in printable, text))
+
+
+def soup_tree(text: str) -> str:
+    text = BeautifulSoup(text, "html.parser").get_text()
+    return re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", "", text)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.html_text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    article = "\n".join(
+        d["value"] for d in make_article()["details"] if d["value"]
+    )
+    fields = make_tree_fields()
+    cases = {
+        "article": (
+            lambda: soup_article(article),
+            lambda: ArticleKbBronzeToSilver._normalize_text(article),
+        ),
+        "tree": (
+            lambda: [soup_tree(field) for field in fields],
+            lambda: [TreeBronzeToSilver.normalize_text(f) for f in fields],
+        ),
+    }
+
+    print(f"{'payload':<10}{'soup':>12}{'stream':>12}{'speedup':>10}")
+    for name, (before, after) in cases.items():
+        assert before() == after(), f"{name} texts differ"
+        soup_ms, stream_ms = (
+            min(timeit.repeat(run, number=1, repeat=args.repeat)) * 1000
+            for run in (before, after)
+        )
+        print(
+            f"{name:<10}{soup_ms:>10.1f}ms{stream_ms:>10.1f}ms"
+            f"{soup_ms / stream_ms:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Measure the cost of the payload logs of a search and an ingestion.
+
+Each request logs the search query, with the embeddings of the question, and
+the input and output of an embedder call of 16 chunks. The eager version
+formats them as before, the lazy one through `LogPayload` and `log_sampled`.
+
+Run with::
+
+    python -m benchmarks.log_payloads [--repeat 50]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import timeit
+
+from src.api.v1.endpoints.requests.semantic_search import SearchFilters
+from src.builders.queries.semantic_search import (
+    SemanticSearchSearchQueryBuilder,
+)
+from src.core.deps.logger import LogPayload, log_sampled
+
+DIMENSIONS = 4096
+
+
+def make_request() -> dict:
+    rng = random.Random(0)
+    chunks = [f"Chunk {i} of the article. " * 40 for i in range(16)]
+    return {
+        "question": [rng.uniform(-1, 1) for _ in range(DIMENSIONS)],
+        "input": chunks,
+        "output": [
+            [rng.uniform(-1, 1) for _ in range(DIMENSIONS)] for _ in chunks
+        ],
+    }
+
+
+def build_query(request: dict):
+    builder = SemanticSearchSearchQueryBuilder(request["question"], 1, 0.5)
+    builder.filters = SearchFilters(connectors=[1])
+    builder.limit = 10
+    return builder.build()
+
+
+def eager(logger: logging.Logger, request: dict, query) -> None:
+    logger.info(f"Query: {query}")
+    logger.info(f"Creating embeddings for: {json.dumps(request['input'])}")
+    logger.info(
+        "Embeddings created: "
+        f"{json.dumps({'input': request['input'], 'output': request['output']})}"  # noqa: E501
+    )
+
+
+def lazy(logger: logging.Logger, request: dict, query) -> None:
+    log_sampled(
+        logger,
+        "benchmark.query",
+        logging.DEBUG,
+        "Query: %s",
+        LogPayload(query),
+    )
+    log_sampled(
+        logger,
+        "benchmark.input",
+        logging.INFO,
+        "Creating embeddings for: %s",
+        LogPayload(request["input"]),
+    )
+    log_sampled(
+        logger,
+        "benchmark.output",
+        logging.INFO,
+        "Embeddings created: %s",
+        LogPayload({"input": request["input"], "output": request["output"]}),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.log_payloads")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    logger = logging.getLogger("benchmarks.log_payloads")
+    logger.propagate = False
+    logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+
+    request = make_request()
+    query = build_query(request)
+
+    print(f"{'level':<8}{'eager':>12}{'lazy':>12}{'saved':>10}")
+    for level in ("DEBUG", "INFO", "WARNING"):
+        logger.setLevel(level)
+        timings = [
+            min(
+                timeit.repeat(
+                    lambda: log(logger, request, query),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            for log in (eager, lazy)
+        ]
+        eager_ms, lazy_ms = (timing * 1000 for timing in timings)
+        print(
+            f"{level:<8}{eager_ms:>10.2f}ms{lazy_ms:>10.2f}ms"
+            f"{1 - lazy_ms / eager_ms:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
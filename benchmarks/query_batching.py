@@ -0,0 +1,89 @@
+"""Compare concurrent query embeddings sent one by one and in batches.
+
+The endpoint is simulated: each call takes a fixed overhead plus a time per
+text, and the endpoint serves a limited number of calls at once, as a
+SageMaker endpoint with a few instances does. Clients send single-text
+calls from many threads.
+
+Run with::
+
+    python -m benchmarks.query_batching [--clients 64] [--queries 2000]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+
+from src.adapters.batching_embedder import BatchingEmbedder
+from src.core.deps.metrics import get_metrics
+
+
+class SimulatedEndpoint:
+    def __init__(
+        self, overhead: float, per_text: float, concurrency: int
+    ) -> None:
+        self._overhead = overhead
+        self._per_text = per_text
+        self._slots = BoundedSemaphore(concurrency)
+
+    def embed(self, text):
+        texts = [text] if isinstance(text, str) else text
+        with self._slots:
+            time.sleep(self._overhead + self._per_text * len(texts))
+        return [[float(len(t))] for t in texts]
+
+
+def run(embedder, queries: list[str], clients: int) -> tuple[float, float]:
+    latencies = []
+
+    def embed(query: str) -> None:
+        start = time.perf_counter()
+        embedder.embed(query)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(embed, queries))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(queries) / elapsed, latencies[int(len(latencies) * 0.95)]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.query_batching"
+    )
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--overhead-ms", type=float, default=20.0)
+    parser.add_argument("--per-text-ms", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    endpoint = SimulatedEndpoint(
+        args.overhead_ms / 1000, args.per_text_ms / 1000, args.concurrency
+    )
+    queries = [f"query {i}" for i in range(args.queries)]
+
+    print(f"{'mode':<10}{'queries/s':>12}{'p95':>12}")
+    rate, p95 = run(endpoint, queries, args.clients)
+    print(f"{'single':<10}{rate:>12.1f}{p95 * 1000:>10.1f}ms")
+
+    batching = BatchingEmbedder(
+        endpoint,
+        window=args.window_ms / 1000,
+        max_batch_size=args.batch_size,
+    )
+    rate, p95 = run(batching, queries, args.clients)
+    batch_size = get_metrics().summary(
+        "embedder_query_batch_size", embedder="primary"
+    )
+    print(f"{'batched':<10}{rate:>12.1f}{p95 * 1000:>10.1f}ms")
+    print(f"mean batch size: {batch_size.sum / batch_size.count:.1f}")
+
+
+if __name__ == "__main__":
+    main()
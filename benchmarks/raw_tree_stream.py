@@ -0,0 +1,89 @@
+"""Compare the peak memory of the raw to bronze tree transformations.
+
+A synthetic raw tree object of about `--size` MB is built from the raw
+tree template, a third of its nodes being question nodes. It is
+transformed from its bytes, as downloaded from S3, by decoding it whole
+and by streaming it. Both are checked to return the same bronze tree.
+
+Run with::
+
+    python -m benchmarks.raw_tree_stream [--size 50]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from src.data.transformations.zt_trees import (
+    RawToBronzeTransformation,
+    StreamingRawToBronzeTransformation,
+)
+from src.util import codec
+from tests.__stubs__.tree_templates import RAW_TREE_TEMPLATE_TREE
+
+PARAGRAPH = (
+    '<p>To reset the <b>router</b>, hold the "reset" button for 10 '
+    "seconds.</p>\n"
+)
+
+
+def make_raw_tree(size_mb: int) -> bytes:
+    tree = json.loads(RAW_TREE_TEMPLATE_TREE)
+    node = dict(tree["nodes"]["1"], content=PARAGRAPH * 40)
+    node_size = len(json.dumps(json.dumps(node)))
+    tree["nodes"] = {
+        str(i): dict(node, type="Question" if i % 3 == 0 else "Content")
+        for i in range(size_mb * 2**20 // node_size)
+    }
+    raw = {"id": 1, "details": [{"value": json.dumps(tree)}]}
+    return json.dumps(raw).encode("utf-8")
+
+
+def decode_whole(raw: bytes) -> dict:
+    tree = codec.loads(raw.decode("utf-8"))
+    tree = json.loads(tree["details"][0]["value"])
+    return RawToBronzeTransformation(tree).handle()
+
+
+def decode_stream(raw: bytes, chunk_size: int = 65536) -> dict:
+    view = memoryview(raw)
+    chunks = (
+        bytes(view[i : i + chunk_size])  # noqa: E203
+        for i in range(0, len(raw), chunk_size)
+    )
+    return StreamingRawToBronzeTransformation(chunks).handle()
+
+
+def measure(fn, raw: bytes) -> tuple[dict, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = fn(raw)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return output, elapsed, peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.raw_tree_stream"
+    )
+    parser.add_argument("--size", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    raw = make_raw_tree(args.size)
+    print(f"raw object: {len(raw) / 2**20:.1f}MB")
+    print(f"{'path':<10}{'peak':>12}{'time':>12}")
+    outputs = []
+    for name, fn in (("whole", decode_whole), ("stream", decode_stream)):
+        output, elapsed, peak = measure(fn, raw)
+        outputs.append(output)
+        del output
+        print(f"{name:<10}{peak / 2**20:>10.1f}MB{elapsed * 1000:>10.1f}ms")
+
+    assert outputs[0] == outputs[1], "bronze trees differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare the tree nodes transformation in-thread and in a process pool.
+
+The bronze tree template is scaled up to thousands of content nodes, with
+long HTML contents. Both runs are checked to return the same nodes.
+
+Run with::
+
+    python -m benchmarks.transform_pool [--nodes 5000] [--workers -1]
+"""
+
+import argparse
+import copy
+import time
+
+from src.data.transformations.zt_trees import transform_node
+from src.util.process_pool import ProcessPool
+from tests.__stubs__.tree_templates import BRONZE_TREE_TEMPLATE
+
+PARAGRAPH = (
+    "<p>To reset the <b>router</b>, hold the button for 10&nbsp;seconds."
+    "</p>\n<ul><li>Step&nbsp;1 &amp; 2</li><li>Café – done</li>"
+    "</ul>\n"
+)
+
+
+def make_nodes(nodes: int, paragraphs: int = 20) -> list[dict]:
+    node = copy.deepcopy(BRONZE_TREE_TEMPLATE["nodes"]["1"])
+    node["content"] = PARAGRAPH * paragraphs
+    return [dict(node, node_id=i) for i in range(nodes)]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.transform_pool"
+    )
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=-1)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    nodes = make_nodes(args.nodes)
+    pool = ProcessPool(workers=args.workers, chunk_size=args.chunk_size)
+    # Start the processes outside of the measure
+    pool.map(transform_node, nodes[:2])
+
+    try:
+        start = time.perf_counter()
+        expected = [transform_node(node) for node in nodes]
+        thread_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output = pool.map(transform_node, nodes)
+        pool_s = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+    assert output == expected, "nodes differ"
+    print(f"{'nodes':<10}{'thread':>12}{'pool':>12}{'speedup':>10}")
+    print(
+        f"{args.nodes:<10}{thread_s * 1000:>10.1f}ms{pool_s * 1000:>10.1f}ms"
+        f"{thread_s / pool_s:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
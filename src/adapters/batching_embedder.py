@@ -0,0 +1,138 @@
+from threading import Event, Lock
+from typing import List
+
+from src.contracts.embedder import EmbedderInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+
+
+class _Batch:
+    """Texts sent together to the embedder, and their embeddings."""
+
+    def __init__(self) -> None:
+        # Text -> index in the batch, a text asked twice is embedded once
+        self.texts: dict[str, int] = {}
+        self.full = Event()
+        self.done = Event()
+        self.embeddings: List[List[float]] | None = None
+        self.error: BaseException | None = None
+
+    def add(self, texts: List[str]) -> List[int]:
+        return [self.texts.setdefault(text, len(self.texts)) for text in texts]
+
+    def size_with(self, texts: List[str]) -> int:
+        return len(self.texts) + sum(t not in self.texts for t in set(texts))
+
+
+@with_logger()
+class BatchingEmbedder(EmbedderInterface):
+    """Embedder sending the texts of concurrent calls in one call.
+
+    The first call of a batch waits `window` seconds for other calls, or
+    until `max_batch_size` texts are collected, then embeds the texts of
+    every call of the batch at once and hands each call its embeddings. The
+    other calls of the batch wait for it. A failed batch fails every call
+    of the batch with the same exception.
+
+    Calls with `max_batch_size` texts or more are sent as they are.
+
+    The metrics are labeled with `embedder=<name>`: `embedder_query_batches`
+    and the `embedder_query_batch_size` summary.
+
+    Parameters
+    ----------
+    embedder : EmbedderInterface
+        Wrapped embedder, embedding a list of texts in one call.
+    window : float, optional
+        Seconds a batch waits for calls, by default 0.005
+    max_batch_size : int, optional
+        Texts embedded at once, by default 16
+    name : str, optional
+        Metrics label, by default "primary"
+    """
+
+    def __init__(
+        self,
+        embedder: EmbedderInterface,
+        window: float = 0.005,
+        max_batch_size: int = 16,
+        name: str = "primary",
+    ) -> None:
+        self._embedder = embedder
+        self._window = max(window, 0)
+        self._max_batch_size = max(int(max_batch_size), 1)
+        self._name = name
+        self._metrics = get_metrics()
+        self._lock = Lock()
+        self._batch: _Batch | None = None
+
+    @property
+    def embedder(self) -> EmbedderInterface:
+        return self._embedder
+
+    def connect(self):
+        self._embedder.connect()
+
+    @property
+    def connected(self) -> bool:
+        return self._embedder.connected
+
+    def embed(self, text: str | List[str]) -> List[List[float]]:
+        if not text:
+            raise ValueError("Text cannot be empty.")
+        texts = [text] if isinstance(text, str) else list(text)
+        if len(texts) >= self._max_batch_size:
+            return self._embedder.embed(texts)
+
+        with self._lock:
+            batch = self._batch
+            leader = (
+                batch is None or batch.size_with(texts) > self._max_batch_size
+            )
+            if leader:
+                if batch is not None:
+                    # No room left, the batch is sent without waiting
+                    batch.full.set()
+                batch = self._batch = _Batch()
+            indexes = batch.add(texts)
+            if len(batch.texts) >= self._max_batch_size:
+                batch.full.set()
+                self._batch = None
+
+        if leader:
+            self._send(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return [batch.embeddings[i] for i in indexes]
+
+    def _send(self, batch: _Batch) -> None:
+        batch.full.wait(self._window)
+        with self._lock:
+            # No call joins the batch from now on
+            if self._batch is batch:
+                self._batch = None
+
+        texts = list(batch.texts)
+        self._metrics.incr("embedder_query_batches", embedder=self._name)
+        self._metrics.observe(
+            "embedder_query_batch_size", len(texts), embedder=self._name
+        )
+        try:
+            embeddings = self._embedder.embed(texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"The embedder returned {len(embeddings)} embeddings "
+                    f"for {len(texts)} texts"
+                )
+            batch.embeddings = embeddings
+        except BaseException as e:
+            self._logger.error(
+                f"[BatchingEmbedder] {self._name}: batch of {len(texts)} "
+                f"texts failed: {e}"
+            )
+            batch.error = e
+        finally:
+            batch.done.set()
@@ -1,4 +1,5 @@
-import json
+import logging
+from threading import Lock
 from typing import List, Optional
 
 import boto3
@@ -8,7 +9,8 @@ from sagemaker.deserializers import JSONDeserializer
 from sagemaker.serializers import JSONSerializer
 
 from src.contracts.embedder import EmbedderInterface
-from src.core.deps.logger import with_logger
+from src.core.deps.logger import LogPayload, log_sampled, with_logger
+from src.util import codec
 
 
 @with_logger()
@@ -17,14 +19,19 @@ class CohereEmbedderClient(EmbedderInterface):
         self._client = Client(region_name=region)
         self._endpoint_name = endpoint_name
         self._connected = False
+        # Shared by the requests, which connect it on their first call
+        self._connect_lock = Lock()
         self._logger.info("Cohere Embedder Client initialized")
 
     def connect(self):
-        self._client.connect_to_endpoint(endpoint_name=self._endpoint_name)
-        self._connected = True
+        with self._connect_lock:
+            if self._connected:
+                return
+            self._client.connect_to_endpoint(endpoint_name=self._endpoint_name)
+            self._connected = True
         self._logger.info(
             "Cohere Embedder Client connected"
-            f" to {json.dumps(self._endpoint_name)}"
+            f" to {codec.dumps(self._endpoint_name)}"
         )
 
     def embed(self, text: str | List[str]) -> List[List[float]]:
@@ -34,7 +41,13 @@ class CohereEmbedderClient(EmbedderInterface):
             raise ValueError("Text cannot be empty.")
         if isinstance(text, str):
             text = [text]
-        self._logger.info(f"Creating embeddings for: {json.dumps(text)}")
+        log_sampled(
+            self._logger,
+            "embedder.input",
+            logging.INFO,
+            "Creating embeddings for: %s",
+            LogPayload(text),
+        )
         response = self._client.embed(texts=text)
         embeddings = [e for e in response.embeddings]
         self._logger.info("Embeddings created")
@@ -62,7 +75,13 @@ class SagemakerEmbedderClient(EmbedderInterface):
             raise ValueError("Text cannot be empty.")
         if isinstance(text, str):
             text = [text]
-        self._logger.info(f"Creating embeddings for: {json.dumps(text)}")
+        log_sampled(
+            self._logger,
+            "embedder.input",
+            logging.INFO,
+            "Creating embeddings for: %s",
+            LogPayload(text),
+        )
         embeddings = []
         for t in text:
             response = self.predictor.predict(
@@ -72,11 +91,14 @@ class SagemakerEmbedderClient(EmbedderInterface):
                     "Accept": "application/json",
                 },
             )
-            response = json.loads(response)
+            response = codec.loads(response)
             embeddings.append(response["embedding"])
-        self._logger.info(
-            "Embeddings created: "
-            f"{json.dumps({'input': text, 'output': embeddings})}"
+        log_sampled(
+            self._logger,
+            "embedder.output",
+            logging.INFO,
+            "Embeddings created: %s",
+            LogPayload({"input": text, "output": embeddings}),
         )
         return embeddings
 
@@ -178,9 +200,9 @@ class BedrockEmbedderClient(EmbedderInterface):
                     modelId=self.modelId,
                     contentType=self.contentType,
                     accept=self.accept,
-                    body=json.dumps(inp),
+                    body=codec.dumpb(inp),
                 )
-                response_body = json.loads(response.get("body").read())
+                response_body = codec.loads(response.get("body").read())
                 embedding = response_body.get("embedding")
             except Exception as e:
                 self._logger.error(e)
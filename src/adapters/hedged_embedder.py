@@ -0,0 +1,202 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from threading import Lock
+from typing import Callable, List
+
+from src.contracts.embedder import EmbedderInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import Summary, get_metrics
+from src.exceptions.embedder import (
+    EmbedderTimeoutException,
+    EmbedderUnavailableException,
+)
+from src.util.circuit_breaker import CircuitBreaker
+
+
+@with_logger()
+class HedgedEmbedder(EmbedderInterface):
+    """Embedder for the query path, bounded by a deadline.
+
+    Each call is sent to the wrapped embedder from a thread pool. If it did
+    not answer within the hedge delay, the same call is sent again and the
+    first answer is used. The hedge delay follows the `hedge_percentile`
+    of the latencies of the embedder, so only the slowest calls get a
+    duplicate. A call failing before the hedge delay is hedged right away.
+
+    Calls not answered within `deadline` seconds raise
+    `EmbedderTimeoutException`, the embedder calls still running are left
+    to finish in the background. After `breaker.failure_threshold` failed
+    or timed out calls in a row, calls fail fast with
+    `EmbedderUnavailableException` until the circuit breaker lets a trial
+    call through.
+
+    The metrics are labeled with `embedder=<name>`: `embedder_query_requests`,
+    `embedder_query_hedges`, `embedder_query_hedge_wins`,
+    `embedder_query_timeouts`, `embedder_query_failures`,
+    `embedder_query_rejected` and the `embedder_query_latency` summary.
+
+    Parameters
+    ----------
+    embedder : EmbedderInterface
+        Wrapped embedder.
+    deadline : float, optional
+        Seconds a call may take, by default 2.0
+    hedge_delay : float | None, optional
+        Hedge delay until `min_samples` latencies were measured, by default
+        0.3, None to never hedge
+    hedge_percentile : float, optional
+        Latency percentile used as hedge delay, by default 95
+    min_hedge_delay : float, optional
+        Lower bound of the hedge delay, by default 0.05
+    min_samples : int, optional
+        Latencies measured before adapting the hedge delay, by default 20
+    workers : int, optional
+        Threads calling the embedder, by default 16
+    breaker : CircuitBreaker | None, optional
+        Circuit breaker, by default one opening after 5 failures for 30s
+    name : str, optional
+        Metrics label, by default "primary"
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        embedder: EmbedderInterface,
+        deadline: float = 2.0,
+        hedge_delay: float | None = 0.3,
+        hedge_percentile: float = 95,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 20,
+        workers: int = 16,
+        breaker: CircuitBreaker | None = None,
+        name: str = "primary",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._embedder = embedder
+        self._deadline = deadline
+        self._hedge_delay = hedge_delay
+        self._hedge_percentile = hedge_percentile
+        self._min_hedge_delay = min_hedge_delay
+        self._min_samples = min_samples
+        self._breaker = breaker or CircuitBreaker()
+        self._name = name
+        self._clock = clock
+        self._metrics = get_metrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(int(workers), 1),
+            thread_name_prefix=f"{name}-query-embedder",
+        )
+        self._latencies = Summary(window=256)
+        self._latencies_lock = Lock()
+
+    @property
+    def embedder(self) -> EmbedderInterface:
+        return self._embedder
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    def connect(self):
+        self._embedder.connect()
+
+    @property
+    def connected(self) -> bool:
+        return self._embedder.connected
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a call is sent again, None to never hedge."""
+        if self._hedge_delay is None:
+            return None
+
+        with self._latencies_lock:
+            if self._latencies.count < self._min_samples:
+                delay = self._hedge_delay
+            else:
+                delay = self._latencies.percentile(self._hedge_percentile)
+        return min(max(delay, self._min_hedge_delay), self._deadline)
+
+    def embed(self, text: str | List[str]) -> List[List[float]]:
+        if not text:
+            raise ValueError("Text cannot be empty.")
+        if not self._breaker.allow():
+            self._incr("embedder_query_rejected")
+            raise EmbedderUnavailableException()
+
+        self._incr("embedder_query_requests")
+        try:
+            embeddings = self._hedged_embed(text)
+        except EmbedderTimeoutException:
+            self._incr("embedder_query_timeouts")
+            self._breaker.record_failure()
+            raise
+        except Exception as e:
+            self._incr("embedder_query_failures")
+            self._breaker.record_failure()
+            self._logger.error(f"[HedgedEmbedder] {self._name}: {e}")
+            raise EmbedderUnavailableException()
+
+        self._breaker.record_success()
+        return embeddings
+
+    def _hedged_embed(self, text: str | List[str]) -> List[List[float]]:
+        expires_at = self._clock() + self._deadline
+        first = self._executor.submit(self._call, text)
+        pending = {first}
+        hedge = None
+        error = None
+
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is not None:
+            wait_futures(pending, timeout=hedge_delay)
+        while True:
+            if first.done() and first.exception() is None:
+                return first.result()
+            if hedge is not None and hedge.done():
+                if hedge.exception() is None:
+                    self._incr("embedder_query_hedge_wins")
+                    return hedge.result()
+
+            pending = {f for f in (first, hedge) if f and not f.done()}
+            for future in (first, hedge):
+                if future is not None and future.done():
+                    error = future.exception()
+            if hedge is None and hedge_delay is not None:
+                # Slow or failed, the duplicate may answer first
+                self._incr("embedder_query_hedges")
+                hedge = self._executor.submit(self._call, text)
+                pending.add(hedge)
+            if not pending:
+                raise error
+
+            remaining = expires_at - self._clock()
+            if remaining <= 0:
+                for future in pending:
+                    future.cancel()
+                raise EmbedderTimeoutException()
+            wait_futures(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+
+    def _call(self, text: str | List[str]) -> List[List[float]]:
+        start = self._clock()
+        embeddings = self._embedder.embed(text)
+        latency = self._clock() - start
+
+        with self._latencies_lock:
+            self._latencies.observe(latency)
+        self._metrics.observe(
+            "embedder_query_latency", latency, embedder=self._name
+        )
+        # Some clients log their errors and return no vector
+        if len(embeddings) == 0 or any(e is None for e in embeddings):
+            raise ValueError("The embedder returned no embedding")
+        return embeddings
+
+    def _incr(self, name: str) -> None:
+        self._metrics.incr(name, embedder=self._name)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,101 @@
+import time
+from threading import Lock
+from typing import Callable, Iterator, List
+
+from src.contracts.repositories.assets import AssetsRepositoryInterface
+from src.contracts.summarizer import SummarizerInterface
+from src.core.deps.logger import with_logger
+
+
+@with_logger()
+class ReloadingSummarizer(SummarizerInterface):
+    """Summarizer shared by the requests, rebuilt when its config changes.
+
+    The summarizer is built once per process instead of per request. Every
+    `check_interval` seconds, one call reads the config asset again. If it
+    changed, for example a new template or new parameters, the summarizer
+    is rebuilt and connected, then swapped in. The calls under way finish
+    with the previous one, and the other calls do not wait for the check.
+
+    Parameters
+    ----------
+    factory : Callable[[], SummarizerInterface]
+        Build the summarizer, from the current config asset.
+    assets_repo : AssetsRepositoryInterface
+        Repository of the config asset.
+    config_filename : str
+        Key of the config asset.
+    check_interval : float, optional
+        Seconds between the checks of the config asset, 0 to never reload,
+        by default 60.0
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], SummarizerInterface],
+        assets_repo: AssetsRepositoryInterface,
+        config_filename: str,
+        check_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._factory = factory
+        self._assets_repo = assets_repo
+        self._config_filename = config_filename
+        self._check_interval = check_interval
+        self._clock = clock
+        self._config = assets_repo.get_json_asset(config_filename)
+        self._summarizer = factory()
+        self._checked_at = clock()
+        self._reload_lock = Lock()
+
+    def _current(self) -> SummarizerInterface:
+        if (
+            self._check_interval > 0
+            and self._clock() - self._checked_at >= self._check_interval
+            and self._reload_lock.acquire(blocking=False)
+        ):
+            try:
+                self._reload()
+            finally:
+                self._reload_lock.release()
+        return self._summarizer
+
+    def _reload(self) -> None:
+        self._checked_at = self._clock()
+        try:
+            config = self._assets_repo.get_json_asset(self._config_filename)
+            if config == self._config:
+                return
+            summarizer = self._factory()
+            summarizer.connect()
+        except Exception as e:
+            self._logger.error(
+                f"[Summarizer] Error while reloading the config: {e}"
+            )
+            return
+        self._config = config
+        self._summarizer = summarizer
+        self._logger.info(
+            f"[Summarizer] Reloaded the config {self._config_filename}"
+        )
+
+    def summarize(self, context: str | List[str], question) -> str:
+        return self._current().summarize(context, question)
+
+    def summarize_stream(
+        self, context: str | List[str], question
+    ) -> Iterator[str]:
+        return self._current().summarize_stream(context, question)
+
+    def connect(self):
+        self._current().connect()
+
+    @property
+    def connected(self) -> bool:
+        return self._current().connected
+
+    @property
+    def context_max_tokens(self) -> int:
+        return self._current().context_max_tokens
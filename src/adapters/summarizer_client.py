@@ -1,19 +1,74 @@
-import json
-from typing import List
+import logging
+from threading import Lock
+from typing import Iterable, Iterator, List
 
 import boto3
 from cohere_sagemaker import Client
 from sagemaker.deserializers import JSONDeserializer
+from sagemaker.iterators import LineIterator
 from sagemaker.predictor import Predictor
 
 from src.builders.prompts import SemanticSearchSummarizePrompt
 from src.contracts.repositories.assets import AssetsRepositoryInterface
 from src.contracts.summarizer import SummarizerInterface
+from src.core.deps.logger import LogPayload, log_sampled, with_logger
+from src.util import codec
+
+
+def iter_stream_tokens(lines: Iterable[bytes]) -> Iterator[str]:
+    """Text generated, from the lines streamed by a SageMaker endpoint.
+
+    Text Generation Inference streams `data:{"token": {"text": ...}}`
+    lines, the Large Model Inference containers `{"outputs": [...]}` or
+    `{"token": {"text": ...}}` lines. Special tokens are skipped.
+    """
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith(b"data:"):
+            line = line[len(b"data:") :].strip()  # noqa: E203
+        if not line:
+            continue
+        data = codec.loads(line)
+        token = data.get("token")
+        if token is not None:
+            if not token.get("special"):
+                yield token["text"]
+        elif data.get("outputs"):
+            yield "".join(data["outputs"])
 
 
 class SummarizerClient(SummarizerInterface):
     def __init__(self, assets_repo: AssetsRepositoryInterface):
         self._assets_repo = assets_repo
+        self._context_max_tokens = 0
+
+    def _set_context_max_tokens(self, config: dict, model: str) -> None:
+        # Tokens of context by model, e.g. {"llama-2-7b-f": 1500,
+        # "default": 2000}, unlimited without
+        budgets = config.get("context_max_tokens", {})
+        self._context_max_tokens = budgets.get(
+            model, budgets.get("default", 0)
+        )
+
+    @property
+    def context_max_tokens(self) -> int:
+        return self._context_max_tokens
+
+    def _build_prompt(self, context: str | List[str], question: str) -> str:
+        if not context:
+            raise ValueError("Context cannot be empty.")
+        if not question:
+            raise ValueError("Question cannot be empty.")
+        if isinstance(context, list):
+            context = " ".join(context)
+        return self._prompt_builder.build(context, question)
+
+    def summarize_stream(
+        self, context: str | List[str], question: str
+    ) -> Iterator[str]:
+        # Endpoints without response streaming answer in one piece
+        yield self.summarize(context, question)
 
 
 class FalconSummarizerClient(SummarizerClient):
@@ -34,6 +89,7 @@ class FalconSummarizerClient(SummarizerClient):
         self._connected = True
         config = self._assets_repo.get_json_asset(config_filename)
         self._templates = config["templates"]
+        self._set_context_max_tokens(config, endpoint_name)
         self._params = config["falcon_params"]
         self._prompt_type = prompt_type
         self._prompt_builder = SemanticSearchSummarizePrompt()
@@ -47,19 +103,12 @@ class FalconSummarizerClient(SummarizerClient):
         return self._connected
 
     def summarize(self, context: str | List[str], question: str) -> str:
-        if not context:
-            raise ValueError("Context cannot be empty.")
-        if not question:
-            raise ValueError("Question cannot be empty.")
-        if isinstance(context, list):
-            context = " ".join(context)
-        prompt = self._prompt_builder.build(context, question)
+        prompt = self._build_prompt(context, question)
         payload = {
             "inputs": prompt,
             "parameters": self._params,
         }
-        payload = json.dumps(payload)
-        payload = payload.encode("utf-8")
+        payload = codec.dumpb(payload)
         response = self.predictor.predict(
             payload,
             initial_args={"ContentType": "application/json"},
@@ -67,7 +116,27 @@ class FalconSummarizerClient(SummarizerClient):
         )
         return response[0]["generated_text"][len(prompt) :]  # noqa: E203
 
+    def summarize_stream(
+        self, context: str | List[str], question: str
+    ) -> Iterator[str]:
+        prompt = self._build_prompt(context, question)
+        payload = {
+            "inputs": prompt,
+            "parameters": self._params,
+            "stream": True,
+        }
+        payload = codec.dumpb(payload)
+        lines = self.predictor.predict_stream(
+            payload,
+            initial_args={"ContentType": "application/json"},
+            custom_attributes="accept_eula=true",
+            iterator=LineIterator,
+        )
+        # Only the generated tokens are streamed, not the prompt
+        yield from iter_stream_tokens(lines)
+
 
+@with_logger()
 class Llama2SummarizerClient(SummarizerClient):
     def __init__(
         self,
@@ -84,6 +153,7 @@ class Llama2SummarizerClient(SummarizerClient):
         self._connected = True
         config = self._assets_repo.get_json_asset(config_filename)
         self._templates = config["templates"]
+        self._set_context_max_tokens(config, endpoint_name)
         self._params = config["llama2_params"]
         self._prompt_type = prompt_type
         self._prompt_builder = SemanticSearchSummarizePrompt()
@@ -96,14 +166,7 @@ class Llama2SummarizerClient(SummarizerClient):
     def connected(self):
         return self._connected
 
-    def summarize(self, context: str | List[str], question) -> str:
-        if not context:
-            raise ValueError("Context cannot be empty.")
-        if not question:
-            raise ValueError("Question cannot be empty.")
-        if isinstance(context, list):
-            context = " ".join(context)
-        prompt = self._prompt_builder.build(context, question)
+    def _payload(self, prompt: str, question: str, stream: bool) -> bytes:
         payload = {
             "inputs": [
                 [
@@ -116,8 +179,13 @@ class Llama2SummarizerClient(SummarizerClient):
             ],
             "parameters": self._params,
         }
-        payload = json.dumps(payload)
-        payload = payload.encode("utf-8")
+        if stream:
+            payload["stream"] = True
+        return codec.dumpb(payload)
+
+    def summarize(self, context: str | List[str], question) -> str:
+        prompt = self._build_prompt(context, question)
+        payload = self._payload(prompt, question, stream=False)
         response = self.predictor.predict(
             payload,
             initial_args={
@@ -125,9 +193,30 @@ class Llama2SummarizerClient(SummarizerClient):
             },
             custom_attributes="accept_eula=true",
         )
-        print(response)
+        log_sampled(
+            self._logger,
+            "summarizer.response",
+            logging.DEBUG,
+            "Summarizer response: %s",
+            LogPayload(response),
+        )
         return response[0]["generation"]["content"]
 
+    def summarize_stream(
+        self, context: str | List[str], question: str
+    ) -> Iterator[str]:
+        prompt = self._build_prompt(context, question)
+        payload = self._payload(prompt, question, stream=True)
+        lines = self.predictor.predict_stream(
+            payload,
+            initial_args={
+                "ContentType": "application/json",
+            },
+            custom_attributes="accept_eula=true",
+            iterator=LineIterator,
+        )
+        yield from iter_stream_tokens(lines)
+
 
 class CohereSummarizerClient(SummarizerClient):
     def __init__(
@@ -142,27 +231,27 @@ class CohereSummarizerClient(SummarizerClient):
         self._client = Client(region_name=region)
         self._endpoint_name = endpoint_name
         self._connected = False
+        # Shared by the requests, which connect it on their first call
+        self._connect_lock = Lock()
         config = self._assets_repo.get_json_asset(config_filename)
         self._templates = config["templates"]
+        self._set_context_max_tokens(config, endpoint_name)
         self._params = config["cohere_params"]
         self._prompt_type = prompt_type
         self._prompt_builder = SemanticSearchSummarizePrompt()
         self._prompt_builder.template = self._templates[self._prompt_type]
 
     def connect(self):
-        self._client.connect_to_endpoint(endpoint_name=self._endpoint_name)
-        self._connected = True
+        with self._connect_lock:
+            if self._connected:
+                return
+            self._client.connect_to_endpoint(endpoint_name=self._endpoint_name)
+            self._connected = True
 
     def summarize(self, context: str | List[str], question) -> str:
-        if not context:
-            raise ValueError("Context cannot be empty.")
-        if not question:
-            raise ValueError("Question cannot be empty.")
-        if isinstance(context, list):
-            context = " ".join(context)
+        prompt = self._build_prompt(context, question)
         if not self._connected:
             self.connect()
-        prompt = self._prompt_builder.build(context, question)
         response = self._client.generate(
             prompt=prompt,
             **self._params,
@@ -196,6 +285,7 @@ class BedrockSummarizerClient(SummarizerClient):
         self._endpoint_name = endpoint_name
         self._connected = True
         self._templates = config["templates"]
+        self._set_context_max_tokens(config, endpoint_name)
         self._prompt_type = prompt_type
         self._prompt_builder = SemanticSearchSummarizePrompt()
         self._prompt_builder.template = self._templates[self._prompt_type]
@@ -203,18 +293,10 @@ class BedrockSummarizerClient(SummarizerClient):
     def connect(self):
         pass
 
-    def summarize(self, context: str | List[str], question) -> str:
-        if not context:
-            raise ValueError("Context cannot be empty.")
-        if not question:
-            raise ValueError("Question cannot be empty.")
-        if isinstance(context, list):
-            context = " ".join(context)
-
+    def _payload(self, prompt: str) -> tuple[dict, str, list[str] | None]:
+        # Payload, key and subkeys of the answer in the response
         result_key = ""
         result_subkeys = None
-
-        prompt = self._prompt_builder.build(context, question)
         payload = {"inputText": prompt}
 
         if "titan" in self._params["modelId"]:
@@ -229,11 +311,15 @@ class BedrockSummarizerClient(SummarizerClient):
         elif "ai21" in self._params["modelId"]:
             result_key = "completions"
             result_subkeys = ["data", "text"]
+        return payload, result_key, result_subkeys
+
+    def summarize(self, context: str | List[str], question) -> str:
+        prompt = self._build_prompt(context, question)
+        payload, result_key, result_subkeys = self._payload(prompt)
 
-        payload = json.dumps(payload)
-        payload = payload.encode("utf-8")
+        payload = codec.dumpb(payload)
         response = self.predictor.invoke_model(body=payload, **self._params)
-        response_body = json.loads(response.get("body").read())
+        response_body = codec.loads(response.get("body").read())
         result = response_body.get(result_key)
 
         # fetch deeper result based on result_subkeys
@@ -245,6 +331,32 @@ class BedrockSummarizerClient(SummarizerClient):
                     result = result.get(key)
         return result  # noqa: E203
 
+    def summarize_stream(
+        self, context: str | List[str], question: str
+    ) -> Iterator[str]:
+        # Key of the text in the streamed chunks
+        if "titan" in self._params["modelId"]:
+            chunk_key = "outputText"
+        elif "anthropic" in self._params["modelId"]:
+            chunk_key = "completion"
+        else:
+            # AI21 models do not stream
+            yield from super().summarize_stream(context, question)
+            return
+
+        prompt = self._build_prompt(context, question)
+        payload, _, _ = self._payload(prompt)
+        response = self.predictor.invoke_model_with_response_stream(
+            body=codec.dumpb(payload), **self._params
+        )
+        for event in response.get("body"):
+            chunk = event.get("chunk")
+            if chunk is None:
+                continue
+            text = codec.loads(chunk["bytes"]).get(chunk_key)
+            if text:
+                yield text
+
     @property
     def connected(self) -> bool:
         return self._connected
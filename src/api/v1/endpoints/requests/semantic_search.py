@@ -67,11 +67,33 @@ class SummarizeRequest:
         options: list[int] | None = Query(
             default=None, description="List of options' IDs to summarize."
         ),
+        analyticsId: str | None = Query(
+            default=None,
+            description="Analytics ID returned by a search of the same "
+            "query, its options are summarized.",
+        ),
     ):
         self.query = query
         self.org_id = orgId
         self.deployment_id = deploymentId
         self.options = options
+        self.analytics_id = analyticsId
+
+
+class SummarizeJobRequest:
+    def __init__(
+        self,
+        jobId: str,
+        orgId: int = Query(..., description="Organization ID."),
+        wait: float = Query(
+            default=0,
+            ge=0,
+            description="Seconds to wait for the job while it is pending.",
+        ),
+    ):
+        self.job_id = jobId
+        self.org_id = orgId
+        self.wait = wait
 
 
 class SuggestionsRequest:
@@ -111,6 +111,24 @@ class SummarizeAnswerResponse(BaseResponse):
     data: SummarizeAnswerData
 
 
+class SummarizeJobData(BaseModel):
+    jobId: str = Field(description="The id of the summarize job")
+    status: str = Field(
+        description="The status of the job: pending, done or failed",
+        example="done",
+    )
+    answer: str | None = Field(
+        default=None, description="The answer, once the job is done"
+    )
+    options: list[SemanticSearchOption] = Field(
+        default=[], description="The options summarized"
+    )
+
+
+class SummarizeJobResponse(BaseResponse):
+    data: SummarizeJobData
+
+
 class ConnectorTypeData(BaseModel):
     name: str
     desc: str | None = Field(..., alias="description")
@@ -1,5 +1,10 @@
+from typing import Iterator
+
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from src.api.v1.endpoints.requests.semantic_search import (
     ConnectorsRequest,
@@ -8,6 +13,7 @@ from src.api.v1.endpoints.requests.semantic_search import (
     SearchFilters,
     SearchRequest,
     SuggestionsRequest,
+    SummarizeJobRequest,
     SummarizeRequest,
     TagsRequest,
 )
@@ -20,12 +26,17 @@ from src.api.v1.endpoints.responses.semantic_search import (
     SearchResponse,
     SearchSuggestionsResponse,
     SemanticSearchData,
+    SemanticSearchOption,
     SummarizeAnswerData,
     SummarizeAnswerResponse,
+    SummarizeJobData,
+    SummarizeJobResponse,
     TagsResponse,
 )
+from src.core.config import get_settings
 from src.core.containers import Container
-from src.exceptions.http import ValidationException
+from src.core.deps.logger import get_logger
+from src.exceptions.http import NotFoundException, ValidationException
 from src.middlewares.collect_audit_data_middleware import (
     collect_audit_data_middleware,
 )
@@ -34,6 +45,8 @@ from src.services.semantic_search import (
     SemanticSearchService,
     SummarizeAnswerService,
 )
+from src.services.summarize_jobs import SummarizeJobService
+from src.util import sse
 
 router = APIRouter()
 
@@ -124,6 +137,7 @@ async def summarize(
         org_id=request.org_id,
         deployment_id=request.deployment_id,
         options_id_list=request.options,
+        search_id=request.analytics_id,
     )
     return SummarizeAnswerResponse(
         data=SummarizeAnswerData(
@@ -132,6 +146,125 @@ async def summarize(
     )
 
 
+def summarize_events(options: list[dict], answer: Iterator[str]):
+    """Events of a streamed summary.
+
+    An `options` event with the options summarized, a `token` event per
+    piece of the answer, then a `done` event, or an `error` event if the
+    answer could not be generated.
+    """
+
+    yield sse.format_event(
+        "options",
+        jsonable_encoder([SemanticSearchOption.parse_obj(o) for o in options]),
+    )
+    try:
+        for text in answer:
+            yield sse.format_event("token", {"text": text})
+    except Exception as e:
+        # The status was sent with the options, the error is an event
+        get_logger(__name__).error(f"[Summarize-Answer] Stream failed: {e}")
+        yield sse.format_event(
+            "error", {"message": "The answer could not be generated"}
+        )
+        return
+    yield sse.format_event("done", {})
+
+
+@router.get(
+    "/summarize/stream",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    description="Summarize most relevant content into a concrete answer, "
+    "streamed as Server-Sent Events: the options, then the answer as it is "
+    "generated.",
+    tags=["summarize"],
+)
+@inject
+async def summarize_stream(
+    request: SummarizeRequest = Depends(),
+    summarize_service: SummarizeAnswerService = Depends(
+        Provide[Container.summarize_answer_service]
+    ),
+):
+    options, answer = summarize_service.handle_stream(
+        query=request.query,
+        org_id=request.org_id,
+        deployment_id=request.deployment_id,
+        options_id_list=request.options,
+        search_id=request.analytics_id,
+    )
+    return StreamingResponse(
+        summarize_events(options, answer),
+        media_type=sse.MEDIA_TYPE,
+        headers=sse.HEADERS,
+    )
+
+
+def summarize_job_response(job: dict) -> SummarizeJobResponse:
+    return SummarizeJobResponse(
+        data=SummarizeJobData(
+            jobId=job["id"],
+            status=job["status"],
+            answer=job.get("answer"),
+            options=job.get("options", []),
+        )
+    )
+
+
+@router.post(
+    "/summarize/jobs",
+    response_model=SummarizeJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Summarize most relevant content into a concrete answer in "
+    "the background. The same query and options are summarized once, the "
+    "job is polled for with its id.",
+    tags=["summarize"],
+)
+@inject
+async def submit_summarize_job(
+    request: SummarizeRequest = Depends(),
+    summarize_service: SummarizeAnswerService = Depends(
+        Provide[Container.summarize_answer_service]
+    ),
+):
+    # Searches and reads Redis, off the event loop
+    job = await run_in_threadpool(
+        summarize_service.submit_job,
+        query=request.query,
+        org_id=request.org_id,
+        deployment_id=request.deployment_id,
+        options_id_list=request.options,
+        search_id=request.analytics_id,
+    )
+    return summarize_job_response(job)
+
+
+@router.get(
+    "/summarize/jobs/{jobId}",
+    response_model=SummarizeJobResponse,
+    status_code=status.HTTP_200_OK,
+    description="Get a summarize job, waiting up to `wait` seconds while it "
+    "is pending.",
+    tags=["summarize"],
+)
+@inject
+async def get_summarize_job(
+    request: SummarizeJobRequest = Depends(),
+    summarize_jobs: SummarizeJobService = Depends(
+        Provide[Container.summarize_job_service]
+    ),
+):
+    job = await summarize_jobs.wait(
+        request.job_id,
+        request.org_id,
+        min(request.wait, get_settings().SUMMARIZER_JOBS_MAX_WAIT),
+    )
+    if job is None:
+        raise NotFoundException(message=f"Job {request.job_id} not found")
+    return summarize_job_response(job)
+
+
 @router.get(
     "/tags",
     response_model=TagsResponse,
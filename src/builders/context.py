@@ -0,0 +1,86 @@
+import math
+import re
+from typing import Hashable, Iterable
+
+
+class ContextPacker:
+    """Pack the snippets of a summary into a budget of tokens.
+
+    The snippets are taken in the order given, the closest to the query
+    first, and split into sentences. A sentence already packed from the
+    same document is skipped, so overlapping snippets of a document add
+    their new sentences only. Packing stops at the first sentence that
+    does not fit, the snippet being cut after its last sentence that does.
+
+    The tokens are counted approximately, from the length of the text,
+    which is enough to size a prompt and costs nothing next to a
+    tokenizer.
+
+    Parameters
+    ----------
+    max_tokens : int
+        Tokens of the packed snippets, 0 to keep them all.
+    chars_per_token : float, optional
+        Characters of a token on average, by default 4.0 (English text
+        with the usual BPE tokenizers)
+    """
+
+    # As the sentence chunker splits the documents
+    SENTENCE_RE = re.compile(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s+")
+
+    def __init__(self, max_tokens: int, chars_per_token: float = 4.0):
+        self._max_tokens = max_tokens
+        self._chars_per_token = chars_per_token
+
+    def count_tokens(self, text: str) -> int:
+        """Approximate number of tokens of a text."""
+
+        return math.ceil(len(text) / self._chars_per_token)
+
+    def pack(self, snippets: Iterable[tuple[Hashable, str]]) -> list[str]:
+        """Pack snippets into the budget.
+
+        Parameters
+        ----------
+        snippets : Iterable[tuple[Hashable, str]]
+            Document key and text of the snippets, the closest first.
+
+        Returns
+        -------
+        list[str]
+            Texts of the snippets packed, in the order given.
+        """
+
+        snippets = list(snippets)
+        if self._max_tokens <= 0:
+            return [snippet for _, snippet in snippets]
+
+        packed = []
+        seen: dict[Hashable, set[str]] = {}
+        # Separators between the snippets and sentences count as well
+        budget = self._max_tokens * self._chars_per_token + 1
+        for document, snippet in snippets:
+            document_seen = seen.setdefault(document, set())
+            sentences = []
+            full = False
+            for sentence in self.SENTENCE_RE.split(snippet.strip()):
+                if not sentence or sentence in document_seen:
+                    continue
+                if len(sentence) + 1 > budget:
+                    full = True
+                    break
+                budget -= len(sentence) + 1
+                document_seen.add(sentence)
+                sentences.append(sentence)
+            if sentences:
+                packed.append(" ".join(sentences))
+            if full:
+                break
+
+        if not packed and snippets:
+            # Not even a sentence fits, cut the closest one at a word
+            cut = snippets[0][1].strip()[: int(budget) - 1]
+            if " " in cut:
+                cut = cut.rsplit(" ", 1)[0]
+            packed.append(cut)
+        return packed
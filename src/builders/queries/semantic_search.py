@@ -1,4 +1,5 @@
 import json
+import logging
 from copy import deepcopy
 
 from sqlalchemy import ARRAY, String, select, text, union_all
@@ -6,11 +7,12 @@ from sqlalchemy.sql import and_, not_, or_
 from sqlalchemy.sql.expression import func
 
 from src.api.v1.endpoints.requests.semantic_search import SearchFilters
-from src.core.deps.logger import with_logger
+from src.core.deps.logger import LogPayload, log_sampled, with_logger
 from src.exceptions.http import NotFoundException
 from src.models.semantic_search_item import (
     SemanticSearchDocument,
     SemanticSearchItem,
+    SemanticSearchShadowItem,
 )
 from src.schemas.services.config_svc import SearchWidget
 from src.schemas.services.connectors_svc import Connector
@@ -27,7 +29,7 @@ class SemanticSearchBaseQueryBuilder:
 
     def _prepare_data_filter(self, filter_data: dict):
         filters = []
-        self._logger.info(f"Query filter_data: {json.dumps(filter_data)}")
+        self._logger.info("Query filter_data: %s", LogPayload(filter_data))
         for key, value in filter_data.items():
             if isinstance(value, str):
                 filters.append(
@@ -207,22 +209,49 @@ class SemanticSearchBaseQueryBuilder:
 
 
 class SemanticSearchSearchQueryBuilder(SemanticSearchBaseQueryBuilder):
-    def __init__(self, embeddings: list[float], org_id: int, treshold: float):
+    def __init__(
+        self,
+        embeddings: list[float],
+        org_id: int,
+        treshold: float,
+        version: str | None = None,
+    ):
         super().__init__(org_id)
         self.embeddings = embeddings
         self.treshold = treshold
+        # Shadow embeddings version to search, the items embeddings if None
+        self.version = version
+
+    def _distance(self):
+        vectors = SemanticSearchItem.embeddings
+        if self.version is not None:
+            vectors = SemanticSearchShadowItem.embeddings
+        return vectors.cosine_distance(self.embeddings)
+
+    def _join_vectors(self, query: select) -> select:
+        if self.version is None:
+            return query
+        return query.join(
+            SemanticSearchShadowItem,
+            and_(
+                SemanticSearchShadowItem.item_id == SemanticSearchItem.id,
+                SemanticSearchShadowItem.version == self.version,
+            ),
+        )
 
     def _start_query(self):
         self._query = (
-            select(SemanticSearchItem.id)
-            .distinct(
-                SemanticSearchItem.document_id,
+            self._join_vectors(
+                select(SemanticSearchItem.id)
+                .distinct(
+                    SemanticSearchItem.document_id,
+                )
+                .join(SemanticSearchDocument)
             )
-            .join(SemanticSearchDocument)
             .where(SemanticSearchDocument.org_id == self.org_id)
             .order_by(
                 SemanticSearchItem.document_id,
-                SemanticSearchItem.embeddings.cosine_distance(self.embeddings),
+                self._distance(),
             )
         )
 
@@ -231,31 +260,32 @@ class SemanticSearchSearchQueryBuilder(SemanticSearchBaseQueryBuilder):
         self._apply_filters()
 
         q = (
-            select(SemanticSearchItem)
-            .add_columns(
-                SemanticSearchItem.embeddings.cosine_distance(
-                    self.embeddings
-                ).label("distance")
-            )
+            self._join_vectors(select(SemanticSearchItem))
+            .add_columns(self._distance().label("distance"))
             .order_by(text("distance"))
             .where(SemanticSearchItem.id.in_(self._query))
-            .filter(
-                SemanticSearchItem.embeddings.cosine_distance(self.embeddings)
-                < self.treshold * 2
-            )
+            .filter(self._distance() < self.treshold * 2)
             .limit(self.limit)
         )
 
-        self._logger.info(f"Query: {q}")
+        # Compiled only if emitted, the embeddings make it expensive
+        log_sampled(
+            self._logger,
+            "semantic_search.query",
+            logging.DEBUG,
+            "Query: %s",
+            LogPayload(q),
+        )
         return q
 
     def _start_best_query(self) -> None:
         self._query = (
-            select(SemanticSearchItem)
-            .join(SemanticSearchDocument)
+            self._join_vectors(
+                select(SemanticSearchItem).join(SemanticSearchDocument)
+            )
             .filter(SemanticSearchDocument.org_id == self.org_id)
             .order_by(
-                SemanticSearchItem.embeddings.cosine_distance(self.embeddings),
+                self._distance(),
             )
         )
 
@@ -0,0 +1,136 @@
+"""Backfill the gold records from the stored silver objects.
+
+Runs the silver to gold transformation over every silver object of an
+organization, e.g. after changing the embedder or the chunking settings,
+without replaying the articles through Kafka::
+
+    python -m src.commands.backfill --source article_kb \\
+        --bucket my-bucket-silver --org 123 --checkpoint backfill.json
+
+Documents whose content and configuration did not change are skipped. Run
+the command again with the same checkpoint to resume after a crash.
+"""
+
+import argparse
+import logging
+
+from src.contracts.storage import StorageInterface
+from src.core.config import get_settings
+from src.core.containers import container
+from src.core.deps.kafka import NullProducer
+from src.data.util import S3IsolationLocationParser
+from src.services.data.backfill import BackfillCheckpoint, BackfillService
+
+
+# Job id of the statuses, which are not published
+JOB_ID = "backfill"
+
+
+def _handle_article_kb(storage: StorageInterface, bucket, key, content):
+    parser = S3IsolationLocationParser(key)
+    service = container.article_kb_silver_to_gold_service(
+        assets_repo=storage, event_producer=NullProducer()
+    )
+    service.set_job_id(JOB_ID)
+    return service.handle(
+        bucket,
+        key,
+        content["connector_id"],
+        "Object Created",
+        parser.get_id(),
+        int(parser.get_org_id()),
+    )
+
+
+def _handle_zt_trees(storage: StorageInterface, bucket, key, content):
+    parser = S3IsolationLocationParser(key)
+    service = container.zt_trees_silver_to_gold_service(
+        assets_repo=storage, event_producer=NullProducer()
+    )
+    service.set_job_id(JOB_ID)
+    return service.handle(
+        bucket,
+        key,
+        "Object Created",
+        parser.get_id(),
+        int(parser.get_org_id()),
+        # Only reported in the job status, the tree fingerprint and records
+        # do not depend on it
+        content.get("connector_id", 0),
+    )
+
+
+def _handle_html(storage: StorageInterface, bucket, key, content):
+    return container.html_silver_to_gold_service(assets_repo=storage).handle(
+        bucket, key, "Object Created"
+    )
+
+
+# Source to (silver path segment, handler, filterable by connector)
+SOURCES = {
+    "article_kb": ("articles", _handle_article_kb, True),
+    "zt_trees": ("zt_trees", _handle_zt_trees, False),
+    # The silver pages hold no connector, it is resolved from the org
+    "html": ("html", _handle_html, False),
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.commands.backfill",
+        description="Backfill the gold records from the silver objects.",
+    )
+    parser.add_argument("--source", choices=sorted(SOURCES), required=True)
+    parser.add_argument(
+        "--bucket", required=True, help="Bucket of the silver objects"
+    )
+    parser.add_argument("--org", type=int, required=True)
+    parser.add_argument(
+        "--connector",
+        type=int,
+        help="Only backfill the documents of this connector",
+    )
+    parser.add_argument(
+        "--prefix",
+        help="Prefix of the silver objects, by default "
+        "silver/<source path>/<org>/",
+    )
+    parser.add_argument(
+        "--checkpoint", help="File to save the progress to and resume from"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between progress reports and checkpoints",
+    )
+
+    args = parser.parse_args(argv)
+    if args.connector is not None and not SOURCES[args.source][2]:
+        parser.error(f"--connector is not supported for {args.source}")
+    return args
+
+
+def main(argv: list[str] | None = None) -> dict:
+    args = parse_args(argv)
+    path, handler, _ = SOURCES[args.source]
+    prefix = args.prefix or f"silver/{path}/{args.org}/"
+
+    service = BackfillService(
+        container.storage_s3(),
+        handler,
+        workers=args.workers,
+        checkpoint=(
+            BackfillCheckpoint(args.checkpoint) if args.checkpoint else None
+        ),
+        report_interval=args.report_interval,
+    )
+    return service.run(args.bucket, prefix, args.connector)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=get_settings().LOG_LEVEL)
+    container.wire(packages=["src"])
+    state = main()
+    raise SystemExit(1 if state["failed"] else 0)
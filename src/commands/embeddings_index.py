@@ -0,0 +1,90 @@
+"""Manage the shadow embeddings index.
+
+Migrating the searches to another embedder without downtime:
+
+1. Set the `EMBEDDINGS_SHADOW_*` settings to the new embedder and deploy,
+   ingestion then writes the new embeddings next to the current ones.
+2. Embed the items ingested before::
+
+       python -m src.commands.embeddings_index fill
+
+3. Switch every search to the new embeddings, and back if needed::
+
+       python -m src.commands.embeddings_index cutover
+       python -m src.commands.embeddings_index rollback
+"""
+
+import argparse
+import logging
+
+from src.core.config import get_settings
+from src.core.containers import container
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.commands.embeddings_index",
+        description="Manage the shadow embeddings index.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "status", help="Show the active version and the fill progress"
+    )
+
+    fill = commands.add_parser(
+        "fill", help="Embed the items without shadow embeddings"
+    )
+    fill.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Chunks embedded per embedder call",
+    )
+    fill.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="Seconds to wait between batches, to spare the searches",
+    )
+
+    cutover = commands.add_parser(
+        "cutover", help="Search the shadow embeddings"
+    )
+    cutover.add_argument(
+        "--force",
+        action="store_true",
+        help="Switch even if some items have no shadow embeddings",
+    )
+
+    commands.add_parser("rollback", help="Search the primary embeddings")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    index = container.embeddings_index_service()
+    logger = logging.getLogger(__name__)
+
+    match args.command:
+        case "status":
+            print(f"Active version: {index.active_version()}")
+            print(f"Shadow version: {index.shadow_version}")
+            if index.shadow_version is not None:
+                print(
+                    f"Items without shadow embeddings: "
+                    f"{index.missing_shadow()}"
+                )
+        case "fill":
+            filled = index.fill_shadow(args.batch_size, args.pause)
+            logger.info(f"{filled} shadow embeddings stored")
+        case "cutover":
+            index.cutover(force=args.force)
+        case "rollback":
+            index.rollback()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=get_settings().LOG_LEVEL)
+    main()
@@ -17,3 +17,9 @@ class CacheInterface(ABC):
     @abstractmethod
     def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
+
+    def incr(self, key: str, ttl: float | None = None) -> int:
+        """Increment a counter in cache"""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support counters"
+        )
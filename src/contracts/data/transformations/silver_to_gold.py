@@ -1,13 +1,13 @@
 from abc import abstractmethod
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from src.contracts.data.transformations.base import BaseTransformationInterface
 
 
 class SilverToGoldTransformationInterface(BaseTransformationInterface):
     @abstractmethod
-    def handle(self) -> List[dict]:
-        """Handle transformation"""
+    def handle(self) -> Iterator[List[dict]]:
+        """Handle transformation, yielding the records batch by batch"""
 
     @abstractmethod
     def concat_text(self, content: Dict[str, str]) -> str:
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class StorageInterface(ABC):
@@ -6,6 +7,12 @@ class StorageInterface(ABC):
     def get_file(self, key: str, bucket: str | None = None) -> any:
         """Get file from storage"""
 
+    @abstractmethod
+    def iter_file_chunks(
+        self, key: str, bucket: str | None = None, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Iterate over the content of a file from storage, in chunks"""
+
     @abstractmethod
     def get_json(self, key: str, bucket: str | None = None) -> dict:
         """Get a JSON from storage"""
@@ -26,6 +33,15 @@ class StorageInterface(ABC):
     ) -> list[str]:
         """List files in storage"""
 
+    @abstractmethod
+    def iter_files(
+        self,
+        bucket: str | None = None,
+        prefix: str = "",
+        start_after: str = "",
+    ) -> Iterator[str]:
+        """Iterate over the files in storage, in key order"""
+
     @abstractmethod
     def delete_file(self, key: str, bucket: str | None = None) -> None:
         """Delete file in storage"""
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 
 class SummarizerInterface(ABC):
@@ -7,6 +7,12 @@ class SummarizerInterface(ABC):
     def summarize(self, context: str | List[str], question) -> str:
         """Summarize text"""
 
+    @abstractmethod
+    def summarize_stream(
+        self, context: str | List[str], question
+    ) -> Iterator[str]:
+        """Summarize text, yielding the answer as it is generated"""
+
     @abstractmethod
     def connect(self):
         """Connect to endpoint"""
@@ -15,3 +21,8 @@ class SummarizerInterface(ABC):
     @abstractmethod
     def connected(self) -> bool:
         """Return connection status"""
+
+    @property
+    @abstractmethod
+    def context_max_tokens(self) -> int:
+        """Return the tokens of context of a prompt, 0 if unlimited"""
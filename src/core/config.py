@@ -15,7 +15,14 @@ class Settings(BaseSettings):
 
     # Log and Debug
     DEBUG: bool = True
-    LOG_LEVEL: str = "DEBUG"
+    LOG_LEVEL: str = "INFO"
+    # Characters of a payload kept in a log message
+    LOG_PAYLOAD_MAX_LENGTH: int = 2000
+    # Share of the messages logged per call site, e.g. {"embedder.output": 0.1}
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+
+    # JSON codec: auto (orjson if installed), orjson or json
+    JSON_CODEC: str = "auto"
 
     # Redis
     REDIS_URL: AnyUrl = None
@@ -46,7 +53,53 @@ class Settings(BaseSettings):
     KAFKA_SECURITY_PROTOCOL: str = "PLAINTEXT"
     KAFKA_EMBED_JOB_STATUS_TOPIC: str = "embed-job-status-local"
     KAFKA_EMBED_JOBS_TOPIC: str = "embed-jobs-local"
+    # Interactive embed jobs (single article edits), served ahead of the bulk
+    # ones published on KAFKA_EMBED_JOBS_TOPIC, empty to not subscribe
+    KAFKA_EMBED_JOBS_PRIORITY_TOPIC: str = "embed-jobs-priority-local"
     KAFKA_GROUP_ID: str = "random-id-123"
+    # Embed jobs are processed concurrently by this many worker threads.
+    # Any idle worker takes the next job: interactive jobs first, then the
+    # organizations in weighted round robin within their concurrency cap.
+    # Jobs of the same article run one after the other, in order
+    KAFKA_CONSUMER_WORKERS: int = 4
+    # Partitions are paused while this many messages are pending, pending
+    # messages are scheduled fairly between organizations
+    KAFKA_CONSUMER_MAX_IN_FLIGHT: int = 64
+    # In-flight slots bulk jobs can never take, kept for interactive ones
+    KAFKA_CONSUMER_RESERVED_IN_FLIGHT: int = 4
+    # Embed jobs of an organization processed at once, 0 for no limit
+    KAFKA_CONSUMER_ORG_CONCURRENCY: int = 2
+    # Jobs started per scheduling round by organization id, defaults to 1
+    KAFKA_CONSUMER_ORG_WEIGHTS: dict[int, int] = {}
+    # Seconds embed jobs are held so repeated updates of an article are
+    # processed once, 0 to disable
+    KAFKA_CONSUMER_COALESCE_WINDOW: float = 0.0
+    # Max messages fetched on each consume call
+    KAFKA_CONSUMER_BATCH_SIZE: int = 16
+    # Seconds between commits of the processed offsets
+    KAFKA_CONSUMER_COMMIT_INTERVAL: float = 5.0
+    # Seconds to wait for in-flight messages on shutdown
+    KAFKA_CONSUMER_DRAIN_TIMEOUT: float = 30.0
+
+    # Ingestion
+    # When disabled, the API does not consume embed jobs and they must be
+    # handled by workers started with `python -m src.worker`
+    INGESTION_ENABLED: bool = True
+    WORKER_HOST: str = "0.0.0.0"
+    WORKER_PORT: int = 8056
+    # Hand the medallion stages outputs forward in memory instead of
+    # reading them back from S3
+    PIPELINE_PASS_THROUGH: bool = False
+    # With pass-through, keep writing the bronze and silver objects to S3,
+    # from background threads
+    PIPELINE_PERSIST_INTERMEDIATE: bool = True
+    PIPELINE_UPLOAD_WORKERS: int = 4
+    PIPELINE_UPLOAD_MAX_PENDING: int = 64
+    # Processes transforming the bronze trees nodes and articles into
+    # silver, 0 to transform them in the consumer threads, -1 for one per CPU
+    TRANSFORM_PROCESSES: int = 0
+    # Tree nodes sent to a process at once
+    TRANSFORM_PROCESS_CHUNK_SIZE: int = 64
 
     # AWS
     AWS_ACCESS_KEY_ID: str = None
@@ -78,6 +131,41 @@ class Settings(BaseSettings):
     # "cohere_embedder" or "huggingface_embedder"
     EMBEDDINGS_ENDPOINT_TYPE: str = "huggingface_embedder"
     EMBEDDINGS_ENDPOINT_NAME: str = "amazon.titan-e1t-medium"
+    # Chunks sent per embedder call while a document is chunked
+    EMBEDDINGS_BATCH_SIZE: int = 64
+
+    # Shadow index: version name of an embedder whose vectors are written
+    # next to the primary ones, to switch searches to another model without
+    # downtime. Empty to disable
+    EMBEDDINGS_SHADOW_VERSION: str = ""
+    EMBEDDINGS_SHADOW_ENDPOINT_TYPE: str = "huggingface_embedder"
+    EMBEDDINGS_SHADOW_ENDPOINT_NAME: str = ""
+    EMBEDDINGS_SHADOW_DIMENSIONS: int = 4096
+
+    # Seconds a process keeps using the active embeddings version before
+    # reading it again from Redis
+    EMBEDDINGS_ACTIVE_VERSION_TTL: float = 5.0
+
+    # Query embeddings (searches and summaries): seconds a call may take,
+    # and delay after which a slow call is sent again, until the latencies
+    # percentile can be used. Hedge delay 0 to never send it again
+    EMBEDDINGS_QUERY_DEADLINE: float = 2.0
+    EMBEDDINGS_QUERY_HEDGE_DELAY: float = 0.3
+    EMBEDDINGS_QUERY_HEDGE_PERCENTILE: float = 95
+    EMBEDDINGS_QUERY_WORKERS: int = 16
+    # Failed calls in a row after which the query embeddings fail fast for
+    # the reset timeout seconds
+    EMBEDDINGS_QUERY_BREAKER_FAILURES: int = 5
+    EMBEDDINGS_QUERY_BREAKER_RESET_TIMEOUT: float = 30.0
+    # Query embeddings of concurrent requests sent in one call: texts per
+    # call, 1 to disable, and seconds a call waits for others. Only worth it
+    # with an endpoint embedding a list of texts at once, e.g. Cohere
+    EMBEDDINGS_QUERY_BATCH_SIZE: int = 1
+    EMBEDDINGS_QUERY_BATCH_WINDOW: float = 0.005
+
+    # Connect the embedder and the summarizer, with a first call to each,
+    # when the API starts
+    ADAPTERS_WARMUP: bool = False
 
     # Summarizer
     # The values could be "bedrock_summarizer", "cohere_summarizer"
@@ -87,6 +175,28 @@ class Settings(BaseSettings):
     SUMMARIZER_ENDPOINT_NAME: str = "amazon.titan-tg1-large"
     SUMMARIZER_PROMPT_TYPE: str = "short"
     SUMMARIZER_CONFIG_FILE: str = "summarizer_config.json"
+    # Seconds between the checks of the config file, the summarizer is
+    # rebuilt when it changed, 0 to never reload it
+    SUMMARIZER_CONFIG_RELOAD_INTERVAL: float = 60.0
+    # Speculative summaries: deployment ids of the widgets whose searches
+    # are summarized in the background, "*" for all of them
+    SUMMARIZER_SPECULATIVE_DEPLOYMENTS: list[str] = []
+    SUMMARIZER_SPECULATIVE_WORKERS: int = 2
+    # Summaries waiting or running at once, and seconds one may wait
+    SUMMARIZER_SPECULATIVE_MAX_PENDING: int = 16
+    SUMMARIZER_SPECULATIVE_MAX_DELAY: float = 10.0
+    SUMMARIZER_SPECULATIVE_TTL: int = 60 * 5  # 5 minutes
+    # Speculative summaries of an organization per window of seconds
+    SUMMARIZER_SPECULATIVE_ORG_LIMIT: int = 500
+    SUMMARIZER_SPECULATIVE_ORG_WINDOW: int = 60 * 60  # 1 hour
+    # Summarize jobs: threads generating them, and jobs waiting or running
+    # at once per process
+    SUMMARIZER_JOBS_WORKERS: int = 4
+    SUMMARIZER_JOBS_MAX_PENDING: int = 64
+    SUMMARIZER_JOBS_TTL: int = 60 * 5  # 5 minutes
+    SUMMARIZER_JOBS_POLL_INTERVAL: float = 0.25
+    # Seconds a poll of a job may wait for it
+    SUMMARIZER_JOBS_MAX_WAIT: float = 20.0
 
     # Semantic Search Snippet Length
     SEMANTIC_SEARCH_CHUNK_LENGTH: int = 1000
@@ -103,10 +213,19 @@ class Settings(BaseSettings):
 
     # Value between 0 and 1
     SEMANTIC_SEARCH_THRESHOLD: float = 0.70
+    # Threshold of the searches on the shadow embeddings, whose distances
+    # depend on another model, 0 to use SEMANTIC_SEARCH_THRESHOLD
+    SEMANTIC_SEARCH_SHADOW_THRESHOLD: float = 0.0
+    # Seconds the results of a search are kept for the summary of the same
+    # query, 0 to search again on each summary
+    SEMANTIC_SEARCH_RESULTS_TTL: int = 60 * 5  # 5 minutes
 
     # svc URLs
     SERVICE_TO_SERVICE_KEY: str = "just-some-key"
     CONNECTORS_SVC_URL: str = "http://connectors-svc"
+    # Seconds the ingestion keeps the connector of an organization, 0 to
+    # resolve it for every tree or page
+    CONNECTORS_CACHE_TTL: float = 300.0
     CONFIG_SVC_URL: str = "http://config-svc"
     LIME_URL: str = "http://lime"
 
@@ -117,7 +236,7 @@ class Settings(BaseSettings):
     def clean_input(cls, value: object) -> any:
         return value.strip("\"'") if isinstance(value, str) else value
 
-    @validator("SEMANTIC_SEARCH_THRESHOLD")
+    @validator("SEMANTIC_SEARCH_THRESHOLD", "SEMANTIC_SEARCH_SHADOW_THRESHOLD")
     def validate_semantic_search_threshold(cls, value):
         if not isinstance(value, float):
             raise ValueError("Treshold must be a float")
@@ -5,6 +5,7 @@ from src.core.deps.chunker import get_chunker
 from src.repositories.assets import S3CachedAssetsRepository
 from src.repositories.audit import AuditInMemoryRepository
 from src.repositories.models.usage_log_repository import UsageLogRepository
+from src.repositories.search_results import SearchResultsRepository
 from src.repositories.services.config_svc import ConfigSvcRepository
 from src.repositories.services.connectors_svc import ConnectorsSvcRepository
 from src.repositories.services.lime import LimeRepository
@@ -19,6 +20,7 @@ from src.services.authoring import (
     SummarizeService,
     TranslateService,
 )
+from src.services.connectors import ConnectorResolver
 from src.services.data.transformations.article_kb import (
     BronzeToSilverService as SalesforceKBBronzeToSilverService,
 )
@@ -41,12 +43,17 @@ from src.services.moderation import (
     ModerationCheckOrFailService,
     ModerationService,
 )
+from src.services.speculative_summary import SpeculativeSummaryService
+from src.services.summarize_jobs import SummarizeJobService
 from src.util.cache import RedisCache
+from src.util.process_pool import ProcessPool
 from src.util.storage import S3Storage
+from src.util.uploader import BackgroundUploader
 
 from ..repositories.models.semantic_search_repository import (
     SemanticSearchRepository,
 )
+from ..services.embeddings_index import EmbeddingsIndexService
 from ..services.semantic_search import (
     SemanticSearchService,
     SummarizeAnswerService,
@@ -55,11 +62,15 @@ from .config import get_settings
 from .deps.ai_client import get_open_ai_client
 from .deps.boto3 import get_client, get_session
 from .deps.database import Database, MysqlDatabase
-from .deps.embedder import get_embedder
+from .deps.embedder import (
+    get_embedder,
+    get_query_embedder,
+    get_shadow_embedder,
+)
 from .deps.kafka import get_consumer, get_producer
 from .deps.redis import get_redis_client
 from .deps.slack import get_slack_service
-from .deps.summarizer import get_summarizer
+from .deps.summarizer import get_reloading_summarizer
 
 
 class Container(containers.DeclarativeContainer):
@@ -84,8 +95,18 @@ class Container(containers.DeclarativeContainer):
             "bootstrap.servers": get_settings().KAFKA_BOOTSTRAP_SERVERS,
             "group.id": get_settings().KAFKA_GROUP_ID,
             "auto.offset.reset": "earliest",
+            "enable.auto.commit": False,
             "security.protocol": get_settings().KAFKA_SECURITY_PROTOCOL,
         },
+        workers=get_settings().KAFKA_CONSUMER_WORKERS,
+        max_in_flight=get_settings().KAFKA_CONSUMER_MAX_IN_FLIGHT,
+        batch_size=get_settings().KAFKA_CONSUMER_BATCH_SIZE,
+        commit_interval=get_settings().KAFKA_CONSUMER_COMMIT_INTERVAL,
+        drain_timeout=get_settings().KAFKA_CONSUMER_DRAIN_TIMEOUT,
+        reserved_in_flight=get_settings().KAFKA_CONSUMER_RESERVED_IN_FLIGHT,
+        group_concurrency=get_settings().KAFKA_CONSUMER_ORG_CONCURRENCY,
+        group_weights=get_settings().KAFKA_CONSUMER_ORG_WEIGHTS,
+        coalesce_window=get_settings().KAFKA_CONSUMER_COALESCE_WINDOW,
     )
 
     # Cache
@@ -111,6 +132,20 @@ class Container(containers.DeclarativeContainer):
 
     storage_s3 = providers.Factory(S3Storage, client=s3_client)
 
+    background_uploader = providers.Singleton(
+        BackgroundUploader,
+        storage=storage_s3,
+        workers=config.PIPELINE_UPLOAD_WORKERS,
+        max_pending=config.PIPELINE_UPLOAD_MAX_PENDING,
+    )
+
+    # CPU-bound transformations
+    process_pool = providers.Singleton(
+        ProcessPool,
+        workers=config.TRANSFORM_PROCESSES,
+        chunk_size=config.TRANSFORM_PROCESS_CHUNK_SIZE,
+    )
+
     # Repositories
     audit_repository = providers.Singleton(AuditInMemoryRepository)
 
@@ -122,6 +157,12 @@ class Container(containers.DeclarativeContainer):
         ttl=config.ASSETS_CACHE_TTL,
     )
 
+    search_results_repository = providers.Factory(
+        SearchResultsRepository,
+        cache=cache_redis,
+        ttl=config.SEMANTIC_SEARCH_RESULTS_TTL,
+    )
+
     usage_log_repository = providers.Factory(
         UsageLogRepository,
         session_factory=db.provided.session,
@@ -146,6 +187,12 @@ class Container(containers.DeclarativeContainer):
         url=config.CONNECTORS_SVC_URL,
     )
 
+    connector_resolver = providers.Singleton(
+        ConnectorResolver,
+        connectors_service=connectors_svc_repository,
+        ttl=config.CONNECTORS_CACHE_TTL,
+    )
+
     config_svc_repository = providers.Factory(
         ConfigSvcRepository,
         url=config.CONFIG_SVC_URL,
@@ -264,42 +311,121 @@ class Container(containers.DeclarativeContainer):
         concat_type=config.SEMANTIC_SEARCH_CONCAT,
     )
 
-    embedder = providers.Factory(
+    # The clients are shared by the requests and the ingestion jobs
+    embedder = providers.Singleton(
         get_embedder,
         endpoint_type=config.EMBEDDINGS_ENDPOINT_TYPE,
         endpoint_name=config.EMBEDDINGS_ENDPOINT_NAME,
         aws_region=config.AWS_DEFAULT_REGION,
     )
 
-    summarizer = providers.Factory(
-        get_summarizer,
+    shadow_embedder = providers.Singleton(
+        get_shadow_embedder,
+        version=config.EMBEDDINGS_SHADOW_VERSION,
+        endpoint_type=config.EMBEDDINGS_SHADOW_ENDPOINT_TYPE,
+        endpoint_name=config.EMBEDDINGS_SHADOW_ENDPOINT_NAME,
+        aws_region=config.AWS_DEFAULT_REGION,
+    )
+
+    query_embedder = providers.Singleton(
+        get_query_embedder,
+        embedder=embedder,
+        name="primary",
+        deadline=config.EMBEDDINGS_QUERY_DEADLINE,
+        hedge_delay=config.EMBEDDINGS_QUERY_HEDGE_DELAY,
+        hedge_percentile=config.EMBEDDINGS_QUERY_HEDGE_PERCENTILE,
+        workers=config.EMBEDDINGS_QUERY_WORKERS,
+        breaker_failures=config.EMBEDDINGS_QUERY_BREAKER_FAILURES,
+        breaker_reset_timeout=config.EMBEDDINGS_QUERY_BREAKER_RESET_TIMEOUT,
+        batch_size=config.EMBEDDINGS_QUERY_BATCH_SIZE,
+        batch_window=config.EMBEDDINGS_QUERY_BATCH_WINDOW,
+    )
+
+    shadow_query_embedder = providers.Singleton(
+        get_query_embedder,
+        embedder=shadow_embedder,
+        name="shadow",
+        deadline=config.EMBEDDINGS_QUERY_DEADLINE,
+        hedge_delay=config.EMBEDDINGS_QUERY_HEDGE_DELAY,
+        hedge_percentile=config.EMBEDDINGS_QUERY_HEDGE_PERCENTILE,
+        workers=config.EMBEDDINGS_QUERY_WORKERS,
+        breaker_failures=config.EMBEDDINGS_QUERY_BREAKER_FAILURES,
+        breaker_reset_timeout=config.EMBEDDINGS_QUERY_BREAKER_RESET_TIMEOUT,
+        batch_size=config.EMBEDDINGS_QUERY_BATCH_SIZE,
+        batch_window=config.EMBEDDINGS_QUERY_BATCH_WINDOW,
+    )
+
+    embeddings_index_service = providers.Singleton(
+        EmbeddingsIndexService,
+        cache=cache_redis,
+        items_repository=semantic_search_repository,
+        embedder=query_embedder,
+        shadow_embedder=shadow_embedder,
+        shadow_query_embedder=shadow_query_embedder,
+        shadow_version=config.EMBEDDINGS_SHADOW_VERSION,
+        ttl=config.EMBEDDINGS_ACTIVE_VERSION_TTL,
+    )
+
+    # Shared by the requests, rebuilt when its config asset changes
+    summarizer = providers.Singleton(
+        get_reloading_summarizer,
         assets_repo=assets_s3_cached_repository,
         endpoint_type=config.SUMMARIZER_ENDPOINT_TYPE,
         endpoint_name=config.SUMMARIZER_ENDPOINT_NAME,
         aws_region=config.AWS_DEFAULT_REGION,
         prompt_type=config.SUMMARIZER_PROMPT_TYPE,
         config_filename=config.SUMMARIZER_CONFIG_FILE,
+        check_interval=config.SUMMARIZER_CONFIG_RELOAD_INTERVAL,
+    )
+
+    speculative_summary_service = providers.Singleton(
+        SpeculativeSummaryService,
+        summarizer_factory=summarizer.provider,
+        cache=cache_redis,
+        deployments=config.SUMMARIZER_SPECULATIVE_DEPLOYMENTS,
+        workers=config.SUMMARIZER_SPECULATIVE_WORKERS,
+        max_pending=config.SUMMARIZER_SPECULATIVE_MAX_PENDING,
+        max_delay=config.SUMMARIZER_SPECULATIVE_MAX_DELAY,
+        ttl=config.SUMMARIZER_SPECULATIVE_TTL,
+        org_limit=config.SUMMARIZER_SPECULATIVE_ORG_LIMIT,
+        org_window=config.SUMMARIZER_SPECULATIVE_ORG_WINDOW,
+    )
+
+    summarize_job_service = providers.Singleton(
+        SummarizeJobService,
+        cache=cache_redis,
+        workers=config.SUMMARIZER_JOBS_WORKERS,
+        max_pending=config.SUMMARIZER_JOBS_MAX_PENDING,
+        ttl=config.SUMMARIZER_JOBS_TTL,
+        poll_interval=config.SUMMARIZER_JOBS_POLL_INTERVAL,
     )
 
     semantic_search_service = providers.Factory(
         SemanticSearchService,
-        embedder=embedder,
+        embedder=query_embedder,
         items_repository=semantic_search_repository,
         semantic_search_analytics_repository=semantic_search_analytics_repository,  # noqa: E501
         connectors_svc_repository=connectors_svc_repository,
         config_svc_repository=config_svc_repository,
         lime_repository=lime_repository,
         audit_repository=audit_repository,
+        embeddings_index=embeddings_index_service,
+        search_results=search_results_repository,
+        speculative_summaries=speculative_summary_service,
     )
 
     summarize_answer_service = providers.Factory(
         SummarizeAnswerService,
-        embedder=embedder,
+        embedder=query_embedder,
         summarizer=summarizer,
         items_repository=semantic_search_repository,
         app_env=config.APP_ENV,
         connectors_svc_repository=connectors_svc_repository,
         config_svc_repository=config_svc_repository,
+        embeddings_index=embeddings_index_service,
+        search_results=search_results_repository,
+        speculative_summaries=speculative_summary_service,
+        summarize_jobs=summarize_job_service,
     )
 
     # Data
@@ -315,6 +441,7 @@ class Container(containers.DeclarativeContainer):
         ZTBronzeToSilverService,
         assets_repo=storage_s3,
         event_producer=kafka_producer,
+        process_pool=process_pool,
     )
 
     zt_trees_silver_to_gold_service = providers.Factory(
@@ -325,6 +452,8 @@ class Container(containers.DeclarativeContainer):
         items_repository=semantic_search_repository,
         chunker=chunker,
         connectors_service=connectors_svc_repository,
+        embeddings_index=embeddings_index_service,
+        connector_resolver=connector_resolver,
     )
 
     # HTML
@@ -335,6 +464,8 @@ class Container(containers.DeclarativeContainer):
         items_repository=semantic_search_repository,
         chunker=chunker,
         connectors_service=connectors_svc_repository,
+        embeddings_index=embeddings_index_service,
+        connector_resolver=connector_resolver,
     )
 
     # Article KB
@@ -344,6 +475,7 @@ class Container(containers.DeclarativeContainer):
         event_producer=kafka_producer,
         app_url=config.APP_URL,
         silver_to_gold_enable=config.SILVER_TO_GOLD_ENABLE,
+        process_pool=process_pool,
     )
 
     article_kb_silver_to_gold_service = providers.Factory(
@@ -353,6 +485,7 @@ class Container(containers.DeclarativeContainer):
         embedder=embedder,
         items_repository=semantic_search_repository,
         chunker=chunker,
+        embeddings_index=embeddings_index_service,
     )
 
 
@@ -1,3 +1,8 @@
+from src.adapters.batching_embedder import BatchingEmbedder
+from src.adapters.hedged_embedder import HedgedEmbedder
+from src.contracts.embedder import EmbedderInterface
+from src.util.circuit_breaker import CircuitBreaker
+
 from ...adapters.embedder_client import (
     BedrockEmbedderClient,
     CohereEmbedderClient,
@@ -32,3 +37,44 @@ def get_embedder(endpoint_type: str, endpoint_name: str, aws_region: str):
             endpoint_name=endpoint_name
         )
     return embedder
+
+
+def get_shadow_embedder(
+    version: str, endpoint_type: str, endpoint_name: str, aws_region: str
+):
+    if not version:
+        return None
+    return get_embedder(endpoint_type, endpoint_name, aws_region)
+
+
+def get_query_embedder(
+    embedder: EmbedderInterface | None,
+    name: str,
+    deadline: float,
+    hedge_delay: float,
+    hedge_percentile: float,
+    workers: int,
+    breaker_failures: int,
+    breaker_reset_timeout: float,
+    batch_size: int = 1,
+    batch_window: float = 0.0,
+):
+    if embedder is None:
+        return None
+    embedder = HedgedEmbedder(
+        embedder,
+        deadline=deadline,
+        hedge_delay=hedge_delay or None,
+        hedge_percentile=hedge_percentile,
+        workers=workers,
+        breaker=CircuitBreaker(breaker_failures, breaker_reset_timeout),
+        name=name,
+    )
+    if batch_size > 1:
+        embedder = BatchingEmbedder(
+            embedder,
+            window=batch_window,
+            max_batch_size=batch_size,
+            name=name,
+        )
+    return embedder
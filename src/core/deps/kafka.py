@@ -1,10 +1,16 @@
-from threading import Thread
+import time
+from collections import deque
+from functools import partial
+from threading import Lock, Thread
 
 import confluent_kafka
 
 from src.contracts.events import EventProducerInterface
 from src.core.config import get_settings
 from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.util.coalescer import Coalescer
+from src.util.worker_pool import KeyedWorkerPool
 
 
 def get_producer(configs):
@@ -13,10 +19,10 @@ def get_producer(configs):
     return Producer(configs)
 
 
-def get_consumer(configs):
+def get_consumer(configs, **options):
     if get_settings().APP_ENV == "testing":
-        return TestingConsumer(configs)
-    return Consumer(configs)
+        return TestingConsumer(configs, **options)
+    return Consumer(configs, **options)
 
 
 @with_logger()
@@ -31,6 +37,16 @@ class TestingProducer:
         self._logger.info(f"Producing msg on `{topic}`")
 
 
+class NullProducer(EventProducerInterface):
+    """Producer dropping every message, for runs outside of a job."""
+
+    def close(self):
+        pass
+
+    def produce(self, topic, value, on_delivery=None, key=None):
+        pass
+
+
 class Producer(EventProducerInterface):
     def __init__(self, configs):
         self._producer = confluent_kafka.Producer(configs)
@@ -52,7 +68,7 @@ class Producer(EventProducerInterface):
 
 @with_logger()
 class TestingConsumer:
-    def __init__(self, configs):
+    def __init__(self, configs, **options):
         self._logger.info("TestingConsumer initialized")
 
     def start(self):
@@ -61,64 +77,585 @@ class TestingConsumer:
     def close(self):
         self._logger.info("Closing TestingConsumer")
 
+    @property
+    def running(self):
+        return True
+
     def subscribe(self, topics):
         self._logger.info("Subscribing to topics")
 
 
+class PartitionOffsetTracker:
+    """Track the offsets of a partition being processed out of order.
+
+    Offsets are registered in the order they are consumed and marked as done
+    as their processing finishes. The committable offset only advances past
+    the contiguous run of done offsets, so a message is never committed
+    before every message preceding it in the partition has been processed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._pending = deque()
+        self._done = set()
+        self._committable = None
+        self._committed = None
+
+    def track(self, offset: int) -> None:
+        with self._lock:
+            self._pending.append(offset)
+
+    def done(self, offset: int) -> None:
+        with self._lock:
+            self._done.add(offset)
+            while self._pending and self._pending[0] in self._done:
+                completed = self._pending.popleft()
+                self._done.discard(completed)
+                self._committable = completed + 1
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def to_commit(self) -> int | None:
+        """Get the next offset to commit, if it changed since last commit."""
+        with self._lock:
+            if self._committable == self._committed:
+                return None
+            return self._committable
+
+    def committed(self, offset: int) -> None:
+        with self._lock:
+            self._committed = offset
+
+
+class _ConsumedMessage:
+    __slots__ = (
+        "topic",
+        "partition",
+        "offset",
+        "tracker",
+        "lane",
+        "key",
+        "group",
+        "queued_at",
+        "on_message",
+        "payload",
+    )
+
+    def __init__(self, **fields) -> None:
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
 @with_logger()
 class Consumer:
-    def __init__(self, configs):
+    """Kafka consumer dispatching messages to a fair worker pool.
+
+    Messages are consumed in batches and handed to `KeyedWorkerPool`, so the
+    ones sharing a key are processed in order while up to `workers` keys are
+    processed concurrently. Once `max_in_flight` messages are pending, the
+    assigned partitions are paused until the pool has drained down to half
+    of it.
+
+    Pending messages are scheduled per group (e.g. organization) with
+    deficit round robin, `group_weights` setting the messages a group may
+    start per round and `group_concurrency` the messages of a group
+    processed at once. As the pool reorders the pending messages only,
+    `max_in_flight` is how far ahead of a busy group the others can be
+    served.
+
+    Offsets are committed manually, only past the messages whose processing
+    has finished (at-least-once delivery). Auto commit must be disabled in
+    the given configs. On close, the consumer stops fetching, waits up to
+    `drain_timeout` seconds for in-flight messages and commits them.
+
+    Topics are subscribed as `[topic, message_class, on_message]` lists, with
+    an optional fourth element holding topic options:
+
+    - `key`: callable receiving the parsed payload and returning its
+      ordering key. Defaults to the Kafka message key.
+    - `group`: callable receiving the parsed payload and returning its
+      scheduling group. Defaults to a single group.
+    - `coalesce`: callable receiving the parsed payload and returning its
+      coalescing key. When `coalesce_window` is set, messages are held for
+      that many seconds and only the latest one per coalescing key and lane
+      is processed. Held messages do not count towards `max_in_flight`.
+    - `on_superseded`: callable receiving the payload of a message dropped
+      by coalescing and the payload replacing it.
+    - `lane`: `LANE_INTERACTIVE` (default) or `LANE_BULK`. Bulk topics can
+      only use `max_in_flight - reserved_in_flight` slots of the pool, and
+      their partitions are paused while interactive messages are pending,
+      so a large resync never delays interactive jobs by more than the bulk
+      messages already in flight. Interactive messages are also started
+      before the pending bulk ones.
+    """
+
+    LANE_INTERACTIVE: str = "interactive"
+    LANE_BULK: str = "bulk"
+
+    POLL_TIMEOUT: float = 1.0
+    PAUSED_POLL_TIMEOUT: float = 0.1
+    # Seconds the lag of a partition is trusted without a message from it:
+    # a lag left by transaction markers would otherwise never go down
+    LAG_TTL: float = 10.0
+
+    def __init__(
+        self,
+        configs,
+        workers=1,
+        max_in_flight=1,
+        batch_size=1,
+        commit_interval=5.0,
+        drain_timeout=30.0,
+        reserved_in_flight=0,
+        group_concurrency=0,
+        group_weights=None,
+        coalesce_window=0.0,
+    ):
         self._consumer = confluent_kafka.Consumer(configs)
         self._cancelled = False
+        self._paused = False
+        self._bulk_paused = False
         self._poll_thread = Thread(target=self._poll_loop)
+        self._pool = KeyedWorkerPool(
+            workers,
+            max(max_in_flight, workers),
+            name="kafka-consumer",
+            group_concurrency=group_concurrency,
+            weights=group_weights,
+        )
+        self._batch_size = max(int(batch_size), 1)
+        self._commit_interval = commit_interval
+        self._drain_timeout = drain_timeout
+        self._bulk_max_in_flight = max(
+            self._pool.max_in_flight - int(reserved_in_flight), 1
+        )
+        self._lanes_in_flight = {}
+        self._lanes_lock = Lock()
+        self._lag = {}
+        self._coalescer = (
+            Coalescer(coalesce_window) if coalesce_window > 0 else None
+        )
+        self._last_commit = time.monotonic()
+        self._offsets = {}
+        self._offsets_lock = Lock()
+        self._metrics = get_metrics()
         self._topics_metadata = {}
 
+    def _apply_backpressure(self):
+        # Held messages are not counted: they wait for their window, not for
+        # a worker, and would otherwise keep the partitions paused
+        in_flight = self._pool.in_flight
+        if not self._paused and in_flight >= self._pool.max_in_flight:
+            self._consumer.pause(self._consumer.assignment())
+            self._paused = True
+            self._logger.info(
+                f"Kafka consumer paused, {in_flight} messages in flight"
+            )
+        elif self._paused and in_flight <= self._pool.max_in_flight // 2:
+            self._consumer.resume(self._consumer.assignment())
+            self._paused = False
+            self._bulk_paused = False
+            self._logger.info("Kafka consumer resumed")
+
+        if not self._paused:
+            self._throttle_bulk()
+
+    def _throttle_bulk(self):
+        bulk_in_flight = self._lane_in_flight(self.LANE_BULK)
+        interactive_backlog = self._lane_in_flight(
+            self.LANE_INTERACTIVE
+        ) + sum(
+            lag
+            for (topic, _), lag in self._fresh_lag().items()
+            if self._lane(topic) == self.LANE_INTERACTIVE
+        )
+        throttle = (
+            interactive_backlog > 0
+            or bulk_in_flight >= self._bulk_max_in_flight
+        )
+        if throttle == self._bulk_paused:
+            return
+
+        partitions = [
+            tp
+            for tp in self._consumer.assignment()
+            if self._lane(tp.topic) == self.LANE_BULK
+        ]
+        if throttle:
+            self._consumer.pause(partitions)
+            self._logger.info(
+                "Kafka consumer throttling bulk lane, "
+                f"{bulk_in_flight} bulk messages in flight, "
+                f"{interactive_backlog} interactive messages pending"
+            )
+        else:
+            self._consumer.resume(partitions)
+            self._logger.info("Kafka consumer resumed bulk lane")
+        self._bulk_paused = throttle
+
+    def _fresh_lag(self) -> dict:
+        # Lags not refreshed by a message for LAG_TTL seconds are dropped
+        now = time.monotonic()
+        with self._offsets_lock:
+            for tp, (_, recorded_at) in list(self._lag.items()):
+                if now - recorded_at > self.LAG_TTL:
+                    del self._lag[tp]
+            return {tp: lag for tp, (lag, _) in self._lag.items()}
+
+    def _lane(self, topic) -> str:
+        metadata = self._topics_metadata.get(topic)
+        if metadata is None:
+            return self.LANE_INTERACTIVE
+        return metadata["options"].get("lane", self.LANE_INTERACTIVE)
+
+    def _lane_in_flight(self, lane) -> int:
+        with self._lanes_lock:
+            return self._lanes_in_flight.get(lane, 0)
+
+    def _add_lane_in_flight(self, lane, value):
+        with self._lanes_lock:
+            self._lanes_in_flight[lane] = (
+                self._lanes_in_flight.get(lane, 0) + value
+            )
+
     def _poll_loop(self):
         try:
             while not self._cancelled:
-                msg = self._consumer.poll(1.0)
-
-                if msg is None:
-                    continue
-                if msg.error():
-                    if (
-                        msg.error().code()
-                        == confluent_kafka.KafkaError._PARTITION_EOF
-                    ):
-                        self._logger.warning(
-                            "Kafka consumer reached end of partition"
-                        )
-                        continue
-                    else:
+                self._release_coalesced()
+                self._apply_backpressure()
+                # Never fetch more than what fits in the pool
+                messages = self._consumer.consume(
+                    num_messages=max(
+                        min(
+                            self._batch_size,
+                            self._pool.max_in_flight - self._pool.in_flight,
+                        ),
+                        1,
+                    ),
+                    timeout=(
+                        self.PAUSED_POLL_TIMEOUT
+                        if self._paused
+                        else self.POLL_TIMEOUT
+                    ),
+                )
+
+                failed = False
+                for msg in messages:
+                    error = msg.error()
+                    if error:
+                        if (
+                            error.code()
+                            == confluent_kafka.KafkaError._PARTITION_EOF
+                        ):
+                            self._logger.warning(
+                                "Kafka consumer reached end of partition"
+                            )
+                            continue
+                        if not error.fatal():
+                            # e.g. a topic not created yet, the consumer
+                            # keeps serving the other topics
+                            self._logger.warning(
+                                f"Kafka consumer error: {error}"
+                            )
+                            continue
                         self._logger.error(
-                            f"Kafka consumer error: {msg.error()}"
+                            f"Kafka consumer fatal error: {error}"
                         )
+                        failed = True
                         break
 
-                # Process Kafka messages here
-                topic = msg.topic()
-                if topic in self._topics_metadata:
-                    payload = self._topics_metadata[topic]["message_class"]()
-                    payload.ParseFromString(msg.value())
-                    self._topics_metadata[topic]["on_message"](payload)
-                else:
-                    self._logger.warning(
-                        "Kafka consumer received message on "
-                        f"unknown topic: {topic}"
-                    )
+                    self._dispatch(msg)
+
+                self._record_lag(messages)
+                if failed:
+                    break
+
+                if (
+                    time.monotonic() - self._last_commit
+                    >= self._commit_interval
+                ):
+                    self._commit()
         finally:
-            self._consumer.close()
+            self._drain()
+
+    def _dispatch(self, msg):
+        # Process Kafka messages here
+        topic = msg.topic()
+        tracker = self._tracker(topic, msg.partition())
+        tracker.track(msg.offset())
+        self._metrics.incr(
+            "kafka_consumer_consumed", topic=topic, partition=msg.partition()
+        )
+
+        if topic not in self._topics_metadata:
+            self._logger.warning(
+                f"Kafka consumer received message on unknown topic: {topic}"
+            )
+            tracker.done(msg.offset())
+            return
+
+        metadata = self._topics_metadata[topic]
+        payload = metadata["message_class"]()
+        payload.ParseFromString(msg.value())
+
+        key = msg.key()
+        if metadata["options"].get("key") is not None:
+            key = metadata["options"]["key"](payload)
+
+        group = None
+        if metadata["options"].get("group") is not None:
+            group = metadata["options"]["group"](payload)
+
+        # Queue latency is measured from the time the message was produced
+        timestamp_type, timestamp = msg.timestamp()
+        if timestamp_type == confluent_kafka.TIMESTAMP_NOT_AVAILABLE:
+            queued_at = time.time()
+        else:
+            queued_at = timestamp / 1000
+
+        message = _ConsumedMessage(
+            topic=topic,
+            partition=msg.partition(),
+            offset=msg.offset(),
+            tracker=tracker,
+            lane=self._lane(topic),
+            key=key,
+            group=group,
+            queued_at=queued_at,
+            on_message=metadata["on_message"],
+            payload=payload,
+        )
+
+        coalesce = metadata["options"].get("coalesce")
+        if self._coalescer is not None and coalesce is not None:
+            # A bulk message never supersedes an interactive one
+            superseded = self._coalescer.add(
+                (message.lane, coalesce(payload)), message
+            )
+            if superseded is not None:
+                self._supersede(superseded, message)
+            return
+
+        self._submit(message)
+
+    def _submit(self, message):
+        self._add_lane_in_flight(message.lane, 1)
+        self._pool.submit(
+            message.key,
+            partial(
+                self._process,
+                message.lane,
+                message.group,
+                message.queued_at,
+                time.monotonic(),
+                message.on_message,
+            ),
+            message.payload,
+            on_done=partial(
+                self._on_processed,
+                message.tracker,
+                message.lane,
+                message.topic,
+                message.partition,
+                message.offset,
+            ),
+            group=message.group,
+            priority=int(message.lane == self.LANE_INTERACTIVE),
+        )
+
+    def _release_coalesced(self):
+        if self._coalescer is None:
+            return
+        for message in self._coalescer.pop_expired():
+            self._submit(message)
+
+    def _supersede(self, superseded, message):
+        on_superseded = self._topics_metadata[superseded.topic]["options"].get(
+            "on_superseded"
+        )
+        if on_superseded is not None:
+            try:
+                on_superseded(superseded.payload, message.payload)
+            except Exception as e:
+                self._logger.error(
+                    f"Kafka consumer failed to handle superseded message: {e}"
+                )
+
+        superseded.tracker.done(superseded.offset)
+        self._metrics.incr(
+            "kafka_consumer_coalesced",
+            topic=superseded.topic,
+            partition=superseded.partition,
+        )
+
+    def _process(
+        self, lane, group, queued_at, dispatched_at, on_message, payload
+    ):
+        self._metrics.observe(
+            "kafka_consumer_queue_latency",
+            max(time.time() - queued_at, 0.0),
+            lane=lane,
+        )
+        if group is not None:
+            # Time spent waiting for a worker, the part fair scheduling acts on
+            self._metrics.observe(
+                "kafka_consumer_group_wait",
+                time.monotonic() - dispatched_at,
+                group=group,
+            )
+        on_message(payload)
+
+    def _on_processed(self, tracker, lane, topic, partition, offset, error):
+        # Failures are handled (and notified) by the message handler itself,
+        # retrying them here would block the partition
+        self._add_lane_in_flight(lane, -1)
+        tracker.done(offset)
+        self._metrics.incr(
+            "kafka_consumer_processed", topic=topic, partition=partition
+        )
+
+    def _tracker(self, topic, partition) -> PartitionOffsetTracker:
+        with self._offsets_lock:
+            if (topic, partition) not in self._offsets:
+                self._offsets[(topic, partition)] = PartitionOffsetTracker()
+            return self._offsets[(topic, partition)]
+
+    def _record_lag(self, messages):
+        last_offsets = {}
+        for msg in messages:
+            if not msg.error():
+                last_offsets[(msg.topic(), msg.partition())] = msg.offset()
+
+        for (topic, partition), offset in last_offsets.items():
+            try:
+                _, high = self._consumer.get_watermark_offsets(
+                    confluent_kafka.TopicPartition(topic, partition),
+                    cached=True,
+                )
+            except Exception:
+                continue
+            if high is None or high < 0:
+                continue
+            lag = max(high - offset - 1, 0)
+            with self._offsets_lock:
+                self._lag[(topic, partition)] = (lag, time.monotonic())
+            self._metrics.gauge(
+                "kafka_consumer_lag", lag, topic=topic, partition=partition
+            )
+
+    def _commit(self, asynchronous=True):
+        self._last_commit = time.monotonic()
+        with self._offsets_lock:
+            trackers = list(self._offsets.items())
+
+        pending = []
+        for (topic, partition), tracker in trackers:
+            offset = tracker.to_commit()
+            if offset is not None:
+                pending.append((topic, partition, offset, tracker))
+
+        if not pending:
+            return
+
+        try:
+            self._consumer.commit(
+                offsets=[
+                    confluent_kafka.TopicPartition(topic, partition, offset)
+                    for topic, partition, offset, _ in pending
+                ],
+                asynchronous=asynchronous,
+            )
+        except Exception as e:
+            self._logger.error(f"Kafka consumer failed to commit: {e}")
+            return
+
+        for topic, partition, offset, tracker in pending:
+            tracker.committed(offset)
+            self._metrics.gauge(
+                "kafka_consumer_committed_offset",
+                offset,
+                topic=topic,
+                partition=partition,
+            )
+
+    def _on_assign(self, consumer, partitions):
+        # New partitions start resumed, the pauses in force must cover them
+        if self._paused:
+            paused = partitions
+        elif self._bulk_paused:
+            paused = [
+                tp
+                for tp in partitions
+                if self._lane(tp.topic) == self.LANE_BULK
+            ]
+        else:
+            return
+
+        # Paused once assigned, the assignment would otherwise reset them
+        consumer.assign(partitions)
+        if paused:
+            consumer.pause(paused)
+
+    def _on_revoke(self, consumer, partitions):
+        # Commit what is done for the partitions leaving this consumer, the
+        # messages still in flight will be redelivered to the new owner
+        self._commit(asynchronous=False)
+        with self._offsets_lock:
+            for tp in partitions:
+                self._offsets.pop((tp.topic, tp.partition), None)
+                self._lag.pop((tp.topic, tp.partition), None)
+
+        if self._coalescer is not None:
+            revoked = {(tp.topic, tp.partition) for tp in partitions}
+            self._coalescer.discard(
+                lambda m: (m.topic, m.partition) in revoked
+            )
+
+    def _drain(self):
+        if self._coalescer is not None and len(self._coalescer):
+            # Held messages are not committed, they will be redelivered
+            self._logger.info(
+                "Kafka consumer dropping "
+                f"{len(self._coalescer.pop_all())} coalesced messages"
+            )
+        self._logger.info(
+            "Draining Kafka consumer, "
+            f"{self._pool.in_flight} messages in flight"
+        )
+        if not self._pool.wait_idle(timeout=self._drain_timeout):
+            self._logger.warning(
+                "Kafka consumer drain timed out, "
+                f"{self._pool.in_flight} messages will be redelivered"
+            )
+        self._commit(asynchronous=False)
+        self._pool.shutdown(wait=False)
+        self._consumer.close()
 
     def start(self):
+        self._pool.start()
         self._poll_thread.start()
 
     def close(self):
         self._cancelled = True
+        if self._poll_thread.is_alive():
+            self._poll_thread.join()
+
+    @property
+    def running(self) -> bool:
+        return not self._cancelled and self._poll_thread.is_alive()
 
     def subscribe(self, topics):
-        self._consumer.subscribe([topic[0] for topic in topics])
+        self._consumer.subscribe(
+            [topic[0] for topic in topics],
+            on_assign=self._on_assign,
+            on_revoke=self._on_revoke,
+        )
         for topic in topics:
             self._topics_metadata[topic[0]] = {
                 "message_class": topic[1],
                 "on_message": topic[2],
+                "options": topic[3] if len(topic) > 3 else {},
             }
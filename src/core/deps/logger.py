@@ -1,6 +1,10 @@
+import itertools
 import logging
 from functools import lru_cache
 
+from src.core.config import get_settings
+from src.util import codec
+
 
 @lru_cache()
 def get_logger(logger_name: str) -> logging.Logger:
@@ -44,3 +48,131 @@ def with_logger():
         return cls
 
     return deco
+
+
+def redact_vectors(value: any, max_items: int = 8) -> any:
+    """Replace the vectors of a value by their dimensions.
+
+    Parameters
+    ----------
+    value : any
+        Value to redact, dicts, lists and tuples are walked.
+    max_items : int, optional
+        Float lists longer than this are vectors, by default 8
+
+    Returns
+    -------
+    any
+        Copy of the value with vectors as `<vector[4096]>` strings.
+    """
+
+    if isinstance(value, dict):
+        return {k: redact_vectors(v, max_items) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > max_items and isinstance(value[0], float):
+            return f"<vector[{len(value)}]>"
+        return [redact_vectors(v, max_items) for v in value]
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        return f"<vector[{','.join(map(str, value.shape))}]>"
+    return value
+
+
+class LogPayload:
+    """Payload of a log message, rendered only if the message is emitted.
+
+    Pass it as a `%s` argument, not in an f-string::
+
+        logger.info("Payload: %s", LogPayload(payload))
+
+    Dicts, lists and tuples are rendered as JSON with their vectors
+    redacted, other values as the JSON string of their `str`, on one line.
+    The output is truncated to `max_length` characters.
+
+    Parameters
+    ----------
+    value : any
+        Value to log.
+    max_length : int | None, optional
+        Characters kept, by default the `LOG_PAYLOAD_MAX_LENGTH` setting
+    """
+
+    __slots__ = ("value", "max_length")
+
+    def __init__(self, value: any, max_length: int | None = None) -> None:
+        self.value = value
+        self.max_length = max_length
+
+    def _render(self) -> str:
+        if isinstance(self.value, (dict, list, tuple)):
+            try:
+                return codec.dumps(redact_vectors(self.value))
+            except TypeError:
+                pass
+        return codec.dumps(str(self.value))
+
+    def __str__(self) -> str:
+        text = self._render()
+        max_length = self.max_length or get_settings().LOG_PAYLOAD_MAX_LENGTH
+        if len(text) <= max_length:
+            return text
+        return f"{text[:max_length]}... ({len(text) - max_length} more)"
+
+
+class LogSampler:
+    """Keep a share of the messages of a call site.
+
+    The first message is kept, then one every `1 / rate`.
+
+    Parameters
+    ----------
+    rate : float
+        Share of the messages kept, from 0 (none) to 1 (all).
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._every = round(1 / rate) if 0 < rate < 1 else 1
+        self._calls = itertools.count()
+
+    def sample(self) -> bool:
+        if self.rate <= 0:
+            return False
+        return next(self._calls) % self._every == 0
+
+
+@lru_cache()
+def get_log_sampler(site: str) -> LogSampler:
+    """Get the sampler of a call site, from the `LOG_SAMPLE_RATES` setting.
+
+    Parameters
+    ----------
+    site : str
+        Call site name, e.g. "embedder.output".
+
+    Returns
+    -------
+    LogSampler
+    """
+
+    return LogSampler(get_settings().LOG_SAMPLE_RATES.get(site, 1.0))
+
+
+def log_sampled(
+    logger: logging.Logger, site: str, level: int, msg: str, *args
+) -> None:
+    """Log a message if its level is enabled and the call site is sampled.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger to log with.
+    site : str
+        Call site name, see `get_log_sampler`.
+    level : int
+        Log level.
+    msg : str
+        Message, formatted lazily with `args`.
+    """
+
+    if logger.isEnabledFor(level) and get_log_sampler(site).sample():
+        logger.log(level, msg, *args, stacklevel=2)
@@ -0,0 +1,119 @@
+import math
+from collections import deque
+from functools import lru_cache
+from threading import Lock
+
+
+def _series_name(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    flattened = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{flattened}}}"
+
+
+class Summary:
+    """Running summary of observed values.
+
+    Keeps count, sum and max of every observation plus a bounded window of
+    the most recent ones used to calculate percentiles.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._window = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self._window.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._window:
+            return None
+        values = sorted(self._window)
+        index = max(math.ceil(q / 100 * len(values)) - 1, 0)
+        return values[index]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """In-process registry of counters, gauges and summaries.
+
+    Series are identified by a name plus optional labels, e.g.
+    `incr("kafka_consumer_processed", topic="embed-jobs", partition=0)`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._summaries: dict[str, Summary] = {}
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        series = _series_name(name, labels)
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0) + value
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        series = _series_name(name, labels)
+        with self._lock:
+            self._gauges[series] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        series = _series_name(name, labels)
+        with self._lock:
+            if series not in self._summaries:
+                self._summaries[series] = Summary()
+            self._summaries[series].observe(value)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_series_name(name, labels), 0)
+
+    def gauge_value(self, name: str, **labels) -> float | None:
+        with self._lock:
+            return self._gauges.get(_series_name(name, labels))
+
+    def summary(self, name: str, **labels) -> Summary | None:
+        with self._lock:
+            return self._summaries.get(_series_name(name, labels))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {
+                    k: v.to_dict() for k, v in self._summaries.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """Get the process wide metrics registry.
+
+    Returns
+    -------
+    MetricsRegistry
+    """
+
+    return MetricsRegistry()
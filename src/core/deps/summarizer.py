@@ -1,3 +1,6 @@
+from functools import partial
+
+from src.adapters.reloading_summarizer import ReloadingSummarizer
 from src.adapters.summarizer_client import (
     BedrockSummarizerClient,
     CohereSummarizerClient,
@@ -57,3 +60,28 @@ def get_summarizer(
         )
 
     return summarizer
+
+
+def get_reloading_summarizer(
+    assets_repo: AssetsRepositoryInterface,
+    endpoint_type: str,
+    endpoint_name: str,
+    aws_region: str,
+    config_filename: str,
+    prompt_type: str,
+    check_interval: float,
+):
+    return ReloadingSummarizer(
+        partial(
+            get_summarizer,
+            assets_repo=assets_repo,
+            endpoint_type=endpoint_type,
+            endpoint_name=endpoint_name,
+            aws_region=aws_region,
+            config_filename=config_filename,
+            prompt_type=prompt_type,
+        ),
+        assets_repo=assets_repo,
+        config_filename=config_filename,
+        check_interval=check_interval,
+    )
@@ -0,0 +1,41 @@
+import time
+
+from src.contracts.embedder import EmbedderInterface
+from src.contracts.summarizer import SummarizerInterface
+from src.core.deps.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def warm_up(
+    embedder: EmbedderInterface, summarizer: SummarizerInterface
+) -> None:
+    """Connect the adapters and make a first call to each of them.
+
+    The first call of a client pays for its connections and credentials,
+    and a cold endpoint for its first inference: the warm up pays for them
+    before the first request. A failure is logged, the requests then
+    connect the adapter as usual.
+    """
+
+    calls = {
+        "embedder": (embedder, lambda: embedder.embed("Warm up.")),
+        "summarizer": (
+            summarizer,
+            lambda: summarizer.summarize(
+                ["This is a warm up."], "Is this a warm up?"
+            ),
+        ),
+    }
+    for name, (adapter, call) in calls.items():
+        start = time.perf_counter()
+        try:
+            adapter.connect()
+            call()
+        except Exception as e:
+            logger.warning(f"[Warm-Up] The {name} failed to warm up: {e}")
+            continue
+        logger.info(
+            f"[Warm-Up] The {name} warmed up in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
@@ -1,5 +1,6 @@
 import re
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class Chunker(ABC):
@@ -20,12 +21,14 @@ class Chunker(ABC):
             )
         return concat_str
 
+    @classmethod
+    def get_snippets(cls, text: str, snippet_len):
+        return list(cls.iter_snippets(text, snippet_len))
+
     @staticmethod
-    def get_snippets(text: str, snippet_len):
-        results = []
+    def iter_snippets(text: str, snippet_len) -> Iterator[str]:
         for i in range(0, len(text), snippet_len):
-            results.append(text[i : i + snippet_len])  # noqa: E203
-        return results
+            yield text[i : i + snippet_len]  # noqa: E203
 
     def get_chunk(self, snippet, concat_str):
         if self.concat_type == "prefix":
@@ -35,102 +38,114 @@ class Chunker(ABC):
         else:
             return snippet
 
-    @abstractmethod
     def chunk(self, title, text, concat_str):
-        pass
+        chunks = []
+        snippets = []
+        for chunk, snippet in self.iter_chunks(title, text, concat_str):
+            chunks.append(chunk)
+            snippets.append(snippet)
+        return chunks, snippets
+
+    def iter_batches(
+        self, title, text, concat_str, size: int
+    ) -> Iterator[tuple[list[str], list[str]]]:
+        """Chunk a text by batches of at most `size` chunks.
+
+        Yields
+        ------
+        tuple[list[str], list[str]]
+            Chunks and their snippets.
+        """
+
+        chunks = []
+        snippets = []
+        for chunk, snippet in self.iter_chunks(title, text, concat_str):
+            chunks.append(chunk)
+            snippets.append(snippet)
+            if len(chunks) == size:
+                yield chunks, snippets
+                chunks = []
+                snippets = []
+        if chunks:
+            yield chunks, snippets
+
+    @abstractmethod
+    def iter_chunks(
+        self, title, text, concat_str
+    ) -> Iterator[tuple[str, str]]:
+        """Chunk a text, the title last.
+
+        Yields
+        ------
+        tuple[str, str]
+            Chunk and its snippet.
+        """
 
 
 class CharacterChunker(Chunker):
     def __init__(self, max_length, concat_type):
         super().__init__(max_length, concat_type)
 
-    def chunk(self, title, text, concat_str):
-        chunks = []
+    def iter_chunks(self, title, text, concat_str):
         if not self.concat_type or len(concat_str) == 0:
             snippet_len = self.max_length
         else:
             snippet_len = self.max_length - len(concat_str) - 1
 
-        snippets = self.get_snippets(text, snippet_len)
-
-        for snippet in snippets:
-            chunk = self.get_chunk(snippet, concat_str)
-            chunks.append(chunk)
+        for snippet in self.iter_snippets(text, snippet_len):
+            yield self.get_chunk(snippet, concat_str), snippet
 
         if title:
-            chunks.append(title)
-            snippets.append(title)
-
-        return chunks, snippets
+            yield title, title
 
 
 class SentenceChunker(Chunker):
     SENTENCE_PATTERN = r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s"
+    SENTENCE_RE = re.compile(SENTENCE_PATTERN)
 
     def __init__(self, max_length, concat_type):
         super().__init__(max_length, concat_type)
 
-    def chunk(self, title, content, concat_str):
+    def iter_chunks(self, title, content, concat_str):
         """
         Chunk content by sentences
         """
-        chunks = []
-        snippets = []
-        sentences = re.split(self.SENTENCE_PATTERN, content)
-        current_chunk = ""
-        for sentence in sentences:
-            current_chunk, chunks, snippets = self._process_sentence(
-                self.max_length, current_chunk, sentence, concat_str, snippets
-            )
+        # Sentences of the current chunk, joined when it is full
+        sentences = []
+        length = 0
+        for sentence in self._iter_sentences(content):
+            if len(sentence) + len(concat_str) >= self.max_length:
+                # This is a very long sentence, we need to split it
+                for snippet in self.iter_snippets(
+                    sentence, self.max_length - len(concat_str) - 1
+                ):
+                    yield self.get_chunk(snippet, concat_str), snippet
+            elif length + len(sentence) + len(concat_str) <= self.max_length:
+                # Still too small, we can try adding more sentences
+                if length:
+                    sentences.append(sentence)
+                    length += 1 + len(sentence)
+                else:
+                    sentences = [sentence]
+                    length = len(sentence)
+            else:
+                if length:
+                    snippet = " ".join(sentences)
+                    yield self.get_chunk(snippet, concat_str), snippet
+                sentences = [sentence]
+                length = len(sentence)
 
-        if current_chunk:
-            snippets.append(current_chunk)
-            current_chunk = self.get_chunk(current_chunk, concat_str)
-            chunks.append(current_chunk)
+        if length:
+            snippet = " ".join(sentences)
+            yield self.get_chunk(snippet, concat_str), snippet
 
         if title:
-            chunks.append(title)
-            snippets.append(title)
-
-        return chunks, snippets
-
-    def _process_sentence(
-        self, snippet_length, current_chunk, sentence, concat_str, snippets
-    ):
-        """
-        Process a sentence
-        """
-        chunks = []
-
-        if len(sentence) + len(concat_str) >= snippet_length:
-            # This is a very long sentence, we need to split it
-            smaller_sentences = self.get_snippets(
-                sentence, snippet_length - len(concat_str) - 1
-            )
-            for smaller_sentence in smaller_sentences:
-                # We append to chunks and snippets because the sentences are
-                # of the right size
-                snippets.append(smaller_sentence)
-                smaller_sentence = self.get_chunk(smaller_sentence, concat_str)
-                chunks.append(smaller_sentence)
-
-        elif (
-            len(current_chunk) + len(sentence) + len(concat_str)
-            <= snippet_length
-        ):
-            if current_chunk:
-                current_chunk += " " + sentence
-            else:
-                current_chunk = sentence
-            # We do not append to chunks because it is still too small, and we
-            # can try adding more sentences
-        else:
-            if current_chunk:
-                # We append to chunks and snippets because the sentences are
-                # of the right size
-                snippets.append(current_chunk)
-                current_chunk = self.get_chunk(current_chunk, concat_str)
-                chunks.append(current_chunk)
-            current_chunk = sentence
-
-        return current_chunk, chunks, snippets
+            yield title, title
+
+    def _iter_sentences(self, content: str) -> Iterator[str]:
+        """Split the content as `re.split` would, without a list."""
+        start = 0
+        for match in self.SENTENCE_RE.finditer(content):
+            yield content[start : match.start()]  # noqa: E203
+            start = match.end()
+        yield content[start:]
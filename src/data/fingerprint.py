@@ -0,0 +1,54 @@
+import hashlib
+import json
+
+from src.core.config import get_settings
+from src.data.chunkers.chunker import Chunker
+
+# Bump when a change in the silver to gold transformations must invalidate
+# the stored fingerprints, so every document is embedded again
+FINGERPRINT_VERSION = 3
+
+
+def content_fingerprint(content: dict, chunker: Chunker, **context) -> str:
+    """Fingerprint the gold records a silver document would produce.
+
+    Covers the normalized silver content plus everything else the records
+    depend on: the chunker and embedder configurations and the given
+    context (e.g. connector id). Two equal fingerprints mean re-embedding
+    the document would produce the same records.
+
+    Parameters
+    ----------
+    content : dict
+        Silver document, as stored.
+    chunker : Chunker
+        Chunker used to split the document.
+    **context
+        Any other value the records depend on.
+
+    Returns
+    -------
+    str
+        SHA-256 hex digest.
+    """
+
+    settings = get_settings()
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "content": content,
+        "context": context,
+        "chunker": {
+            "type": type(chunker).__name__,
+            "max_length": chunker.max_length,
+            "concat_type": chunker.concat_type,
+        },
+        "embedder": {
+            "type": settings.EMBEDDINGS_ENDPOINT_TYPE,
+            "name": settings.EMBEDDINGS_ENDPOINT_NAME,
+            "dimensions": settings.EMBEDDINGS_DIMENSIONS,
+        },
+    }
+    serialized = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
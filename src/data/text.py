@@ -0,0 +1,194 @@
+"""Text extraction and cleanup for the bronze to silver transformations.
+
+`html_to_text` returns the same text as `BeautifulSoup(html, "html.parser")
+.get_text()`, but collects it from the parser events instead of building
+and walking a tree. The character cleanups use translate tables.
+"""
+
+from collections import Counter
+from html.parser import HTMLParser
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+# Tags closed as soon as they are opened
+VOID_TAGS = frozenset(HTMLTreeBuilder.empty_element_tags)
+# Tags keeping their whitespace-only strings as is
+PRESERVE_WHITESPACE_TAGS = frozenset(
+    HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS
+)
+# Tags whose strings are not text: scripts, styles, templates and rubies
+NON_TEXT_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+# ASCII characters out of `string.printable`
+_NON_PRINTABLE_ASCII = dict.fromkeys(
+    [*range(0x00, 0x09), *range(0x0E, 0x20), 0x7F]
+)
+# C0 and C1 control characters, but tabs, line feeds and carriage returns
+_CONTROL_CHARACTERS = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), *range(0x7F, 0xA0)]
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the text of a document as BeautifulSoup's `get_text` does.
+
+    Only the state `get_text` depends on is kept: the open tags, to know
+    whether a string is in a `NON_TEXT_TAGS` or `PRESERVE_WHITESPACE_TAGS`
+    tag, and the current run of data, as runs of whitespace are collapsed
+    to one space or line feed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self._text = []
+        self._data = []
+        self._stack = []
+        self._open = Counter()
+        # Depths of the open preserve whitespace and non text tags
+        self._preserve = []
+        self._non_text = []
+        # Void tags closed on opening, their end tag is ignored once
+        self._already_closed = []
+
+    def text(self) -> str:
+        self.close()
+        self._end_data()
+        return "".join(self._text)
+
+    def _end_data(self, cdata: bool = False) -> None:
+        if not self._data:
+            return
+
+        data = "".join(self._data)
+        self._data = []
+        if not self._preserve and not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        if cdata or not self._non_text:
+            self._text.append(data)
+
+    def _push(self, name: str) -> None:
+        self._stack.append(name)
+        self._open[name] += 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self._preserve.append(len(self._stack))
+        if name in NON_TEXT_TAGS:
+            self._non_text.append(len(self._stack))
+
+    def _pop(self) -> str:
+        depth = len(self._stack)
+        name = self._stack.pop()
+        self._open[name] -= 1
+        if self._preserve and self._preserve[-1] == depth:
+            self._preserve.pop()
+        if self._non_text and self._non_text[-1] == depth:
+            self._non_text.pop()
+        return name
+
+    def _pop_to(self, name: str) -> None:
+        while self._open[name]:
+            if self._pop() == name:
+                return
+
+    def handle_starttag(
+        self, name: str, attrs: list, handle_empty_element: bool = True
+    ) -> None:
+        self._end_data()
+        self._push(name)
+        if name in VOID_TAGS and handle_empty_element:
+            self.handle_endtag(name, check_already_closed=False)
+            self._already_closed.append(name)
+
+    def handle_startendtag(self, name: str, attrs: list) -> None:
+        self.handle_starttag(name, attrs, handle_empty_element=False)
+        self.handle_endtag(name)
+
+    def handle_endtag(self, name: str, check_already_closed: bool = True):
+        if check_already_closed and name in self._already_closed:
+            self._already_closed.remove(name)
+        else:
+            self._end_data()
+            self._pop_to(name)
+
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        if name[0] in "xX":
+            code = int(name[1:], 16)
+        else:
+            code = int(name)
+
+        data = None
+        if code < 256:
+            # References to Windows-1252 instead of Unicode code points
+            try:
+                data = bytes([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name: str) -> None:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(f"&{name}" if character is None else character)
+
+    def handle_comment(self, data: str) -> None:
+        self._end_data()
+
+    def handle_decl(self, decl: str) -> None:
+        self._end_data()
+
+    def handle_pi(self, data: str) -> None:
+        self._end_data()
+
+    def unknown_decl(self, data: str) -> None:
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA[") :])  # noqa: E203
+            self._end_data(cdata=True)
+
+
+def html_to_text(html: str) -> str:
+    """Extract the text of an HTML document or fragment.
+
+    Parameters
+    ----------
+    html : str
+        HTML to extract the text from.
+
+    Returns
+    -------
+    str
+        Text, as `BeautifulSoup(html, "html.parser").get_text()`.
+    """
+
+    if "<" not in html and "&" not in html:
+        # Plain text, only a whitespace-only text is changed
+        if not html or html.strip(ASCII_SPACES):
+            return html
+        return "\n" if "\n" in html else " "
+
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    return extractor.text()
+
+
+def strip_non_printable(text: str) -> str:
+    """Keep only the characters of `string.printable`."""
+    return (
+        text.encode("ascii", "ignore")
+        .decode("ascii")
+        .translate(_NON_PRINTABLE_ASCII)
+    )
+
+
+def strip_control_characters(text: str) -> str:
+    """Remove the C0 and C1 control characters, but tabs and line breaks."""
+    return text.translate(_CONTROL_CHARACTERS)
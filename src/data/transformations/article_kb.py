@@ -1,15 +1,14 @@
 import datetime
-import string
-from typing import Dict, List
-
-from bs4 import BeautifulSoup
+from typing import Dict, Iterator, List
 
 from src.contracts.data.transformations.base import BaseTransformationInterface
 from src.contracts.data.transformations.silver_to_gold import (
     SilverToGoldTransformationInterface,
 )
 from src.contracts.embedder import EmbedderInterface
+from src.core.config import get_settings
 from src.data.chunkers.chunker import Chunker
+from src.data.text import html_to_text, strip_non_printable
 from src.util.tags_parser import TagParser
 
 
@@ -69,11 +68,16 @@ class BronzeToSilverTransformation(BaseTransformationInterface):
 
     @staticmethod
     def _normalize_text(text: str) -> str:
-        soup = BeautifulSoup(text, "html.parser")
-        text = soup.get_text()
-        printable = set(string.printable)
-        text = "".join(filter(lambda x: x in printable, text))
-        return text
+        return strip_non_printable(html_to_text(text))
+
+
+def transform_article(data: dict) -> dict:
+    """Transform a bronze article into its silver version.
+
+    Defined at the top level to be run in a `ProcessPool`.
+    """
+
+    return BronzeToSilverTransformation(data).handle()
 
 
 class SilverToGoldTransformation(SilverToGoldTransformationInterface):
@@ -88,41 +92,42 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         self._data["language"] = self._data.pop("lang")
         self._data["document_id"] = self._data.pop("id")
 
-    def handle(self) -> List[dict]:
+    def handle(self) -> Iterator[List[dict]]:
         text_dict = {key: self._data[key] for key in self.CONTENT_KEYS}
         all_text = self.concat_text(text_dict)
 
         if not len(all_text):
             if not self._data["title"]:
-                return []
-
-        chunks, snippets = self.chunk_text(all_text)
-        embeddings = self.embed(chunks)
+                return
 
         additional_data = self.prepare_additional_data()
 
-        return [
-            {
-                "org_id": self._data["org_id"],
-                "language": self._data["language"],
-                "title": self._data["title"],
-                "description": None,
-                "tags": self._data["tags"] if "tags" in self._data else [],
-                "data": additional_data,
-                "connector_id": self._data["connector_id"],
-                "document_id": self._data["document_id"],
-                "created_at": self._data["createdAt"],
-                "updated_at": (
-                    self._data["updatedAt"]
-                    if "updatedAt" in self._data
-                    else self._data["createdAt"]
-                ),
-                "embeddings": embedding,
-                "chunk": chunk,
-                "snippet": snippet,
-            }
-            for chunk, embedding, snippet in zip(chunks, embeddings, snippets)
-        ]
+        for chunks, snippets in self.iter_chunk_batches(all_text):
+            embeddings = self.embed(chunks)
+            yield [
+                {
+                    "org_id": self._data["org_id"],
+                    "language": self._data["language"],
+                    "title": self._data["title"],
+                    "description": None,
+                    "tags": self._data["tags"] if "tags" in self._data else [],
+                    "data": additional_data,
+                    "connector_id": self._data["connector_id"],
+                    "document_id": self._data["document_id"],
+                    "created_at": self._data["createdAt"],
+                    "updated_at": (
+                        self._data["updatedAt"]
+                        if "updatedAt" in self._data
+                        else self._data["createdAt"]
+                    ),
+                    "embeddings": embedding,
+                    "chunk": chunk,
+                    "snippet": snippet,
+                }
+                for chunk, embedding, snippet in zip(
+                    chunks, embeddings, snippets
+                )
+            ]
 
     def concat_text(self, content: Dict[str, str]):
         return " ".join(
@@ -136,6 +141,15 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         )
         return chunks, snippets
 
+    def iter_chunk_batches(self, content: str):
+        concat_str = self._chunker.create_concat_str(self._data)
+        return self._chunker.iter_batches(
+            self._data["title"],
+            content,
+            concat_str,
+            get_settings().EMBEDDINGS_BATCH_SIZE,
+        )
+
     def embed(self, text: List[str] | str) -> List[List[float]]:
         if not self._embedder.connected:
             self._embedder.connect()
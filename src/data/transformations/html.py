@@ -1,9 +1,10 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from src.contracts.data.transformations.silver_to_gold import (
     SilverToGoldTransformationInterface,
 )
 from src.contracts.embedder import EmbedderInterface
+from src.core.config import get_settings
 from src.data.chunkers.chunker import Chunker
 
 
@@ -30,39 +31,40 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         self.data[self.HTML_METADATA_KEYS[1]] = self.data.pop("lang")
         self.data["description"] = None
 
-    def handle(self) -> List[dict]:
+    def handle(self) -> Iterator[List[dict]]:
         text_dict = {key: self.data[key] for key in self.HTML_CONTENT_KEYS}
         all_text = self.concat_text(text_dict)
 
         # prepare snippets
         if not len(all_text):
             if not self.data["title"]:
-                return []
-
-        # prepare chunks
-        chunks, snippets = self.chunk_text(all_text)
-        embeddings = self.embed(chunks)
+                return
 
         additional_data = self.prepare_additional_data()
 
-        return [
-            {
-                "org_id": self.data["org_id"],
-                "language": self.data["language"],
-                "title": self.data["title"],
-                "description": self.data["description"],
-                "tags": [],
-                "data": additional_data,
-                "connector_id": self.data["connector_id"],
-                "document_id": self.data["html_id"],
-                "created_at": None,
-                "updated_at": None,
-                "embeddings": embeddings,
-                "snippet": snippet,
-                "chunk": chunk,
-            }
-            for chunk, embeddings, snippet in zip(chunks, embeddings, snippets)
-        ]
+        # prepare chunks, embedded and yielded by batches
+        for chunks, snippets in self.iter_chunk_batches(all_text):
+            embeddings = self.embed(chunks)
+            yield [
+                {
+                    "org_id": self.data["org_id"],
+                    "language": self.data["language"],
+                    "title": self.data["title"],
+                    "description": self.data["description"],
+                    "tags": [],
+                    "data": additional_data,
+                    "connector_id": self.data["connector_id"],
+                    "document_id": self.data["html_id"],
+                    "created_at": None,
+                    "updated_at": None,
+                    "embeddings": embeddings,
+                    "snippet": snippet,
+                    "chunk": chunk,
+                }
+                for chunk, embeddings, snippet in zip(
+                    chunks, embeddings, snippets
+                )
+            ]
 
     def concat_text(self, content: Dict[str, str]) -> str:
         return " ".join(
@@ -76,6 +78,15 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         )
         return chunks, snippets
 
+    def iter_chunk_batches(self, content: str):
+        concat_str = self.chunker.create_concat_str(self.data)
+        return self.chunker.iter_batches(
+            self.data["title"],
+            content,
+            concat_str,
+            get_settings().EMBEDDINGS_BATCH_SIZE,
+        )
+
     def embed(self, text: List[str] | str) -> List[List[float]]:
         if not self.embedder.connected:
             self.embedder.connect()
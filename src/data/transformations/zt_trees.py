@@ -1,16 +1,16 @@
 import datetime
-import re
-from typing import Dict, List
-
-from bs4 import BeautifulSoup
+from typing import Dict, Iterable, Iterator, List
 
 from src.contracts.data.transformations.base import BaseTransformationInterface
 from src.contracts.data.transformations.silver_to_gold import (
     SilverToGoldTransformationInterface,
 )
 from src.contracts.embedder import EmbedderInterface
+from src.core.config import get_settings
 from src.core.deps.logger import with_logger
 from src.data.chunkers.chunker import Chunker
+from src.data.text import html_to_text, strip_control_characters
+from src.util.json_stream import JSONStream, iter_text
 from src.util.tags_parser import TagParser
 
 
@@ -49,63 +49,109 @@ class RawToBronzeTransformation(BaseTransformationInterface):
 
     def handle(self) -> dict:
         prepared = dict()
+        prepared[self.META_KEY] = self.prepare_meta(self.tree)
+        prepared[self.NODES_KEY] = dict(
+            self.iter_content_nodes(self.tree[self.NODES_KEY].items())
+        )
+        return prepared
 
+    @classmethod
+    def prepare_meta(cls, tree: dict) -> dict:
         # Add meta keys-values
-        prepared[self.META_KEY] = {
-            key: self.tree[key] for key in self.TREE_KEEP_KEYS
-        }
+        meta = {key: tree[key] for key in cls.TREE_KEEP_KEYS}
 
         # Cast meta keys-values
-        prepared[self.META_KEY]["tags"] = (
-            prepared[self.META_KEY]["tags"].split(",")
-            if prepared[self.META_KEY].get("tags")
-            else []
-        )
-        prepared[self.META_KEY]["active"] = bool(
-            int(prepared[self.META_KEY]["active"])
-        )
-        prepared[self.META_KEY]["is_private"] = bool(
-            int(prepared[self.META_KEY]["is_private"])
-        )
+        meta["tags"] = meta["tags"].split(",") if meta.get("tags") else []
+        meta["active"] = bool(int(meta["active"]))
+        meta["is_private"] = bool(int(meta["is_private"]))
 
         # Cast meta date keys-values to UTC
-        for date_key in self.TREE_DATE_KEYS:
+        for date_key in cls.TREE_DATE_KEYS:
             try:
-                prepared[self.META_KEY][date_key] = (
-                    datetime.datetime.fromisoformat(
-                        prepared[self.META_KEY][date_key]
-                    )
+                meta[date_key] = (
+                    datetime.datetime.fromisoformat(meta[date_key])
                     .astimezone(datetime.timezone.utc)
                     .isoformat()
                 )
             except ValueError:
-                prepared[self.META_KEY][date_key] = None
+                meta[date_key] = None
+
+        return meta
+
+    @classmethod
+    def iter_content_nodes(
+        cls, nodes: Iterable[tuple[str, dict]]
+    ) -> Iterator[tuple[str, dict]]:
+        # Extract content nodes, with their keys-values to keep
+        for node_id, node in nodes:
+            if node[cls.NODE_TYPE_KEY] != "Content":
+                continue
+
+            prepared = {key: node[key] for key in cls.NODE_KEEP_KEYS}
+            for key in ("keywords", "tag"):
+                prepared[key] = (
+                    prepared[key].split(",") if prepared.get(key) else []
+                )
+            yield node_id, prepared
 
-        # Extract content nodes
-        prepared[self.NODES_KEY] = {
-            key: value
-            for key, value in self.tree[self.NODES_KEY].items()
-            if value[self.NODE_TYPE_KEY] == "Content"
-        }
 
-        # Add keys-values from content nodes
-        for node in prepared[self.NODES_KEY].keys():
-            prepared[self.NODES_KEY][node] = {
-                key: prepared[self.NODES_KEY][node][key]
-                for key in self.NODE_KEEP_KEYS
-            }
-            prepared[self.NODES_KEY][node]["keywords"] = (
-                prepared[self.NODES_KEY][node]["keywords"].split(",")
-                if prepared[self.NODES_KEY][node].get("keywords")
-                else []
-            )
-            prepared[self.NODES_KEY][node]["tag"] = (
-                prepared[self.NODES_KEY][node]["tag"].split(",")
-                if prepared[self.NODES_KEY][node].get("tag")
-                else []
-            )
+class StreamingRawToBronzeTransformation(RawToBronzeTransformation):
+    """Raw to bronze transformation of a raw tree read in chunks.
 
-        return prepared
+    The tree is a JSON string nested in the raw JSON object. Both are
+    parsed incrementally: the nodes are built and transformed one at a
+    time, and the other values of the tree are skipped without being
+    built, so only the bronze tree is held in memory.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Raw JSON object, in UTF-8.
+    """
+
+    DETAILS_KEY = "details"
+    VALUE_KEY = "value"
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+
+    def handle(self) -> dict:
+        tree = JSONStream(self._iter_tree_text())
+        meta = dict()
+        nodes = None
+        for key in tree.iter_object():
+            if key == self.NODES_KEY:
+                nodes = dict(self.iter_content_nodes(self._iter_nodes(tree)))
+            elif key in self.TREE_KEEP_KEYS:
+                meta[key] = tree.read_value()
+            else:
+                tree.skip_value()
+
+        if nodes is None:
+            raise KeyError(self.NODES_KEY)
+        return {self.META_KEY: self.prepare_meta(meta), self.NODES_KEY: nodes}
+
+    def _iter_tree_text(self) -> Iterator[str]:
+        # Pieces of `details[0].value`, the tree JSON
+        raw = JSONStream(iter_text(self._chunks))
+        for key in raw.iter_object():
+            if key != self.DETAILS_KEY:
+                raw.skip_value()
+                continue
+            for _ in raw.iter_array():
+                for detail_key in raw.iter_object():
+                    if detail_key == self.VALUE_KEY:
+                        # The rest of the raw object is not read
+                        yield from raw.iter_string()
+                        return
+                    raw.skip_value()
+                raise KeyError(self.VALUE_KEY)
+        raise KeyError(self.DETAILS_KEY)
+
+    @staticmethod
+    def _iter_nodes(tree: JSONStream) -> Iterator[tuple[str, dict]]:
+        for node_id in tree.iter_object():
+            yield node_id, tree.read_value()
 
 
 class BronzeToSilverTransformation(BaseTransformationInterface):
@@ -145,9 +191,20 @@ class BronzeToSilverTransformation(BaseTransformationInterface):
 
     @staticmethod
     def normalize_text(text: str) -> str:
-        soup = BeautifulSoup(text, "html.parser")
-        text = soup.get_text()
-        return re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", "", text)
+        return strip_control_characters(html_to_text(text))
+
+
+def transform_node(node: dict) -> dict:
+    """Transform a bronze tree node into its silver `content` and `meta`.
+
+    Defined at the top level to be run in a `ProcessPool`.
+    """
+
+    transformed = BronzeToSilverTransformation(node).handle()
+    return {
+        "content": transformed["content"],
+        "meta": transformed["metadata"],
+    }
 
 
 @with_logger()
@@ -179,7 +236,7 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         self.node_meta_json["tags"] = node_meta_json.pop("tag")
         self.node_meta_json["page_title"] = content_json["page_title"]
 
-    def handle(self) -> List[dict]:
+    def handle(self) -> Iterator[List[dict]]:
         # prepare text
         if self.content_json["content"]:
             all_text = " ".join(
@@ -214,38 +271,39 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         # prepare snippets
         if not len(all_text):
             if not self.content_json[self.NODE_CONTENT_KEYS[0]]:
-                return []
+                return
             else:
                 all_text = self.content_json[self.NODE_CONTENT_KEYS[0]]
 
-        chunks, snippets = self.chunk_text(all_text)
-        embeddings = self.embed(chunks)
-
         additional_data = self.prepare_additional_data()
 
-        return [
-            {
-                "org_id": self.tree_meta_json["org_id"],
-                "language": self.tree_meta_json["language"],
-                "title": " ".join(
-                    [
-                        self.tree_meta_json["tree_name"],
-                        self.node_meta_json["page_title"],
-                    ]
-                ),
-                "description": self.tree_meta_json["tree_description"],
-                "tags": self.tree_meta_json["tags"],
-                "data": additional_data,
-                "connector_id": self.tree_meta_json["connector_id"],
-                "document_id": self.get_document_id(),
-                "created_at": self.tree_meta_json["create_date"],
-                "updated_at": self.tree_meta_json["last_modified"],
-                "embeddings": embedding,
-                "chunk": chunk,
-                "snippet": snippet,
-            }
-            for chunk, embedding, snippet in zip(chunks, embeddings, snippets)
-        ]
+        for chunks, snippets in self.iter_chunk_batches(all_text):
+            embeddings = self.embed(chunks)
+            yield [
+                {
+                    "org_id": self.tree_meta_json["org_id"],
+                    "language": self.tree_meta_json["language"],
+                    "title": " ".join(
+                        [
+                            self.tree_meta_json["tree_name"],
+                            self.node_meta_json["page_title"],
+                        ]
+                    ),
+                    "description": self.tree_meta_json["tree_description"],
+                    "tags": self.tree_meta_json["tags"],
+                    "data": additional_data,
+                    "connector_id": self.tree_meta_json["connector_id"],
+                    "document_id": self.get_document_id(),
+                    "created_at": self.tree_meta_json["create_date"],
+                    "updated_at": self.tree_meta_json["last_modified"],
+                    "embeddings": embedding,
+                    "chunk": chunk,
+                    "snippet": snippet,
+                }
+                for chunk, embedding, snippet in zip(
+                    chunks, embeddings, snippets
+                )
+            ]
 
     def concat_text(self, content: Dict[str, str]) -> str:
         return " ".join(
@@ -275,6 +333,15 @@ class SilverToGoldTransformation(SilverToGoldTransformationInterface):
         )
         return chunks, snippets
 
+    def iter_chunk_batches(self, content: str):
+        concat_str = self.chunker.create_concat_str(self.tree_meta_json)
+        return self.chunker.iter_batches(
+            self.get_title(),
+            content,
+            concat_str,
+            get_settings().EMBEDDINGS_BATCH_SIZE,
+        )
+
     def embed(self, text_list) -> List[List[float]]:
         if not self.embedder.connected:
             self.embedder.connect()
@@ -0,0 +1,15 @@
+from http import HTTPStatus
+
+from src.exceptions.base import BaseException
+
+
+class EmbedderTimeoutException(BaseException):
+    _code = HTTPStatus.GATEWAY_TIMEOUT
+    _error_code = 5040
+    _message = "The embedder did not answer in time."
+
+
+class EmbedderUnavailableException(BaseException):
+    _code = HTTPStatus.SERVICE_UNAVAILABLE
+    _error_code = 5030
+    _message = "The embedder is unavailable."
@@ -0,0 +1,9 @@
+from http import HTTPStatus
+
+from src.exceptions.base import BaseException
+
+
+class SummarizeJobsBusyException(BaseException):
+    _code = HTTPStatus.SERVICE_UNAVAILABLE
+    _error_code = 5031
+    _message = "Too many summaries are being generated, retry later."
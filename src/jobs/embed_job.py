@@ -1,4 +1,4 @@
-import json
+import logging
 import os
 import time
 
@@ -8,12 +8,20 @@ import src.services.data.transformations.article_kb as article_kb
 from src.contracts.events import EventProducerInterface
 from src.core.config import get_settings
 from src.core.containers import container
-from src.core.deps.logger import with_logger
+from src.core.deps.kafka import Consumer
+from src.core.deps.logger import LogPayload, log_sampled, with_logger
 from src.exceptions.transformations import NotifiedException
+from src.util.storage import PassThroughStorage
 
 
 @with_logger()
 class EmbedJob:
+    """Run the medallion transformations for an article notification.
+
+    The job keeps no per-event state, so a single instance can be shared by
+    every worker of the Kafka consumer.
+    """
+
     def __init__(
         self,
         event_producer: EventProducerInterface = None,
@@ -25,6 +33,20 @@ class EmbedJob:
         article: embed_jobs_pb2.ArticleNotification,
         error: str,
         started_at: float,
+    ):
+        self._notify_status(
+            article,
+            embed_job_status_pb2.FailureStatus.FAILED,
+            error,
+            started_at,
+        )
+
+    def _notify_status(
+        self,
+        article: embed_jobs_pb2.ArticleNotification,
+        status: int,
+        reason: str,
+        started_at: float,
     ):
         if self._event_producer is None:
             self._logger.error(
@@ -39,18 +61,32 @@ class EmbedJob:
         s.connectorId = article.connectorId
         s.dur = int((time.time() - started_at) * 1000)
         s.state = embed_job_status_pb2.ArticleState.COMPLETE
-        s.status = embed_job_status_pb2.FailureStatus.FAILED
-        s.reason = error
-        s.jobId = self.event.jobId
+        s.status = status
+        s.reason = reason
+        s.jobId = article.jobId
 
         self._event_producer.produce(
             get_settings().KAFKA_EMBED_JOB_STATUS_TOPIC,
             s.SerializeToString(),
-            key=self.event.jobId,
+            key=article.jobId,
         )
-        self._logger.info(f"Notifying job status: " f"{json.dumps(str(s))}")
+        self._logger.info("Notifying job status: %s", LogPayload(s))
 
-    def run_zingtree(self):
+    def _stages_overrides(self) -> dict:
+        # With pass-through, the stages of a run share an in-memory storage
+        # and their outputs are persisted in the background, if at all
+        settings = get_settings()
+        if not settings.PIPELINE_PASS_THROUGH:
+            return {}
+
+        uploader = None
+        if settings.PIPELINE_PERSIST_INTERMEDIATE:
+            uploader = container.background_uploader()
+        return {
+            "assets_repo": PassThroughStorage(container.storage_s3(), uploader)
+        }
+
+    def run_zingtree(self, event: embed_jobs_pb2.ArticleNotification):
         def parse_location(location: str):
             segments = location.replace("s3://", "").split("/")
             bucket = segments[0]
@@ -60,107 +96,145 @@ class EmbedJob:
 
         self._logger.info("Zingtree article syncying process strated")
 
-        event = "Object Created"
-        if self.event.operation == embed_jobs_pb2.ArticleOperation.DELETE:
-            event = "Object Deleted"
+        detail_type = "Object Created"
+        if event.operation == embed_jobs_pb2.ArticleOperation.DELETE:
+            detail_type = "Object Deleted"
 
-        filepath = os.path.join(
-            self.event.location.path, f"{self.event.articleId}.json"
-        )
+        filepath = os.path.join(event.location.path, f"{event.articleId}.json")
+        overrides = self._stages_overrides()
 
         zt_trees_raw_to_bronze_service = (
-            container.zt_trees_raw_to_bronze_service()
+            container.zt_trees_raw_to_bronze_service(**overrides)
         )
-        zt_trees_raw_to_bronze_service.set_job_id(self.event.jobId)
+        zt_trees_raw_to_bronze_service.set_job_id(event.jobId)
         filename = zt_trees_raw_to_bronze_service.handle(
-            self.event.location.bucket,
+            event.location.bucket,
             filepath,
-            event,
-            self.event.articleId,
-            self.event.orgId,
-            self.event.connectorId,
+            detail_type,
+            event.articleId,
+            event.orgId,
+            event.connectorId,
         )
         self._logger.info(f"Raw to branze processed, filename: {filename}")
 
         bucket, path = parse_location(filename)
         zt_trees_bronze_to_silver_service = (
-            container.zt_trees_bronze_to_silver_service()
+            container.zt_trees_bronze_to_silver_service(**overrides)
         )
-        zt_trees_bronze_to_silver_service.set_job_id(self.event.jobId)
+        zt_trees_bronze_to_silver_service.set_job_id(event.jobId)
         filename = zt_trees_bronze_to_silver_service.handle(
             bucket,
             path,
-            event,
-            self.event.articleId,
-            self.event.orgId,
-            self.event.connectorId,
+            detail_type,
+            event.articleId,
+            event.orgId,
+            event.connectorId,
         )
         self._logger.info(f"Bronze to silver processed, filename: {filename}")
 
         bucket, path = parse_location(filename)
         zt_trees_silver_to_gold_service = (
-            container.zt_trees_silver_to_gold_service()
+            container.zt_trees_silver_to_gold_service(**overrides)
         )
-        zt_trees_silver_to_gold_service.set_job_id(self.event.jobId)
+        zt_trees_silver_to_gold_service.set_job_id(event.jobId)
         ids = zt_trees_silver_to_gold_service.handle(
             bucket,
             path,
-            event,
-            self.event.articleId,
-            self.event.orgId,
-            self.event.connectorId,
+            detail_type,
+            event.articleId,
+            event.orgId,
+            event.connectorId,
         )
         self._logger.info(f"Silver to gold processed, ids {str(ids)}")
 
-    def run_article(self):
+    def run_article(self, event: embed_jobs_pb2.ArticleNotification):
         self._logger.info("Article syncying process strated")
         ops = {
             embed_jobs_pb2.ArticleOperation.CREATE: article_kb.BronzeToSilverService.OP_INSERT,  # noqa: E501
             embed_jobs_pb2.ArticleOperation.UPDATE: article_kb.BronzeToSilverService.OP_UPDATE,  # noqa: E501
             embed_jobs_pb2.ArticleOperation.DELETE: article_kb.BronzeToSilverService.OP_DELETE,  # noqa: E501
         }
+        overrides = self._stages_overrides()
 
         article_kb_bronze_to_silver_service = (
-            container.article_kb_bronze_to_silver_service()
+            container.article_kb_bronze_to_silver_service(**overrides)
         )
-        article_kb_bronze_to_silver_service.set_job_id(self.event.jobId)
+        article_kb_bronze_to_silver_service.set_job_id(event.jobId)
         payload = article_kb_bronze_to_silver_service.handle(
-            self.event.location.bucket,
-            self.event.location.path,
-            self.event.articleId,
-            self.event.orgId,
-            self.event.connectorId,
-            ops[self.event.operation],
+            event.location.bucket,
+            event.location.path,
+            event.articleId,
+            event.orgId,
+            event.connectorId,
+            ops[event.operation],
         )
-        self._logger.info(
-            "Bronze to silver processed, payload: " + json.dumps(payload)
+        log_sampled(
+            self._logger,
+            "embed_job.payload",
+            logging.INFO,
+            "Bronze to silver processed, payload: %s",
+            LogPayload(payload),
         )
 
         if payload is None:
             return
 
         article_kb_silver_to_gold_service = (
-            container.article_kb_silver_to_gold_service()
+            container.article_kb_silver_to_gold_service(**overrides)
         )
-        article_kb_silver_to_gold_service.set_job_id(self.event.jobId)
+        article_kb_silver_to_gold_service.set_job_id(event.jobId)
         ids = article_kb_silver_to_gold_service.handle(
             payload["bucket"],
             payload["key"],
             payload["connector_id"],
             payload["detail_type"],
-            self.event.articleId,
-            self.event.orgId,
+            event.articleId,
+            event.orgId,
         )
         self._logger.info(f"Silver to gold processed, ids {str(ids)}")
 
+    @staticmethod
+    def ordering_key(event: embed_jobs_pb2.ArticleNotification) -> str:
+        """Key keeping the notifications of an article in order."""
+        return event.articleId or event.jobId
+
+    @staticmethod
+    def coalescing_key(event: embed_jobs_pb2.ArticleNotification) -> tuple:
+        """Key of the notifications superseding each other."""
+        return (
+            event.orgId,
+            event.connectorId,
+            event.articleId or event.jobId,
+        )
+
+    @staticmethod
+    def scheduling_group(event: embed_jobs_pb2.ArticleNotification) -> int:
+        """Group sharing the consumer capacity fairly with the others."""
+        return event.orgId
+
+    def notify_superseded(
+        self,
+        event: embed_jobs_pb2.ArticleNotification,
+        latest: embed_jobs_pb2.ArticleNotification,
+    ):
+        """Report a job dropped in favor of a later one as complete."""
+        self._logger.info(
+            f"Job {event.jobId} superseded by job {latest.jobId}"
+        )
+        self._notify_status(
+            event,
+            embed_job_status_pb2.FailureStatus.SUCCESS,
+            f"Superseded by job {latest.jobId}",
+            time.time(),
+        )
+
     def run(self, event: embed_jobs_pb2.ArticleNotification):
-        self.event = event
         started_at = time.time()
         try:
-            if self.event.source == "zingtree":
-                return self.run_zingtree()
+            if event.source == "zingtree":
+                return self.run_zingtree(event)
 
-            return self.run_article()
+            return self.run_article(event)
         except NotifiedException as e:
             self._logger.error(
                 f"Error handling transformation, exception notified: {e}"
@@ -168,5 +242,68 @@ class EmbedJob:
             return
         except Exception as e:
             self._logger.error(f"Error processing event: {e}")
-            self._notify_failure(self.event, str(e), started_at)
+            self._notify_failure(event, str(e), started_at)
             return
+
+
+def subscribe_embed_jobs(consumer, event_producer: EventProducerInterface):
+    """Subscribe the given consumer to the embed jobs topics.
+
+    Jobs on the priority topic run in the interactive lane, the ones on the
+    regular topic (connector resyncs) in the throttled bulk lane. The
+    priority topic is not subscribed when its setting is empty. Repeated
+    jobs for an article are coalesced, the superseded ones being reported
+    as complete.
+
+    Parameters
+    ----------
+    consumer : Consumer
+        Kafka consumer, not started yet.
+    event_producer : EventProducerInterface
+        Producer used to notify the jobs status.
+    """
+
+    job = EmbedJob(event_producer)
+    topics = [
+        (
+            get_settings().KAFKA_EMBED_JOBS_PRIORITY_TOPIC,
+            Consumer.LANE_INTERACTIVE,
+        ),
+        (get_settings().KAFKA_EMBED_JOBS_TOPIC, Consumer.LANE_BULK),
+    ]
+    consumer.subscribe(
+        [
+            [
+                topic,
+                embed_jobs_pb2.ArticleNotification,
+                job.run,
+                {
+                    "key": EmbedJob.ordering_key,
+                    "group": EmbedJob.scheduling_group,
+                    "coalesce": EmbedJob.coalescing_key,
+                    "on_superseded": job.notify_superseded,
+                    "lane": lane,
+                },
+            ]
+            # Without a priority topic, every job runs in the bulk lane
+            for topic, lane in topics
+            if topic
+        ]
+    )
+
+
+def flush_embed_jobs_uploads(timeout: float | None = None):
+    """Wait for the stage outputs still being persisted in the background.
+
+    Parameters
+    ----------
+    timeout : float | None, optional
+        Maximum seconds to wait, by default None (forever)
+    """
+
+    settings = get_settings()
+    if (
+        settings.PIPELINE_PASS_THROUGH
+        and settings.PIPELINE_PERSIST_INTERMEDIATE
+    ):
+        container.background_uploader().close(timeout=timeout)
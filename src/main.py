@@ -3,16 +3,17 @@ import logging
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 
-import src.proto.embed_jobs_pb2 as embed_jobs_pb2
 from src.schemas.endpoints.responses import HTTPValidationResponse
 
 from .api.api import api_router
 from .api.v1.api import api_router as api_v1_router
 from .core.config import get_settings
 from .core.containers import container
+from .core.deps.warmup import warm_up
 from .exceptions.base import BaseException, base_exception_handler
 from .exceptions.http import custom_validation_exception_handler
-from .jobs.embed_job import EmbedJob
+from .jobs.embed_job import flush_embed_jobs_uploads, subscribe_embed_jobs
+from .util.codec import CodecJSONResponse
 
 settings = get_settings()
 prefix = settings.API_PREFIX
@@ -23,7 +24,9 @@ logging.basicConfig(level=settings.LOG_LEVEL)
 # Wire Container
 container.wire(packages=[__package__])
 
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(
+    title=settings.APP_NAME, default_response_class=CodecJSONResponse
+)
 app.include_router(api_router, prefix=prefix)
 app.include_router(
     api_v1_router,
@@ -46,20 +49,26 @@ def custom_app_exception_handler(request, e):
 
 @app.on_event("startup")
 def on_startup():
+    if settings.ADAPTERS_WARMUP:
+        warm_up(container.embedder(), container.summarizer())
+
+    # Ingestion can run in the API processes or in dedicated workers
+    # started with `python -m src.worker`
+    if not settings.INGESTION_ENABLED:
+        return
+
     consumer = container.kafka_consumer()
-    consumer.subscribe(
-        [
-            [
-                settings.KAFKA_EMBED_JOBS_TOPIC,
-                embed_jobs_pb2.ArticleNotification,
-                EmbedJob(container.kafka_producer()).run,
-            ]
-        ]
-    )
+    subscribe_embed_jobs(consumer, container.kafka_producer())
     consumer.start()
 
 
 @app.on_event("shutdown")
 def shutdown_event():
+    # The consumer drains in-flight jobs, which still notify their status
+    if settings.INGESTION_ENABLED:
+        container.kafka_consumer().close()
+        flush_embed_jobs_uploads(settings.KAFKA_CONSUMER_DRAIN_TIMEOUT)
+        container.process_pool().shutdown()
+    container.speculative_summary_service().shutdown()
+    container.summarize_job_service().shutdown()
     container.kafka_producer().close()
-    container.kafka_consumer().close()
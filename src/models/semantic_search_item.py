@@ -2,7 +2,16 @@ import datetime
 import json
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ARRAY, JSON, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.config import get_settings
@@ -26,6 +35,9 @@ class SemanticSearchDocument(Base):
     data: Mapped[dict] = mapped_column(JSON, nullable=False)
     connector_id: Mapped[int] = mapped_column(Integer, nullable=False)
     document_id: Mapped[str] = mapped_column(String, nullable=False)
+    # Fingerprint of the silver content and configuration the document was
+    # embedded from, see `src.data.fingerprint`
+    fingerprint: Mapped[str] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime, nullable=True, default=datetime.datetime.utcnow
     )
@@ -106,3 +118,26 @@ class SemanticSearchItem(Base):
             "snippet": self.snippet,
             "document": self.document.to_analytics_dict(),
         }
+
+
+class SemanticSearchShadowItem(Base):
+    """Embeddings of an item made by another model, tagged by version.
+
+    Filled while migrating to another embedder, so searches can switch to
+    the new vectors at once, see `EmbeddingsIndexService`.
+    """
+
+    __tablename__ = "semantic_search_shadow_items"
+    __table_args__ = (
+        UniqueConstraint("item_id", "version", name="uq_sssi_item_version"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("semantic_search_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    version: Mapped[str] = mapped_column(String, nullable=False)
+    embeddings = mapped_column(
+        Vector(settings.EMBEDDINGS_SHADOW_DIMENSIONS), nullable=False
+    )
@@ -2,7 +2,9 @@ from contextlib import AbstractContextManager
 from datetime import datetime
 from typing import Callable
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from src.api.v1.endpoints.requests.semantic_search import SearchFilters
@@ -15,6 +17,7 @@ from src.core.config import get_settings
 from src.models.semantic_search_item import (
     SemanticSearchDocument,
     SemanticSearchItem,
+    SemanticSearchShadowItem,
 )
 
 
@@ -37,6 +40,7 @@ class SemanticSearchRepository:
         document_id: str,
         created_at: datetime | None = None,
         updated_at: datetime | None = None,
+        fingerprint: str | None = None,
     ) -> SemanticSearchDocument:
         document = SemanticSearchDocument(
             org_id=org_id,
@@ -49,6 +53,7 @@ class SemanticSearchRepository:
             document_id=document_id,
             created_at=created_at,
             updated_at=updated_at,
+            fingerprint=fingerprint,
         )
 
         with self.session_factory() as session:
@@ -80,15 +85,126 @@ class SemanticSearchRepository:
 
         return item
 
+    def create_items(
+        self,
+        records: list[dict],
+        document: SemanticSearchDocument,
+    ) -> list[SemanticSearchItem]:
+        """Insert the items of a document in a single transaction."""
+
+        items = []
+        for record in records:
+            item = SemanticSearchItem(
+                embeddings=record["embeddings"],
+                chunk=record["chunk"],
+                snippet=record["snippet"],
+                document_id=document.id,
+            )
+            item.document = document
+            items.append(item)
+
+        with self.session_factory() as session:
+            session.add_all(items)
+            session.commit()
+            for item in items:
+                session.refresh(item)
+
+        return items
+
+    def create_shadow_items(
+        self,
+        item_ids: list[int],
+        embeddings: list[list[float]],
+        version: str,
+    ) -> int:
+        """Store the embeddings of a version for the given items.
+
+        Items already having embeddings for the version are left as they
+        are, and so are the items deleted in the meantime.
+        """
+
+        rows = [
+            {"item_id": item_id, "version": version, "embeddings": vector}
+            for item_id, vector in zip(item_ids, embeddings)
+        ]
+        if not rows:
+            return 0
+
+        statement = (
+            insert(SemanticSearchShadowItem)
+            .on_conflict_do_nothing(constraint="uq_sssi_item_version")
+            .returning(SemanticSearchShadowItem.id)
+        )
+        with self.session_factory() as session:
+            try:
+                inserted = len(session.scalars(statement, rows).all())
+                session.commit()
+                return inserted
+            except IntegrityError:
+                # An item was deleted, insert the rows one by one
+                session.rollback()
+
+            inserted = 0
+            for row in rows:
+                try:
+                    inserted += len(session.scalars(statement, [row]).all())
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+            return inserted
+
+    def find_items_missing_version(
+        self, version: str, after_id: int = 0, limit: int = 100
+    ) -> list[tuple[int, str]]:
+        """Get the id and chunk of the items without embeddings for a
+        version, by ascending id."""
+
+        with self.session_factory() as session:
+            return session.execute(
+                select(SemanticSearchItem.id, SemanticSearchItem.chunk)
+                .where(SemanticSearchItem.id > after_id)
+                .where(~self._has_version(version))
+                .order_by(SemanticSearchItem.id)
+                .limit(limit)
+            ).all()
+
+    def count_items_missing_version(self, version: str) -> int:
+        with self.session_factory() as session:
+            return session.scalar(
+                select(func.count(SemanticSearchItem.id)).where(
+                    ~self._has_version(version)
+                )
+            )
+
+    @staticmethod
+    def _has_version(version: str):
+        return (
+            select(SemanticSearchShadowItem.id)
+            .where(SemanticSearchShadowItem.item_id == SemanticSearchItem.id)
+            .where(SemanticSearchShadowItem.version == version)
+            .exists()
+        )
+
+    @staticmethod
+    def _threshold(version: str | None) -> float:
+        settings = get_settings()
+        if version is not None and settings.SEMANTIC_SEARCH_SHADOW_THRESHOLD:
+            return settings.SEMANTIC_SEARCH_SHADOW_THRESHOLD
+        return settings.SEMANTIC_SEARCH_THRESHOLD
+
     def search(
         self,
         embeddings: list[float],
         org_id: int,
         filters: SearchFilters,
         limit: int | None,
+        version: str | None = None,
     ) -> (SemanticSearchItem, float):
         builder = SemanticSearchSearchQueryBuilder(
-            embeddings, org_id, get_settings().SEMANTIC_SEARCH_THRESHOLD
+            embeddings,
+            org_id,
+            self._threshold(version),
+            version=version,
         )
         builder.filters = filters
         builder.limit = limit
@@ -109,15 +225,62 @@ class SemanticSearchRepository:
             ).first()
         return document_item
 
+    def find_fingerprint(self, document_id: str, org_id: int) -> str | None:
+        with self.session_factory() as session:
+            return session.scalars(
+                select(SemanticSearchDocument.fingerprint).where(
+                    SemanticSearchDocument.org_id == org_id,
+                    SemanticSearchDocument.document_id == document_id,
+                )
+            ).first()
+
+    def update_fingerprint(
+        self, document_ids: list[int], fingerprint: str
+    ) -> None:
+        """Store the fingerprint of documents whose items are all inserted.
+
+        Written last: a document whose items failed to insert keeps no
+        fingerprint and is embedded again on the next sync.
+        """
+
+        with self.session_factory() as session:
+            session.execute(
+                update(SemanticSearchDocument)
+                .where(SemanticSearchDocument.id.in_(document_ids))
+                .values(fingerprint=fingerprint)
+            )
+            session.commit()
+
+    def find_fingerprints_like(
+        self, like_document_id: str, org_id: int
+    ) -> set[str | None]:
+        with self.session_factory() as session:
+            return set(
+                session.scalars(
+                    select(SemanticSearchDocument.fingerprint)
+                    .where(SemanticSearchDocument.org_id == org_id)
+                    .where(
+                        SemanticSearchDocument.document_id.like(
+                            like_document_id
+                        )
+                    )
+                    .distinct()
+                ).fetchall()
+            )
+
     def search_best(
         self,
         embeddings: list[float],
         org_id: int,
         filters: SearchFilters,
         n: int = 5,
+        version: str | None = None,
     ) -> dict:
         builder = SemanticSearchSearchQueryBuilder(
-            embeddings, org_id, get_settings().SEMANTIC_SEARCH_THRESHOLD
+            embeddings,
+            org_id,
+            self._threshold(version),
+            version=version,
         )
         builder.filters = filters
         builder.limit = n
@@ -0,0 +1,79 @@
+from src.contracts.cache import CacheInterface
+from src.core.deps.logger import with_logger
+
+
+@with_logger()
+class SearchResultsRepository:
+    """Results of the searches, kept for the summaries of the same query.
+
+    A search result is kept for `ttl` seconds under its analytics id, which
+    `/search` returns to the widget. The cache being unavailable only makes
+    the summaries search again: errors are logged, not raised.
+
+    Parameters
+    ----------
+    cache : CacheInterface
+        Cache holding the results.
+    ttl : float
+        Seconds a result is kept.
+    """
+
+    KEY_PREFIX = "search-results"
+
+    def __init__(self, cache: CacheInterface, ttl: float):
+        self._cache = cache
+        self._ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def _key(self, search_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{search_id}"
+
+    def save(self, search_id: str, result: dict) -> None:
+        """Keep the result of a search.
+
+        Parameters
+        ----------
+        search_id : str
+            Analytics id of the search.
+        result : dict
+            Query, organization, deployment and ids of the items to
+            summarize.
+        """
+
+        if not self.enabled:
+            return
+        try:
+            self._cache.set(self._key(search_id), result, self._ttl)
+        except Exception as e:
+            self._logger.warning(
+                'Error while setting search result "%s" in cache: %s',
+                search_id,
+                e,
+            )
+
+    def get(self, search_id: str) -> dict | None:
+        """Get the result of a search, None if it is not kept.
+
+        Parameters
+        ----------
+        search_id : str
+            Analytics id of the search.
+
+        Returns
+        -------
+        dict | None
+            Result saved by `save`.
+        """
+
+        try:
+            return self._cache.get(self._key(search_id))
+        except Exception as e:
+            self._logger.warning(
+                'Error while getting search result "%s" from cache: %s',
+                search_id,
+                e,
+            )
+            return None
@@ -0,0 +1,158 @@
+import time
+from threading import Lock
+from typing import Callable
+
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.repositories.services.connectors_svc import ConnectorsSvcRepository
+
+
+@with_logger()
+class ConnectorResolver:
+    """Find the connector of an organization for a provider.
+
+    Resolving takes two connectors-svc calls, the connector types then the
+    connectors of the type. The ids found are kept for `ttl` seconds and
+    shared by every ingestion job of the process, so a connector resync
+    resolves its connector once instead of once per tree or page. Jobs
+    resolving a connector being fetched wait for it instead of fetching it
+    again.
+
+    Failures are not kept: a connector configured after a failure is found
+    by the next job.
+
+    Parameters
+    ----------
+    connectors_service : ConnectorsSvcRepository
+        Connectors service client.
+    ttl : float, optional
+        Seconds a connector id is kept, by default 300.0, 0 to disable
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        connectors_service: ConnectorsSvcRepository,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._connectors_service = connectors_service
+        self._ttl = ttl
+        self._clock = clock
+        self._metrics = get_metrics()
+        self._lock = Lock()
+        # (org_id, provider) -> (connector id, expiration)
+        self._connectors: dict[tuple, tuple[int, float]] = {}
+        self._fetch_locks: dict[tuple, Lock] = {}
+
+    def resolve(self, org_id: int, provider: str) -> int:
+        """Get the id of the connector of an organization for a provider.
+
+        Parameters
+        ----------
+        org_id : int
+            Organization id.
+        provider : str
+            Connector type provider, e.g. "zingtree" or "html".
+
+        Returns
+        -------
+        int
+            Connector id.
+
+        Raises
+        ------
+        ValueError
+            If the organization has no connector for the provider
+        """
+
+        key = (int(org_id), provider)
+        connector_id = self._cached(key)
+        if connector_id is not None:
+            self._metrics.incr("connector_resolver_hits", provider=provider)
+            return connector_id
+
+        with self._fetch_lock(key):
+            # Fetched by another job while waiting
+            connector_id = self._cached(key)
+            if connector_id is not None:
+                self._metrics.incr(
+                    "connector_resolver_hits", provider=provider
+                )
+                return connector_id
+
+            self._metrics.incr("connector_resolver_misses", provider=provider)
+            connector_id = self._fetch(*key)
+            if self._ttl > 0:
+                with self._lock:
+                    self._connectors[key] = (
+                        connector_id,
+                        self._clock() + self._ttl,
+                    )
+            return connector_id
+
+    def invalidate(
+        self, org_id: int | None = None, provider: str | None = None
+    ) -> int:
+        """Forget connector ids, all of them by default.
+
+        Parameters
+        ----------
+        org_id : int | None, optional
+            Only forget the connectors of an organization, by default None
+        provider : str | None, optional
+            Only forget the connectors of a provider, by default None
+
+        Returns
+        -------
+        int
+            Number of connector ids forgotten.
+        """
+
+        with self._lock:
+            keys = [
+                key
+                for key in self._connectors
+                if (org_id is None or key[0] == int(org_id))
+                and (provider is None or key[1] == provider)
+            ]
+            for key in keys:
+                del self._connectors[key]
+        self._logger.info(
+            f"[ConnectorResolver] Invalidated {len(keys)} connectors "
+            f"(org_id: {org_id}, provider: {provider})"
+        )
+        return len(keys)
+
+    def _cached(self, key: tuple) -> int | None:
+        with self._lock:
+            cached = self._connectors.get(key)
+            if cached is None:
+                return None
+            if self._clock() >= cached[1]:
+                del self._connectors[key]
+                return None
+            return cached[0]
+
+    def _fetch_lock(self, key: tuple) -> Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(key, Lock())
+
+    def _fetch(self, org_id: int, provider: str) -> int:
+        try:
+            connector_type = list(
+                filter(
+                    lambda x: x.provider == provider,
+                    self._connectors_service.get_connector_types(org_id),
+                )
+            )[0]
+            return (
+                self._connectors_service.get_connectors_by_connector_type_id(
+                    org_id, connector_type.id
+                )
+            )[0].id
+        except Exception:
+            raise ValueError(
+                "Connector or ConnectorType not configured for organization"
+            )
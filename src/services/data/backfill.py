@@ -0,0 +1,281 @@
+import json
+import os
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Callable
+
+from src.contracts.storage import StorageInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.util.storage import PassThroughStorage
+from src.util.worker_pool import KeyedWorkerPool
+
+
+class BackfillCheckpoint:
+    """Progress of a backfill persisted to a JSON file.
+
+    The file is replaced atomically on every save, so a crash leaves either
+    the previous or the new checkpoint, never a partial one.
+
+    Parameters
+    ----------
+    path : str
+        Checkpoint file path.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def load(self) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, state: dict) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+
+class _KeyWatermark:
+    # Last key such that it and every key listed before it are done, keys
+    # being listed in order but finishing in any order
+    def __init__(self, after: str = "") -> None:
+        self._lock = Lock()
+        self._pending = deque()
+        self._done = set()
+        self.after = after
+
+    def track(self, key: str) -> None:
+        with self._lock:
+            self._pending.append(key)
+
+    def done(self, key: str) -> None:
+        with self._lock:
+            self._done.add(key)
+            while self._pending and self._pending[0] in self._done:
+                self.after = self._pending.popleft()
+                self._done.discard(self.after)
+
+
+@with_logger()
+class BackfillService:
+    """Run the silver to gold transformation over the stored silver objects.
+
+    Objects are listed page by page in key order and handled concurrently,
+    at most `workers * 2` being loaded at once whatever the size of the
+    prefix. Each object is read once and handed to `handler` through an
+    in-memory storage. Documents whose fingerprint did not change are
+    skipped by the transformation services, so only the documents affected
+    by a configuration change get embedded again.
+
+    Progress is checkpointed periodically: a run with the same checkpoint
+    resumes after the last key of the contiguous run of handled objects.
+    Objects handled after that key are handled again, which is harmless as
+    the transformations replace the records of a document.
+
+    Parameters
+    ----------
+    storage : StorageInterface
+        Storage of the silver objects.
+    handler : Callable[[StorageInterface, str, str, dict], Any]
+        Called with the storage, bucket, key and content of each object.
+    workers : int, optional
+        Objects handled concurrently, by default 4
+    checkpoint : BackfillCheckpoint | None, optional
+        Checkpoint to resume from and save to, by default None
+    report_interval : float, optional
+        Seconds between progress reports and checkpoints, by default 30.0
+    """
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        handler: Callable[[StorageInterface, str, str, dict], Any],
+        workers: int = 4,
+        checkpoint: BackfillCheckpoint | None = None,
+        report_interval: float = 30.0,
+    ) -> None:
+        self._storage = storage
+        self._handler = handler
+        self._workers = max(int(workers), 1)
+        self._checkpoint = checkpoint
+        self._report_interval = report_interval
+        self._lock = Lock()
+
+    def run(
+        self,
+        bucket: str,
+        prefix: str,
+        connector_id: int | None = None,
+    ) -> dict:
+        """Backfill the objects under a prefix.
+
+        Parameters
+        ----------
+        bucket : str
+            Bucket of the silver objects.
+        prefix : str
+            Prefix of the objects to backfill, e.g. an organization.
+        connector_id : int | None, optional
+            Only backfill the documents of this connector, by default None
+
+        Returns
+        -------
+        dict
+            Final state: number of `processed`, `skipped` and `failed`
+            objects and the keys that failed.
+
+        Raises
+        ------
+        ValueError
+            If the checkpoint belongs to another backfill
+        """
+
+        state = self._initial_state(bucket, prefix, connector_id)
+        watermark = _KeyWatermark(state["after"])
+
+        self._logger.info(
+            f"[Backfill] Counting objects in {bucket}/{prefix} "
+            f"after {state['after']!r}"
+        )
+        total = sum(
+            1 for _ in self._storage.iter_files(bucket, prefix, state["after"])
+        )
+        self._logger.info(f"[Backfill] {total} objects to backfill")
+
+        pool = KeyedWorkerPool(
+            self._workers, self._workers * 2, name="backfill"
+        )
+        pool.start()
+        started_at = time.monotonic()
+        reported_at = started_at
+        done_before = state["processed"] + state["skipped"] + state["failed"]
+        try:
+            for key in self._storage.iter_files(
+                bucket, prefix, state["after"]
+            ):
+                while not pool.wait_available(timeout=self._report_interval):
+                    reported_at = self._report(
+                        state, watermark, total, done_before, started_at
+                    )
+                watermark.track(key)
+                pool.submit(
+                    None,
+                    self._handle,
+                    state,
+                    bucket,
+                    key,
+                    connector_id,
+                    on_done=lambda _, key=key: watermark.done(key),
+                )
+                if time.monotonic() - reported_at >= self._report_interval:
+                    reported_at = self._report(
+                        state, watermark, total, done_before, started_at
+                    )
+
+            while not pool.wait_idle(timeout=self._report_interval):
+                self._report(state, watermark, total, done_before, started_at)
+        finally:
+            pool.shutdown()
+            self._report(state, watermark, total, done_before, started_at)
+
+        return state
+
+    def _initial_state(
+        self, bucket: str, prefix: str, connector_id: int | None
+    ) -> dict:
+        state = {
+            "bucket": bucket,
+            "prefix": prefix,
+            "connector_id": connector_id,
+            "after": "",
+            "processed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "failed_keys": [],
+        }
+        if self._checkpoint is None:
+            return state
+
+        saved = self._checkpoint.load()
+        if saved is None:
+            return state
+        for field in ("bucket", "prefix", "connector_id"):
+            if saved.get(field) != state[field]:
+                raise ValueError(
+                    f"Checkpoint {self._checkpoint.path} belongs to another "
+                    f"backfill ({field}: {saved.get(field)!r})"
+                )
+        self._logger.info(
+            f"[Backfill] Resuming after {saved['after']!r} from "
+            f"{self._checkpoint.path}"
+        )
+        return {**state, **saved}
+
+    def _handle(
+        self,
+        state: dict,
+        bucket: str,
+        key: str,
+        connector_id: int | None,
+    ) -> None:
+        outcome = "processed"
+        try:
+            content = self._storage.get_json(key, bucket)
+            if (
+                connector_id is not None
+                and content.get("connector_id") != connector_id
+            ):
+                outcome = "skipped"
+                return
+
+            # The handler reads the object already loaded from memory
+            storage = PassThroughStorage(self._storage)
+            storage.put_json(key, content, bucket)
+            self._handler(storage, bucket, key, content)
+        except Exception as e:
+            outcome = "failed"
+            self._logger.error(f"[Backfill] Failed to backfill {key}: {e}")
+        finally:
+            get_metrics().incr("backfill_objects", outcome=outcome)
+            with self._lock:
+                state[outcome] += 1
+                if outcome == "failed":
+                    state["failed_keys"].append(key)
+
+    def _report(
+        self,
+        state: dict,
+        watermark: _KeyWatermark,
+        total: int,
+        done_before: int,
+        started_at: float,
+    ) -> float:
+        now = time.monotonic()
+        with self._lock:
+            state["after"] = watermark.after
+            snapshot = dict(state, failed_keys=list(state["failed_keys"]))
+
+        done = (
+            snapshot["processed"]
+            + snapshot["skipped"]
+            + snapshot["failed"]
+            - done_before
+        )
+        elapsed = now - started_at
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = f"{(total - done) / rate:.0f}s" if rate > 0 else "unknown"
+        self._logger.info(
+            f"[Backfill] {done}/{total} objects "
+            f"({snapshot['processed']} processed, "
+            f"{snapshot['skipped']} skipped, {snapshot['failed']} failed), "
+            f"{rate:.2f} objects/s, ETA {eta}"
+        )
+
+        if self._checkpoint is not None:
+            self._checkpoint.save(snapshot)
+        return now
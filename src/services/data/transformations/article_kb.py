@@ -1,4 +1,5 @@
 import os.path
+from itertools import chain
 from typing import List
 
 import src.proto.embed_job_status_pb2 as embed_job_status_pb2
@@ -7,9 +8,10 @@ from src.contracts.events import EventProducerInterface
 from src.contracts.storage import StorageInterface
 from src.core.deps.logger import with_logger
 from src.data.chunkers.chunker import Chunker
+from src.data.fingerprint import content_fingerprint
 from src.data.transformations.article_kb import (
-    BronzeToSilverTransformation,
     SilverToGoldTransformation,
+    transform_article,
 )
 from src.data.util import S3IsolationLocationParser
 from src.exceptions.transformations import NotifiedException
@@ -17,6 +19,8 @@ from src.repositories.models.semantic_search_repository import (
     SemanticSearchRepository,
 )
 from src.services.data.transformations.base import BaseService
+from src.services.embeddings_index import EmbeddingsIndexService
+from src.util.process_pool import ProcessPool
 
 
 @with_logger()
@@ -30,10 +34,12 @@ class BronzeToSilverService(BaseService):
         event_producer: EventProducerInterface,
         app_url: str,
         silver_to_gold_enable: bool,
+        process_pool: ProcessPool | None = None,
     ) -> None:
         super().__init__(assets_repo, event_producer)
         self._app_url = app_url
         self.silver_to_gold_enable = bool(silver_to_gold_enable)
+        self._process_pool = process_pool
 
     def handle(
         self,
@@ -110,8 +116,12 @@ class BronzeToSilverService(BaseService):
             # Handle metadata and content
             data["org_id"] = org_id
             data["connector_id"] = connector_id
-            transformer = BronzeToSilverTransformation(data)
-            output = transformer.handle()
+            # In a process of the pool, if any, the consumer threads then
+            # transform their articles in parallel
+            if self._process_pool is None:
+                output = transform_article(data)
+            else:
+                output = self._process_pool.run(transform_article, data)
 
             # Save the transformed drive json file
             self._logger.info(
@@ -262,11 +272,13 @@ class SilverToGoldService(BaseService):
         embedder: EmbedderInterface,
         items_repository: SemanticSearchRepository,
         chunker: Chunker,
+        embeddings_index: EmbeddingsIndexService | None = None,
     ) -> None:
         super().__init__(assets_repo, event_producer)
         self._embedder = embedder
         self._items_repository = items_repository
         self.chunker = chunker
+        self._embeddings_index = embeddings_index
 
     def handle(
         self,
@@ -278,10 +290,25 @@ class SilverToGoldService(BaseService):
         org_id: int,
     ) -> List[int]:
         self._set_notifier_data(article_id, org_id, connector_id)
+        parser = S3IsolationLocationParser(key)
+
+        if event == "Object Created":
+            json_data = self._assets_repo.get_json(key, bucket)
+            fingerprint = content_fingerprint(
+                json_data, self.chunker, connector_id=connector_id
+            )
+            if fingerprint == self._items_repository.find_fingerprint(
+                parser.get_id(), int(parser.get_org_id())
+            ):
+                self._logger.info("Content unchanged, skipping embedding")
+                self._notify(
+                    embed_job_status_pb2.ArticleState.COMPLETE,
+                    embed_job_status_pb2.FailureStatus.SUCCESS,
+                )
+                return []
 
         # Delete the records from the database, in any case
         self._logger.info("Removing records from the database")
-        parser = S3IsolationLocationParser(key)
         deleted_ids = self._items_repository.remove_item(
             parser.get_id(), int(parser.get_org_id())
         )
@@ -301,7 +328,6 @@ class SilverToGoldService(BaseService):
                 embed_job_status_pb2.ArticleState.EMBEDDING,
                 embed_job_status_pb2.FailureStatus.SUCCESS,
             )
-            json_data = self._assets_repo.get_json(key, bucket)
 
             org_id = parser.get_org_id()
             json_data["org_id"] = org_id
@@ -311,7 +337,10 @@ class SilverToGoldService(BaseService):
             transformer = SilverToGoldTransformation(
                 json_data, self._embedder, self.chunker
             )
-            records = transformer.handle()
+            # The records are inserted batch by batch as they get embedded,
+            # the document being created from the first batch
+            batches = transformer.handle()
+            records = next(batches, [])
 
             # If the content is empty skip it
             if len(records) == 0:
@@ -345,14 +374,17 @@ class SilverToGoldService(BaseService):
                     records[0]["updated_at"],
                 )
 
-            for record in records:
-                inserted = self._items_repository.create_item(
-                    record["embeddings"],
-                    record["chunk"],
-                    record["snippet"],
-                    document_item,
+            for records in chain([records], batches):
+                inserted = self._items_repository.create_items(
+                    records, document_item
                 )
-                inserted_ids.append(inserted.id)
+                if self._embeddings_index is not None:
+                    self._embeddings_index.write_shadow(records, inserted)
+                inserted_ids.extend(item.id for item in inserted)
+            # Stored last, so a document left without items is embedded again
+            self._items_repository.update_fingerprint(
+                [document_item.id], fingerprint
+            )
 
             self._notify(
                 embed_job_status_pb2.ArticleState.COMPLETE,
@@ -1,11 +1,10 @@
-import json
 import time
 
 import src.proto.embed_job_status_pb2 as embed_job_status_pb2
 from src.contracts.events import EventProducerInterface
 from src.contracts.storage import StorageInterface
 from src.core.config import get_settings
-from src.core.deps.logger import with_logger
+from src.core.deps.logger import LogPayload, with_logger
 from src.data.util import S3IsolationLocationSolver
 
 
@@ -97,6 +96,4 @@ class BaseService:
             s.SerializeToString(),
             key=self._job_id,
         )
-        self._logger.info(
-            f"Notifying new job status: " f"{json.dumps(str(s))}"
-        )
+        self._logger.info("Notifying new job status: %s", LogPayload(s))
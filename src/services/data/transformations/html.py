@@ -1,16 +1,20 @@
+from itertools import chain
 from typing import List
 
 from src.contracts.embedder import EmbedderInterface
 from src.contracts.storage import StorageInterface
 from src.core.deps.logger import with_logger
 from src.data.chunkers.chunker import Chunker
+from src.data.fingerprint import content_fingerprint
 from src.data.transformations.html import SilverToGoldTransformation
 from src.data.util import S3IsolationLocationParser
 from src.repositories.models.semantic_search_repository import (
     SemanticSearchRepository,
 )
 from src.repositories.services.connectors_svc import ConnectorsSvcRepository
+from src.services.connectors import ConnectorResolver
 from src.services.data.transformations.base import BaseService
+from src.services.embeddings_index import EmbeddingsIndexService
 
 
 @with_logger()
@@ -25,17 +29,40 @@ class SilverToGoldService(BaseService):
         items_repository: SemanticSearchRepository,
         chunker: Chunker,
         connectors_service: ConnectorsSvcRepository,
+        embeddings_index: EmbeddingsIndexService | None = None,
+        connector_resolver: ConnectorResolver | None = None,
     ) -> None:
         super().__init__(assets_repo)
         self._embedder = embedder
         self._items_repository = items_repository
         self.chunker = chunker
         self.connectors_service = connectors_service
+        # Without a shared resolver, the connector is resolved on every call
+        self._connector_resolver = connector_resolver or ConnectorResolver(
+            connectors_service, ttl=0
+        )
+        self._embeddings_index = embeddings_index
 
     def handle(self, bucket: str, key: str, event: str) -> List[int]:
+        parser = S3IsolationLocationParser(key)
+        if event == "Object Created":
+            json_data = self._assets_repo.get_json(key, bucket)
+            # The records hold the resolved connector, a new connector must
+            # embed the page again
+            connector_id = self._connector_resolver.resolve(
+                parser.get_org_id(), "html"
+            )
+            fingerprint = content_fingerprint(
+                json_data, self.chunker, connector_id=connector_id
+            )
+            if fingerprint == self._items_repository.find_fingerprint(
+                parser.get_id(), int(parser.get_org_id())
+            ):
+                self._logger.info("Content unchanged, skipping embedding")
+                return []
+
         # Delete the records from the database, in any case
         self._logger.info("Removing records from the database")
-        parser = S3IsolationLocationParser(key)
         deleted_ids = self._items_repository.remove_item(
             parser.get_id(), int(parser.get_org_id())
         )
@@ -45,29 +72,9 @@ class SilverToGoldService(BaseService):
             return deleted_ids
         elif event == "Object Created":
             self._logger.info("Creating object in the database.")
-            json_data = self._assets_repo.get_json(key, bucket)
             json_data["org_id"] = parser.get_org_id()
 
-            try:
-                connector_type = list(
-                    filter(
-                        lambda x: x.provider == "html",
-                        self.connectors_service.get_connector_types(
-                            json_data["org_id"]
-                        ),
-                    )
-                )[0]
-                connector_id = (
-                    self.connectors_service.get_connectors_by_connector_type_id(  # noqa: E501
-                        json_data["org_id"], connector_type.id
-                    )
-                )[0].id
-                json_data["connector_id"] = connector_id
-            except Exception:
-                raise ValueError(
-                    "Connector or ConnectorType not configured for "
-                    "organization"
-                )
+            json_data["connector_id"] = connector_id
 
             inserted_ids = []
             transformer = SilverToGoldTransformation(
@@ -75,7 +82,10 @@ class SilverToGoldService(BaseService):
                 self._embedder,
                 self.chunker,
             )
-            records = transformer.handle()
+            # The records are inserted batch by batch as they get embedded,
+            # the document being created from the first batch
+            batches = transformer.handle()
+            records = next(batches, [])
 
             # If the node content is empty skip it
             if len(records) == 0:
@@ -105,14 +115,16 @@ class SilverToGoldService(BaseService):
                     records[0]["updated_at"],
                 )
 
-            for record in records:
-                # Initially a list with a single dictionary per node
-                inserted = self._items_repository.create_item(
-                    record["embeddings"],
-                    record["chunk"],
-                    record["snippet"],
-                    document_item,
+            for records in chain([records], batches):
+                inserted = self._items_repository.create_items(
+                    records, document_item
                 )
-                inserted_ids.append(inserted.id)
+                if self._embeddings_index is not None:
+                    self._embeddings_index.write_shadow(records, inserted)
+                inserted_ids.extend(item.id for item in inserted)
+            # Stored last, so a document left without items is embedded again
+            self._items_repository.update_fingerprint(
+                [document_item.id], fingerprint
+            )
 
             return inserted_ids
@@ -1,4 +1,4 @@
-import json
+from itertools import chain
 
 import src.proto.embed_job_status_pb2 as embed_job_status_pb2
 from src.contracts.embedder import EmbedderInterface
@@ -6,10 +6,12 @@ from src.contracts.events import EventProducerInterface
 from src.contracts.storage import StorageInterface
 from src.core.deps.logger import with_logger
 from src.data.chunkers.chunker import Chunker
+from src.data.fingerprint import content_fingerprint
 from src.data.transformations.zt_trees import (
     BronzeToSilverTransformation,
-    RawToBronzeTransformation,
     SilverToGoldTransformation,
+    StreamingRawToBronzeTransformation,
+    transform_node,
 )
 from src.data.util import S3ZTTreesIsolationLocationParser
 from src.exceptions.transformations import NotifiedException
@@ -17,7 +19,10 @@ from src.repositories.models.semantic_search_repository import (
     SemanticSearchRepository,
 )
 from src.repositories.services.connectors_svc import ConnectorsSvcRepository
+from src.services.connectors import ConnectorResolver
 from src.services.data.transformations.base import BaseService
+from src.services.embeddings_index import EmbeddingsIndexService
+from src.util.process_pool import ProcessPool
 
 
 class RawToBronzeService(BaseService):
@@ -58,13 +63,10 @@ class RawToBronzeService(BaseService):
                 )
                 return self.full_output_location()
 
-            # Retrieve the tree JSON file
-            tree_json = self._assets_repo.get_json(key, bucket)
-
-            tree_json = json.loads(tree_json["details"][0]["value"])
-
-            # Transform the tree
-            transformer = RawToBronzeTransformation(tree_json)
+            # Transform the tree as the raw JSON file is downloaded
+            transformer = StreamingRawToBronzeTransformation(
+                self._assets_repo.iter_file_chunks(key, bucket)
+            )
             transformed_tree = transformer.handle()
 
             # Save the transformed tree
@@ -90,8 +92,16 @@ class BronzeToSilverService(BaseService):
         self,
         assets_repo: StorageInterface,
         event_producer: EventProducerInterface,
+        process_pool: ProcessPool | None = None,
     ) -> None:
         super().__init__(assets_repo, event_producer)
+        self._process_pool = process_pool
+
+    def _map(self, fn, items) -> list:
+        # Nodes are transformed in the processes of the pool, if any
+        if self._process_pool is None:
+            return [fn(item) for item in items]
+        return self._process_pool.map(fn, items)
 
     def handle(
         self,
@@ -125,15 +135,10 @@ class BronzeToSilverService(BaseService):
             output["meta"] = transformer.handle()["metadata"]
             # raise Exception(json_data["nodes"])
             # Handle nodes
-            output["nodes"] = dict()
-            for node_id in json_data["nodes"]:
-                transformer = BronzeToSilverTransformation(
-                    json_data["nodes"][node_id]
-                )
-                transformed = transformer.handle()
-                output["nodes"][node_id] = dict()
-                output["nodes"][node_id]["content"] = transformed["content"]
-                output["nodes"][node_id]["meta"] = transformed["metadata"]
+            nodes = json_data["nodes"]
+            output["nodes"] = dict(
+                zip(nodes, self._map(transform_node, nodes.values()))
+            )
 
             # Save the transformed tree
             self._assets_repo.put_json(
@@ -163,6 +168,8 @@ class SilverToGoldService(BaseService):
         items_repository: SemanticSearchRepository,
         chunker: Chunker,
         connectors_service: ConnectorsSvcRepository,
+        embeddings_index: EmbeddingsIndexService | None = None,
+        connector_resolver: ConnectorResolver | None = None,
     ) -> None:
         super().__init__(assets_repo, event_producer)
         self.concat = None
@@ -170,6 +177,11 @@ class SilverToGoldService(BaseService):
         self._items_repository = items_repository
         self._chunker = chunker
         self.connectors_service = connectors_service
+        # Without a shared resolver, the connector is resolved on every call
+        self._connector_resolver = connector_resolver or ConnectorResolver(
+            connectors_service, ttl=0
+        )
+        self._embeddings_index = embeddings_index
 
     def handle(
         self,
@@ -182,13 +194,38 @@ class SilverToGoldService(BaseService):
     ):
         self._set_notifier_data(article_id, org_id, connector_id)
         try:
+            parser = S3ZTTreesIsolationLocationParser(key)
+            if event == "Object Created":
+                json_data = self._assets_repo.get_json(key, bucket)
+                # Not the connector of the event, which a backfill has not:
+                # the records hold the resolved one, a new connector must
+                # embed the tree again
+                resolved_connector_id = self._connector_resolver.resolve(
+                    json_data["meta"]["org_id"], "zingtree"
+                )
+                fingerprint = content_fingerprint(
+                    json_data,
+                    self._chunker,
+                    connector_id=resolved_connector_id,
+                )
+                # Every node document of the tree holds the tree fingerprint
+                fingerprints = self._items_repository.find_fingerprints_like(
+                    f"{parser.get_id()}::%", int(parser.get_org_id())
+                )
+                if fingerprints == {fingerprint}:
+                    self._logger.info("Tree unchanged, skipping embedding")
+                    self._notify(
+                        embed_job_status_pb2.ArticleState.COMPLETE,
+                        embed_job_status_pb2.FailureStatus.SUCCESS,
+                    )
+                    return []
+
             self._notify(
                 embed_job_status_pb2.ArticleState.EMBEDDING,
                 embed_job_status_pb2.FailureStatus.SUCCESS,
             )
             # Delete the records from the database, in any case
             self._logger.info("Removing records from the database")
-            parser = S3ZTTreesIsolationLocationParser(key)
             deleted_ids = self._items_repository.remove_items_like(
                 f"{parser.get_id()}::%", int(parser.get_org_id())
             )
@@ -202,9 +239,7 @@ class SilverToGoldService(BaseService):
 
                 return deleted_ids
             elif event == "Object Created":
-                # Retrieve the tree JSON file
                 self._logger.info("Creating object in the database.")
-                json_data = self._assets_repo.get_json(key, bucket)
                 tree_meta_data = json_data["meta"]
                 tree_meta_data["tree_id"] = tree_meta_data.pop("id")
                 tree_meta_data["tree_name"] = tree_meta_data.pop("name")
@@ -212,29 +247,11 @@ class SilverToGoldService(BaseService):
                     "description"
                 )
 
-                try:
-                    connector_type = list(
-                        filter(
-                            lambda x: x.provider == "zingtree",
-                            self.connectors_service.get_connector_types(
-                                tree_meta_data["org_id"]
-                            ),
-                        )
-                    )[0]
-                    connector_id = (
-                        self.connectors_service.get_connectors_by_connector_type_id(  # noqa: E501
-                            tree_meta_data["org_id"], connector_type.id
-                        )
-                    )[0].id
-                    tree_meta_data["connector_id"] = connector_id
-                except Exception:
-                    raise ValueError(
-                        "Connector or ConnectorType not configured for "
-                        "organization"
-                    )
+                tree_meta_data["connector_id"] = resolved_connector_id
 
                 # Handle nodes
                 inserted_ids = []
+                document_ids = []
                 for node_id in json_data["nodes"]:
                     json_data["nodes"][node_id]["meta"]["node_id"] = node_id
                     transformer = SilverToGoldTransformation(
@@ -244,7 +261,10 @@ class SilverToGoldService(BaseService):
                         self._embedder,
                         self._chunker,
                     )
-                    records = transformer.handle()
+                    # The records are inserted batch by batch as they get
+                    # embedded, the document being created from the first
+                    batches = transformer.handle()
+                    records = next(batches, [])
 
                     # If the node content is empty skip it
                     if len(records) == 0:
@@ -277,15 +297,22 @@ class SilverToGoldService(BaseService):
                             records[0]["updated_at"],
                         )
 
-                    for record in records:
-                        # Initially a list with a single dictionary per node
-                        inserted = self._items_repository.create_item(
-                            record["embeddings"],
-                            record["chunk"],
-                            record["snippet"],
-                            document_item,
+                    for records in chain([records], batches):
+                        inserted = self._items_repository.create_items(
+                            records, document_item
                         )
-                        inserted_ids.append(inserted.id)
+                        if self._embeddings_index is not None:
+                            self._embeddings_index.write_shadow(
+                                records, inserted
+                            )
+                        inserted_ids.extend(item.id for item in inserted)
+                    document_ids.append(document_item.id)
+
+                # Stored last, so a partially embedded tree is embedded again
+                if document_ids:
+                    self._items_repository.update_fingerprint(
+                        document_ids, fingerprint
+                    )
 
                 # At this stage we do not need to
                 # save the transformed tree, only
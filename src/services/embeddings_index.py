@@ -0,0 +1,253 @@
+import time
+from threading import Lock
+from typing import Callable
+
+from src.contracts.cache import CacheInterface
+from src.contracts.embedder import EmbedderInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.repositories.models.semantic_search_repository import (
+    SemanticSearchRepository,
+)
+
+
+@with_logger()
+class EmbeddingsIndexService:
+    """Select the embeddings searched and maintain the shadow index.
+
+    The items embeddings, made by the primary embedder, are the `primary`
+    version. While migrating to another model, the shadow embedder vectors
+    are written next to them under the shadow version: on ingestion, and by
+    `fill_shadow` for the items ingested before.
+
+    The version searched is kept in Redis, so a cutover switches every
+    process at once, within `ttl` seconds. The query embedder and the
+    version are always read together, a search never mixes the vectors of
+    two models.
+
+    Parameters
+    ----------
+    cache : CacheInterface
+        Cache holding the active version.
+    items_repository : SemanticSearchRepository
+        Repository of the items and their shadow embeddings.
+    embedder : EmbedderInterface
+        Primary embedder, for search queries.
+    shadow_embedder : EmbedderInterface | None, optional
+        Embedder of the shadow version, by default None (no shadow index)
+    shadow_version : str, optional
+        Version name of the shadow embeddings, by default ""
+    ttl : float, optional
+        Seconds the active version is kept in memory, by default 5.0
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    shadow_query_embedder : EmbedderInterface | None, optional
+        Embedder of the shadow version for search queries, by default the
+        shadow embedder
+    """
+
+    PRIMARY = "primary"
+    ACTIVE_VERSION_KEY = "embeddings:active-version"
+
+    def __init__(
+        self,
+        cache: CacheInterface,
+        items_repository: SemanticSearchRepository,
+        embedder: EmbedderInterface,
+        shadow_embedder: EmbedderInterface | None = None,
+        shadow_version: str = "",
+        ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        shadow_query_embedder: EmbedderInterface | None = None,
+    ) -> None:
+        self._cache = cache
+        self._items_repository = items_repository
+        self._embedder = embedder
+        self._shadow_embedder = shadow_embedder if shadow_version else None
+        self._shadow_version = shadow_version
+        self._shadow_query_embedder = (
+            shadow_query_embedder or self._shadow_embedder
+        )
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        self._active = self.PRIMARY
+        self._expires_at = None
+
+    @property
+    def shadow_version(self) -> str | None:
+        if self._shadow_embedder is None:
+            return None
+        return self._shadow_version
+
+    def active_version(self) -> str:
+        """Get the version searched, `primary` if none was set."""
+        with self._lock:
+            now = self._clock()
+            if self._expires_at is not None and now < self._expires_at:
+                return self._active
+
+            try:
+                self._active = (
+                    self._cache.get(self.ACTIVE_VERSION_KEY) or self.PRIMARY
+                )
+            except Exception as e:
+                # Keep searching the last known version
+                self._logger.error(
+                    f"[EmbeddingsIndex] Failed to read active version: {e}"
+                )
+            self._expires_at = now + self._ttl
+            return self._active
+
+    def query_embedder(self) -> tuple[EmbedderInterface, str | None]:
+        """Get the embedder for search queries and the version to search.
+
+        Returns
+        -------
+        tuple[EmbedderInterface, str | None]
+            Embedder and shadow version, None for the items embeddings.
+        """
+
+        if self.shadow_version is None:
+            # Without shadow index only the primary embeddings exist
+            return self._embedder, None
+
+        version = self.active_version()
+        if version == self.PRIMARY:
+            return self._embedder, None
+        if version == self.shadow_version:
+            return self._shadow_query_embedder, version
+
+        self._logger.warning(
+            f"[EmbeddingsIndex] No embedder for active version {version}, "
+            "searching the primary embeddings"
+        )
+        return self._embedder, None
+
+    def write_shadow(self, records: list[dict], items: list) -> None:
+        """Store the shadow embeddings of freshly inserted items.
+
+        While the primary embeddings are searched, failures are only logged
+        and `fill_shadow` embeds the missed items. Once the shadow version
+        is active they are raised: the searches only find the items with
+        shadow embeddings, the ingestion must fail and be retried.
+
+        Parameters
+        ----------
+        records : list[dict]
+            Records the items were inserted from, with their `chunk`.
+        items : list
+            Inserted items, in the order of the records.
+
+        Raises
+        ------
+        Exception
+            If the shadow embeddings could not be stored while the shadow
+            version is active
+        """
+
+        if self.shadow_version is None or not records:
+            return
+
+        try:
+            embeddings = self._shadow_embedder.embed(
+                [record["chunk"] for record in records]
+            )
+            self._items_repository.create_shadow_items(
+                [item.id for item in items], embeddings, self._shadow_version
+            )
+        except Exception as e:
+            get_metrics().incr("embeddings_shadow_write_failed")
+            self._logger.error(
+                f"[EmbeddingsIndex] Failed to write shadow embeddings: {e}"
+            )
+            if self.active_version() == self._shadow_version:
+                raise
+
+    def missing_shadow(self) -> int:
+        """Count the items without shadow embeddings."""
+        self._require_shadow()
+        return self._items_repository.count_items_missing_version(
+            self._shadow_version
+        )
+
+    def fill_shadow(
+        self,
+        batch_size: int = 64,
+        pause: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> int:
+        """Embed the items without shadow embeddings.
+
+        Items are embedded in batches of `batch_size` chunks per embedder
+        call, pausing `pause` seconds between batches to leave room for
+        the searches on the database and embedder.
+
+        Returns
+        -------
+        int
+            Number of shadow embeddings stored.
+        """
+
+        self._require_shadow()
+        filled = 0
+        after_id = 0
+        while True:
+            rows = self._items_repository.find_items_missing_version(
+                self._shadow_version, after_id, batch_size
+            )
+            if not rows:
+                return filled
+
+            embeddings = self._shadow_embedder.embed(
+                [chunk for _, chunk in rows]
+            )
+            filled += self._items_repository.create_shadow_items(
+                [item_id for item_id, _ in rows],
+                embeddings,
+                self._shadow_version,
+            )
+            after_id = rows[-1][0]
+            self._logger.info(
+                f"[EmbeddingsIndex] {filled} {self._shadow_version} "
+                f"embeddings stored, up to item {after_id}"
+            )
+            if pause:
+                sleep(pause)
+
+    def cutover(self, force: bool = False) -> None:
+        """Search the shadow embeddings from now on.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Switch even if some items have no shadow embeddings yet, by
+            default False
+
+        Raises
+        ------
+        ValueError
+            If there is no shadow index or it is incomplete
+        """
+
+        missing = self.missing_shadow()
+        if missing and not force:
+            raise ValueError(
+                f"{missing} items have no {self._shadow_version} embeddings"
+            )
+        self._set_active(self._shadow_version)
+
+    def rollback(self) -> None:
+        """Search the primary embeddings from now on."""
+        self._set_active(self.PRIMARY)
+
+    def _set_active(self, version: str) -> None:
+        self._cache.set(self.ACTIVE_VERSION_KEY, version)
+        with self._lock:
+            self._active = version
+            self._expires_at = self._clock() + self._ttl
+        self._logger.info(f"[EmbeddingsIndex] Active version set to {version}")
+
+    def _require_shadow(self) -> None:
+        if self.shadow_version is None:
+            raise ValueError("No shadow embeddings version configured")
@@ -1,4 +1,6 @@
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Union
+
+from fastapi.encoders import jsonable_encoder
 
 import src.repositories.models.analytics.semantic_search_analytics_repository as ssar  # noqa: E501
 from src.api.v1.endpoints.requests.semantic_search import (
@@ -6,6 +8,7 @@ from src.api.v1.endpoints.requests.semantic_search import (
     TagsWithMetaFields,
 )
 from src.api.v1.endpoints.responses.semantic_search import TagMeta
+from src.builders.context import ContextPacker
 from src.builders.queries.semantic_search import WidgetFiltersBuilder
 from src.contracts.embedder import EmbedderInterface
 from src.contracts.summarizer import SummarizerInterface
@@ -16,12 +19,33 @@ from src.repositories.audit import AuditInMemoryRepository
 from src.repositories.models.semantic_search_repository import (
     SemanticSearchRepository,
 )
+from src.repositories.search_results import SearchResultsRepository
 from src.repositories.services.config_svc import ConfigSvcRepository
 from src.repositories.services.connectors_svc import ConnectorsSvcRepository
 from src.repositories.services.lime import LimeRepository
 from src.schemas.services.connectors_svc import Connector
+from src.services.embeddings_index import EmbeddingsIndexService
+from src.services.speculative_summary import SpeculativeSummaryService
+from src.services.summarize_jobs import SummarizeJobService
 from src.util.tags_parser import TagParser
 
+# Answer of the summaries in the local environment
+LOCAL_ANSWER = (
+    "Lorem ipsum dolor sit amet, consectetur"
+    " adipiscing elit. Integer ut elit id leo imperdiet"
+    " placerat. Nam ligula odio, auctor eu velit quis,"
+    " tincidunt fringilla quam. Etiam fermentum ligula"
+    " vel dolor ultricies, a viverra nulla aliquet."
+    " Duis elit mi, ornare vel pulvinar ac, cursus"
+    " vitae elit. Ut auctor lacinia tempor. Nulla"
+    " fermentum libero id neque ullamcorper, eget"
+    " ornare tellus bibendum. Duis suscipit eleifend"
+    " elementum. Pellentesque arcu est, mattis vitae"
+    " elit eu, dapibus sollicitudin ante. Nunc"
+    " molestie lobortis magna, eu mattis"
+    " libero mollis auctor."
+)
+
 
 @with_logger()
 class SemanticSearchService:
@@ -34,8 +58,14 @@ class SemanticSearchService:
         config_svc_repository: ConfigSvcRepository,
         lime_repository: LimeRepository,
         audit_repository: AuditInMemoryRepository,
+        embeddings_index: EmbeddingsIndexService | None = None,
+        search_results: SearchResultsRepository | None = None,
+        speculative_summaries: SpeculativeSummaryService | None = None,
     ) -> None:
         self._embedder = embedder
+        self._embeddings_index = embeddings_index
+        self._search_results = search_results
+        self._speculative_summaries = speculative_summaries
         self._items_repository = items_repository
         self._semantic_search_analytics_repository = (
             semantic_search_analytics_repository
@@ -45,6 +75,11 @@ class SemanticSearchService:
         self._lime_repository = lime_repository
         self._audit_repository = audit_repository
 
+    def _query_embedder(self) -> tuple[EmbedderInterface, str | None]:
+        if self._embeddings_index is None:
+            return self._embedder, None
+        return self._embeddings_index.query_embedder()
+
     def search(
         self,
         search: str,
@@ -93,10 +128,30 @@ class SemanticSearchService:
             if len(user_tags) > 0:
                 filters.zt_tags = user_tags
 
-        embeddings = self._embedder.embed(search)[0]
+        embedder, version = self._query_embedder()
+        embeddings = embedder.embed(search)[0]
         options, distances = self._items_repository.search(
-            embeddings, org_id, filters, limit
+            embeddings, org_id, filters, limit, version=version
         )
+        keep_result = (
+            self._search_results is not None and self._search_results.enabled
+        )
+        speculate = (
+            self._speculative_summaries is not None
+            and self._speculative_summaries.enabled_for(deployment_id)
+        )
+        summarized = []
+        if keep_result or speculate:
+            # The items `SummarizeAnswerService` summarizes for this query:
+            # the closest chunks with the widget filters, at any distance
+            summarized = self._items_repository.search_best(
+                embeddings,
+                org_id,
+                filters=WidgetFiltersBuilder(widget, connectors).build_from(
+                    SearchFilters()
+                ),
+                version=version,
+            )
 
         # Analytics
         # NOTE: results should be saved in as fetched (relevant sort)
@@ -111,6 +166,28 @@ class SemanticSearchService:
             distances=distances,
             deployment_id=deployment_id,
         )
+        if keep_result:
+            # Kept for the summary of the same query, in relevance order
+            self._search_results.save(
+                str(batch.id),
+                {
+                    "query": search,
+                    "org_id": org_id,
+                    "deployment_id": deployment_id,
+                    "ids": [item.id for item in summarized],
+                },
+            )
+
+        if speculate:
+            self._speculative_summaries.submit(
+                org_id,
+                deployment_id,
+                search,
+                [
+                    (item.id, item.document_id, item.snippet)
+                    for item in summarized
+                ],
+            )
 
         # if there are no options, return empty list
         if not options:
@@ -312,6 +389,7 @@ class SemanticSearchService:
 
 @with_logger()
 class SummarizeAnswerService:
+
     def __init__(
         self,
         embedder: EmbedderInterface,
@@ -320,20 +398,68 @@ class SummarizeAnswerService:
         app_env: str,
         connectors_svc_repository: ConnectorsSvcRepository,
         config_svc_repository: ConfigSvcRepository,
+        embeddings_index: EmbeddingsIndexService | None = None,
+        search_results: SearchResultsRepository | None = None,
+        speculative_summaries: SpeculativeSummaryService | None = None,
+        summarize_jobs: SummarizeJobService | None = None,
     ) -> None:
         self._embedder = embedder
+        self._embeddings_index = embeddings_index
+        self._search_results = search_results
+        self._speculative_summaries = speculative_summaries
+        self._summarize_jobs = summarize_jobs
         self._summarizer = summarizer
         self._items_repository = items_repository
         self._app_env = app_env
         self._connectors_svc_repository = connectors_svc_repository
         self._config_svc_repository = config_svc_repository
 
+    def _query_embedder(self) -> tuple[EmbedderInterface, str | None]:
+        if self._embeddings_index is None:
+            return self._embedder, None
+        return self._embeddings_index.query_embedder()
+
+    def _get_search_result(
+        self, search_id: str, query: str, org_id: int, deployment_id: str
+    ) -> dict | None:
+        if self._search_results is None:
+            return None
+
+        result = self._search_results.get(search_id)
+        if result is None:
+            self._logger.info(
+                f"[Summarize-Answer] Search {search_id} expired, "
+                "searching again."
+            )
+            return None
+        if (
+            result["query"] != query
+            or result["org_id"] != org_id
+            or result["deployment_id"] != deployment_id
+        ):
+            # Another query, or not a search of this widget
+            return None
+        return result
+
+    def _find_items(
+        self, items_ids: list[int], org_id: int
+    ) -> list[SemanticSearchItem]:
+        # In the order of the ids, the query does not keep it
+        items = {
+            item.id: item
+            for item in self._items_repository.find_semantic_search_items_by_ids(  # noqa: E501
+                items_ids, org_id
+            )
+        }
+        return [items[i] for i in items_ids if i in items]
+
     def handle(
         self,
         query: str,
         org_id: int,
         deployment_id: str,
         options_id_list: list[int] | None = None,
+        search_id: str | None = None,
     ) -> Dict[str, str | List[SemanticSearchItem]]:
         """
         Summarize semantic search results.
@@ -346,6 +472,10 @@ class SummarizeAnswerService:
             Organization ID.
         options_id_list : [int]
             List of SemanticSearchItem's IDs to summarize.
+        search_id : str | None
+            Analytics ID of a search of the same query, its results are
+            summarized without searching again. Ignored with
+            `options_id_list`, or once the search result expired.
 
         Returns
         -------
@@ -353,6 +483,151 @@ class SummarizeAnswerService:
             Summarized answer from given SemanticSearchItem's IDs.
         """
 
+        options = self._find_options(
+            query, org_id, deployment_id, options_id_list, search_id
+        )
+        if self._app_env == "local":
+            return dict(
+                answer=LOCAL_ANSWER, options=[o.to_dict() for o in options]
+            )
+        if not options:
+            return self._no_context()
+
+        answer = self._speculative_answer(
+            query, options, org_id, deployment_id
+        )
+        if answer is None:
+            answer = self._summarizer.summarize(self._context(options), query)
+        return {"answer": answer, "options": [o.to_dict() for o in options]}
+
+    def handle_stream(
+        self,
+        query: str,
+        org_id: int,
+        deployment_id: str,
+        options_id_list: list[int] | None = None,
+        search_id: str | None = None,
+    ) -> tuple[list[dict], Iterator[str]]:
+        """
+        Summarize semantic search results, streaming the answer.
+
+        The options are found before returning, the answer is generated
+        while the returned iterator is consumed.
+
+        Parameters
+        ----------
+        query : str
+            Query to search for.
+        org_id: int
+            Organization ID.
+        options_id_list : [int]
+            List of SemanticSearchItem's IDs to summarize.
+        search_id : str | None
+            Analytics ID of a search of the same query, as for `handle`.
+
+        Returns
+        -------
+        (list[dict], Iterator[str])
+            Options summarized, and pieces of the answer.
+        """
+
+        options = self._find_options(
+            query, org_id, deployment_id, options_id_list, search_id
+        )
+        output = [o.to_dict() for o in options]
+        if self._app_env == "local":
+            return output, iter([LOCAL_ANSWER])
+        if not options:
+            return [], iter([self._no_context()["answer"]])
+
+        answer = self._speculative_answer(
+            query, options, org_id, deployment_id
+        )
+        if answer is not None:
+            return output, iter([answer])
+        return output, self._summarizer.summarize_stream(
+            self._context(options), query
+        )
+
+    def submit_job(
+        self,
+        query: str,
+        org_id: int,
+        deployment_id: str,
+        options_id_list: list[int] | None = None,
+        search_id: str | None = None,
+    ) -> dict:
+        """
+        Summarize semantic search results in the background.
+
+        The options are found before returning, the answer is generated by
+        `SummarizeJobService`, once for the same query and options.
+
+        Parameters
+        ----------
+        query : str
+            Query to search for.
+        org_id: int
+            Organization ID.
+        options_id_list : [int]
+            List of SemanticSearchItem's IDs to summarize.
+        search_id : str | None
+            Analytics ID of a search of the same query, as for `handle`.
+
+        Returns
+        -------
+        dict
+            Job, as returned by `SummarizeJobService.submit`.
+        """
+
+        options = self._find_options(
+            query, org_id, deployment_id, options_id_list, search_id
+        )
+
+        def generate() -> str:
+            if self._app_env == "local":
+                return LOCAL_ANSWER
+            if not options:
+                return self._no_context()["answer"]
+            answer = self._speculative_answer(
+                query, options, org_id, deployment_id
+            )
+            if answer is None:
+                answer = self._summarizer.summarize(
+                    self._context(options), query
+                )
+            return answer
+
+        return self._summarize_jobs.submit(
+            org_id,
+            query,
+            jsonable_encoder([o.to_dict() for o in options]),
+            generate,
+        )
+
+    def _find_options(
+        self,
+        query: str,
+        org_id: int,
+        deployment_id: str,
+        options_id_list: list[int] | None,
+        search_id: str | None,
+    ) -> list[SemanticSearchItem]:
+        search_result = None
+        if search_id and not options_id_list and self._app_env != "local":
+            search_result = self._get_search_result(
+                search_id, query, org_id, deployment_id
+            )
+        if search_result is not None:
+            # Found by the search as below: the widget was checked and the
+            # query embedded already
+            if not search_result["ids"]:
+                return []
+            options = self._find_items(search_result["ids"], org_id)
+            if options:
+                return options
+            # Removed since the search, e.g. by a resync
+
         widget = (
             self._config_svc_repository.get_search_widget_by_deployment_id(
                 org_id, deployment_id
@@ -368,53 +643,47 @@ class SummarizeAnswerService:
             SearchFilters()
         )
 
-        if self._app_env == "local":
-            embeddings = self._embedder.embed(query)[0]
-            options = self._items_repository.search_best(
-                embeddings,
-                org_id,
-                filters=filters,
-            )
-            return dict(
-                answer="Lorem ipsum dolor sit amet, consectetur"
-                " adipiscing elit. Integer ut elit id leo imperdiet"
-                " placerat. Nam ligula odio, auctor eu velit quis,"
-                " tincidunt fringilla quam. Etiam fermentum ligula"
-                " vel dolor ultricies, a viverra nulla aliquet."
-                " Duis elit mi, ornare vel pulvinar ac, cursus"
-                " vitae elit. Ut auctor lacinia tempor. Nulla"
-                " fermentum libero id neque ullamcorper, eget"
-                " ornare tellus bibendum. Duis suscipit eleifend"
-                " elementum. Pellentesque arcu est, mattis vitae"
-                " elit eu, dapibus sollicitudin ante. Nunc"
-                " molestie lobortis magna, eu mattis"
-                " libero mollis auctor.",
-                options=[o.to_dict() for o in options],
-            )
+        if options_id_list and self._app_env != "local":
+            # In the order of the search the widget made
+            return self._find_items(options_id_list, org_id)
 
-        if options_id_list:
-            options = self._items_repository.find_semantic_search_items_by_ids(
-                options_id_list, org_id
-            )
-        else:
-            embeddings = self._embedder.embed(query)[0]
-            options = self._items_repository.search_best(
-                embeddings,
-                org_id,
-                filters=filters,
-            )
-        # If still there are no options, log and return error message
-        if not options:
-            self._logger.error(
-                "[Summarize-Answer] There is no context to answer this "
-                "question."
-            )
-            return {
-                "answer": "There is no context to answer this question.",
-                "options": [],
-            }
+        embedder, version = self._query_embedder()
+        embeddings = embedder.embed(query)[0]
+        return self._items_repository.search_best(
+            embeddings,
+            org_id,
+            filters=filters,
+            version=version,
+        )
 
-        answer = self._summarizer.summarize(
-            [option.snippet for option in options], query
+    def _context(self, options: list[SemanticSearchItem]) -> list[str]:
+        packer = ContextPacker(self._summarizer.context_max_tokens)
+        return packer.pack(
+            (option.document_id, option.snippet) for option in options
+        )
+
+    def _no_context(self) -> Dict[str, str | List[SemanticSearchItem]]:
+        self._logger.error(
+            "[Summarize-Answer] There is no context to answer this "
+            "question."
+        )
+        return {
+            "answer": "There is no context to answer this question.",
+            "options": [],
+        }
+
+    def _speculative_answer(
+        self,
+        query: str,
+        options: list[SemanticSearchItem],
+        org_id: int,
+        deployment_id: str,
+    ) -> str | None:
+        if (
+            self._speculative_summaries is None
+            or not self._speculative_summaries.enabled_for(deployment_id)
+        ):
+            return None
+        return self._speculative_summaries.get(
+            org_id, query, [option.id for option in options]
         )
-        return {"answer": answer, "options": [o.to_dict() for o in options]}
@@ -0,0 +1,273 @@
+import hashlib
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock
+from typing import Callable
+
+from src.builders.context import ContextPacker
+from src.contracts.cache import CacheInterface
+from src.contracts.summarizer import SummarizerInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+
+
+@with_logger()
+class SpeculativeSummaryService:
+    """Summarize search results before the summary is asked for.
+
+    Searches of the enabled widgets submit their best options, which are
+    summarized in the background by a few threads. The summaries are kept
+    in Redis for `ttl` seconds, keyed by organization, query and option
+    ids, so the summary of the same query and options is read instead of
+    generated.
+
+    The speculative summaries cost endpoint time nobody may ask for, so:
+
+    - at most `max_pending` summaries wait or run at once, the searches
+      submitting more are not summarized;
+    - a summary not started `max_delay` seconds after its search is given
+      up, the user has likely moved on;
+    - an organization gets at most `org_limit` summaries per `org_window`
+      seconds, counted in Redis across the processes.
+
+    A summary asked for while its speculative summary runs in the same
+    process waits for it instead of generating it again. One asked for
+    before its speculative summary started cancels it.
+
+    The metrics are `speculative_summaries_submitted`, `_completed`,
+    `_dropped` (too many pending), `_expired`, `_capped`, `_cancelled`,
+    `_failures`, `_hits` and `_misses`.
+
+    Parameters
+    ----------
+    summarizer_factory : Callable[[], SummarizerInterface]
+        Get the summarizer, once per summary.
+    cache : CacheInterface
+        Cache holding the summaries and the organizations counters.
+    deployments : list[str]
+        Deployment ids of the enabled widgets, "*" for all of them.
+    workers : int, optional
+        Threads summarizing, by default 2
+    max_pending : int, optional
+        Summaries waiting or running at once, by default 16
+    max_delay : float, optional
+        Seconds a summary may wait to start, by default 10.0
+    ttl : float, optional
+        Seconds a summary is kept, by default 300
+    org_limit : int, optional
+        Summaries of an organization per window, by default 500
+    org_window : float, optional
+        Seconds of the organizations windows, by default 3600
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    KEY_PREFIX = "speculative-summaries"
+
+    def __init__(
+        self,
+        summarizer_factory: Callable[[], SummarizerInterface],
+        cache: CacheInterface,
+        deployments: list[str],
+        workers: int = 2,
+        max_pending: int = 16,
+        max_delay: float = 10.0,
+        ttl: float = 300,
+        org_limit: int = 500,
+        org_window: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._summarizer_factory = summarizer_factory
+        self._cache = cache
+        self._deployments = frozenset(deployments)
+        self._max_delay = max_delay
+        self._ttl = ttl
+        self._org_limit = org_limit
+        self._org_window = org_window
+        self._clock = clock
+        self._metrics = get_metrics()
+        self._pending = BoundedSemaphore(max(int(max_pending), 1))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(int(workers), 1),
+            thread_name_prefix="speculative-summary",
+        )
+        self._lock = Lock()
+        self._running: dict[str, Future] = {}
+
+    def enabled_for(self, deployment_id: str) -> bool:
+        return "*" in self._deployments or deployment_id in self._deployments
+
+    def _key(self, org_id: int, query: str, options_ids: list[int]) -> str:
+        # The options found for the same query can come in another order
+        digest = hashlib.sha256(
+            f"{query}\0{sorted(options_ids)}".encode()
+        ).hexdigest()
+        return f"{self.KEY_PREFIX}:{org_id}:{digest}"
+
+    def submit(
+        self,
+        org_id: int,
+        deployment_id: str,
+        query: str,
+        options: list[tuple[int, int, str]],
+    ) -> bool:
+        """Summarize the options of a search in the background.
+
+        Parameters
+        ----------
+        org_id : int
+            Organization ID.
+        deployment_id : str
+            Deployment ID of the widget searched.
+        query : str
+            Query searched.
+        options : list[tuple[int, int, str]]
+            Ids, document ids and snippets of the options to summarize, the
+            closest first.
+
+        Returns
+        -------
+        bool
+            Whether the summary was submitted.
+        """
+
+        if not options or not self.enabled_for(deployment_id):
+            return False
+
+        key = self._key(org_id, query, [option[0] for option in options])
+        try:
+            with self._lock:
+                if key in self._running:
+                    return False
+            if self._cache.exists(key):
+                return False
+        except Exception as e:
+            self._logger.warning(
+                f"[Speculative-Summary] Error while reading cache: {e}"
+            )
+            return False
+
+        if not self._pending.acquire(blocking=False):
+            self._metrics.incr("speculative_summaries_dropped")
+            return False
+        with self._lock:
+            if key in self._running:
+                self._pending.release()
+                return False
+            try:
+                future = self._executor.submit(
+                    self._summarize,
+                    key,
+                    org_id,
+                    query,
+                    [option[1:] for option in options],
+                    self._clock(),
+                )
+            except RuntimeError:
+                # Shut down
+                self._pending.release()
+                return False
+            self._running[key] = future
+        # Also called when cancelled, unlike a `finally` in the thread
+        future.add_done_callback(lambda _: self._done(key))
+        self._metrics.incr("speculative_summaries_submitted")
+        return True
+
+    def get(
+        self,
+        org_id: int,
+        query: str,
+        options_ids: list[int],
+        timeout: float | None = None,
+    ) -> str | None:
+        """Get the speculative summary of a query and its options.
+
+        Parameters
+        ----------
+        org_id : int
+            Organization ID.
+        query : str
+            Query to summarize.
+        options_ids : list[int]
+            Ids of the options to summarize.
+        timeout : float | None, optional
+            Seconds to wait for a summary running in this process, by
+            default until it is done
+
+        Returns
+        -------
+        str | None
+            Summary, None if there is none.
+        """
+
+        key = self._key(org_id, query, options_ids)
+        with self._lock:
+            running = self._running.get(key)
+
+        answer = None
+        if running is not None and running.cancel():
+            # Not started, generating it now is faster than waiting
+            self._metrics.incr("speculative_summaries_cancelled")
+        elif running is not None:
+            try:
+                answer = running.result(timeout)
+            except (CancelledError, FutureTimeoutError):
+                pass
+        if answer is None:
+            try:
+                cached = self._cache.get(key)
+            except Exception as e:
+                self._logger.warning(
+                    f"[Speculative-Summary] Error while reading cache: {e}"
+                )
+                cached = None
+            answer = cached["answer"] if cached else None
+
+        self._metrics.incr(
+            "speculative_summaries_hits"
+            if answer is not None
+            else "speculative_summaries_misses"
+        )
+        return answer
+
+    def _summarize(
+        self,
+        key: str,
+        org_id: int,
+        query: str,
+        snippets: list[tuple[int, str]],
+        submitted_at: float,
+    ) -> str | None:
+        try:
+            if self._clock() - submitted_at > self._max_delay:
+                self._metrics.incr("speculative_summaries_expired")
+                return None
+            count = self._cache.incr(
+                f"{self.KEY_PREFIX}:count:{org_id}", self._org_window
+            )
+            if count > self._org_limit:
+                self._metrics.incr("speculative_summaries_capped")
+                return None
+
+            summarizer = self._summarizer_factory()
+            context = ContextPacker(summarizer.context_max_tokens).pack(
+                snippets
+            )
+            answer = summarizer.summarize(context, query)
+            self._cache.set(key, {"answer": answer}, self._ttl)
+            self._metrics.incr("speculative_summaries_completed")
+            return answer
+        except Exception as e:
+            self._metrics.incr("speculative_summaries_failures")
+            self._logger.error(f"[Speculative-Summary] {e}")
+            return None
+
+    def _done(self, key: str) -> None:
+        with self._lock:
+            self._running.pop(key, None)
+        self._pending.release()
+
+    def shutdown(self) -> None:
+        """Give up the summaries not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from typing import Callable
+
+from src.contracts.cache import CacheInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.exceptions.summarizer import SummarizeJobsBusyException
+
+
+@with_logger()
+class SummarizeJobService:
+    """Summaries generated in the background, polled for by the widgets.
+
+    A job is identified by its organization, query and option ids, so the
+    same summary asked for again, by this process or another, is the same
+    job: it is generated once. The first process claiming a job in Redis
+    generates it on its pool of `workers` threads, and keeps the job and
+    its answer in Redis for `ttl` seconds, where any process reads it.
+
+    At most `max_pending` jobs wait or run per process, more are refused
+    with `SummarizeJobsBusyException`. A failed job is kept as such until
+    it is submitted again, which generates it again.
+
+    The metrics are `summarize_jobs_submitted`, `_deduplicated`,
+    `_rejected`, `_completed` and `_failures`.
+
+    Parameters
+    ----------
+    cache : CacheInterface
+        Cache holding the jobs.
+    workers : int, optional
+        Threads generating the summaries, by default 4
+    max_pending : int, optional
+        Jobs waiting or running at once, by default 64
+    ttl : float, optional
+        Seconds a job is kept, by default 300
+    poll_interval : float, optional
+        Seconds between the reads of a job waited for, by default 0.25
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    KEY_PREFIX = "summarize-jobs"
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        cache: CacheInterface,
+        workers: int = 4,
+        max_pending: int = 64,
+        ttl: float = 300,
+        poll_interval: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache = cache
+        self._ttl = ttl
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._metrics = get_metrics()
+        self._pending = BoundedSemaphore(max(int(max_pending), 1))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(int(workers), 1),
+            thread_name_prefix="summarize-job",
+        )
+
+    @staticmethod
+    def job_id(org_id: int, query: str, options_ids: list[int]) -> str:
+        # The options found for the same query can come in another order
+        return hashlib.sha256(
+            f"{org_id}\0{query}\0{sorted(options_ids)}".encode()
+        ).hexdigest()
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{job_id}"
+
+    def _claim_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:claim:{job_id}"
+
+    def submit(
+        self,
+        org_id: int,
+        query: str,
+        options: list[dict],
+        generate: Callable[[], str],
+    ) -> dict:
+        """Submit a summary, unless the same one is already submitted.
+
+        Parameters
+        ----------
+        org_id : int
+            Organization ID.
+        query : str
+            Query summarized.
+        options : list[dict]
+            Options summarized, as returned with the answer.
+        generate : Callable[[], str]
+            Generate the answer, called on the pool.
+
+        Returns
+        -------
+        dict
+            Job: its `id`, `status` and, once done, `answer` and `options`.
+
+        Raises
+        ------
+        SummarizeJobsBusyException
+            If too many jobs are pending in this process.
+        """
+
+        job_id = self.job_id(org_id, query, [o["id"] for o in options])
+        job = self.get(job_id, org_id)
+        if job is not None and job["status"] != self.FAILED:
+            self._metrics.incr("summarize_jobs_deduplicated")
+            return job
+
+        if not self._pending.acquire(blocking=False):
+            self._metrics.incr("summarize_jobs_rejected")
+            raise SummarizeJobsBusyException()
+        try:
+            claimed = self._cache.incr(self._claim_key(job_id), self._ttl)
+            if claimed > 1:
+                # Submitted since read, by another request
+                self._pending.release()
+                self._metrics.incr("summarize_jobs_deduplicated")
+                return self.get(job_id, org_id) or {
+                    "id": job_id,
+                    "status": self.PENDING,
+                }
+
+            job = {
+                "id": job_id,
+                "org_id": org_id,
+                "status": self.PENDING,
+                "options": options,
+            }
+            self._cache.set(self._key(job_id), job, self._ttl)
+            future = self._executor.submit(self._run, job, generate)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        self._metrics.incr("summarize_jobs_submitted")
+        return job
+
+    def get(self, job_id: str, org_id: int) -> dict | None:
+        """Get a job of an organization, None if there is none.
+
+        Parameters
+        ----------
+        job_id : str
+            Job ID.
+        org_id : int
+            Organization ID.
+
+        Returns
+        -------
+        dict | None
+            Job, as returned by `submit`.
+        """
+
+        job = self._cache.get(self._key(job_id))
+        if job is None or job["org_id"] != org_id:
+            return None
+        return job
+
+    async def wait(
+        self, job_id: str, org_id: int, timeout: float
+    ) -> dict | None:
+        """Get a job, waiting up to `timeout` seconds while it is pending.
+
+        The job is read every `poll_interval` seconds in a thread, so the
+        reads do not block the event loop, without holding a thread in
+        between.
+
+        Parameters
+        ----------
+        job_id : str
+            Job ID.
+        org_id : int
+            Organization ID.
+        timeout : float
+            Seconds to wait for the job to be done or failed.
+
+        Returns
+        -------
+        dict | None
+            Job, as returned by `submit`.
+        """
+
+        deadline = self._clock() + timeout
+        job = await asyncio.to_thread(self.get, job_id, org_id)
+        while job is not None and job["status"] == self.PENDING:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(self._poll_interval, remaining))
+            job = await asyncio.to_thread(self.get, job_id, org_id)
+        return job
+
+    def _run(self, job: dict, generate: Callable[[], str]) -> None:
+        try:
+            job = job | {"status": self.DONE, "answer": generate()}
+            self._metrics.incr("summarize_jobs_completed")
+        except Exception as e:
+            job = job | {"status": self.FAILED}
+            self._metrics.incr("summarize_jobs_failures")
+            self._logger.error(f"[Summarize-Job] {job['id']}: {e}")
+        try:
+            self._cache.set(self._key(job["id"]), job, self._ttl)
+            if job["status"] == self.FAILED:
+                # Submitting it again generates it again
+                self._cache.delete(self._claim_key(job["id"]))
+        except Exception as e:
+            self._logger.error(
+                f"[Summarize-Job] Error while saving {job['id']}: {e}"
+            )
+
+    def shutdown(self) -> None:
+        """Give up the jobs not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
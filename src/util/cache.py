@@ -1,9 +1,8 @@
-import json
-
 import redis as redis
 
 from src.contracts.cache import CacheInterface
 from src.core.config import get_settings
+from src.util import codec
 
 
 class Cache(CacheInterface):
@@ -50,7 +49,7 @@ class RedisCache(Cache):
 
         value = self._client.get(name=self._formulate_key(key))
 
-        return None if value is None else json.loads(value)
+        return None if value is None else codec.loads(value)
 
     def set(
         self, key: str, value: str, ttl: float | None = None
@@ -69,7 +68,7 @@ class RedisCache(Cache):
 
         return self._client.set(
             self._formulate_key(key),
-            json.dumps(value, separators=(",", ":")),
+            codec.dumpb(value),
             ttl,
         )
 
@@ -99,3 +98,31 @@ class RedisCache(Cache):
         """
 
         return self.client.exists(self._formulate_key(key))
+
+    def incr(self, key: str, ttl: float | None = None) -> int:
+        """Increment a counter in Redis.
+
+        The time to live is set when the counter is created, the counter
+        then counts over a fixed window.
+
+        Parameters
+        ----------
+        key : str
+            Key of the counter.
+        ttl : float | None, optional
+            Time to live in seconds, by default None
+
+        Returns
+        -------
+        int
+            Value of the counter.
+        """
+
+        key = self._formulate_key(key)
+        with self.client.pipeline() as pipeline:
+            if ttl is not None:
+                # Created with its time to live, unlike EXPIRE NX this
+                # works before Redis 7
+                pipeline.set(key, 0, ex=max(int(ttl), 1), nx=True)
+            pipeline.incr(key)
+            return pipeline.execute()[-1]
@@ -0,0 +1,73 @@
+import time
+from threading import Lock
+from typing import Callable
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a while.
+
+    The breaker opens after `failure_threshold` consecutive failures and
+    then rejects every call for `reset_timeout` seconds. After that, a
+    single trial call is let through (half-open): its success closes the
+    breaker, its failure opens it again for `reset_timeout` seconds.
+
+    Parameters
+    ----------
+    failure_threshold : int, optional
+        Consecutive failures opening the breaker, by default 5
+    reset_timeout : float, optional
+        Seconds the breaker stays open, by default 30.0
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = max(int(failure_threshold), 1)
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made, reserving the trial call if so."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and (
+                self._clock() - self._opened_at >= self._reset_timeout
+            ):
+                self._state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial call in flight
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self._failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
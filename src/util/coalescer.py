@@ -0,0 +1,80 @@
+import time
+from typing import Any, Callable, Hashable
+
+
+class Coalescer:
+    """Hold items for a time window keeping only the latest one per key.
+
+    The window starts with the first item of a key: adding more items for
+    the same key replaces the held one without extending the window, so an
+    item is never held longer than `window` seconds.
+
+    The coalescer is not thread safe, it is meant to be used by a single
+    thread.
+
+    Parameters
+    ----------
+    window : float
+        Seconds an item is held before being released.
+    clock : Callable[[], float], optional
+        Monotonic clock, by default `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        window: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = window
+        self._clock = clock
+        # Key to (deadline, item), ordered by deadline as windows never
+        # get extended
+        self._held: dict[Hashable, tuple[float, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._held)
+
+    def add(self, key: Hashable, item: Any) -> Any | None:
+        """Hold an item, replacing the one held for the same key.
+
+        Parameters
+        ----------
+        key : Hashable
+            Coalescing key.
+        item : Any
+            Item to hold.
+
+        Returns
+        -------
+        Any | None
+            The replaced item, if any.
+        """
+
+        if key in self._held:
+            deadline, superseded = self._held[key]
+            self._held[key] = (deadline, item)
+            return superseded
+
+        self._held[key] = (self._clock() + self._window, item)
+        return None
+
+    def pop_expired(self) -> list:
+        """Release the items whose window has elapsed, oldest first."""
+        now = self._clock()
+        expired = []
+        for key, (deadline, _) in self._held.items():
+            if deadline > now:
+                break
+            expired.append(key)
+        return [self._held.pop(key)[1] for key in expired]
+
+    def pop_all(self) -> list:
+        """Release every held item, oldest first."""
+        items = [item for _, item in self._held.values()]
+        self._held.clear()
+        return items
+
+    def discard(self, predicate: Callable[[Any], bool]) -> list:
+        """Drop the held items matching the predicate and return them."""
+        keys = [k for k, (_, item) in self._held.items() if predicate(item)]
+        return [self._held.pop(key)[1] for key in keys]
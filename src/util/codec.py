@@ -0,0 +1,119 @@
+"""JSON encoding and decoding.
+
+orjson, a dependency of the service, is several times faster than the
+standard library on the trees and articles stored on S3 and on the cached
+values. The standard library is used where it is not installed.
+Both codecs produce compact UTF-8 JSON, a value written with one is read
+back identically with the other.
+
+The codec is selected with the `JSON_CODEC` setting: `auto` (orjson if
+installed), `orjson` or `json`.
+"""
+
+import json
+from functools import lru_cache
+
+from starlette.responses import JSONResponse
+
+from src.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec:
+    """Standard library codec."""
+
+    name = "json"
+
+    def dumps(self, obj: any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumpb(self, obj: any) -> bytes:
+        return self.dumps(obj).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> any:
+        return json.loads(data)
+
+
+class ORJSONCodec(JSONCodec):
+    """orjson codec.
+
+    Values orjson does not handle, such as integers over 64 bits, are
+    encoded by the standard library.
+    """
+
+    name = "orjson"
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if orjson is not None
+        else 0
+    )
+
+    def dumps(self, obj: any) -> str:
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj: any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=self.OPTIONS)
+        except TypeError:
+            return super().dumps(obj).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> any:
+        return orjson.loads(data)
+
+
+@lru_cache()
+def get_codec(name: str | None = None) -> JSONCodec:
+    """Get a JSON codec.
+
+    Parameters
+    ----------
+    name : str | None, optional
+        `auto`, `orjson` or `json`, by default the `JSON_CODEC` setting
+
+    Returns
+    -------
+    JSONCodec
+
+    Raises
+    ------
+    ValueError
+        If the codec is unknown or orjson is not installed
+    """
+
+    name = name or get_settings().JSON_CODEC
+    if name == "auto":
+        name = "json" if orjson is None else "orjson"
+
+    if name == "json":
+        return JSONCodec()
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        return ORJSONCodec()
+    raise ValueError(f"Unknown JSON codec: {name}")
+
+
+def dumps(obj: any) -> str:
+    """Encode a value to a JSON string."""
+    return get_codec().dumps(obj)
+
+
+def dumpb(obj: any) -> bytes:
+    """Encode a value to UTF-8 JSON bytes."""
+    return get_codec().dumpb(obj)
+
+
+def loads(data: str | bytes) -> any:
+    """Decode a JSON string or bytes."""
+    return get_codec().loads(data)
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSON response encoded with the configured codec."""
+
+    def render(self, content: any) -> bytes:
+        return dumpb(content)
@@ -0,0 +1,208 @@
+"""Incremental JSON parsing.
+
+`JSONStream` reads a JSON document from chunks of text and lets the caller
+walk it: objects and arrays are iterated one member at a time, strings can
+be read in pieces, and only the values read with `read_value` are built.
+The memory used is then the size of the largest value read at once, not the
+size of the document.
+
+The values themselves are decoded by the standard library decoder, so
+walking a document costs about as much as decoding it with `json.loads`.
+"""
+
+import codecs
+import json
+import re
+from json.decoder import scanstring
+from typing import Iterable, Iterator
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Longest run of string content ending on a whole escape sequence. A high
+# surrogate escape is only taken with the escape following it, which may
+# be its low surrogate
+STRING_CONTENT = re.compile(
+    r"(?:[^\"\\]+"
+    r"|\\[^u]"
+    r"|\\u(?![dD][89abAB])[0-9a-fA-F]{4}"
+    r"|\\u[dD][89abAB][0-9a-fA-F]{2}\\u[0-9a-fA-F]{4}"
+    r"|\\u[dD][89abAB][0-9a-fA-F]{2}(?=[^\\]|\\[^u])"
+    r")*"
+)
+NUMBER_START = frozenset("-0123456789")
+NUMBER = re.compile(r"[-+.0-9eE]*")
+HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}")
+
+
+def iter_text(
+    chunks: Iterable[bytes], encoding: str = "utf-8"
+) -> Iterator[str]:
+    """Decode chunks of bytes, characters may be split between chunks."""
+    return codecs.iterdecode(chunks, encoding)
+
+
+class JSONStream:
+    """Pull parser over a JSON document arriving in chunks of text.
+
+    The iterators returned by `iter_object` and `iter_array` stop on each
+    member, which must be consumed with `read_value`, `skip_value`,
+    `iter_string` or a nested iteration before moving to the next one.
+
+    Parameters
+    ----------
+    chunks : Iterable[str]
+        Text of the document.
+    """
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = 1) -> bool:
+        # Read at least `size` more characters, dropping the consumed ones
+        parts = [self._buffer[self._pos :]]  # noqa: E203
+        read = 0
+        while read < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            read += len(chunk)
+        self._buffer = "".join(parts)
+        self._pos = 0
+        return read > 0
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self._buffer, self._pos)
+
+    def _peek(self) -> str:
+        # Next significant character, left unconsumed, empty at the end
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            raise self._error(f"Expecting one of {chars!r}")
+        self._pos += 1
+        return char
+
+    def peek_type(self) -> type | None:
+        """Type of the next value: dict, list, str, or None for others."""
+        return {"{": dict, "[": list, '"': str}.get(self._peek())
+
+    def read_value(self) -> any:
+        """Read the next value."""
+        if self._peek() in NUMBER_START:
+            # A number may go on in the next chunk
+            while (
+                NUMBER.match(self._buffer, self._pos).end()
+                == len(self._buffer)
+                and self._fill()
+            ):
+                pass
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete, reading as much as is buffered again keeps
+                # the decoding attempts linear in the value size
+                if not self._fill(max(len(self._buffer) - self._pos, 1)):
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Skip the next value without building it."""
+        kind = self.peek_type()
+        if kind is dict:
+            for _ in self.iter_object():
+                self.skip_value()
+        elif kind is list:
+            for _ in self.iter_array():
+                self.skip_value()
+        elif kind is str:
+            for _ in self.iter_string():
+                pass
+        else:
+            self.read_value()
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over the keys of the next value, an object."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise self._error("Expecting property name")
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate over the indexes of the next value, an array."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._expect(",]") == "]":
+                return
+
+    def iter_string(self) -> Iterator[str]:
+        """Iterate over the pieces of the next value, a string."""
+        self._expect('"')
+        while True:
+            try:
+                value, end = scanstring(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The string goes on in the next chunks
+                pass
+            else:
+                self._pos = end
+                if value:
+                    yield value
+                return
+
+            cut = self._string_cut()
+            if cut > self._pos:
+                content = self._buffer[self._pos : cut]  # noqa: E203
+                yield scanstring(content + '"', 0)[0]
+                self._pos = cut
+            if not self._fill():
+                raise self._error("Unterminated string")
+
+    def _string_cut(self) -> int:
+        # End of the buffered string content not within an escape sequence
+        # or between the escapes of a surrogate pair
+        buffer = self._buffer
+        cut = buffer.rfind("\\", self._pos)
+        if cut == -1:
+            return len(buffer)
+        while cut > self._pos and buffer[cut - 1] == "\\":
+            cut -= 1
+        if cut == self._pos:
+            # Only the last escapes are buffered, they are checked one by one
+            return STRING_CONTENT.match(buffer, self._pos).end()
+
+        start = cut - len("\\uD800")
+        if start >= self._pos and HIGH_SURROGATE.match(buffer, start):
+            # Unless it is an escaped backslash followed by "u"
+            escaped = start
+            while escaped > self._pos and buffer[escaped - 1] == "\\":
+                escaped -= 1
+            if (start - escaped) % 2 == 0:
+                cut = start
+        return cut
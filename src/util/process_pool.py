@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Callable, Iterable
+
+from src.core.deps.logger import with_logger
+
+
+@with_logger()
+class ProcessPool:
+    """Run CPU-bound functions on a pool of processes shared by the threads.
+
+    The pool is disabled with `workers` set to 0: the functions then run in
+    the calling thread, as they would without the pool. The processes are
+    only started on the first call which has enough items to be worth it,
+    with the spawn method, so they do not inherit the Kafka, database and
+    HTTP clients of the parent.
+
+    The functions and their arguments are pickled, the functions must be
+    defined at the top level of a module.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of processes, by default 0 (disabled), negative for one per
+        CPU
+    chunk_size : int, optional
+        Items sent to a process at once by `map`, by default 64
+    min_items : int, optional
+        Items from which `map` uses the processes, by default 2
+    """
+
+    def __init__(
+        self, workers: int = 0, chunk_size: int = 64, min_items: int = 2
+    ) -> None:
+        workers = int(workers)
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        self._workers = workers
+        self._chunk_size = max(int(chunk_size), 1)
+        self._min_items = max(int(min_items), 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = Lock()
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._workers > 0 and not self._closed
+
+    def map(
+        self,
+        fn: Callable,
+        items: Iterable,
+        chunk_size: int | None = None,
+    ) -> list:
+        """Apply a function to every item.
+
+        Parameters
+        ----------
+        fn : Callable
+            Function of one argument, defined at the top level of a module.
+        items : Iterable
+            Arguments.
+        chunk_size : int | None, optional
+            Items sent to a process at once, by default the pool's
+
+        Returns
+        -------
+        list
+            Results, in the order of the items.
+        """
+
+        items = list(items)
+        if not self.enabled or len(items) < self._min_items:
+            return [fn(item) for item in items]
+
+        # Small batches are spread over every process
+        chunk_size = chunk_size or self._chunk_size
+        chunk_size = max(min(chunk_size, -(-len(items) // self._workers)), 1)
+        try:
+            return list(
+                self._get_executor().map(fn, items, chunksize=chunk_size)
+            )
+        except BrokenProcessPool:
+            self._reset()
+            return [fn(item) for item in items]
+
+    def run(self, fn: Callable, *args) -> any:
+        """Call a function in one of the processes and wait for its result.
+
+        The calling thread does not hold the GIL while waiting, calls from
+        several threads run in parallel.
+        """
+
+        if not self.enabled:
+            return fn(*args)
+
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            self._reset()
+            return fn(*args)
+
+    def shutdown(self) -> None:
+        """Stop the processes, later calls run in the calling thread."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._logger.info(
+                    f"[ProcessPool] Starting {self._workers} processes"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset(self) -> None:
+        # A process died (e.g. killed out of memory), the next calls start
+        # a new pool, this one runs in the calling thread
+        self._logger.error("[ProcessPool] Broken pool, running in-thread")
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
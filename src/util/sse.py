@@ -0,0 +1,16 @@
+"""Server-Sent Events.
+
+See https://html.spec.whatwg.org/multipage/server-sent-events.html. The
+data of the events is JSON, which never spans several lines.
+"""
+
+from src.util import codec
+
+MEDIA_TYPE = "text/event-stream"
+# Proxies such as nginx buffer the responses unless told not to
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: any) -> str:
+    """Encode an event, its data as JSON."""
+    return f"event: {event}\ndata: {codec.dumps(data)}\n\n"
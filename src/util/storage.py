@@ -1,8 +1,10 @@
-import json
+from typing import Iterator
 
 import boto3
 
 from src.contracts.storage import StorageInterface
+from src.util import codec
+from src.util.uploader import BackgroundUploader
 
 
 class S3Storage(StorageInterface):
@@ -44,6 +46,41 @@ class S3Storage(StorageInterface):
 
         return result["Body"].read().decode("utf-8")
 
+    def iter_file_chunks(
+        self, key: str, bucket: str | None = None, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Read a file from a S3 bucket as it is downloaded
+
+        Parameters
+        ----------
+        key : str
+            File path
+        bucket : str | None, optional
+            Bucket name, by default None
+        chunk_size : int, optional
+            Bytes per chunk, by default 65536
+
+        Yields
+        ------
+        bytes
+
+        Raises
+        ------
+        ValueError
+            If bucket name is not provided
+        """
+
+        _bucket = bucket or self.bucket
+        if not _bucket:
+            raise ValueError("Bucket name is not provided")
+
+        result = self._client.get_object(Bucket=_bucket, Key=key.lstrip("/"))
+        body = result["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
     def get_json(self, key: str, bucket: str | None = None) -> dict:
         """Get a JSON from a S3 bucket
 
@@ -64,7 +101,7 @@ class S3Storage(StorageInterface):
             If bucket name is not provided
         """
 
-        return json.loads(self.get_file(key, bucket))
+        return codec.loads(self.get_file(key, bucket))
 
     def put_file(self, key: str, data: any, bucket: str | None = None) -> None:
         """Set file in a S3 bucket
@@ -112,7 +149,7 @@ class S3Storage(StorageInterface):
             If bucket name is not provided
         """
 
-        self.put_file(key, json.dumps(data), bucket)
+        self.put_file(key, codec.dumps(data), bucket)
 
     def list_files(
         self, bucket: str | None = None, prefix: str = ""
@@ -136,15 +173,51 @@ class S3Storage(StorageInterface):
             If bucket name is not provided
         """
 
+        return list(self.iter_files(bucket, prefix))
+
+    def iter_files(
+        self,
+        bucket: str | None = None,
+        prefix: str = "",
+        start_after: str = "",
+    ) -> Iterator[str]:
+        """Iterate over the files in a S3 bucket, in key order
+
+        Keys are listed page by page as the iterator is consumed, so
+        listing a large prefix never holds more than a page in memory.
+
+        Parameters
+        ----------
+        bucket : str | None, optional
+            Bucket name, by default None
+        prefix : str, optional
+            Prefix of the files, by default ""
+        start_after : str, optional
+            Only list the keys after this one, by default ""
+
+        Returns
+        -------
+        Iterator[str]
+
+        Raises
+        ------
+        ValueError
+            If bucket name is not provided
+        """
+
         _bucket = bucket or self.bucket
         if not _bucket:
             raise ValueError("Bucket name is not provided")
 
-        result = self._client.list_objects_v2(Bucket=_bucket, Prefix=prefix)
-
-        if "Contents" not in result:
-            return []
-        return [obj["Key"] for obj in result["Contents"]]
+        params = {"Bucket": _bucket, "Prefix": prefix}
+        if start_after:
+            params["StartAfter"] = start_after
+        pages = self._client.get_paginator("list_objects_v2").paginate(
+            **params
+        )
+        return (
+            obj["Key"] for page in pages for obj in page.get("Contents", ())
+        )
 
     def delete_file(self, key: str, bucket: str | None = None) -> None:
         """Delete file in a S3 bucket
@@ -171,3 +244,96 @@ class S3Storage(StorageInterface):
         key = key.lstrip("/")
 
         self._client.delete_object(Bucket=_bucket, Key=key)
+
+
+class PassThroughStorage(StorageInterface):
+    """Storage handing written JSON objects forward in memory.
+
+    Meant to be shared by the stages of a single pipeline run: the objects
+    written by a stage are kept in memory, as is, and returned to the next
+    stage without any storage round trip or JSON decoding. Readers get the
+    written object itself, not a copy.
+
+    Writes are forwarded to `uploader` to be persisted in the background,
+    or dropped when there is none. Everything not written during the run is
+    read from `storage`.
+
+    Parameters
+    ----------
+    storage : StorageInterface
+        Storage reads fall back to.
+    uploader : BackgroundUploader | None, optional
+        Uploader persisting the writes, by default None
+    """
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        uploader: BackgroundUploader | None = None,
+    ):
+        self._storage = storage
+        self._uploader = uploader
+        self._objects = {}
+
+    @staticmethod
+    def _location(key: str, bucket: str | None) -> tuple:
+        return bucket, key.lstrip("/")
+
+    def get_file(self, key: str, bucket: str | None = None) -> any:
+        location = self._location(key, bucket)
+        if location not in self._objects:
+            return self._storage.get_file(key, bucket)
+
+        data = self._objects[location]
+        return data if isinstance(data, (str, bytes)) else codec.dumps(data)
+
+    def iter_file_chunks(
+        self, key: str, bucket: str | None = None, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        location = self._location(key, bucket)
+        if location not in self._objects:
+            return self._storage.iter_file_chunks(key, bucket, chunk_size)
+
+        data = self.get_file(key, bucket)
+        return iter([data.encode("utf-8") if isinstance(data, str) else data])
+
+    def get_json(self, key: str, bucket: str | None = None) -> dict:
+        location = self._location(key, bucket)
+        if location not in self._objects:
+            return self._storage.get_json(key, bucket)
+
+        data = self._objects[location]
+        return codec.loads(data) if isinstance(data, (str, bytes)) else data
+
+    def put_file(self, key: str, data: any, bucket: str | None = None) -> None:
+        self._objects[self._location(key, bucket)] = data
+        if self._uploader is not None:
+            self._uploader.put_file(key, data, bucket)
+
+    def put_json(
+        self, key: str, data: dict, bucket: str | None = None
+    ) -> None:
+        self._objects[self._location(key, bucket)] = data
+        if self._uploader is not None:
+            self._uploader.put_json(key, data, bucket)
+
+    def list_files(
+        self, bucket: str | None = None, prefix: str = ""
+    ) -> list[str]:
+        return self._storage.list_files(bucket, prefix)
+
+    def iter_files(
+        self,
+        bucket: str | None = None,
+        prefix: str = "",
+        start_after: str = "",
+    ) -> Iterator[str]:
+        return self._storage.iter_files(bucket, prefix, start_after)
+
+    def delete_file(self, key: str, bucket: str | None = None) -> None:
+        self._objects.pop(self._location(key, bucket), None)
+        if self._uploader is not None:
+            # Queued after the pending uploads of the same file
+            self._uploader.delete_file(key, bucket)
+        else:
+            self._storage.delete_file(key, bucket)
@@ -0,0 +1,86 @@
+from src.contracts.storage import StorageInterface
+from src.core.deps.logger import with_logger
+from src.core.deps.metrics import get_metrics
+from src.util import codec
+from src.util.worker_pool import KeyedWorkerPool
+
+
+@with_logger()
+class BackgroundUploader:
+    """Write files to a storage from background threads.
+
+    Writes and deletes of the same file are applied in the order they were
+    requested. Once `max_pending` operations are pending, requesting a new
+    one blocks until a worker is done, so a slow storage slows the callers
+    down instead of growing the memory.
+
+    Parameters
+    ----------
+    storage : StorageInterface
+        Storage the files are written to.
+    workers : int, optional
+        Number of upload threads, by default 4
+    max_pending : int, optional
+        Pending operations from which callers are blocked, by default 64
+    """
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        workers: int = 4,
+        max_pending: int = 64,
+    ) -> None:
+        self._storage = storage
+        self._metrics = get_metrics()
+        self._pool = KeyedWorkerPool(
+            workers, max_pending, name="background-uploader"
+        )
+        self._pool.start()
+
+    @property
+    def pending(self) -> int:
+        return self._pool.in_flight
+
+    def put_file(self, key: str, data: any, bucket: str | None = None) -> None:
+        self._submit("put", key, bucket, self._storage.put_file, data)
+
+    def put_json(
+        self, key: str, data: dict, bucket: str | None = None
+    ) -> None:
+        # Serialized right away, later changes to `data` are not uploaded
+        self.put_file(key, codec.dumps(data), bucket)
+
+    def delete_file(self, key: str, bucket: str | None = None) -> None:
+        self._submit("delete", key, bucket, self._storage.delete_file)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait for the pending operations, False if the timeout expired."""
+        return self._pool.wait_idle(timeout=timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        if not self.flush(timeout):
+            self._logger.warning(
+                f"Closing uploader with {self.pending} operations pending"
+            )
+        self._pool.shutdown(wait=False)
+
+    def _submit(self, operation, key, bucket, fn, *args) -> None:
+        self._pool.wait_available()
+        self._pool.submit(
+            f"{bucket}/{key.lstrip('/')}",
+            fn,
+            key,
+            *args,
+            bucket,
+            on_done=lambda error: self._on_done(operation, key, error),
+        )
+
+    def _on_done(self, operation, key, error) -> None:
+        if error is None:
+            self._metrics.incr("storage_background_ops", operation=operation)
+            return
+
+        self._logger.error(f"Background {operation} of {key} failed: {error}")
+        self._metrics.incr(
+            "storage_background_ops_failed", operation=operation
+        )
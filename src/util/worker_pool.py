@@ -0,0 +1,298 @@
+from collections import deque
+from threading import Condition, Thread
+from typing import Callable, Hashable
+
+from src.core.deps.logger import with_logger
+
+
+class _WorkItem:
+    __slots__ = ("key", "group", "priority", "fn", "args", "on_done")
+
+    def __init__(self, key, group, priority, fn, args, on_done) -> None:
+        self.key = key
+        self.group = group
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+
+
+@with_logger()
+class KeyedWorkerPool:
+    """Run work items on a fixed set of threads with fair scheduling.
+
+    Items are queued per group (e.g. organization) and the workers pick them
+    with deficit round robin: each turn, a group may start up to `weight`
+    items before the next group gets its turn, so a group with a large
+    backlog cannot delay the items of the other groups by more than a round.
+    A group never runs more than `group_concurrency` items at once. Items
+    submitted with a higher priority are always picked first, the groups of
+    each priority level are served in their own round robin.
+
+    Items sharing a key run one after the other in submission order. An item
+    is only started once no earlier item with the same key is queued or
+    running, while items with different keys run concurrently.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker threads.
+    max_in_flight : int
+        Number of queued plus running items from which the pool is
+        considered full. Submitting is never refused, it is up to the caller
+        to stop feeding the pool while `full` is true.
+    name : str, optional
+        Prefix for the worker thread names, by default "worker-pool"
+    group_concurrency : int, optional
+        Maximum running items per group, by default 0 (no limit)
+    weights : dict[Hashable, int] | None, optional
+        Items started per round for each group, by default 1 for every group
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_in_flight: int,
+        name: str = "worker-pool",
+        group_concurrency: int = 0,
+        weights: dict[Hashable, int] | None = None,
+    ) -> None:
+        workers = max(int(workers), 1)
+        self._max_in_flight = max(int(max_in_flight), 1)
+        self._group_concurrency = max(int(group_concurrency), 0)
+        self._weights = dict(weights or {})
+        self._threads = [
+            Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self._cond = Condition()
+        # Queued items and deficits per (priority, group)
+        self._queues: dict[tuple, deque[_WorkItem]] = {}
+        self._deficits: dict[tuple, int] = {}
+        # Groups with queued items per priority, in round robin order
+        self._rings: dict[int, deque[Hashable]] = {}
+        self._running_groups: dict[Hashable, int] = {}
+        self._running_keys: set = set()
+        # Queued items per key, in submission order
+        self._pending_keys: dict[Hashable, deque[_WorkItem]] = {}
+        self._in_flight = 0
+        self._started = False
+        self._stopped = False
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    @property
+    def full(self) -> bool:
+        return self.in_flight >= self._max_in_flight
+
+    def queued(self, group: Hashable = None, priority: int = 0) -> int:
+        """Get the number of items of a group waiting for a worker."""
+        with self._cond:
+            return len(self._queues.get((priority, group), ()))
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        key: str | bytes | None,
+        fn: Callable,
+        *args,
+        on_done: Callable[[BaseException | None], None] | None = None,
+        group: Hashable = None,
+        priority: int = 0,
+    ) -> None:
+        """Queue a call to `fn(*args)`.
+
+        Parameters
+        ----------
+        key : str | bytes | None
+            Ordering key, items without key are not ordered.
+        fn : Callable
+            Function to run.
+        on_done : Callable[[BaseException | None], None] | None, optional
+            Called from the worker thread once `fn` returns, with the raised
+            exception if any, by default None
+        group : Hashable, optional
+            Scheduling group, by default None
+        priority : int, optional
+            Items with higher priority are started first, by default 0
+        """
+
+        with self._cond:
+            self._in_flight += 1
+            if (priority, group) not in self._queues:
+                self._queues[(priority, group)] = deque()
+                self._rings.setdefault(priority, deque()).append(group)
+            item = _WorkItem(key or None, group, priority, fn, args, on_done)
+            self._queues[(priority, group)].append(item)
+            if item.key is not None:
+                self._pending_keys.setdefault(item.key, deque()).append(item)
+            self._cond.notify()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until every submitted item has been processed.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            Maximum seconds to wait, by default None (forever)
+
+        Returns
+        -------
+        bool
+            False if the timeout expired with items still in flight.
+        """
+
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._in_flight == 0, timeout=timeout
+            )
+
+    def wait_available(self, timeout: float | None = None) -> bool:
+        """Block until the pool is no longer full.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            Maximum seconds to wait, by default None (forever)
+
+        Returns
+        -------
+        bool
+            False if the timeout expired with the pool still full.
+        """
+
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._in_flight < self._max_in_flight,
+                timeout=timeout,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if wait and self._started:
+            for thread in self._threads:
+                thread.join()
+
+    def _eligible(self, queue: deque[_WorkItem]) -> _WorkItem | None:
+        # First item whose key is neither running nor queued before it, at
+        # any priority
+        for item in queue:
+            if item.key is None:
+                return item
+            if (
+                item.key not in self._running_keys
+                and self._pending_keys[item.key][0] is item
+            ):
+                return item
+        return None
+
+    def _next(self) -> _WorkItem | None:
+        # Must be called holding the condition lock
+        for priority in sorted(self._rings, reverse=True):
+            item = self._next_in_ring(priority)
+            if item is not None:
+                return item
+        return None
+
+    def _next_in_ring(self, priority: int) -> _WorkItem | None:
+        # Deficit round robin over the groups with queued items
+        ring = self._rings[priority]
+        for _ in range(len(ring)):
+            group = ring[0]
+            running = self._running_groups.get(group, 0)
+            item = None
+            if (
+                not self._group_concurrency
+                or running < self._group_concurrency
+            ):
+                item = self._eligible(self._queues[(priority, group)])
+
+            if item is None:
+                # Blocked groups keep their deficit for their next turn
+                ring.rotate(-1)
+                continue
+
+            slot = (priority, group)
+            if self._deficits.get(slot, 0) <= 0:
+                self._deficits[slot] = max(self._weights.get(group, 1), 1)
+            self._deficits[slot] -= 1
+
+            queue = self._queues[slot]
+            queue.remove(item)
+            if not queue:
+                del self._queues[slot]
+                self._deficits.pop(slot, None)
+                ring.popleft()
+                if not ring:
+                    del self._rings[priority]
+            elif self._deficits[slot] <= 0:
+                ring.rotate(-1)
+
+            self._running_groups[group] = running + 1
+            if item.key is not None:
+                self._running_keys.add(item.key)
+                pending = self._pending_keys[item.key]
+                pending.popleft()
+                if not pending:
+                    del self._pending_keys[item.key]
+            return item
+
+        return None
+
+    def _finish(self, item: _WorkItem) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._running_groups[item.group] -= 1
+            if not self._running_groups[item.group]:
+                del self._running_groups[item.group]
+            self._running_keys.discard(item.key)
+            self._cond.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                item = None
+                while not self._stopped:
+                    item = self._next()
+                    if item is not None:
+                        break
+                    self._cond.wait()
+                if item is None:
+                    return
+
+            try:
+                error = None
+                try:
+                    item.fn(*item.args)
+                except Exception as e:
+                    error = e
+                    self._logger.error(f"[WorkerPool] Work item failed: {e}")
+
+                if item.on_done is not None:
+                    try:
+                        item.on_done(error)
+                    except Exception as e:
+                        self._logger.error(
+                            f"[WorkerPool] Completion callback failed: {e}"
+                        )
+            finally:
+                self._finish(item)
@@ -0,0 +1,102 @@
+"""Standalone ingestion worker.
+
+Consumes the embed jobs topic outside of the API processes, so ingestion and
+search can be scaled independently. Start it with::
+
+    python -m src.worker
+
+The worker serves `/health` and `/metrics` on `WORKER_PORT`, and drains the
+in-flight jobs before exiting on SIGTERM/SIGINT. `DELETE /connectors/cache`
+makes it resolve the connectors of the organizations again.
+"""
+
+import logging
+
+import uvicorn
+from fastapi import FastAPI, Response, status
+
+from src.api.v1.endpoints.responses.health import HealthData, HealthResponse
+from src.core.config import get_settings
+from src.core.containers import container
+from src.core.deps.logger import get_logger
+from src.core.deps.metrics import get_metrics
+from src.jobs.embed_job import flush_embed_jobs_uploads, subscribe_embed_jobs
+from src.util.codec import CodecJSONResponse
+
+settings = get_settings()
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+# Wire Container
+container.wire(packages=["src"])
+
+app = FastAPI(
+    title=f"{settings.APP_NAME}-worker",
+    default_response_class=CodecJSONResponse,
+)
+
+
+@app.on_event("startup")
+def on_startup():
+    get_logger(__name__).info("[Worker] Starting embed jobs consumer")
+    consumer = container.kafka_consumer()
+    subscribe_embed_jobs(consumer, container.kafka_producer())
+    consumer.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    get_logger(__name__).info("[Worker] Draining embed jobs consumer")
+    container.kafka_consumer().close()
+    flush_embed_jobs_uploads(settings.KAFKA_CONSUMER_DRAIN_TIMEOUT)
+    container.process_pool().shutdown()
+    container.kafka_producer().close()
+
+
+@app.get(
+    "/health",
+    response_model=HealthResponse,
+    description="Retrieve worker health check",
+    tags=["health"],
+)
+def get_health(response: Response):
+    running = container.kafka_consumer().running
+    if not running:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return HealthResponse(
+        error=not running,
+        data=HealthData(
+            status="ok" if running else "consumer-stopped",
+            version="v1",
+            release=settings.RELEASE_STRING,
+        ),
+    )
+
+
+@app.get(
+    "/metrics",
+    description="Retrieve worker metrics",
+    tags=["health"],
+)
+def get_worker_metrics() -> dict:
+    return get_metrics().snapshot()
+
+
+@app.delete(
+    "/connectors/cache",
+    description=(
+        "Forget the connectors resolved by the ingestion, e.g. after an "
+        "organization changed its connectors"
+    ),
+    tags=["connectors"],
+)
+def invalidate_connectors(
+    org_id: int | None = None, provider: str | None = None
+) -> dict:
+    invalidated = container.connector_resolver().invalidate(org_id, provider)
+    return {"invalidated": invalidated}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=settings.WORKER_HOST, port=settings.WORKER_PORT)
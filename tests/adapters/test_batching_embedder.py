@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import pytest
+
+from src.adapters.batching_embedder import BatchingEmbedder
+from src.core.deps.metrics import get_metrics
+
+
+class RecordingEmbedder:
+    """Embedder embedding each text as its length, recording the calls."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.calls = []
+        self.error = error
+        self._lock = Lock()
+
+    def embed(self, text):
+        with self._lock:
+            self.calls.append(list(text))
+        if self.error is not None:
+            raise self.error
+        return [[float(len(t))] for t in text]
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_metrics().reset()
+    yield
+    get_metrics().reset()
+
+
+def _embed_concurrently(batching, queries):
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        return list(executor.map(batching.embed, queries))
+
+
+def test_concurrent_calls_are_sent_in_one_call():
+    embedder = RecordingEmbedder()
+    batching = BatchingEmbedder(embedder, window=0.5, max_batch_size=4)
+
+    results = _embed_concurrently(batching, ["a", "bb", "ccc", "dddd"])
+
+    assert results == [[[1.0]], [[2.0]], [[3.0]], [[4.0]]]
+    assert len(embedder.calls) == 1
+    assert sorted(embedder.calls[0]) == ["a", "bb", "ccc", "dddd"]
+    assert (
+        get_metrics().counter_value(
+            "embedder_query_batches", embedder="primary"
+        )
+        == 1
+    )
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    embedder = RecordingEmbedder()
+    batching = BatchingEmbedder(embedder, window=5.0, max_batch_size=2)
+
+    results = _embed_concurrently(batching, ["a", "bb"])
+
+    assert results == [[[1.0]], [[2.0]]]
+    assert len(embedder.calls) == 1
+
+
+def test_batches_are_split_at_max_batch_size():
+    embedder = RecordingEmbedder()
+    batching = BatchingEmbedder(embedder, window=0.2, max_batch_size=2)
+
+    results = _embed_concurrently(batching, ["a", "bb", "ccc"])
+
+    assert results == [[[1.0]], [[2.0]], [[3.0]]]
+    assert all(len(call) <= 2 for call in embedder.calls)
+    assert sum(len(call) for call in embedder.calls) == 3
+
+
+def test_same_text_is_embedded_once():
+    embedder = RecordingEmbedder()
+    batching = BatchingEmbedder(embedder, window=0.5, max_batch_size=3)
+
+    results = _embed_concurrently(batching, ["a", "a", ["a", "bb"]])
+
+    assert results == [[[1.0]], [[1.0]], [[1.0], [2.0]]]
+    assert len(embedder.calls) == 1
+    assert sorted(embedder.calls[0]) == ["a", "bb"]
+
+
+def test_large_call_is_sent_as_is():
+    embedder = RecordingEmbedder()
+    batching = BatchingEmbedder(embedder, window=5.0, max_batch_size=2)
+
+    assert batching.embed(["a", "bb"]) == [[1.0], [2.0]]
+    assert embedder.calls == [["a", "bb"]]
+
+
+def test_failed_batch_fails_every_call():
+    embedder = RecordingEmbedder(error=RuntimeError("endpoint down"))
+    batching = BatchingEmbedder(embedder, window=0.5, max_batch_size=2)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batching.embed, q) for q in ("a", "bb")]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="endpoint down"):
+                future.result()
+    assert len(embedder.calls) == 1
+
+
+def test_empty_text_is_rejected():
+    with pytest.raises(ValueError):
+        BatchingEmbedder(RecordingEmbedder()).embed("")
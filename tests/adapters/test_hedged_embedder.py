@@ -0,0 +1,154 @@
+import time
+from threading import Event, Lock
+from unittest.mock import Mock
+
+import pytest
+
+from src.adapters.hedged_embedder import HedgedEmbedder
+from src.core.deps.metrics import get_metrics
+from src.exceptions.embedder import (
+    EmbedderTimeoutException,
+    EmbedderUnavailableException,
+)
+from src.util.circuit_breaker import CircuitBreaker
+
+
+class ScriptedEmbedder:
+    """Embedder answering each call as scripted: a delay or an exception."""
+
+    def __init__(self, *script) -> None:
+        self._script = list(script)
+        self._lock = Lock()
+        self.calls = 0
+        self.release = Event()
+
+    def embed(self, text):
+        with self._lock:
+            step = self._script[min(self.calls, len(self._script) - 1)]
+            self.calls += 1
+            call = self.calls
+        if isinstance(step, Exception):
+            raise step
+        if step is None:
+            # Blocked until released
+            self.release.wait(5)
+        else:
+            time.sleep(step)
+        return [[float(call)]]
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_metrics().reset()
+    yield
+    get_metrics().reset()
+
+
+def _hedged(embedder, **kwargs):
+    kwargs.setdefault("deadline", 1.0)
+    kwargs.setdefault("hedge_delay", 0.05)
+    kwargs.setdefault("min_hedge_delay", 0.01)
+    return HedgedEmbedder(embedder, workers=4, **kwargs)
+
+
+def test_fast_call_is_not_hedged():
+    embedder = ScriptedEmbedder(0)
+
+    assert _hedged(embedder).embed("query") == [[1.0]]
+    assert embedder.calls == 1
+    assert (
+        get_metrics().counter_value(
+            "embedder_query_requests", embedder="primary"
+        )
+        == 1
+    )
+    assert (
+        get_metrics().counter_value(
+            "embedder_query_hedges", embedder="primary"
+        )
+        == 0
+    )
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    embedder = ScriptedEmbedder(None, 0)
+    hedged = _hedged(embedder)
+
+    try:
+        assert hedged.embed("query") == [[2.0]]
+    finally:
+        embedder.release.set()
+    metrics = get_metrics()
+    assert metrics.counter_value("embedder_query_hedges", embedder="primary")
+    assert metrics.counter_value(
+        "embedder_query_hedge_wins", embedder="primary"
+    )
+
+
+def test_failed_call_is_hedged_right_away():
+    embedder = ScriptedEmbedder(ValueError("throttled"), 0)
+
+    assert _hedged(embedder, hedge_delay=0.5).embed("query") == [[2.0]]
+
+
+def test_missing_vector_is_a_failure():
+    embedder = Mock()
+    embedder.embed.side_effect = [[None], [[1.0]]]
+
+    assert _hedged(embedder).embed("query") == [[1.0]]
+
+
+def test_deadline_raises_timeout():
+    embedder = ScriptedEmbedder(None)
+    hedged = _hedged(embedder, deadline=0.1)
+
+    try:
+        with pytest.raises(EmbedderTimeoutException):
+            hedged.embed("query")
+    finally:
+        embedder.release.set()
+    assert (
+        get_metrics().counter_value(
+            "embedder_query_timeouts", embedder="primary"
+        )
+        == 1
+    )
+
+
+def test_without_hedging_failure_raises_unavailable():
+    embedder = ScriptedEmbedder(ValueError("down"))
+
+    with pytest.raises(EmbedderUnavailableException):
+        _hedged(embedder, hedge_delay=None).embed("query")
+    assert embedder.calls == 1
+
+
+def test_open_breaker_fails_fast():
+    embedder = ScriptedEmbedder(ValueError("down"))
+    hedged = _hedged(embedder, breaker=CircuitBreaker(2, 60.0))
+
+    for _ in range(2):
+        with pytest.raises(EmbedderUnavailableException):
+            hedged.embed("query")
+    calls = embedder.calls
+    with pytest.raises(EmbedderUnavailableException):
+        hedged.embed("query")
+
+    assert embedder.calls == calls
+    assert (
+        get_metrics().counter_value(
+            "embedder_query_rejected", embedder="primary"
+        )
+        == 1
+    )
+
+
+def test_hedge_delay_follows_latency_percentile():
+    hedged = _hedged(Mock(), min_samples=4, hedge_percentile=50)
+    assert hedged.hedge_delay() == 0.05
+
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        hedged._latencies.observe(latency)
+
+    assert hedged.hedge_delay() == 0.2
+    assert _hedged(Mock(), hedge_delay=None).hedge_delay() is None
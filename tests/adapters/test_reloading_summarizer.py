@@ -0,0 +1,94 @@
+from threading import Event, Thread
+from unittest.mock import Mock
+
+from src.adapters.reloading_summarizer import ReloadingSummarizer
+
+
+def _summarizer(config, check_interval=60.0, clock=None):
+    assets_repo = Mock()
+    assets_repo.get_json_asset.side_effect = lambda _: dict(config)
+    clients = []
+
+    def factory():
+        client = Mock()
+        client.summarize.return_value = f"answer {len(clients)}"
+        clients.append(client)
+        return client
+
+    summarizer = ReloadingSummarizer(
+        factory,
+        assets_repo,
+        "summarizer_config.json",
+        check_interval=check_interval,
+        clock=clock or Mock(return_value=0.0),
+    )
+    return summarizer, assets_repo, clients
+
+
+def test_summarizer_is_built_once():
+    summarizer, assets_repo, clients = _summarizer({"templates": {}})
+
+    assert summarizer.summarize(["context"], "q") == "answer 0"
+    assert summarizer.summarize(["context"], "q") == "answer 0"
+    assert len(clients) == 1
+    assets_repo.get_json_asset.assert_called_once_with(
+        "summarizer_config.json"
+    )
+
+
+def test_summarizer_is_rebuilt_when_config_changes():
+    config = {"templates": {"short": "a"}}
+    clock = Mock(return_value=0.0)
+    summarizer, _, clients = _summarizer(config, clock=clock)
+
+    clock.return_value = 60.0
+    assert summarizer.summarize(["context"], "q") == "answer 0"
+    config["templates"] = {"short": "b"}
+    assert summarizer.summarize(["context"], "q") == "answer 0"
+    clock.return_value = 120.0
+    assert summarizer.summarize(["context"], "q") == "answer 1"
+    assert len(clients) == 2
+    clients[1].connect.assert_called_once_with()
+
+
+def test_summarizer_is_kept_when_reload_fails():
+    clock = Mock(return_value=0.0)
+    summarizer, assets_repo, clients = _summarizer({}, clock=clock)
+    assets_repo.get_json_asset.side_effect = RuntimeError("S3 down")
+
+    clock.return_value = 60.0
+    assert summarizer.summarize(["context"], "q") == "answer 0"
+    assert len(clients) == 1
+
+
+def test_summarizer_is_never_reloaded_without_interval():
+    clock = Mock(return_value=0.0)
+    summarizer, assets_repo, _ = _summarizer({}, check_interval=0, clock=clock)
+
+    clock.return_value = 1000.0
+    summarizer.summarize(["context"], "q")
+    assert assets_repo.get_json_asset.call_count == 1
+
+
+def test_calls_do_not_wait_for_reload():
+    clock = Mock(return_value=0.0)
+    summarizer, assets_repo, clients = _summarizer({}, clock=clock)
+    reading, release = Event(), Event()
+
+    def slow_read(_):
+        reading.set()
+        release.wait(5)
+        return {"changed": True}
+
+    assets_repo.get_json_asset.side_effect = slow_read
+    clock.return_value = 60.0
+    reloading = Thread(target=summarizer.summarize, args=(["context"], "q"))
+    reloading.start()
+    try:
+        reading.wait(5)
+        # Served by the current summarizer while the config is read
+        assert summarizer.summarize(["context"], "q") == "answer 0"
+    finally:
+        release.set()
+        reloading.join(5)
+    assert summarizer.summarize(["context"], "q") == "answer 1"
@@ -0,0 +1,158 @@
+import json
+from unittest.mock import ANY, Mock, patch
+
+import pytest
+
+from src.adapters.summarizer_client import (
+    BedrockSummarizerClient,
+    FalconSummarizerClient,
+    Llama2SummarizerClient,
+    iter_stream_tokens,
+)
+
+
+def _assets_repo(config):
+    assets_repo = Mock()
+    assets_repo.get_json_asset.return_value = config
+    return assets_repo
+
+
+def test_iter_stream_tokens_reads_tgi_and_lmi_lines():
+    lines = [
+        b'data:{"token": {"text": " The", "special": false}}',
+        b"",
+        b'data: {"token": {"text": " answer"}}',
+        b'{"outputs": [" is", " 42"]}',
+        b'data:{"token": {"text": "</s>", "special": true},'
+        b' "generated_text": " The answer is 42"}',
+    ]
+
+    assert list(iter_stream_tokens(lines)) == [" The", " answer", " is 42"]
+
+
+@patch("src.adapters.summarizer_client.Predictor.predict_stream")
+def test_falcon_summarize_stream_streams_tokens(
+    predict_stream_mock, make_summarizer_config_plain
+):
+    predict_stream_mock.return_value = iter(
+        [
+            b'data:{"token": {"text": "Hello"}}',
+            b'data:{"token": {"text": " world"}}',
+        ]
+    )
+    summarizer = FalconSummarizerClient(
+        _assets_repo(make_summarizer_config_plain()),
+        "falcon-7b",
+        "summarizer_config.json",
+        "short",
+    )
+
+    assert list(summarizer.summarize_stream(["a", "b"], "q")) == [
+        "Hello",
+        " world",
+    ]
+    payload = json.loads(predict_stream_mock.call_args.args[0])
+    assert payload["stream"] is True
+    assert payload["inputs"] == "This is a short template with a b and q"
+
+
+@patch("src.adapters.summarizer_client.Predictor.predict_stream")
+def test_llama2_summarize_stream_streams_tokens(
+    predict_stream_mock, make_summarizer_config_plain
+):
+    predict_stream_mock.return_value = iter([b'{"outputs": ["Hi"]}'])
+    summarizer = Llama2SummarizerClient(
+        _assets_repo(make_summarizer_config_plain()),
+        "llama-2",
+        "summarizer_config.json",
+        "short",
+    )
+
+    assert list(summarizer.summarize_stream("context", "q")) == ["Hi"]
+    predict_stream_mock.assert_called_once_with(
+        ANY,
+        initial_args={"ContentType": "application/json"},
+        custom_attributes="accept_eula=true",
+        iterator=ANY,
+    )
+
+
+def test_summarize_stream_raises_with_empty_context(
+    make_summarizer_config_plain,
+):
+    summarizer = Llama2SummarizerClient(
+        _assets_repo(make_summarizer_config_plain()),
+        "llama-2",
+        "summarizer_config.json",
+        "short",
+    )
+
+    with pytest.raises(ValueError):
+        next(summarizer.summarize_stream("", "q"))
+
+
+def _bedrock(make_summarizer_config_plain, model_id):
+    config = make_summarizer_config_plain(
+        region="us-east-1",
+        bedrock_params={"modelId": model_id},
+    )
+    return BedrockSummarizerClient(
+        _assets_repo(config),
+        model_id,
+        "us-east-1",
+        "summarizer_config.json",
+        "short",
+    )
+
+
+def test_bedrock_summarize_stream_streams_chunks(make_summarizer_config_plain):
+    summarizer = _bedrock(make_summarizer_config_plain, "amazon.titan-tg1")
+    summarizer.predictor = Mock()
+    summarizer.predictor.invoke_model_with_response_stream.return_value = {
+        "body": [
+            {"chunk": {"bytes": b'{"outputText": "Hello"}'}},
+            {"chunk": {"bytes": b'{"outputText": " world"}'}},
+        ]
+    }
+
+    assert list(summarizer.summarize_stream("context", "q")) == [
+        "Hello",
+        " world",
+    ]
+    summarizer.predictor.invoke_model_with_response_stream.assert_called_once_with(  # noqa: E501
+        body=ANY, modelId="amazon.titan-tg1"
+    )
+
+
+def test_bedrock_summarize_stream_without_streaming_model_answers_at_once(
+    make_summarizer_config_plain,
+):
+    summarizer = _bedrock(make_summarizer_config_plain, "ai21.j2-ultra")
+    summarizer.predictor = Mock()
+    body = Mock()
+    body.read.return_value = b'{"completions": [{"data": {"text": "Hi"}}]}'
+    summarizer.predictor.invoke_model.return_value = {"body": body}
+
+    assert list(summarizer.summarize_stream("context", "q")) == ["Hi"]
+    summarizer.predictor.invoke_model_with_response_stream.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "budgets, expected",
+    [
+        ({}, 0),
+        ({"llama-2": 1500, "default": 2000}, 1500),
+        ({"falcon-7b": 1500, "default": 2000}, 2000),
+    ],
+)
+def test_context_max_tokens_by_model(
+    budgets, expected, make_summarizer_config_plain
+):
+    config = make_summarizer_config_plain()
+    if budgets:
+        config["context_max_tokens"] = budgets
+    summarizer = Llama2SummarizerClient(
+        _assets_repo(config), "llama-2", "summarizer_config.json", "short"
+    )
+
+    assert summarizer.context_max_tokens == expected
@@ -3,8 +3,10 @@ import os
 from unittest.mock import call, patch
 
 import pytest
+from fakeredis import FakeRedis
 from fastapi.testclient import TestClient
 
+from src.api.v1.endpoints.semantic_search import summarize_events
 from src.core.containers import container
 from src.main import app
 from src.models.analytics.semantic_search import (
@@ -14,6 +16,8 @@ from src.models.analytics.semantic_search import (
 from src.models.semantic_search_item import SemanticSearchItem
 from src.schemas.services.config_svc import SearchWidget
 from src.schemas.services.connectors_svc import Connector, ConnectorType
+from src.services.summarize_jobs import SummarizeJobService
+from src.util.cache import RedisCache
 from src.util.tags_parser import TagParser
 from tests.__factories__.models.semantic_search import (
     SemanticSearchDocumentFactory,
@@ -1229,6 +1233,151 @@ def test_summarize(
     )
 
 
+@patch(
+    "src.repositories.services.config_svc."
+    "ConfigSvcRepository.get_search_widget_by_deployment_id"
+)
+@patch(
+    "src.repositories.services.connectors_svc."
+    "ConnectorsSvcRepository.get_all_connectors"
+)
+@patch("src.core.containers.S3CachedAssetsRepository.get_json_asset")
+@patch("src.adapters.embedder_client.CohereEmbedderClient.embed")
+@patch("src.adapters.embedder_client.CohereEmbedderClient.connected")
+@patch(
+    "src.adapters.summarizer_client.Llama2SummarizerClient.summarize_stream"
+)
+@pytest.mark.usefixtures("refresh_database")
+def test_summarize_stream(
+    summarize_stream_mock,
+    connected_mock,
+    embed_mock,
+    get_json_mock,
+    get_all_connectors_mock,
+    get_search_widget_by_deployment_id_mock,
+    make_summarizer_config_plain,
+):
+    get_json_mock.return_value = make_summarizer_config_plain()
+    connected_mock.return_value = True
+    embed_mock.return_value = [[0.1] * embeddings_dimensions]
+    summarize_stream_mock.return_value = iter(["sum", "mary"])
+
+    SemanticSearchDocumentFactory.create_batch(
+        2, items=2, org_id=1, connector_id=1
+    )
+    w, c1, c2 = widget_mock_data()
+    get_all_connectors_mock.return_value = [c1, c2]
+    get_search_widget_by_deployment_id_mock.return_value = w
+
+    response = client.get(
+        "/ai-service/v1/semantic-search/summarize/stream?query=test&orgId=1"
+        "&deploymentId=9a44ad83-a9d2-427d-a8c9-91040d2b6e84"
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (
+            event.split("\n")[0].removeprefix("event: "),
+            json.loads(event.split("\n")[1].removeprefix("data: ")),
+        )
+        for event in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == [
+        "options",
+        "token",
+        "token",
+        "done",
+    ]
+    assert len(events[0][1]) == 4
+    assert events[1][1] == {"text": "sum"}
+    assert events[2][1] == {"text": "mary"}
+
+
+def test_summarize_events_end_with_error_when_generation_fails():
+    def answer():
+        yield "sum"
+        raise RuntimeError("endpoint down")
+
+    events = list(summarize_events([], answer()))
+
+    assert events == [
+        "event: options\ndata: []\n\n",
+        'event: token\ndata: {"text":"sum"}\n\n',
+        'event: error\ndata: {"message":"The answer could not be generated"}'
+        "\n\n",
+    ]
+
+
+@patch(
+    "src.repositories.services.config_svc."
+    "ConfigSvcRepository.get_search_widget_by_deployment_id"
+)
+@patch(
+    "src.repositories.services.connectors_svc."
+    "ConnectorsSvcRepository.get_all_connectors"
+)
+@patch("src.core.containers.S3CachedAssetsRepository.get_json_asset")
+@patch("src.adapters.embedder_client.CohereEmbedderClient.embed")
+@patch("src.adapters.embedder_client.CohereEmbedderClient.connected")
+@patch("src.adapters.summarizer_client.Llama2SummarizerClient.summarize")
+@pytest.mark.usefixtures("refresh_database")
+def test_summarize_job(
+    summarize_mock,
+    connected_mock,
+    embed_mock,
+    get_json_mock,
+    get_all_connectors_mock,
+    get_search_widget_by_deployment_id_mock,
+    make_summarizer_config_plain,
+):
+    get_json_mock.return_value = make_summarizer_config_plain()
+    connected_mock.return_value = True
+    embed_mock.return_value = [[0.1] * embeddings_dimensions]
+    summarize_mock.return_value = "summary"
+
+    SemanticSearchDocumentFactory.create_batch(
+        2, items=2, org_id=1, connector_id=1
+    )
+    w, c1, c2 = widget_mock_data()
+    get_all_connectors_mock.return_value = [c1, c2]
+    get_search_widget_by_deployment_id_mock.return_value = w
+
+    summarize_jobs = SummarizeJobService(
+        RedisCache(FakeRedis()), poll_interval=0.01
+    )
+    with container.summarize_job_service.override(summarize_jobs):
+        response = client.post(
+            "/ai-service/v1/semantic-search/summarize/jobs?query=test"
+            "&orgId=1&deploymentId=9a44ad83-a9d2-427d-a8c9-91040d2b6e84"
+        )
+        assert response.status_code == 202
+        job_id = response.json()["data"]["jobId"]
+
+        response = client.get(
+            f"/ai-service/v1/semantic-search/summarize/jobs/{job_id}"
+            "?orgId=1&wait=5"
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["jobId"] == job_id
+    assert data["status"] == "done"
+    assert data["answer"] == "summary"
+    assert len(data["options"]) == 4
+
+
+def test_get_summarize_job_not_found():
+    summarize_jobs = SummarizeJobService(RedisCache(FakeRedis()))
+    with container.summarize_job_service.override(summarize_jobs):
+        response = client.get(
+            "/ai-service/v1/semantic-search/summarize/jobs/unknown?orgId=1"
+        )
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "Job unknown not found"
+
+
 def test_get_documents_invalid_requests():
     response = client.get("/ai-service/v1/semantic-search/documents")
     assert response.status_code == 422
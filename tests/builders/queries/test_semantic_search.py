@@ -1,13 +1,22 @@
+import logging
 import os
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
 
 from src.api.v1.endpoints.requests.semantic_search import SearchFilters
 from src.builders.queries.semantic_search import (
     SemanticSearchSearchQueryBuilder,
 )
+from src.core.deps.logger import LogPayload
 
 embeddings_dimensions = int(os.environ.get("EMBEDDINGS_DIMENSIONS", 4096))
 
 
+def _compile(query):
+    return query.compile(dialect=postgresql.dialect())
+
+
 class TestSemanticSearchSearchQueryBuilder:
     def test_init_values(self):
         builder = SemanticSearchSearchQueryBuilder(
@@ -21,3 +30,50 @@ class TestSemanticSearchSearchQueryBuilder:
         assert isinstance(builder.filters, SearchFilters)
         assert builder.filters == SearchFilters()
         assert builder.treshold == 1.0
+
+    def test_build_searches_items_embeddings(self):
+        builder = SemanticSearchSearchQueryBuilder(
+            [0] * embeddings_dimensions, 1, 1.0
+        )
+        builder.filters = SearchFilters(connectors=[1])
+
+        query = str(_compile(builder.build()))
+
+        assert "semantic_search_shadow_items" not in query
+        assert "semantic_search_items.embeddings <=>" in query
+
+    def test_build_searches_shadow_version(self):
+        builder = SemanticSearchSearchQueryBuilder(
+            [0] * embeddings_dimensions, 1, 1.0, version="v2"
+        )
+        builder.filters = SearchFilters(connectors=[1])
+
+        query = _compile(builder.build())
+
+        assert builder.version == "v2"
+        assert "semantic_search_shadow_items.embeddings <=>" in str(query)
+        assert "semantic_search_items.embeddings <=>" not in str(query)
+        assert "v2" in query.params.values()
+
+    def test_build_best_searches_shadow_version(self):
+        builder = SemanticSearchSearchQueryBuilder(
+            [0] * embeddings_dimensions, 1, 1.0, version="v2"
+        )
+        builder.filters = SearchFilters(connectors=[1])
+
+        query = str(_compile(builder.build_best()))
+
+        assert "JOIN semantic_search_shadow_items" in query
+        assert "semantic_search_shadow_items.embeddings <=>" in query
+
+    def test_build_renders_query_only_when_debug_is_logged(self, caplog):
+        caplog.set_level(logging.INFO)
+        builder = SemanticSearchSearchQueryBuilder(
+            [0] * embeddings_dimensions, 1, 1.0
+        )
+        builder.filters = SearchFilters(connectors=[1])
+
+        with patch.object(LogPayload, "_render") as render:
+            builder.build()
+
+        render.assert_not_called()
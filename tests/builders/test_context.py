@@ -0,0 +1,56 @@
+from src.builders.context import ContextPacker
+
+
+def test_count_tokens_is_approximate():
+    packer = ContextPacker(100)
+
+    assert packer.count_tokens("") == 0
+    assert packer.count_tokens("abcd") == 1
+    assert packer.count_tokens("abcde") == 2
+    assert ContextPacker(100, chars_per_token=2).count_tokens("abcd") == 2
+
+
+def test_pack_without_budget_keeps_snippets():
+    snippets = [(1, "First. Second."), (1, "First. Second.")]
+
+    assert ContextPacker(0).pack(snippets) == [
+        "First. Second.",
+        "First. Second.",
+    ]
+
+
+def test_pack_skips_sentences_packed_from_same_document():
+    snippets = [
+        (1, "One is first. Two is next."),
+        (1, "Two is next. Three is last."),
+        (2, "Two is next."),
+    ]
+
+    assert ContextPacker(100).pack(snippets) == [
+        "One is first. Two is next.",
+        "Three is last.",
+        "Two is next.",
+    ]
+
+
+def test_pack_cuts_at_sentence_boundary():
+    # 6 tokens of 4 characters
+    snippets = [(1, "Closest one. Too long for it."), (2, "Next one.")]
+
+    assert ContextPacker(6).pack(snippets) == ["Closest one."]
+
+
+def test_pack_keeps_order_of_snippets():
+    snippets = [(2, "Closest."), (1, "Then this."), (3, "Farthest.")]
+
+    assert ContextPacker(100).pack(snippets) == [
+        "Closest.",
+        "Then this.",
+        "Farthest.",
+    ]
+
+
+def test_pack_cuts_sentence_longer_than_budget_at_word():
+    snippets = [(1, "A sentence far longer than the budget of the prompt.")]
+
+    assert ContextPacker(4).pack(iter(snippets)) == ["A sentence far"]
@@ -0,0 +1,135 @@
+import copy
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.commands.backfill import SOURCES, main, parse_args
+from src.data.chunkers.chunker import CharacterChunker
+from src.services.data.transformations.zt_trees import SilverToGoldService
+from tests.__stubs__.tree_templates import SILVER_TREE_TEMPLATE
+
+
+@pytest.mark.parametrize("source", ["zt_trees", "html"])
+def test_parse_args_rejects_connector(source):
+    with pytest.raises(SystemExit):
+        parse_args(
+            [
+                "--source",
+                source,
+                "--bucket",
+                "b",
+                "--org",
+                "1",
+                "--connector",
+                "2",
+            ]
+        )
+
+
+@patch("src.commands.backfill.BackfillService")
+@patch("src.commands.backfill.container")
+def test_main_backfills_org_prefix(container_mock, service_mock):
+    service_mock.return_value.run.return_value = {"failed": 0}
+
+    state = main(
+        [
+            "--source",
+            "article_kb",
+            "--bucket",
+            "data-bucket-silver",
+            "--org",
+            "123",
+            "--connector",
+            "7",
+            "--workers",
+            "8",
+        ]
+    )
+
+    assert state == {"failed": 0}
+    _, kwargs = service_mock.call_args
+    assert kwargs["workers"] == 8
+    assert kwargs["checkpoint"] is None
+    service_mock.return_value.run.assert_called_once_with(
+        "data-bucket-silver", "silver/articles/123/", 7
+    )
+
+
+@patch("src.commands.backfill.BackfillService")
+@patch("src.commands.backfill.container")
+def test_main_uses_checkpoint_and_prefix(container_mock, service_mock):
+    main(
+        [
+            "--source",
+            "html",
+            "--bucket",
+            "b",
+            "--org",
+            "1",
+            "--prefix",
+            "silver/custom/",
+            "--checkpoint",
+            "backfill.json",
+        ]
+    )
+
+    _, kwargs = service_mock.call_args
+    assert kwargs["checkpoint"].path == "backfill.json"
+    service_mock.return_value.run.assert_called_once_with(
+        "b", "silver/custom/", None
+    )
+
+
+@patch("src.commands.backfill.container")
+def test_article_kb_handler_runs_silver_to_gold(container_mock):
+    storage = Mock()
+    _, handler, _ = SOURCES["article_kb"]
+
+    handler(storage, "b", "silver/articles/123/a1.json", {"connector_id": 7})
+
+    service = container_mock.article_kb_silver_to_gold_service
+    assert service.call_args.kwargs["assets_repo"] is storage
+    service.return_value.handle.assert_called_once_with(
+        "b", "silver/articles/123/a1.json", 7, "Object Created", "a1", 123
+    )
+
+
+@patch("src.commands.backfill.container")
+def test_zt_trees_handler_fingerprints_as_embed_jobs(container_mock):
+    key = "silver/zt_trees/530566/507222858.json"
+    storage = Mock()
+    storage.get_json.side_effect = lambda *_: copy.deepcopy(
+        SILVER_TREE_TEMPLATE
+    )
+    embedder = Mock()
+    embedder.embed.return_value = np.zeros(4)
+    repo_mock = Mock()
+    repo_mock.find_fingerprints_like.return_value = set()
+    repo_mock.find_document.return_value = Mock(id=1)
+    repo_mock.create_items.side_effect = lambda records, _: [Mock(id=1)]
+    connector_resolver = Mock()
+    connector_resolver.resolve.return_value = 1
+
+    def service(assets_repo, event_producer):
+        return SilverToGoldService(
+            assets_repo,
+            event_producer,
+            embedder,
+            repo_mock,
+            CharacterChunker(150, "none"),
+            Mock(),
+            connector_resolver=connector_resolver,
+        )
+
+    container_mock.zt_trees_silver_to_gold_service.side_effect = service
+    _, handler, _ = SOURCES["zt_trees"]
+
+    handler(storage, "b", key, SILVER_TREE_TEMPLATE)
+    # As run by an embed job, with the connector of the event
+    embed_job = service(storage, Mock())
+    embed_job.set_job_id("job")
+    embed_job.handle("b", key, "Object Created", "507222858", 530566, 1234)
+
+    backfilled, embedded = repo_mock.update_fingerprint.call_args_list
+    assert backfilled.args[1] == embedded.args[1]
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.commands.embeddings_index import main, parse_args
+
+
+def test_parse_args_requires_command():
+    with pytest.raises(SystemExit):
+        parse_args([])
+
+
+@patch("src.commands.embeddings_index.container")
+def test_fill(container_mock):
+    index = container_mock.embeddings_index_service.return_value
+    index.fill_shadow.return_value = 10
+
+    main(["fill", "--batch-size", "32", "--pause", "0.1"])
+
+    index.fill_shadow.assert_called_once_with(32, 0.1)
+
+
+@patch("src.commands.embeddings_index.container")
+def test_cutover(container_mock):
+    index = container_mock.embeddings_index_service.return_value
+
+    main(["cutover", "--force"])
+
+    index.cutover.assert_called_once_with(force=True)
+
+
+@patch("src.commands.embeddings_index.container")
+def test_rollback(container_mock):
+    index = container_mock.embeddings_index_service.return_value
+
+    main(["rollback"])
+
+    index.rollback.assert_called_once_with()
+
+
+@patch("src.commands.embeddings_index.container")
+def test_status(container_mock, capsys):
+    index = container_mock.embeddings_index_service.return_value
+    index.active_version.return_value = "primary"
+    index.shadow_version = "v2"
+    index.missing_shadow.return_value = 4
+
+    main(["status"])
+
+    output = capsys.readouterr().out
+    assert "Active version: primary" in output
+    assert "Items without shadow embeddings: 4" in output
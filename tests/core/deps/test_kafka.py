@@ -1,7 +1,9 @@
-from unittest.mock import Mock, patch
+import time
+from unittest.mock import ANY, Mock, patch
 
 from src.core.deps.kafka import (
     Consumer,
+    PartitionOffsetTracker,
     Producer,
     TestingConsumer,
     TestingProducer,
@@ -139,5 +141,620 @@ def test_get_consumer_subscribe(
         "topic": {
             "message_class": "value",
             "on_message": "callback",
+            "options": {},
         }
     }
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_get_consumer_subscribe_with_options(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer.subscribe([["topic", "value", "callback", {"key": "key_fn"}]])
+    assert consumer._topics_metadata["topic"]["options"] == {"key": "key_fn"}
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_dispatch_submits_to_pool_by_key(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=2, max_in_flight=4)
+
+    payload = Mock()
+    message_class = Mock(return_value=payload)
+    callback = Mock()
+    consumer.subscribe(
+        [["topic", message_class, callback, {"key": lambda p: "article-1"}]]
+    )
+    consumer._pool = Mock()
+
+    msg = Mock()
+    msg.topic.return_value = "topic"
+    msg.value.return_value = b"value"
+    msg.timestamp.return_value = (1, 1000)
+    consumer._dispatch(msg)
+
+    payload.ParseFromString.assert_called_once_with(b"value")
+    consumer._pool.submit.assert_called_once_with(
+        "article-1", ANY, payload, on_done=ANY, group=None, priority=1
+    )
+
+    # The submitted function records the queue latency and runs the callback
+    fn = consumer._pool.submit.call_args.args[1]
+    fn(payload)
+    callback.assert_called_once_with(payload)
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_dispatch_defaults_to_message_key(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    payload = Mock()
+    consumer.subscribe([["topic", Mock(return_value=payload), "callback"]])
+    consumer._pool = Mock()
+
+    msg = Mock()
+    msg.topic.return_value = "topic"
+    msg.key.return_value = b"job-1"
+    msg.timestamp.return_value = (1, 1000)
+    consumer._dispatch(msg)
+
+    consumer._pool.submit.assert_called_once_with(
+        b"job-1", ANY, payload, on_done=ANY, group=None, priority=1
+    )
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_backpressure_pauses_and_resumes(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=1, max_in_flight=4)
+
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    kafka_consumer.assignment.return_value = ["partition"]
+    consumer._pool = Mock(max_in_flight=4)
+
+    consumer._pool.full = True
+    consumer._pool.in_flight = 4
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_called_once_with(["partition"])
+    assert consumer._paused is True
+
+    consumer._pool.full = False
+    consumer._pool.in_flight = 3
+    consumer._apply_backpressure()
+    kafka_consumer.resume.assert_not_called()
+
+    consumer._pool.in_flight = 2
+    consumer._apply_backpressure()
+    kafka_consumer.resume.assert_called_once_with(["partition"])
+    assert consumer._paused is False
+
+
+def test_partition_offset_tracker_commits_contiguous_offsets():
+    tracker = PartitionOffsetTracker()
+    for offset in [10, 11, 12, 13]:
+        tracker.track(offset)
+
+    assert tracker.to_commit() is None
+
+    tracker.done(11)
+    tracker.done(13)
+    assert tracker.to_commit() is None
+    assert tracker.pending == 4
+
+    tracker.done(10)
+    assert tracker.to_commit() == 12
+    tracker.committed(12)
+    assert tracker.to_commit() is None
+
+    tracker.done(12)
+    assert tracker.to_commit() == 14
+    assert tracker.pending == 0
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_commits_processed_offsets(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=1, max_in_flight=4)
+
+    payload = Mock()
+    consumer.subscribe([["topic", Mock(return_value=payload), Mock()]])
+    consumer._pool = Mock()
+
+    for offset in [5, 6]:
+        msg = Mock()
+        msg.topic.return_value = "topic"
+        msg.partition.return_value = 0
+        msg.offset.return_value = offset
+        msg.timestamp.return_value = (1, 1000)
+        consumer._dispatch(msg)
+
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    consumer._commit()
+    kafka_consumer.commit.assert_not_called()
+
+    # Complete the second message only, nothing can be committed yet
+    consumer._pool.submit.call_args_list[1].kwargs["on_done"](None)
+    consumer._commit()
+    kafka_consumer.commit.assert_not_called()
+
+    consumer._pool.submit.call_args_list[0].kwargs["on_done"](None)
+    consumer._commit(asynchronous=False)
+    confluent_kafka_mock.TopicPartition.assert_called_with("topic", 0, 7)
+    kafka_consumer.commit.assert_called_once_with(
+        offsets=[confluent_kafka_mock.TopicPartition.return_value],
+        asynchronous=False,
+    )
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_unknown_topic_is_committed(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer._pool = Mock()
+    msg = Mock()
+    msg.topic.return_value = "unknown"
+    msg.partition.return_value = 1
+    msg.offset.return_value = 3
+    consumer._dispatch(msg)
+
+    consumer._pool.submit.assert_not_called()
+    assert consumer._tracker("unknown", 1).to_commit() == 4
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_drain_waits_commits_and_closes(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, drain_timeout=3)
+
+    consumer._pool = Mock()
+    consumer._commit = Mock()
+    consumer._drain()
+
+    consumer._pool.wait_idle.assert_called_once_with(timeout=3)
+    consumer._commit.assert_called_once_with(asynchronous=False)
+    consumer._pool.shutdown.assert_called_once_with(wait=False)
+    confluent_kafka_mock.Consumer.return_value.close.assert_called_once()
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_close_joins_poll_thread(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    thread_mock.return_value.is_alive.return_value = True
+    consumer.close()
+
+    thread_mock.return_value.join.assert_called_once_with()
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_records_partition_lag(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer._metrics = Mock()
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    kafka_consumer.get_watermark_offsets.return_value = (0, 100)
+
+    msg = Mock()
+    msg.error.return_value = None
+    msg.topic.return_value = "topic"
+    msg.partition.return_value = 2
+    msg.offset.return_value = 89
+    consumer._record_lag([msg])
+
+    consumer._metrics.gauge.assert_called_once_with(
+        "kafka_consumer_lag", 10, topic="topic", partition=2
+    )
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_throttles_bulk_lane_on_interactive_backlog(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=2, max_in_flight=8)
+
+    consumer.subscribe(
+        [
+            ["priority", Mock(), Mock(), {"lane": "interactive"}],
+            ["bulk", Mock(), Mock(), {"lane": "bulk"}],
+        ]
+    )
+    consumer._pool = Mock(full=False, max_in_flight=8, in_flight=0)
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    priority_tp, bulk_tp = Mock(topic="priority"), Mock(topic="bulk")
+    kafka_consumer.assignment.return_value = [priority_tp, bulk_tp]
+
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_not_called()
+
+    consumer._add_lane_in_flight("interactive", 1)
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_called_once_with([bulk_tp])
+
+    consumer._add_lane_in_flight("interactive", -1)
+    consumer._lag[("priority", 0)] = (3, time.monotonic())
+    consumer._apply_backpressure()
+    kafka_consumer.resume.assert_not_called()
+
+    consumer._lag[("priority", 0)] = (0, time.monotonic())
+    consumer._apply_backpressure()
+    kafka_consumer.resume.assert_called_once_with([bulk_tp])
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_resumes_bulk_lane_once_interactive_lag_is_stale(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=2, max_in_flight=8)
+
+    consumer.subscribe(
+        [
+            ["priority", Mock(), Mock(), {"lane": "interactive"}],
+            ["bulk", Mock(), Mock(), {"lane": "bulk"}],
+        ]
+    )
+    consumer._pool = Mock(full=False, max_in_flight=8, in_flight=0)
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    bulk_tp = Mock(topic="bulk")
+    kafka_consumer.assignment.return_value = [Mock(topic="priority"), bulk_tp]
+
+    # Left by a transaction marker, no message will refresh it
+    consumer._lag[("priority", 0)] = (1, time.monotonic())
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_called_once_with([bulk_tp])
+
+    consumer._lag[("priority", 0)] = (
+        1,
+        time.monotonic() - consumer.LAG_TTL - 1,
+    )
+    consumer._apply_backpressure()
+    kafka_consumer.resume.assert_called_once_with([bulk_tp])
+    assert consumer._lag == {}
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_keeps_consuming_after_non_fatal_error(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer._drain = Mock()
+    consumer._dispatch = Mock()
+    unknown_topic = Mock()
+    unknown_topic.error.return_value.code.return_value = "unknown-topic"
+    unknown_topic.error.return_value.fatal.return_value = False
+    msg = Mock()
+    msg.error.return_value = None
+    fatal = Mock()
+    fatal.error.return_value.code.return_value = "fatal"
+    fatal.error.return_value.fatal.return_value = True
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    kafka_consumer.consume.side_effect = [[unknown_topic, msg], [fatal]]
+    kafka_consumer.get_watermark_offsets.return_value = (0, -1)
+
+    consumer._poll_loop()
+
+    consumer._dispatch.assert_called_once_with(msg)
+    assert kafka_consumer.consume.call_count == 2
+    consumer._drain.assert_called_once_with()
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_reserves_in_flight_for_interactive_lane(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer(
+            {}, workers=2, max_in_flight=8, reserved_in_flight=3
+        )
+
+    consumer.subscribe([["bulk", Mock(), Mock(), {"lane": "bulk"}]])
+    consumer._pool = Mock(full=False, max_in_flight=8, in_flight=4)
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    bulk_tp = Mock(topic="bulk")
+    kafka_consumer.assignment.return_value = [bulk_tp]
+
+    consumer._add_lane_in_flight("bulk", 4)
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_not_called()
+
+    consumer._add_lane_in_flight("bulk", 1)
+    consumer._apply_backpressure()
+    kafka_consumer.pause.assert_called_once_with([bulk_tp])
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_records_queue_latency_per_lane(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer.subscribe([["bulk", Mock(), Mock(), {"lane": "bulk"}]])
+    consumer._pool = Mock()
+    consumer._metrics = Mock()
+
+    msg = Mock()
+    msg.topic.return_value = "bulk"
+    msg.partition.return_value = 0
+    msg.offset.return_value = 1
+    msg.timestamp.return_value = (1, (time.time() - 2) * 1000)
+    consumer._dispatch(msg)
+    assert consumer._lane_in_flight("bulk") == 1
+
+    args = consumer._pool.submit.call_args.args
+    args[1](*args[2:])
+    name, latency = consumer._metrics.observe.call_args.args
+    assert name == "kafka_consumer_queue_latency"
+    assert 2 <= latency < 10
+    assert consumer._metrics.observe.call_args.kwargs == {"lane": "bulk"}
+
+    consumer._pool.submit.call_args.kwargs["on_done"](None)
+    assert consumer._lane_in_flight("bulk") == 0
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_dispatch_schedules_by_group(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, group_concurrency=2, group_weights={7: 3})
+
+    assert consumer._pool._group_concurrency == 2
+    assert consumer._pool._weights == {7: 3}
+
+    payload = Mock(orgId=7)
+    consumer.subscribe(
+        [
+            [
+                "topic",
+                Mock(return_value=payload),
+                Mock(),
+                {"group": lambda p: p.orgId, "lane": "bulk"},
+            ]
+        ]
+    )
+    consumer._pool = Mock()
+    consumer._metrics = Mock()
+
+    msg = Mock()
+    msg.topic.return_value = "topic"
+    msg.key.return_value = None
+    msg.timestamp.return_value = (1, 1000)
+    consumer._dispatch(msg)
+
+    consumer._pool.submit.assert_called_once_with(
+        None, ANY, payload, on_done=ANY, group=7, priority=0
+    )
+
+    args = consumer._pool.submit.call_args.args
+    args[1](*args[2:])
+    consumer._metrics.observe.assert_any_call(
+        "kafka_consumer_group_wait", ANY, group=7
+    )
+
+
+def coalesced_message(offset, partition=0):
+    msg = Mock()
+    msg.topic.return_value = "topic"
+    msg.partition.return_value = partition
+    msg.offset.return_value = offset
+    msg.key.return_value = None
+    msg.timestamp.return_value = (1, 1000)
+    return msg
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_coalesces_messages(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, coalesce_window=5)
+
+    payloads = [Mock(article="a"), Mock(article="b"), Mock(article="a")]
+    on_superseded = Mock()
+    consumer.subscribe(
+        [
+            [
+                "topic",
+                Mock(side_effect=payloads),
+                Mock(),
+                {
+                    "coalesce": lambda p: p.article,
+                    "on_superseded": on_superseded,
+                },
+            ]
+        ]
+    )
+    consumer._pool = Mock(in_flight=0, max_in_flight=8)
+    clock = Mock(return_value=0)
+    consumer._coalescer._clock = clock
+
+    for offset in [10, 11, 12]:
+        consumer._dispatch(coalesced_message(offset))
+
+    on_superseded.assert_called_once_with(payloads[0], payloads[2])
+    assert len(consumer._coalescer) == 2
+    consumer._release_coalesced()
+    consumer._pool.submit.assert_not_called()
+
+    clock.return_value = 5
+    consumer._release_coalesced()
+    assert [c.args[2] for c in consumer._pool.submit.call_args_list] == [
+        payloads[2],
+        payloads[1],
+    ]
+
+    # The superseded message is done, the others once processed
+    tracker = consumer._tracker("topic", 0)
+    assert tracker.to_commit() == 11
+    for c in consumer._pool.submit.call_args_list:
+        c.kwargs["on_done"](None)
+    assert tracker.to_commit() == 13
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_coalesces_messages_per_lane(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, coalesce_window=5)
+
+    on_superseded = Mock()
+    options = {"coalesce": lambda p: "same", "on_superseded": on_superseded}
+    consumer.subscribe(
+        [
+            ["topic", Mock(), Mock(), options | {"lane": "interactive"}],
+            ["bulk", Mock(), Mock(), options | {"lane": "bulk"}],
+        ]
+    )
+    consumer._pool = Mock(in_flight=0, max_in_flight=8)
+    bulk = coalesced_message(2)
+    bulk.topic.return_value = "bulk"
+
+    consumer._dispatch(coalesced_message(1))
+    consumer._dispatch(bulk)
+
+    on_superseded.assert_not_called()
+    assert len(consumer._coalescer) == 2
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_held_messages_do_not_pause_partitions(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, max_in_flight=2, coalesce_window=5)
+
+    consumer.subscribe(
+        [["topic", Mock(), Mock(), {"coalesce": lambda p: object()}]]
+    )
+    consumer._pool = Mock(in_flight=0, max_in_flight=2)
+    for offset in range(4):
+        consumer._dispatch(coalesced_message(offset))
+
+    consumer._apply_backpressure()
+
+    assert len(consumer._coalescer) == 4
+    confluent_kafka_mock.Consumer.return_value.pause.assert_not_called()
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_drops_coalesced_messages_of_revoked_partitions(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, coalesce_window=5)
+
+    consumer.subscribe(
+        [
+            [
+                "topic",
+                Mock(side_effect=[Mock(article="a"), Mock(article="b")]),
+                Mock(),
+                {"coalesce": lambda p: p.article},
+            ]
+        ]
+    )
+    consumer._dispatch(coalesced_message(1, partition=0))
+    consumer._dispatch(coalesced_message(1, partition=1))
+
+    consumer._on_revoke(None, [Mock(topic="topic", partition=1)])
+
+    assert [m.partition for m in consumer._coalescer.pop_all()] == [0]
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_without_coalesce_window_submits_directly(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({})
+
+    consumer.subscribe(
+        [["topic", Mock(), Mock(), {"coalesce": lambda p: "same"}]]
+    )
+    consumer._pool = Mock()
+    consumer._dispatch(coalesced_message(1))
+    consumer._dispatch(coalesced_message(2))
+
+    assert consumer._pool.submit.call_count == 2
+
+
+@patch("src.core.deps.kafka.confluent_kafka")
+@patch("src.core.deps.kafka.Thread")
+def test_consumer_pauses_assigned_bulk_partitions_while_throttled(
+    thread_mock, confluent_kafka_mock, override_settings
+):
+    with override_settings(APP_ENV="no-testing"):
+        consumer = get_consumer({}, workers=2, max_in_flight=8)
+
+    consumer.subscribe(
+        [
+            ["priority", Mock(), Mock(), {"lane": "interactive"}],
+            ["bulk", Mock(), Mock(), {"lane": "bulk"}],
+        ]
+    )
+    kafka_consumer = confluent_kafka_mock.Consumer.return_value
+    assert (
+        kafka_consumer.subscribe.call_args.kwargs["on_assign"]
+        == consumer._on_assign
+    )
+    priority_tp, bulk_tp = Mock(topic="priority"), Mock(topic="bulk")
+
+    consumer._on_assign(kafka_consumer, [priority_tp, bulk_tp])
+    kafka_consumer.pause.assert_not_called()
+
+    consumer._bulk_paused = True
+    consumer._on_assign(kafka_consumer, [priority_tp, bulk_tp])
+    kafka_consumer.assign.assert_called_once_with([priority_tp, bulk_tp])
+    kafka_consumer.pause.assert_called_once_with([bulk_tp])
+
+    consumer._paused = True
+    consumer._on_assign(kafka_consumer, [priority_tp, bulk_tp])
+    kafka_consumer.pause.assert_called_with([priority_tp, bulk_tp])
@@ -1,6 +1,16 @@
 import logging
+from unittest.mock import Mock
 
-from src.core.deps.logger import get_logger, with_logger
+from src.core.deps.logger import (
+    LogPayload,
+    LogSampler,
+    get_log_sampler,
+    get_logger,
+    log_sampled,
+    redact_vectors,
+    with_logger,
+)
+from tests.utils import override_settings
 
 
 def test_logger(caplog):
@@ -46,3 +56,79 @@ def test_with_logger(caplog):
 
     # Check the log source
     assert "TestClass:test_logger.py" in caplog.text
+
+
+# ------------------------------
+# Payloads
+# ------------------------------
+def test_redact_vectors():
+    value = {"input": ["text"], "output": [[0.1] * 9, [1, 2]], "n": 1}
+
+    assert redact_vectors(value) == {
+        "input": ["text"],
+        "output": ["<vector[9]>", [1, 2]],
+        "n": 1,
+    }
+
+
+def test_log_payload_renders_json_with_redacted_vectors():
+    payload = LogPayload({"output": [0.5] * 4096})
+
+    assert str(payload) == '{"output":"<vector[4096]>"}'
+
+
+def test_log_payload_renders_other_values_on_one_line():
+    assert str(LogPayload("SELECT 1\nFROM t")) == '"SELECT 1\\nFROM t"'
+
+
+def test_log_payload_is_truncated():
+    assert str(LogPayload("x" * 20, max_length=5)) == '"xxxx... (17 more)'
+
+
+def test_log_payload_is_rendered_only_when_emitted(caplog):
+    caplog.set_level(logging.INFO)
+    value = Mock(__str__=Mock(return_value="query"))
+
+    get_logger(__name__).debug("Query: %s", LogPayload(value))
+    value.__str__.assert_not_called()
+
+    get_logger(__name__).info("Query: %s", LogPayload(value))
+    assert 'Query: "query"' in caplog.text
+
+
+# ------------------------------
+# Sampling
+# ------------------------------
+def test_log_sampler_keeps_one_message_every_rate():
+    sampler = LogSampler(0.25)
+
+    assert [sampler.sample() for _ in range(8)] == [
+        True,
+        False,
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert not LogSampler(0).sample()
+    assert all(LogSampler(1).sample() for _ in range(3))
+
+
+def test_log_sampled(caplog):
+    caplog.set_level(logging.INFO)
+    logger = get_logger(__name__)
+
+    with override_settings(LOG_SAMPLE_RATES={"test.site": 0.5}):
+        get_log_sampler.cache_clear()
+        try:
+            for i in range(4):
+                log_sampled(logger, "test.site", logging.INFO, "Call %s", i)
+            log_sampled(logger, "test.site", logging.DEBUG, "Hidden")
+        finally:
+            get_log_sampler.cache_clear()
+
+    assert [r.getMessage() for r in caplog.records] == ["Call 0", "Call 2"]
+    # Attributed to the caller
+    assert caplog.records[0].funcName == "test_log_sampled"
@@ -0,0 +1,51 @@
+from src.core.deps.metrics import MetricsRegistry, Summary, get_metrics
+
+
+def test_get_metrics_is_a_singleton():
+    assert get_metrics() is get_metrics()
+
+
+def test_counters_and_gauges_by_labels():
+    metrics = MetricsRegistry()
+
+    metrics.incr("processed", topic="a", partition=0)
+    metrics.incr("processed", 2, partition=0, topic="a")
+    metrics.incr("processed", topic="b", partition=0)
+    metrics.gauge("lag", 5, topic="a")
+    metrics.gauge("lag", 3, topic="a")
+
+    assert metrics.counter_value("processed", topic="a", partition=0) == 3
+    assert metrics.counter_value("processed", topic="b", partition=0) == 1
+    assert metrics.counter_value("processed", topic="c") == 0
+    assert metrics.gauge_value("lag", topic="a") == 3
+    assert metrics.gauge_value("lag", topic="b") is None
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["processed{partition=0,topic=a}"] == 3
+    assert snapshot["gauges"]["lag{topic=a}"] == 3
+
+
+def test_summary_percentiles():
+    summary = Summary(window=100)
+    assert summary.percentile(95) is None
+
+    for value in range(1, 101):
+        summary.observe(value)
+
+    assert summary.count == 100
+    assert summary.sum == 5050
+    assert summary.max == 100
+    assert summary.percentile(50) == 50
+    assert summary.percentile(95) == 95
+    assert summary.to_dict()["p99"] == 99
+
+
+def test_observe_and_reset():
+    metrics = MetricsRegistry()
+    metrics.observe("latency", 0.5, lane="high")
+
+    assert metrics.summary("latency", lane="high").count == 1
+    assert metrics.snapshot()["summaries"]["latency{lane=high}"]["max"] == 0.5
+
+    metrics.reset()
+    assert metrics.summary("latency", lane="high") is None
@@ -0,0 +1,26 @@
+from unittest.mock import Mock
+
+from src.core.deps.warmup import warm_up
+
+
+def test_warm_up_connects_and_calls_adapters():
+    embedder, summarizer = Mock(), Mock()
+
+    warm_up(embedder, summarizer)
+
+    embedder.connect.assert_called_once_with()
+    embedder.embed.assert_called_once()
+    summarizer.connect.assert_called_once_with()
+    summarizer.summarize.assert_called_once()
+
+
+def test_warm_up_failure_is_logged(check_log_message):
+    embedder, summarizer = Mock(), Mock()
+    embedder.embed.side_effect = RuntimeError("endpoint down")
+
+    warm_up(embedder, summarizer)
+
+    check_log_message(
+        "WARNING", "[Warm-Up] The embedder failed to warm up: endpoint down"
+    )
+    summarizer.summarize.assert_called_once()
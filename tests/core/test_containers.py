@@ -288,6 +288,15 @@ def test_summarizer_factory(get_json_mock, make_summarizer_config_plain):
     container.config.from_pydantic(get_settings())
 
     assert isinstance(container.summarizer(), SummarizerInterface)
+    # Shared by the requests
+    assert container.summarizer() is container.summarizer()
+
+
+def test_embedder_is_shared():
+    container = Container()
+    container.config.from_pydantic(get_settings())
+
+    assert container.embedder() is container.embedder()
 
 
 def test_semantic_search_service_factory():
@@ -78,3 +78,51 @@ def test_small_chunk_sentence_chunker():
     expected_snippets = ["Hello World!", "What is your name?", "Hello"]
     assert chunks == expected_chunks
     assert snippets == expected_snippets
+
+
+def test_sentence_chunker_keeps_chunks_and_snippets_aligned():
+    sentence_chunker = SentenceChunker(25, "suffix")
+    content = "First one here. Second one here. Third one here. Last."
+
+    chunks, snippets = sentence_chunker.chunk("Title", content, "Test")
+
+    assert snippets == [
+        "First one here.",
+        "Second one here.",
+        "Third one here. Last.",
+        "Title",
+    ]
+    assert chunks == [
+        "First one here. Test",
+        "Second one here. Test",
+        "Third one here. Last. Test",
+        "Title",
+    ]
+
+
+def test_sentence_chunker_splits_long_sentences():
+    sentence_chunker = SentenceChunker(10, "none")
+
+    chunks, snippets = sentence_chunker.chunk("", "Short. " + "x" * 12, "")
+
+    assert snippets == ["xxxxxxxxx", "xxx", "Short."]
+    assert chunks == snippets
+
+
+def test_iter_chunks_is_lazy():
+    content = "One. Two. Three."
+    pairs = SentenceChunker(7, "none").iter_chunks("", content, "")
+
+    assert next(pairs) == ("One.", "One.")
+    assert list(pairs) == [("Two.", "Two."), ("Three.", "Three.")]
+
+
+def test_iter_batches():
+    character_chunker = CharacterChunker(2, "none")
+
+    batches = list(character_chunker.iter_batches("T", "abcdef", "", 2))
+
+    assert batches == [
+        (["ab", "cd"], ["ab", "cd"]),
+        (["ef", "T"], ["ef", "T"]),
+    ]
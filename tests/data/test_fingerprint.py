@@ -0,0 +1,44 @@
+from src.data.chunkers.chunker import CharacterChunker, SentenceChunker
+from src.data.fingerprint import content_fingerprint
+
+CONTENT = {"document_id": "doc-1", "title": "Title", "content": "Text"}
+
+
+def test_fingerprint_is_stable():
+    chunker = CharacterChunker(150, "none")
+
+    assert content_fingerprint(
+        CONTENT, chunker, connector_id=1
+    ) == content_fingerprint(
+        dict(reversed(CONTENT.items())), chunker, connector_id=1
+    )
+    assert len(content_fingerprint(CONTENT, chunker)) == 64
+
+
+def test_fingerprint_changes_with_content_and_context():
+    chunker = CharacterChunker(150, "none")
+    fingerprint = content_fingerprint(CONTENT, chunker, connector_id=1)
+
+    assert fingerprint != content_fingerprint(
+        {**CONTENT, "content": "Other text"}, chunker, connector_id=1
+    )
+    assert fingerprint != content_fingerprint(CONTENT, chunker, connector_id=2)
+
+
+def test_fingerprint_changes_with_chunker_config():
+    fingerprint = content_fingerprint(CONTENT, CharacterChunker(150, "none"))
+
+    assert fingerprint != content_fingerprint(
+        CONTENT, CharacterChunker(200, "none")
+    )
+    assert fingerprint != content_fingerprint(
+        CONTENT, SentenceChunker(150, "none")
+    )
+
+
+def test_fingerprint_changes_with_embedder_config(override_settings):
+    chunker = CharacterChunker(150, "none")
+    fingerprint = content_fingerprint(CONTENT, chunker)
+
+    with override_settings(EMBEDDINGS_ENDPOINT_NAME="another-model"):
+        assert fingerprint != content_fingerprint(CONTENT, chunker)
@@ -0,0 +1,67 @@
+import re
+import string
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.data.text import (
+    html_to_text,
+    strip_control_characters,
+    strip_non_printable,
+)
+from tests.__stubs__.article_kb_templates import BRONZE_SALESFORCE_KB_TEMPLATE
+from tests.__stubs__.tree_templates import BRONZE_TREE_TEMPLATE
+
+FIXTURES = [
+    *[d["value"] for d in BRONZE_SALESFORCE_KB_TEMPLATE["details"]],
+    *BRONZE_TREE_TEMPLATE["meta"].values(),
+    *BRONZE_TREE_TEMPLATE["nodes"]["1"].values(),
+]
+
+
+def _get_text(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").get_text()
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        *[value for value in FIXTURES if isinstance(value, str)],
+        "",
+        "plain text",
+        "   ",
+        " \n\t ",
+        "<p>One</p>   <p>Two</p>\n<p>Three</p>",
+        "<pre>  </pre><textarea>\n</textarea>",
+        "<p>a<script>var x = 1;</script>b<style>p {}</style>c</p>",
+        "<template><p>hidden</p></template>visible",
+        "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>",
+        "<!DOCTYPE html><!-- comment --><?pi x?>text",
+        "<![CDATA[ data ]]><script><![CDATA[x]]></script>",
+        "&amp; &nbsp; &foo; &amp &#147; &#x41; &#129; &#0; &#99999999;",
+        "a<br>b<br/>c</br>d<br>  </br>  e",
+        "<div><pre>  <b>  </div>  </pre>  ",
+        "<p>Unclosed <b>bold <i>italic",
+        "broken < tag & <b",
+        "Control \x01\x1f\x7f\x85 and é",
+    ],
+)
+def test_html_to_text_matches_beautifulsoup(html):
+    assert html_to_text(html) == _get_text(html)
+
+
+def test_strip_non_printable():
+    text = "Tab\tline\nnull\x00 bell\x07 é ü \x85 ok~"
+    printable = set(string.printable)
+
+    assert strip_non_printable(text) == "".join(
+        c for c in text if c in printable
+    )
+
+
+def test_strip_control_characters():
+    text = "Tab\tline\r\nnull\x00 vt\x0b del\x7f nel\x85 é \xa0"
+
+    assert strip_control_characters(text) == re.sub(
+        r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]", "", text
+    )
@@ -9,6 +9,7 @@ from src.data.transformations.article_kb import (
     SilverToGoldTransformation,
 )
 from tests.__stubs__.article_kb_templates import BRONZE_SALESFORCE_KB_TEMPLATE
+from tests.utils import override_settings
 
 
 #############################
@@ -190,7 +191,7 @@ def test_transformation_creates_correct_rows_for_db():
         embedder_mock,
         chunker,
     )
-    items = transformation.handle()
+    items = [item for batch in transformation.handle() for item in batch]
     snippet = "test content"
     title_snippet = "test title"
     assert len(items) == 2
@@ -246,3 +247,42 @@ def test_get_snippets_from_transformation():
     assert snippets[0] == "a" * 10
     assert snippets[1] == "b" * 5 + "c" * 5
     assert snippets[2] == "c" * 5 + "d" * 5
+
+
+def test_transformation_embeds_chunks_by_batches():
+    embedder_mock = Mock()
+    embedder_mock.embed.side_effect = lambda chunks: [
+        [float(len(chunk))] for chunk in chunks
+    ]
+    chunker = CharacterChunker(4, "none")
+    transformation = SilverToGoldTransformation(
+        {
+            "title": "title",
+            "lang": "es",
+            "id": "123",
+            "content": "aaaabbbbcc",
+            "org_id": 1,
+            "connector_id": "123",
+            "createdAt": "2023-09-11T08:59:52+00:00",
+        },
+        embedder_mock,
+        chunker,
+    )
+
+    with override_settings(EMBEDDINGS_BATCH_SIZE=2):
+        batches = transformation.handle()
+        first = next(batches)
+        # The next batch is embedded only once asked for
+        assert embedder_mock.embed.call_count == 1
+        batches = [first, *batches]
+
+    assert [c.args[0] for c in embedder_mock.embed.call_args_list] == [
+        ["aaaa", "bbbb"],
+        ["cc", "title"],
+    ]
+    assert [
+        [(i["snippet"], i["embeddings"]) for i in batch] for batch in batches
+    ] == [
+        [("aaaa", [4.0]), ("bbbb", [4.0])],
+        [("cc", [2.0]), ("title", [5.0])],
+    ]
@@ -123,7 +123,7 @@ def test_transformation_creates_correct_rows_for_db():
         embedder_mock,
         chunker,
     )
-    items = transformation.handle()
+    items = [item for batch in transformation.handle() for item in batch]
     embedded_text = f"{title} {content}"
     assert len(items) == 2
 
@@ -4,6 +4,7 @@ import warnings
 from unittest.mock import Mock
 
 import numpy as np
+import pytest
 from bs4 import MarkupResemblesLocatorWarning
 
 from src.data.chunkers.chunker import CharacterChunker, SentenceChunker
@@ -11,6 +12,7 @@ from src.data.transformations.zt_trees import (
     BronzeToSilverTransformation,
     RawToBronzeTransformation,
     SilverToGoldTransformation,
+    StreamingRawToBronzeTransformation,
 )
 from tests.__stubs__.tree_templates import (
     BRONZE_TREE_METADATA_TEMPLATE,
@@ -74,6 +76,38 @@ def test_content_is_the_same():
         )
 
 
+def _raw_chunks(raw: dict, size: int) -> list[bytes]:
+    data = json.dumps(raw).encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]  # noqa
+
+
+def test_streaming_raw_to_bronze_matches_raw_to_bronze():
+    tree = json.loads(RAW_TREE_TEMPLATE_TREE)
+    tree["nodes"]["2"] = dict(tree["nodes"]["1"], type="Question")
+    tree["nodes"]["3"] = dict(tree["nodes"]["1"], content="<p>Café 😀</p>")
+    raw = {
+        "id": 1,
+        "details": [{"name": "tree", "value": json.dumps(tree)}, {}],
+    }
+    expected = RawToBronzeTransformation(tree).handle()
+
+    for size in (1, 7, 65536):
+        prepared = StreamingRawToBronzeTransformation(
+            _raw_chunks(raw, size)
+        ).handle()
+
+        assert prepared == expected
+        assert list(prepared["nodes"]) == list(expected["nodes"])
+    assert "2" not in expected["nodes"]
+
+
+def test_streaming_raw_to_bronze_requires_tree():
+    with pytest.raises(KeyError):
+        StreamingRawToBronzeTransformation(
+            _raw_chunks({"details": [{"name": "tree"}]}, 4)
+        ).handle()
+
+
 ####################
 # Bronze To Silver
 ####################
@@ -316,7 +350,7 @@ def test_transformation_creates_correct_rows_for_db():
         embedder_mock,
         chunker,
     )
-    items = transformation.handle()
+    items = [item for batch in transformation.handle() for item in batch]
     snippet = f"{content} {question}"
     assert len(items) == 2
     assert "org_id" in items[0].keys()
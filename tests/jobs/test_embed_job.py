@@ -2,9 +2,15 @@ from unittest.mock import ANY, patch
 
 import mock
 
+import src.proto.embed_job_status_pb2 as embed_job_status_pb2
 import src.proto.embed_jobs_pb2 as embed_jobs_pb2
 from src.exceptions.transformations import NotifiedException
-from src.jobs.embed_job import EmbedJob
+from src.jobs.embed_job import (
+    EmbedJob,
+    flush_embed_jobs_uploads,
+    subscribe_embed_jobs,
+)
+from src.util.storage import PassThroughStorage
 
 
 def zt_notification(action=0):
@@ -361,3 +367,122 @@ def test_orchestrator_failure(container_mock, check_log_message):
     producer_mock.produce.assert_called_once_with(
         "embed-job-status-local-test", ANY, key="TheJobID456"
     )
+
+
+def test_ordering_key():
+    assert EmbedJob.ordering_key(zt_notification()) == "101868944"
+
+    event = sfk_notification()
+    event.articleId = ""
+    assert EmbedJob.ordering_key(event) == "TheJobID456"
+
+
+def test_coalescing_key():
+    assert EmbedJob.coalescing_key(sfk_notification()) == (
+        789789,
+        6,
+        "kA05j000001ZBKrCAO",
+    )
+
+
+def test_notify_superseded():
+    producer_mock = mock.Mock()
+    superseded = sfk_notification()
+    latest = sfk_notification(1)
+    latest.jobId = "TheLatestJobID"
+
+    EmbedJob(producer_mock).notify_superseded(superseded, latest)
+
+    producer_mock.produce.assert_called_once_with(
+        "embed-job-status-local-test", ANY, key="TheJobID456"
+    )
+    status = embed_job_status_pb2.NotificationResponse()
+    status.ParseFromString(producer_mock.produce.call_args.args[1])
+    assert status.id == "kA05j000001ZBKrCAO"
+    assert status.state == embed_job_status_pb2.ArticleState.COMPLETE
+    assert status.status == embed_job_status_pb2.FailureStatus.SUCCESS
+    assert status.reason == "Superseded by job TheLatestJobID"
+
+
+def test_scheduling_group():
+    assert EmbedJob.scheduling_group(sfk_notification()) == 789789
+
+
+def test_subscribe_embed_jobs():
+    consumer = mock.Mock()
+    producer = mock.Mock()
+
+    subscribe_embed_jobs(consumer, producer)
+
+    topics = consumer.subscribe.call_args.args[0]
+    assert len(topics) == 2
+    assert topics[0][0] == "embed-jobs-priority-local"
+    assert topics[0][3]["lane"] == "interactive"
+    assert topics[1][0] == "embed-jobs-local"
+    assert topics[1][3]["lane"] == "bulk"
+    for topic in topics:
+        assert topic[1] == embed_jobs_pb2.ArticleNotification
+        assert topic[2].__self__._event_producer is producer
+        assert topic[3]["key"] == EmbedJob.ordering_key
+        assert topic[3]["group"] == EmbedJob.scheduling_group
+        assert topic[3]["coalesce"] == EmbedJob.coalescing_key
+        assert topic[3]["on_superseded"].__self__ is topic[2].__self__
+
+
+def test_subscribe_embed_jobs_without_priority_topic(override_settings):
+    consumer = mock.Mock()
+
+    with override_settings(KAFKA_EMBED_JOBS_PRIORITY_TOPIC=""):
+        subscribe_embed_jobs(consumer, mock.Mock())
+
+    topics = consumer.subscribe.call_args.args[0]
+    assert [(topic[0], topic[3]["lane"]) for topic in topics] == [
+        ("embed-jobs-local", "bulk")
+    ]
+
+
+@patch("src.jobs.embed_job.container")
+def test_orchestrator_pass_through_shares_storage(
+    container_mock, override_settings
+):
+    with override_settings(PIPELINE_PASS_THROUGH=True):
+        EmbedJob().run(zt_notification(0))
+
+    storages = [
+        provider.call_args.kwargs["assets_repo"]
+        for provider in [
+            container_mock.zt_trees_raw_to_bronze_service,
+            container_mock.zt_trees_bronze_to_silver_service,
+            container_mock.zt_trees_silver_to_gold_service,
+        ]
+    ]
+    assert isinstance(storages[0], PassThroughStorage)
+    assert storages[0] is storages[1] is storages[2]
+    assert storages[0]._uploader is container_mock.background_uploader()
+
+
+@patch("src.jobs.embed_job.container")
+def test_orchestrator_pass_through_without_persistence(
+    container_mock, override_settings
+):
+    with override_settings(
+        PIPELINE_PASS_THROUGH=True, PIPELINE_PERSIST_INTERMEDIATE=False
+    ):
+        EmbedJob().run(sfk_notification(0))
+
+    provider = container_mock.article_kb_bronze_to_silver_service
+    storage = provider.call_args.kwargs["assets_repo"]
+    assert isinstance(storage, PassThroughStorage)
+    assert storage._uploader is None
+
+
+@patch("src.jobs.embed_job.container")
+def test_flush_embed_jobs_uploads(container_mock, override_settings):
+    flush_embed_jobs_uploads(3)
+    container_mock.background_uploader.assert_not_called()
+
+    with override_settings(PIPELINE_PASS_THROUGH=True):
+        flush_embed_jobs_uploads(3)
+    container_mock.background_uploader().close.assert_called_once_with(
+        timeout=3
+    )
@@ -1,12 +1,15 @@
 import os
 import random
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
 from src.api.v1.endpoints.requests.semantic_search import SearchFilters
 from src.core.containers import container
 from src.models.semantic_search_item import SemanticSearchDocument
+from src.repositories.models.semantic_search_repository import (
+    SemanticSearchRepository,
+)
 from src.schemas.services.config_svc import SearchWidget
 from src.schemas.services.connectors_svc import Connector, ConnectorType
 from src.util.tags_parser import TagParser
@@ -164,6 +167,96 @@ class TestSemanticSearchRepository:
         assert item.snippet == "snippet"
         assert item.document_id == document.id
 
+    @pytest.mark.usefixtures("refresh_database")
+    def test_create_items(self):
+        document = SemanticSearchDocumentFactory(items=0)
+        records = [
+            {
+                "embeddings": [
+                    random.random() for _ in range(embeddings_dimensions)
+                ],
+                "chunk": f"chunk {i}",
+                "snippet": f"snippet {i}",
+            }
+            for i in range(3)
+        ]
+
+        items = self.semantic_search_repository.create_items(records, document)
+
+        assert [item.chunk for item in items] == [
+            "chunk 0",
+            "chunk 1",
+            "chunk 2",
+        ]
+        assert all(item.id is not None for item in items)
+        assert all(item.document_id == document.id for item in items)
+
+    @pytest.mark.usefixtures("refresh_database")
+    def test_shadow_items(self):
+        SemanticSearchDocumentFactory(items=3)
+        repository = self.semantic_search_repository
+        vector = [random.random() for _ in range(embeddings_dimensions)]
+
+        ids = [i for i, _ in repository.find_items_missing_version("v2")]
+        assert len(ids) == 3
+
+        assert repository.create_shadow_items(ids[:2], [vector] * 2, "v2") == 2
+        # Already embedded items are left as they are
+        assert repository.create_shadow_items(ids[:1], [vector], "v2") == 0
+        assert repository.count_items_missing_version("v2") == 1
+        assert repository.count_items_missing_version("v3") == 3
+        assert [
+            i for i, _ in repository.find_items_missing_version("v2")
+        ] == ids[2:]
+        assert repository.find_items_missing_version("v2", ids[2]) == []
+
+    @pytest.mark.usefixtures("refresh_database")
+    def test_find_fingerprint(self):
+        SemanticSearchDocumentFactory(
+            items=0, org_id=1, document_id="d1", fingerprint="f1"
+        )
+        SemanticSearchDocumentFactory(
+            items=0, org_id=2, document_id="d1", fingerprint="f2"
+        )
+
+        repository = self.semantic_search_repository
+        assert repository.find_fingerprint("d1", 1) == "f1"
+        assert repository.find_fingerprint("d1", 2) == "f2"
+        assert repository.find_fingerprint("d2", 1) is None
+
+    @pytest.mark.usefixtures("refresh_database")
+    def test_update_fingerprint(self):
+        documents = [
+            SemanticSearchDocumentFactory(
+                items=0, org_id=1, document_id=document_id
+            )
+            for document_id in ["d1", "d2", "d3"]
+        ]
+
+        repository = self.semantic_search_repository
+        repository.update_fingerprint([d.id for d in documents[:2]], "f1")
+
+        assert repository.find_fingerprint("d1", 1) == "f1"
+        assert repository.find_fingerprint("d2", 1) == "f1"
+        assert repository.find_fingerprint("d3", 1) is None
+
+    @pytest.mark.usefixtures("refresh_database")
+    def test_find_fingerprints_like(self):
+        for node_id in ["n1", "n2"]:
+            SemanticSearchDocumentFactory(
+                items=0,
+                org_id=1,
+                document_id=f"t1::{node_id}",
+                fingerprint="f1",
+            )
+        SemanticSearchDocumentFactory(
+            items=0, org_id=1, document_id="t2::n1", fingerprint="f2"
+        )
+
+        repository = self.semantic_search_repository
+        assert repository.find_fingerprints_like("t1::%", 1) == {"f1"}
+        assert repository.find_fingerprints_like("t3::%", 1) == set()
+
     @pytest.mark.usefixtures("refresh_database")
     def test_search_without_items(self):
         embeddings = [random.random() for _ in range(embeddings_dimensions)]
@@ -839,3 +932,32 @@ class TestSemanticSearchRepository:
             SearchFilters(connectors=[1]),
         )
         assert flag is True
+
+
+@patch(
+    "src.repositories.models.semantic_search_repository"
+    ".SemanticSearchSearchQueryBuilder"
+)
+def test_search_shadow_version_uses_shadow_threshold(
+    builder_mock, override_settings
+):
+    repository = SemanticSearchRepository(MagicMock())
+    filters = SearchFilters()
+
+    with override_settings(
+        SEMANTIC_SEARCH_THRESHOLD=0.7, SEMANTIC_SEARCH_SHADOW_THRESHOLD=0.4
+    ):
+        repository.search([0.1], 1, filters, None, version="v2")
+        repository.search_best([0.1], 1, filters, version="v2")
+        repository.search([0.1], 1, filters, None)
+    with override_settings(
+        SEMANTIC_SEARCH_THRESHOLD=0.7, SEMANTIC_SEARCH_SHADOW_THRESHOLD=0.0
+    ):
+        repository.search([0.1], 1, filters, None, version="v2")
+
+    assert [c.args[2] for c in builder_mock.call_args_list] == [
+        0.4,
+        0.4,
+        0.7,
+        0.7,
+    ]
@@ -0,0 +1,55 @@
+from unittest.mock import Mock
+
+from src.core.config import get_settings
+from src.core.containers import Container
+from src.repositories.search_results import SearchResultsRepository
+
+RESULT = {
+    "query": "reset router",
+    "org_id": 1,
+    "deployment_id": "deploy-uuid",
+    "version": None,
+    "ids": [3, 1, 2],
+    "embeddings": None,
+}
+
+
+def test_saved_result_is_read_back():
+    container = Container()
+    container.config.from_pydantic(get_settings())
+    repository = container.search_results_repository()
+
+    repository.save("analytics-id", RESULT)
+
+    assert repository.get("analytics-id") == RESULT
+    assert repository.get("other-id") is None
+
+
+def test_result_is_saved_with_ttl():
+    cache = Mock()
+    SearchResultsRepository(cache, ttl=60).save("analytics-id", RESULT)
+
+    cache.set.assert_called_once_with(
+        "search-results:analytics-id", RESULT, 60
+    )
+
+
+def test_result_is_not_saved_without_ttl():
+    cache = Mock()
+    SearchResultsRepository(cache, ttl=0).save("analytics-id", RESULT)
+
+    cache.set.assert_not_called()
+
+
+def test_cache_errors_are_not_raised(check_log_message):
+    cache = Mock()
+    cache.set.side_effect = ConnectionError("down")
+    cache.get.side_effect = ConnectionError("down")
+    repository = SearchResultsRepository(cache, ttl=60)
+
+    repository.save("analytics-id", RESULT)
+    assert repository.get("analytics-id") is None
+    check_log_message(
+        "WARNING",
+        'Error while getting search result "analytics-id" from cache: down',
+    )
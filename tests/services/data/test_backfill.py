@@ -0,0 +1,145 @@
+import json
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.services.data.backfill import BackfillCheckpoint, BackfillService
+from src.util.storage import S3Storage
+
+
+def _storage(documents: dict) -> S3Storage:
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket="data-bucket")
+    for key, content in documents.items():
+        s3.put_object(Bucket="data-bucket", Key=key, Body=json.dumps(content))
+    return S3Storage(s3)
+
+
+@mock_aws
+def test_backfill_handles_every_object_under_prefix():
+    storage = _storage(
+        {
+            "silver/articles/1/a.json": {"connector_id": 10},
+            "silver/articles/1/b.json": {"connector_id": 11},
+            "silver/articles/2/c.json": {"connector_id": 10},
+        }
+    )
+    handler = Mock()
+
+    state = BackfillService(storage, handler, workers=2).run(
+        "data-bucket", "silver/articles/1/"
+    )
+
+    handled = sorted(c.args[2] for c in handler.call_args_list)
+    assert handled == ["silver/articles/1/a.json", "silver/articles/1/b.json"]
+    assert state["processed"] == 2
+    assert state["after"] == "silver/articles/1/b.json"
+
+
+@mock_aws
+def test_backfill_hands_loaded_object_to_handler():
+    storage = _storage({"silver/articles/1/a.json": {"connector_id": 10}})
+    handler = Mock()
+
+    BackfillService(storage, handler).run("data-bucket", "silver/")
+
+    handler_storage, bucket, key, content = handler.call_args.args
+    assert (bucket, key) == ("data-bucket", "silver/articles/1/a.json")
+    assert content == {"connector_id": 10}
+    assert handler_storage.get_json(key, bucket) is content
+
+
+@mock_aws
+def test_backfill_skips_other_connectors():
+    storage = _storage(
+        {
+            "silver/articles/1/a.json": {"connector_id": 10},
+            "silver/articles/1/b.json": {"connector_id": 11},
+        }
+    )
+    handler = Mock()
+
+    state = BackfillService(storage, handler).run(
+        "data-bucket", "silver/", connector_id=11
+    )
+
+    assert [c.args[2] for c in handler.call_args_list] == [
+        "silver/articles/1/b.json"
+    ]
+    assert state["processed"] == 1
+    assert state["skipped"] == 1
+
+
+@mock_aws
+def test_backfill_records_failures_and_continues():
+    storage = _storage(
+        {
+            "silver/articles/1/a.json": {"connector_id": 10},
+            "silver/articles/1/b.json": {"connector_id": 10},
+        }
+    )
+
+    def handler(storage, bucket, key, content):
+        if key.endswith("a.json"):
+            raise ValueError("boom")
+
+    state = BackfillService(storage, handler).run("data-bucket", "silver/")
+
+    assert state["processed"] == 1
+    assert state["failed"] == 1
+    assert state["failed_keys"] == ["silver/articles/1/a.json"]
+    assert state["after"] == "silver/articles/1/b.json"
+
+
+@mock_aws
+def test_backfill_saves_and_resumes_from_checkpoint(tmp_path):
+    storage = _storage(
+        {
+            "silver/articles/1/a.json": {"connector_id": 10},
+            "silver/articles/1/b.json": {"connector_id": 10},
+        }
+    )
+    checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+    checkpoint.save(
+        {
+            "bucket": "data-bucket",
+            "prefix": "silver/",
+            "connector_id": None,
+            "after": "silver/articles/1/a.json",
+            "processed": 1,
+            "skipped": 0,
+            "failed": 0,
+            "failed_keys": [],
+        }
+    )
+    handler = Mock()
+
+    state = BackfillService(storage, handler, checkpoint=checkpoint).run(
+        "data-bucket", "silver/"
+    )
+
+    assert [c.args[2] for c in handler.call_args_list] == [
+        "silver/articles/1/b.json"
+    ]
+    assert state["processed"] == 2
+    assert checkpoint.load() == state
+
+
+@mock_aws
+def test_backfill_refuses_checkpoint_of_another_backfill(tmp_path):
+    storage = _storage({})
+    checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+    checkpoint.save(
+        {"bucket": "data-bucket", "prefix": "silver/", "connector_id": 10}
+    )
+
+    with pytest.raises(ValueError):
+        BackfillService(storage, Mock(), checkpoint=checkpoint).run(
+            "data-bucket", "silver/"
+        )
+
+
+def test_checkpoint_load_missing_file(tmp_path):
+    assert BackfillCheckpoint(str(tmp_path / "missing.json")).load() is None
@@ -1,6 +1,6 @@
 import copy
 import os
-from unittest.mock import Mock, call, patch
+from unittest.mock import ANY, Mock, call, patch
 
 import boto3
 import numpy as np
@@ -10,6 +10,7 @@ from moto import mock_aws
 import src.proto.embed_job_status_pb2 as embed_job_status_pb2
 from src.core.containers import container
 from src.data.chunkers.chunker import CharacterChunker
+from src.data.fingerprint import content_fingerprint
 from src.models.semantic_search_item import (
     SemanticSearchDocument,
     SemanticSearchItem,
@@ -18,6 +19,7 @@ from src.services.data.transformations.article_kb import (
     BronzeToSilverService,
     SilverToGoldService,
 )
+from src.util.process_pool import ProcessPool
 from src.util.storage import S3Storage
 from tests.__factories__.models.semantic_search import (
     SemanticSearchDocumentFactory,
@@ -139,6 +141,40 @@ def test_bronze_to_silver_insert_service(set_notifier_data_mock, notify_mock):
     }
 
 
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_bronze_to_silver_insert_service_in_process_pool(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="data-bucket")
+    s3.put_json(
+        "bronze/article_kb/530566/507222858.json",
+        BRONZE_SALESFORCE_KB_TEMPLATE,
+        "data-bucket",
+    )
+    pool = ProcessPool(workers=1)
+    try:
+        BronzeToSilverService(
+            s3, Mock(), "https://localhost", True, process_pool=pool
+        ).handle(
+            "data-bucket",
+            "bronze/article_kb/530566/",
+            "507222858",
+            530566,
+            123456,
+            BronzeToSilverService.OP_INSERT,
+        )
+    finally:
+        pool.shutdown()
+
+    transformed = s3.get_json(
+        "silver/article_kb/530566/507222858.json", "data-bucket"
+    )
+    assert transformed == SILVER_SALESFORCE_KB_TEMPLATE
+
+
 @mock_aws
 @patch("src.services.data.transformations.base.BaseService._notify")
 @patch("src.services.data.transformations.base.BaseService._set_notifier_data")
@@ -264,11 +300,13 @@ def test_silver_to_gold_service_service(set_notifier_data_mock, notify_mock):
     embedder_mock = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -289,7 +327,8 @@ def test_silver_to_gold_service_service(set_notifier_data_mock, notify_mock):
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 1
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
     repo_mock.create_document.assert_called_once_with(
         "530566",
         "en-US",
@@ -348,11 +387,13 @@ def test_silver_to_gold_does_not_create_item_if_it_exists(
     embedder_mock = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = inserted_item_mock
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -373,7 +414,8 @@ def test_silver_to_gold_does_not_create_item_if_it_exists(
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 0
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
 
     notify_mock.assert_has_calls(
         [
@@ -394,6 +436,51 @@ def test_silver_to_gold_does_not_create_item_if_it_exists(
     )
 
 
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_writes_shadow_embeddings(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="data-bucket")
+    s3.put_json(
+        "silver/article_kb/530566/507222858.json",
+        SILVER_SALESFORCE_KB_TEMPLATE,
+        "data-bucket",
+    )
+    embedder_mock = Mock()
+    embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
+    repo_mock = Mock()
+    inserted_items = [Mock(id=1), Mock(id=2)]
+    repo_mock.create_items.return_value = inserted_items
+    repo_mock.find_document.return_value = Mock()
+    repo_mock.find_fingerprint.return_value = None
+    embeddings_index = Mock()
+
+    silver_to_gold_service = SilverToGoldService(
+        s3,
+        Mock(),
+        embedder_mock,
+        repo_mock,
+        CharacterChunker(150, "none"),
+        embeddings_index=embeddings_index,
+    )
+    silver_to_gold_service.handle(
+        "data-bucket",
+        "silver/article_kb/530566/507222858.json",
+        123456,
+        "Object Created",
+        "507222858",
+        530566,
+    )
+
+    records = repo_mock.create_items.call_args.args[0]
+    embeddings_index.write_shadow.assert_called_once_with(
+        records, inserted_items
+    )
+
+
 @mock_aws
 @patch("src.services.data.transformations.base.BaseService._notify")
 @patch("src.services.data.transformations.base.BaseService._set_notifier_data")
@@ -415,11 +502,13 @@ def test_silver_to_gold_skips_fully_emtpy_files(
     embedder_mock = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -441,7 +530,7 @@ def test_silver_to_gold_skips_fully_emtpy_files(
     assert embedder_mock.embed.call_count == 0
     assert repo_mock.find_document.call_count == 0
     assert repo_mock.create_document.call_count == 0
-    assert repo_mock.create_item.call_count == 0
+    assert repo_mock.create_items.call_count == 0
     check_log_message(
         "INFO",
         "[Semantic-Search] Salesforce content, and title are empty, skipping "
@@ -526,3 +615,147 @@ def test_silver_to_gold_delete_flow(set_notifier_data_mock, notify_mock):
         2,
         123456,
     )
+
+
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_skips_unchanged_content(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="data-bucket")
+    s3.put_json(
+        "silver/article_kb/530566/507222858.json",
+        SILVER_SALESFORCE_KB_TEMPLATE,
+        "data-bucket",
+    )
+    embedder_mock = Mock()
+    repo_mock = Mock()
+    chunker = CharacterChunker(150, "none")
+    repo_mock.find_fingerprint.return_value = content_fingerprint(
+        SILVER_SALESFORCE_KB_TEMPLATE, chunker, connector_id=123456
+    )
+
+    silver_to_gold_service = SilverToGoldService(
+        s3, Mock(), embedder_mock, repo_mock, chunker
+    )
+    ids = silver_to_gold_service.handle(
+        "data-bucket",
+        "silver/article_kb/530566/507222858.json",
+        123456,
+        "Object Created",
+        "507222858",
+        530566,
+    )
+
+    assert ids == []
+    repo_mock.find_fingerprint.assert_called_once_with("507222858", 530566)
+    repo_mock.remove_item.assert_not_called()
+    repo_mock.create_items.assert_not_called()
+    embedder_mock.embed.assert_not_called()
+    notify_mock.assert_called_once_with(
+        embed_job_status_pb2.ArticleState.COMPLETE,
+        embed_job_status_pb2.FailureStatus.SUCCESS,
+    )
+
+
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_embeds_again_after_failed_insert(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="data-bucket")
+    s3.put_json(
+        "silver/article_kb/530566/507222858.json",
+        SILVER_SALESFORCE_KB_TEMPLATE,
+        "data-bucket",
+    )
+    embedder_mock = Mock()
+    embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
+    fingerprints = {}
+    repo_mock = Mock()
+    repo_mock.find_fingerprint.side_effect = lambda doc_id, org_id: (
+        fingerprints.get(doc_id)
+    )
+    repo_mock.update_fingerprint.side_effect = lambda ids, fingerprint: (
+        fingerprints.update({"507222858": fingerprint})
+    )
+    repo_mock.find_document.return_value = Mock(id=1)
+    # e.g. the embeddings of a chunk could not be computed
+    repo_mock.create_items.side_effect = [
+        RuntimeError("null value in column embeddings"),
+        [Mock(id=1), Mock(id=2)],
+    ]
+    silver_to_gold_service = SilverToGoldService(
+        s3, Mock(), embedder_mock, repo_mock, CharacterChunker(150, "none")
+    )
+    args = (
+        "data-bucket",
+        "silver/article_kb/530566/507222858.json",
+        123456,
+        "Object Created",
+        "507222858",
+        530566,
+    )
+
+    with pytest.raises(RuntimeError):
+        silver_to_gold_service.handle(*args)
+    repo_mock.update_fingerprint.assert_not_called()
+
+    assert silver_to_gold_service.handle(*args) == [1, 2]
+    assert silver_to_gold_service.handle(*args) == []
+    assert embedder_mock.embed.call_count == 2
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
+
+
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_inserts_records_batch_by_batch(
+    set_notifier_data_mock, notify_mock, override_settings
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="data-bucket")
+    s3.put_json(
+        "silver/article_kb/530566/507222858.json",
+        SILVER_SALESFORCE_KB_TEMPLATE,
+        "data-bucket",
+    )
+    events = []
+    embedder_mock = Mock()
+    embedder_mock.embed.side_effect = lambda chunks: events.append(
+        "embed"
+    ) or np.zeros((len(chunks), embeddings_dimensions))
+    repo_mock = Mock()
+    repo_mock.find_fingerprint.return_value = None
+    repo_mock.find_document.return_value = None
+    repo_mock.create_document.return_value = Mock(id=1)
+    repo_mock.create_items.side_effect = lambda records, _: events.append(
+        "insert"
+    ) or [Mock(id=len(events) // 2)]
+
+    silver_to_gold_service = SilverToGoldService(
+        s3, Mock(), embedder_mock, repo_mock, CharacterChunker(150, "none")
+    )
+    with override_settings(EMBEDDINGS_BATCH_SIZE=1):
+        ids = silver_to_gold_service.handle(
+            "data-bucket",
+            "silver/article_kb/530566/507222858.json",
+            123456,
+            "Object Created",
+            "507222858",
+            530566,
+        )
+
+    assert ids == [1, 2]
+    # Each batch is inserted before the next one gets embedded
+    assert events == ["embed", "insert", "embed", "insert"]
+    assert repo_mock.create_document.call_count == 1
+    assert [len(c.args[0]) for c in repo_mock.create_items.call_args_list] == [
+        1,
+        1,
+    ]
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
@@ -1,6 +1,6 @@
 import copy
 import os
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock
 
 import boto3
 import numpy as np
@@ -9,6 +9,7 @@ from moto import mock_aws
 
 from src.core.containers import container
 from src.data.chunkers.chunker import CharacterChunker
+from src.data.fingerprint import content_fingerprint
 from src.models.semantic_search_item import (
     SemanticSearchDocument,
     SemanticSearchItem,
@@ -37,11 +38,13 @@ def test_silver_to_gold_html():
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -67,7 +70,8 @@ def test_silver_to_gold_html():
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 1
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
     repo_mock.create_document.assert_called_once_with(
         "530566",
         "en",
@@ -102,11 +106,13 @@ def test_silver_to_gold_html_uses_does_not_create_item_if_it_exists():
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = inserted_item_mock
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -133,7 +139,8 @@ def test_silver_to_gold_html_uses_does_not_create_item_if_it_exists():
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 0
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
 
 
 @mock_aws
@@ -154,11 +161,13 @@ def test_silver_to_gold_html_skips_fully_empty_files(check_log_message):
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -186,7 +195,7 @@ def test_silver_to_gold_html_skips_fully_empty_files(check_log_message):
     assert embedder_mock.embed.call_count == 0
     assert repo_mock.find_document.call_count == 0
     assert repo_mock.create_document.call_count == 0
-    assert repo_mock.create_item.call_count == 0
+    assert repo_mock.create_items.call_count == 0
     check_log_message(
         "INFO",
         "[Semantic-Search] HTML content, and title are empty, "
@@ -223,3 +232,91 @@ def test_silver_to_gold_html_delete_flow():
     with container.db().session() as session:
         assert session.query(SemanticSearchItem).count() == 1
         assert session.query(SemanticSearchDocument).count() == 1
+
+
+@mock_aws
+def test_silver_to_gold_html_skips_unchanged_content():
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="test-bucket")
+    s3.put_json(
+        "silver/html/530566/507222858.json",
+        SILVER_HTML_TEMPLATE,
+        "test-bucket",
+    )
+    embedder_mock = Mock()
+    repo_mock = Mock()
+    chunker = CharacterChunker(150, "none")
+    repo_mock.find_fingerprint.return_value = content_fingerprint(
+        SILVER_HTML_TEMPLATE, chunker, connector_id=1
+    )
+    connectors_svc_mock = Mock()
+    connector_resolver = Mock()
+    connector_resolver.resolve.return_value = 1
+
+    silver_to_gold_service = SilverToGoldService(
+        s3,
+        embedder_mock,
+        repo_mock,
+        chunker,
+        connectors_svc_mock,
+        connector_resolver=connector_resolver,
+    )
+    ids = silver_to_gold_service.handle(
+        "test-bucket",
+        "silver/html/530566/507222858.json",
+        "Object Created",
+    )
+
+    assert ids == []
+    repo_mock.find_fingerprint.assert_called_once_with("507222858", 530566)
+    repo_mock.remove_item.assert_not_called()
+    embedder_mock.embed.assert_not_called()
+    connectors_svc_mock.get_connector_types.assert_not_called()
+
+
+@mock_aws
+def test_silver_to_gold_html_embeds_again_for_new_connector():
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="test-bucket")
+    s3.put_json(
+        "silver/html/530566/507222858.json",
+        SILVER_HTML_TEMPLATE,
+        "test-bucket",
+    )
+    embedder_mock = Mock()
+    embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
+    repo_mock = Mock()
+    inserted_item_mock = Mock()
+    inserted_item_mock.id = 1
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
+    repo_mock.find_document.return_value = inserted_item_mock
+    chunker = CharacterChunker(150, "none")
+    # Embedded for the previous connector of the organization
+    repo_mock.find_fingerprint.return_value = content_fingerprint(
+        SILVER_HTML_TEMPLATE, chunker, connector_id=1
+    )
+    connector_resolver = Mock()
+    connector_resolver.resolve.return_value = 2
+
+    silver_to_gold_service = SilverToGoldService(
+        s3,
+        embedder_mock,
+        repo_mock,
+        chunker,
+        Mock(),
+        connector_resolver=connector_resolver,
+    )
+    ids = silver_to_gold_service.handle(
+        "test-bucket",
+        "silver/html/530566/507222858.json",
+        "Object Created",
+    )
+
+    assert ids == [1, 1]
+    assert embedder_mock.embed.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with(
+        [1],
+        content_fingerprint(SILVER_HTML_TEMPLATE, chunker, connector_id=2),
+    )
@@ -10,6 +10,8 @@ from moto import mock_aws
 import src.proto.embed_job_status_pb2 as embed_job_status_pb2
 from src.core.containers import container
 from src.data.chunkers.chunker import CharacterChunker, SentenceChunker
+from src.data.fingerprint import content_fingerprint
+from src.exceptions.transformations import NotifiedException
 from src.models.semantic_search_item import (
     SemanticSearchDocument,
     SemanticSearchItem,
@@ -20,6 +22,7 @@ from src.services.data.transformations.zt_trees import (
     RawToBronzeService,
     SilverToGoldService,
 )
+from src.util.process_pool import ProcessPool
 from src.util.storage import S3Storage
 from tests.__factories__.models.semantic_search import (
     SemanticSearchDocumentFactory,
@@ -192,6 +195,37 @@ def test_bronze_to_silver_zingtree_tree(set_notifier_data_mock, notify_mock):
     notify_mock.assert_not_called()
 
 
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_bronze_to_silver_zingtree_tree_in_process_pool(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="test-bucket")
+    key = "bronze/zt_trees/530566/507222858/507222858.json"
+    output_key = "silver/zt_trees/530566/507222858/507222858.json"
+    s3.put_json(key, BRONZE_TREE_TEMPLATE, "test-bucket")
+
+    BronzeToSilverService(s3, Mock()).handle(
+        "test-bucket", key, "Object Created", "507222858", 530566, 1234
+    )
+    expected = s3.get_json(output_key, "test-bucket")
+
+    pool = ProcessPool(workers=2, chunk_size=1)
+    try:
+        BronzeToSilverService(s3, Mock(), process_pool=pool).handle(
+            "test-bucket", key, "Object Created", "507222858", 530566, 1234
+        )
+    finally:
+        pool.shutdown()
+
+    output = s3.get_json(output_key, "test-bucket")
+    assert output == expected
+    assert list(output["nodes"]) == list(BRONZE_TREE_TEMPLATE["nodes"])
+    notify_mock.assert_not_called()
+
+
 @mock_aws
 @patch("src.services.data.transformations.base.BaseService._notify")
 @patch("src.services.data.transformations.base.BaseService._set_notifier_data")
@@ -287,11 +321,13 @@ def test_silver_to_gold_zingtree_tree(set_notifier_data_mock, notify_mock):
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -323,7 +359,8 @@ def test_silver_to_gold_zingtree_tree(set_notifier_data_mock, notify_mock):
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 1
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
     repo_mock.create_document.assert_called_once_with(
         "531868",
         "en",
@@ -344,22 +381,15 @@ def test_silver_to_gold_zingtree_tree(set_notifier_data_mock, notify_mock):
         "2021-03-04T11:17:03.000000Z",
         "2023-05-22 18:20:28.000000Z",
     )
-    repo_mock.create_item.assert_has_calls(
-        [
-            call(
-                ANY,
-                "test content of a node Is this a question?",
-                "test content of a node Is this a question?",
-                inserted_item_mock,
-            ),
-            call(
-                ANY,
-                "Test Tree test title",
-                "Test Tree test title",
-                inserted_item_mock,
-            ),
-        ]
-    )
+    records, document = repo_mock.create_items.call_args.args
+    assert [(r["chunk"], r["snippet"]) for r in records] == [
+        (
+            "test content of a node Is this a question?",
+            "test content of a node Is this a question?",
+        ),
+        ("Test Tree test title", "Test Tree test title"),
+    ]
+    assert document is inserted_item_mock
     set_notifier_data_mock.assert_called_once_with("507222858", 530566, 1234)
     notify_mock.assert_has_calls(
         [
@@ -392,11 +422,13 @@ def test_silver_to_gold_zingtree_tree_uses_does_not_create_item_if_it_exists(
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = inserted_item_mock
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -428,7 +460,8 @@ def test_silver_to_gold_zingtree_tree_uses_does_not_create_item_if_it_exists(
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 0
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
     set_notifier_data_mock.assert_called_once_with("507222858", 530566, 1234)
     notify_mock.assert_has_calls(
         [
@@ -470,11 +503,13 @@ def test_silver_to_gold_zingtree_tree_adds_title_for_fully_empty_nodes(
     embedder_mock.embed = Mock()
     embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
     repo_mock = Mock()
-    repo_mock.create_item = Mock()
+    repo_mock.create_items = Mock()
     repo_mock.create_document = Mock()
     inserted_item_mock = Mock()
     inserted_item_mock.id = 1
-    repo_mock.create_item.return_value = inserted_item_mock
+    repo_mock.create_items.side_effect = lambda r, d: [
+        inserted_item_mock
+    ] * len(r)
     repo_mock.find_document.return_value = None
     repo_mock.create_document.return_value = inserted_item_mock
     chunker = CharacterChunker(150, "none")
@@ -507,7 +542,8 @@ def test_silver_to_gold_zingtree_tree_adds_title_for_fully_empty_nodes(
     assert embedder_mock.embed.call_count == 1
     assert repo_mock.find_document.call_count == 1
     assert repo_mock.create_document.call_count == 1
-    assert repo_mock.create_item.call_count == 2
+    assert repo_mock.create_items.call_count == 1
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
     check_log_message(
         "INFO",
         "[Semantic-Search] Node content,"
@@ -577,3 +613,112 @@ def test_silver_to_gold_zingtree_tree_delete_flow(
             ),
         ]
     )
+
+
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_zingtree_tree_skips_unchanged_tree(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="test-bucket")
+    s3.put_json(
+        "silver/zt_trees/530566/507222858.json",
+        SILVER_TREE_TEMPLATE,
+        "test-bucket",
+    )
+    embedder_mock = Mock()
+    repo_mock = Mock()
+    chunker = CharacterChunker(150, "none")
+    repo_mock.find_fingerprints_like.return_value = {
+        content_fingerprint(SILVER_TREE_TEMPLATE, chunker, connector_id=1)
+    }
+    connector_resolver = Mock()
+    connector_resolver.resolve.return_value = 1
+
+    silver_to_gold_service = SilverToGoldService(
+        s3,
+        Mock(),
+        embedder_mock,
+        repo_mock,
+        chunker,
+        Mock(),
+        connector_resolver=connector_resolver,
+    )
+    ids = silver_to_gold_service.handle(
+        "test-bucket",
+        "silver/zt_trees/530566/507222858.json",
+        "Object Created",
+        "507222858",
+        530566,
+        1234,
+    )
+
+    assert ids == []
+    repo_mock.find_fingerprints_like.assert_called_once_with(
+        "507222858::%", 530566
+    )
+    repo_mock.remove_items_like.assert_not_called()
+    embedder_mock.embed.assert_not_called()
+    notify_mock.assert_called_once_with(
+        embed_job_status_pb2.ArticleState.COMPLETE,
+        embed_job_status_pb2.FailureStatus.SUCCESS,
+    )
+
+
+@mock_aws
+@patch("src.services.data.transformations.base.BaseService._notify")
+@patch("src.services.data.transformations.base.BaseService._set_notifier_data")
+def test_silver_to_gold_zingtree_tree_embeds_again_after_failed_insert(
+    set_notifier_data_mock, notify_mock
+):
+    s3 = S3Storage(boto3.client("s3"))
+    s3._client.create_bucket(Bucket="test-bucket")
+    s3.put_json(
+        "silver/zt_trees/530566/507222858.json",
+        SILVER_TREE_TEMPLATE,
+        "test-bucket",
+    )
+    embedder_mock = Mock()
+    embedder_mock.embed.return_value = np.zeros(embeddings_dimensions)
+    fingerprints = {}
+    repo_mock = Mock()
+    repo_mock.find_fingerprints_like.side_effect = lambda like, org_id: set(
+        fingerprints.values()
+    )
+    repo_mock.update_fingerprint.side_effect = lambda ids, fingerprint: (
+        fingerprints.update(dict.fromkeys(ids, fingerprint))
+    )
+    repo_mock.find_document.return_value = Mock(id=1)
+    # e.g. the embeddings of a chunk could not be computed
+    repo_mock.create_items.side_effect = [
+        RuntimeError("null value in column embeddings"),
+        [Mock(id=1), Mock(id=2)],
+    ]
+    silver_to_gold_service = SilverToGoldService(
+        s3,
+        Mock(),
+        embedder_mock,
+        repo_mock,
+        CharacterChunker(150, "none"),
+        Mock(),
+        connector_resolver=Mock(),
+    )
+    args = (
+        "test-bucket",
+        "silver/zt_trees/530566/507222858.json",
+        "Object Created",
+        "507222858",
+        530566,
+        1234,
+    )
+
+    with pytest.raises(NotifiedException):
+        silver_to_gold_service.handle(*args)
+    repo_mock.update_fingerprint.assert_not_called()
+
+    assert silver_to_gold_service.handle(*args) == [1, 2]
+    assert silver_to_gold_service.handle(*args) == []
+    assert embedder_mock.embed.call_count == 2
+    repo_mock.update_fingerprint.assert_called_once_with([1], ANY)
@@ -0,0 +1,125 @@
+from threading import Barrier, Thread
+from unittest.mock import Mock
+
+import pytest
+
+from src.schemas.services.connectors_svc import Connector, ConnectorType
+from src.services.connectors import ConnectorResolver
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _connectors_service():
+    service = Mock()
+    service.get_connector_types.return_value = [
+        ConnectorType(
+            id=1, provider="html", name="", description="", active=True
+        ),
+        ConnectorType(
+            id=2, provider="zingtree", name="", description="", active=True
+        ),
+    ]
+    service.get_connectors_by_connector_type_id.side_effect = (
+        lambda org_id, type_id: [
+            Connector(
+                id=org_id * 10 + type_id,
+                name="connector",
+                description="",
+                active=True,
+            )
+        ]
+    )
+    return service
+
+
+def test_resolve_finds_the_provider_connector():
+    service = _connectors_service()
+    resolver = ConnectorResolver(service)
+
+    assert resolver.resolve(5, "zingtree") == 52
+    assert resolver.resolve("5", "html") == 51
+    service.get_connector_types.assert_called_with(5)
+    service.get_connectors_by_connector_type_id.assert_called_with(5, 1)
+
+
+def test_resolve_keeps_connectors_for_ttl():
+    service = _connectors_service()
+    clock = FakeClock()
+    resolver = ConnectorResolver(service, ttl=10.0, clock=clock)
+
+    resolver.resolve(5, "zingtree")
+    clock.now = 9.9
+    resolver.resolve("5", "zingtree")
+    assert service.get_connector_types.call_count == 1
+
+    clock.now = 10.0
+    resolver.resolve(5, "zingtree")
+    assert service.get_connector_types.call_count == 2
+
+
+def test_resolve_without_ttl_always_fetches():
+    service = _connectors_service()
+    resolver = ConnectorResolver(service, ttl=0)
+
+    resolver.resolve(5, "html")
+    resolver.resolve(5, "html")
+
+    assert service.get_connector_types.call_count == 2
+
+
+def test_resolve_unknown_provider_raises_and_is_not_kept():
+    service = _connectors_service()
+    resolver = ConnectorResolver(service)
+
+    with pytest.raises(ValueError):
+        resolver.resolve(5, "salesforce")
+    with pytest.raises(ValueError):
+        resolver.resolve(5, "salesforce")
+    assert service.get_connector_types.call_count == 2
+
+
+def test_invalidate_filters_by_org_and_provider():
+    service = _connectors_service()
+    resolver = ConnectorResolver(service)
+    for org_id in (5, 6):
+        for provider in ("html", "zingtree"):
+            resolver.resolve(org_id, provider)
+
+    assert resolver.invalidate(5, "html") == 1
+    assert resolver.invalidate(org_id=6) == 2
+    assert resolver.invalidate() == 1
+
+    resolver.resolve(5, "zingtree")
+    assert service.get_connector_types.call_count == 5
+
+
+def test_concurrent_resolutions_fetch_once():
+    service = _connectors_service()
+    types = service.get_connector_types.return_value
+    barrier = Barrier(8)
+
+    def get_connector_types(org_id):
+        return types
+
+    service.get_connector_types.side_effect = get_connector_types
+    resolver = ConnectorResolver(service)
+    results = []
+
+    def resolve():
+        barrier.wait()
+        results.append(resolver.resolve(5, "zingtree"))
+
+    threads = [Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [52] * 8
+    assert service.get_connector_types.call_count == 1
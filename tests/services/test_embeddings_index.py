@@ -0,0 +1,209 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.services.embeddings_index import EmbeddingsIndexService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _index(cache=None, repository=None, shadow=True, clock=None):
+    return EmbeddingsIndexService(
+        cache or Mock(get=Mock(return_value=None)),
+        repository or Mock(),
+        Mock(name="embedder"),
+        Mock(name="shadow_embedder") if shadow else None,
+        "v2" if shadow else "",
+        ttl=5.0,
+        clock=clock or FakeClock(),
+    )
+
+
+def test_query_embedder_defaults_to_primary():
+    index = _index()
+
+    embedder, version = index.query_embedder()
+
+    assert embedder is index._embedder
+    assert version is None
+
+
+def test_query_embedder_without_shadow_does_not_read_cache():
+    cache = Mock()
+    index = _index(cache=cache, shadow=False)
+
+    embedder, version = index.query_embedder()
+
+    assert (embedder, version) == (index._embedder, None)
+    cache.get.assert_not_called()
+
+
+def test_query_embedder_switches_with_active_version():
+    cache = Mock()
+    cache.get.return_value = "v2"
+    index = _index(cache=cache)
+
+    embedder, version = index.query_embedder()
+
+    assert embedder is index._shadow_embedder
+    assert version == "v2"
+    cache.get.assert_called_once_with("embeddings:active-version")
+
+
+def test_query_embedder_falls_back_on_unknown_version():
+    cache = Mock()
+    cache.get.return_value = "v3"
+    index = _index(cache=cache)
+
+    assert index.query_embedder() == (index._embedder, None)
+
+
+def test_query_embedder_uses_shadow_query_embedder():
+    cache = Mock()
+    cache.get.return_value = "v2"
+    shadow_query_embedder = Mock(name="shadow_query_embedder")
+    index = EmbeddingsIndexService(
+        cache,
+        Mock(),
+        Mock(name="embedder"),
+        Mock(name="shadow_embedder"),
+        "v2",
+        shadow_query_embedder=shadow_query_embedder,
+    )
+
+    assert index.query_embedder() == (shadow_query_embedder, "v2")
+
+
+def test_active_version_is_kept_for_ttl():
+    cache = Mock()
+    cache.get.return_value = "v2"
+    clock = FakeClock()
+    index = _index(cache=cache, clock=clock)
+
+    index.active_version()
+    cache.get.return_value = "primary"
+    clock.now = 4.9
+    assert index.active_version() == "v2"
+    clock.now = 5.0
+    assert index.active_version() == "primary"
+    assert cache.get.call_count == 2
+
+
+def test_active_version_keeps_last_known_on_cache_error():
+    cache = Mock()
+    cache.get.return_value = "v2"
+    clock = FakeClock()
+    index = _index(cache=cache, clock=clock)
+
+    index.active_version()
+    cache.get.side_effect = ConnectionError("down")
+    clock.now = 10.0
+
+    assert index.active_version() == "v2"
+
+
+def test_write_shadow_embeds_chunks_of_inserted_items():
+    repository = Mock()
+    index = _index(repository=repository)
+    index._shadow_embedder.embed.return_value = [[1.0], [2.0]]
+
+    index.write_shadow(
+        [{"chunk": "a"}, {"chunk": "b"}], [Mock(id=1), Mock(id=2)]
+    )
+
+    index._shadow_embedder.embed.assert_called_once_with(["a", "b"])
+    repository.create_shadow_items.assert_called_once_with(
+        [1, 2], [[1.0], [2.0]], "v2"
+    )
+
+
+def test_write_shadow_does_nothing_without_shadow():
+    repository = Mock()
+    index = _index(repository=repository, shadow=False)
+
+    index.write_shadow([{"chunk": "a"}], [Mock(id=1)])
+
+    repository.create_shadow_items.assert_not_called()
+
+
+def test_write_shadow_failure_is_not_raised():
+    repository = Mock()
+    repository.create_shadow_items.side_effect = Exception("db down")
+    index = _index(repository=repository)
+
+    index.write_shadow([{"chunk": "a"}], [Mock(id=1)])
+
+
+def test_write_shadow_failure_is_raised_once_shadow_is_active():
+    repository = Mock()
+    repository.create_shadow_items.side_effect = Exception("db down")
+    index = _index(
+        cache=Mock(get=Mock(return_value="v2")), repository=repository
+    )
+
+    with pytest.raises(Exception, match="db down"):
+        index.write_shadow([{"chunk": "a"}], [Mock(id=1)])
+
+
+def test_fill_shadow_embeds_missing_items_in_batches():
+    repository = Mock()
+    repository.find_items_missing_version.side_effect = [
+        [(1, "a"), (2, "b")],
+        [(5, "c")],
+        [],
+    ]
+    repository.create_shadow_items.side_effect = lambda ids, e, v: len(ids)
+    sleep = Mock()
+    index = _index(repository=repository)
+    index._shadow_embedder.embed.side_effect = lambda t: [[0.0]] * len(t)
+
+    filled = index.fill_shadow(batch_size=2, pause=0.5, sleep=sleep)
+
+    assert filled == 3
+    assert [
+        c.args for c in repository.find_items_missing_version.call_args_list
+    ] == [("v2", 0, 2), ("v2", 2, 2), ("v2", 5, 2)]
+    repository.create_shadow_items.assert_any_call(
+        [1, 2], [[0.0], [0.0]], "v2"
+    )
+    assert sleep.call_count == 2
+
+
+def test_cutover_requires_complete_shadow():
+    repository = Mock()
+    repository.count_items_missing_version.return_value = 3
+    cache = Mock()
+    index = _index(cache=cache, repository=repository)
+
+    with pytest.raises(ValueError):
+        index.cutover()
+    cache.set.assert_not_called()
+
+    index.cutover(force=True)
+    cache.set.assert_called_once_with("embeddings:active-version", "v2")
+
+
+def test_cutover_and_rollback_switch_immediately():
+    repository = Mock()
+    repository.count_items_missing_version.return_value = 0
+    cache = Mock()
+    cache.get.return_value = None
+    index = _index(cache=cache, repository=repository)
+
+    assert index.active_version() == "primary"
+    index.cutover()
+    assert index.query_embedder() == (index._shadow_embedder, "v2")
+    index.rollback()
+    assert index.query_embedder() == (index._embedder, None)
+    cache.set.assert_called_with("embeddings:active-version", "primary")
+
+
+def test_fill_without_shadow_raises():
+    with pytest.raises(ValueError):
+        _index(shadow=False).fill_shadow()
@@ -5,6 +5,7 @@ import pytest
 
 from src.api.v1.endpoints.requests.semantic_search import SearchFilters
 from src.api.v1.endpoints.responses.semantic_search import TagMeta
+from src.builders.queries.semantic_search import WidgetFiltersBuilder
 from src.core.containers import container
 from src.schemas.services.config_svc import SearchWidget
 from src.schemas.services.connectors_svc import Connector, ConnectorType
@@ -525,7 +526,7 @@ def test_get_connectors():
 
 def setup_summarize_mocks():
     mock_embedder = Mock()
-    mock_summarizer = Mock()
+    mock_summarizer = Mock(context_max_tokens=0)
     mock_items_repository = Mock()
     config_svc_mock, connectors_svc_mock = create_widget_valid_items()
     summarize_answer_service = SummarizeAnswerService(
@@ -551,13 +552,14 @@ def test_handle_with_options_id_list_returns_summarized_answer():
         mock_items_repository,
         summarize_answer_service,
     ) = setup_summarize_mocks()
-    item1 = Mock(text="text1")
+    item1 = Mock(id=1, text="text1")
     item1.to_dict.return_value = {"text": "text1"}
-    item2 = Mock(text="text2")
+    item2 = Mock(id=2, text="text2")
     item2.to_dict.return_value = {"text": "text2"}
+    # Found in another order than asked for
     mock_items_repository.find_semantic_search_items_by_ids.return_value = [
-        item1,
         item2,
+        item1,
     ]
     mock_summarizer.summarize.return_value = "summarized_answer"
     result = summarize_answer_service.handle("query", 1, "deploy-uuid", [1, 2])
@@ -696,3 +698,442 @@ def test_semantic_search_deployment_has_document():
         deployment_id="test-uuid",
     )
     assert result is False
+
+
+def test_semantic_search_uses_active_embeddings_version():
+    embed_mock = Mock()
+    shadow_embed_mock = Mock()
+    shadow_embed_mock.embed.return_value = [[0.2, 0.3]]
+    repository = Mock()
+    repository.search.return_value = ([], [])
+    embeddings_index = Mock()
+    embeddings_index.query_embedder.return_value = (shadow_embed_mock, "v2")
+    audit_mock = Mock()
+    audit_mock.is_agent.return_value = False
+    config_svc_mock, connectors_svc_mock = create_widget_valid_items()
+
+    semantic_search_service = SemanticSearchService(
+        embed_mock,
+        repository,
+        Mock(),
+        connectors_svc_mock,
+        config_svc_mock,
+        Mock(),
+        audit_mock,
+        embeddings_index=embeddings_index,
+    )
+    semantic_search_service.search(
+        search="test",
+        org_id=1,
+        deployment_id="test-uuid",
+        filters=SearchFilters(),
+        limit=5,
+    )
+
+    embed_mock.embed.assert_not_called()
+    shadow_embed_mock.embed.assert_called_once_with("test")
+    repository.search.assert_called_once_with(
+        [0.2, 0.3], 1, ANY, 5, version="v2"
+    )
+
+
+def test_summarize_uses_active_embeddings_version():
+    (
+        mock_embedder,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    shadow_embed_mock = Mock()
+    shadow_embed_mock.embed.return_value = [[0.2, 0.3]]
+    embeddings_index = Mock()
+    embeddings_index.query_embedder.return_value = (shadow_embed_mock, "v2")
+    summarize_answer_service._embeddings_index = embeddings_index
+    mock_items_repository.search_best.return_value = []
+
+    summarize_answer_service.handle("query", 1, "test-uuid")
+
+    mock_embedder.embed.assert_not_called()
+    mock_items_repository.search_best.assert_called_once_with(
+        [0.2, 0.3], 1, filters=ANY, version="v2"
+    )
+
+
+def test_semantic_search_saves_search_result():
+    embed_mock = Mock()
+    embed_mock.embed.return_value = [[0.2, 0.3]]
+    repository = Mock()
+    repository.search.return_value = ([Mock(id=3), Mock(id=1)], [0.1, 0.2])
+    repository.search_best.return_value = [Mock(id=1), Mock(id=4)]
+    analytics_mock = Mock()
+    analytics_mock.from_search.return_value = Mock(id="analytics-id")
+    search_results = Mock()
+    audit_mock = Mock()
+    audit_mock.is_agent.return_value = False
+    config_svc_mock, connectors_svc_mock = create_widget_valid_items()
+
+    semantic_search_service = SemanticSearchService(
+        embed_mock,
+        repository,
+        analytics_mock,
+        connectors_svc_mock,
+        config_svc_mock,
+        Mock(),
+        audit_mock,
+        search_results=search_results,
+    )
+    semantic_search_service.search(
+        search="test",
+        org_id=1,
+        deployment_id="test-uuid",
+        filters=SearchFilters(),
+        limit=5,
+        sort_by="alphabetical",
+    )
+
+    # What a summary without search id finds, not the options listed
+    repository.search_best.assert_called_once_with(
+        [0.2, 0.3], 1, filters=ANY, version=None
+    )
+    assert repository.search_best.call_args.kwargs["filters"] == (
+        WidgetFiltersBuilder(
+            config_svc_mock.get_search_widget_by_deployment_id.return_value,
+            connectors_svc_mock.get_all_connectors.return_value,
+        ).build_from(SearchFilters())
+    )
+    search_results.save.assert_called_once_with(
+        "analytics-id",
+        {
+            "query": "test",
+            "org_id": 1,
+            "deployment_id": "test-uuid",
+            "ids": [1, 4],
+        },
+    )
+
+
+def test_semantic_search_without_search_results_does_not_search_best():
+    embed_mock = Mock()
+    embed_mock.embed.return_value = [[0.2, 0.3]]
+    repository = Mock()
+    repository.search.return_value = ([Mock(id=3)], [0.1])
+    search_results = Mock(enabled=False)
+    audit_mock = Mock()
+    audit_mock.is_agent.return_value = False
+    config_svc_mock, connectors_svc_mock = create_widget_valid_items()
+
+    semantic_search_service = SemanticSearchService(
+        embed_mock,
+        repository,
+        Mock(),
+        connectors_svc_mock,
+        config_svc_mock,
+        Mock(),
+        audit_mock,
+        search_results=search_results,
+    )
+    semantic_search_service.search(
+        search="test",
+        org_id=1,
+        deployment_id="test-uuid",
+        filters=SearchFilters(),
+        limit=5,
+    )
+
+    repository.search_best.assert_not_called()
+    search_results.save.assert_not_called()
+
+
+def _search_result(**kwargs):
+    return {
+        "query": "query",
+        "org_id": 1,
+        "deployment_id": "deploy-uuid",
+        "ids": [2, 1],
+        **kwargs,
+    }
+
+
+def test_handle_with_search_id_summarizes_search_result():
+    (
+        mock_embedder,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    search_results = Mock()
+    search_results.get.return_value = _search_result()
+    summarize_answer_service._search_results = search_results
+    item1 = Mock(id=1, snippet="text1")
+    item1.to_dict.return_value = {"text": "text1"}
+    item2 = Mock(id=2, snippet="text2")
+    item2.to_dict.return_value = {"text": "text2"}
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = [
+        item1,
+        item2,
+    ]
+    mock_summarizer.summarize.return_value = "summarized_answer"
+
+    result = summarize_answer_service.handle(
+        "query", 1, "deploy-uuid", search_id="analytics-id"
+    )
+
+    assert result["answer"] == "summarized_answer"
+    assert result["options"] == [{"text": "text2"}, {"text": "text1"}]
+    search_results.get.assert_called_once_with("analytics-id")
+    mock_summarizer.summarize.assert_called_once_with(
+        ["text2", "text1"], "query"
+    )
+    mock_embedder.embed.assert_not_called()
+    mock_items_repository.search_best.assert_not_called()
+    summarize_answer_service._config_svc_repository.get_search_widget_by_deployment_id.assert_not_called()  # noqa: E501
+
+
+@pytest.mark.parametrize(
+    "search_result",
+    [
+        None,
+        _search_result(query="another query"),
+        _search_result(org_id=2),
+        _search_result(deployment_id="another-uuid"),
+    ],
+)
+def test_handle_with_unusable_search_id_searches_again(search_result):
+    (
+        mock_embedder,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    search_results = Mock()
+    search_results.get.return_value = search_result
+    summarize_answer_service._search_results = search_results
+    mock_embedder.embed.return_value = [[0.2, 0.3]]
+    mock_items_repository.search_best.return_value = []
+
+    summarize_answer_service.handle(
+        "query", 1, "deploy-uuid", search_id="analytics-id"
+    )
+
+    mock_embedder.embed.assert_called_once_with("query")
+    mock_items_repository.find_semantic_search_items_by_ids.assert_not_called()
+    mock_items_repository.search_best.assert_called_once_with(
+        [0.2, 0.3], 1, filters=ANY, version=None
+    )
+
+
+def test_handle_with_search_id_without_results_does_not_search_again():
+    (
+        mock_embedder,
+        _,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    search_results = Mock()
+    search_results.get.return_value = _search_result(ids=[])
+    summarize_answer_service._search_results = search_results
+
+    result = summarize_answer_service.handle(
+        "query", 1, "deploy-uuid", search_id="analytics-id"
+    )
+
+    assert result["answer"] == "There is no context to answer this question."
+    mock_embedder.embed.assert_not_called()
+    mock_items_repository.search_best.assert_not_called()
+
+
+def test_semantic_search_submits_speculative_summary():
+    embed_mock = Mock()
+    embed_mock.embed.return_value = [[0.2, 0.3]]
+    repository = Mock()
+    repository.search.return_value = ([Mock(id=9)], [0.1])
+    repository.search_best.return_value = [
+        Mock(id=i, document_id=i // 2, snippet=f"text{i}") for i in range(5)
+    ]
+    speculative_summaries = Mock()
+    speculative_summaries.enabled_for.return_value = True
+    audit_mock = Mock()
+    audit_mock.is_agent.return_value = False
+    config_svc_mock, connectors_svc_mock = create_widget_valid_items()
+
+    semantic_search_service = SemanticSearchService(
+        embed_mock,
+        repository,
+        Mock(),
+        connectors_svc_mock,
+        config_svc_mock,
+        Mock(),
+        audit_mock,
+        speculative_summaries=speculative_summaries,
+    )
+    semantic_search_service.search(
+        search="test",
+        org_id=1,
+        deployment_id="test-uuid",
+        filters=SearchFilters(),
+        limit=10,
+    )
+
+    speculative_summaries.submit.assert_called_once_with(
+        1, "test-uuid", "test", [(i, i // 2, f"text{i}") for i in range(5)]
+    )
+
+
+@pytest.mark.parametrize(
+    "enabled, speculative_answer, answer",
+    [
+        (True, "speculative_answer", "speculative_answer"),
+        (True, None, "summarized_answer"),
+        (False, "speculative_answer", "summarized_answer"),
+    ],
+)
+def test_handle_uses_speculative_summary(enabled, speculative_answer, answer):
+    (
+        _,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    speculative_summaries = Mock()
+    speculative_summaries.enabled_for.return_value = enabled
+    speculative_summaries.get.return_value = speculative_answer
+    summarize_answer_service._speculative_summaries = speculative_summaries
+    item = Mock(id=1, snippet="text1")
+    item.to_dict.return_value = {"text": "text1"}
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = [
+        item
+    ]
+    mock_summarizer.summarize.return_value = "summarized_answer"
+
+    result = summarize_answer_service.handle("query", 1, "deploy-uuid", [1])
+
+    assert result["answer"] == answer
+    speculative_summaries.enabled_for.assert_called_once_with("deploy-uuid")
+    if enabled:
+        speculative_summaries.get.assert_called_once_with(1, "query", [1])
+    assert mock_summarizer.summarize.called == (answer != speculative_answer)
+
+
+def test_handle_stream_streams_summarized_answer():
+    (
+        _,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    item = Mock(id=1, snippet="text1")
+    item.to_dict.return_value = {"text": "text1"}
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = [
+        item
+    ]
+    mock_summarizer.summarize_stream.return_value = iter(["sum", "mary"])
+
+    options, answer = summarize_answer_service.handle_stream(
+        "query", 1, "deploy-uuid", [1]
+    )
+
+    assert options == [{"text": "text1"}]
+    assert list(answer) == ["sum", "mary"]
+    mock_summarizer.summarize_stream.assert_called_once_with(
+        ["text1"], "query"
+    )
+    mock_summarizer.summarize.assert_not_called()
+
+
+def test_handle_stream_sends_speculative_summary_at_once():
+    (
+        _,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    speculative_summaries = Mock()
+    speculative_summaries.enabled_for.return_value = True
+    speculative_summaries.get.return_value = "speculative_answer"
+    summarize_answer_service._speculative_summaries = speculative_summaries
+    item = Mock(id=1, snippet="text1")
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = [
+        item
+    ]
+
+    _, answer = summarize_answer_service.handle_stream(
+        "query", 1, "deploy-uuid", [1]
+    )
+
+    assert list(answer) == ["speculative_answer"]
+    mock_summarizer.summarize_stream.assert_not_called()
+
+
+def test_handle_stream_with_empty_options_returns_error_message():
+    (
+        mock_embedder,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    mock_embedder.embed.return_value = ["embeddings1", "embeddings2"]
+    mock_items_repository.search_best.return_value = []
+
+    options, answer = summarize_answer_service.handle_stream(
+        "query", 1, "deploy-uuid"
+    )
+
+    assert options == []
+    assert list(answer) == ["There is no context to answer this question."]
+    mock_summarizer.summarize_stream.assert_not_called()
+
+
+def test_handle_packs_context_into_summarizer_budget():
+    (
+        _,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    mock_summarizer.context_max_tokens = 10
+    items = [
+        Mock(id=1, document_id=1, snippet="Closest. Overlap."),
+        Mock(id=2, document_id=1, snippet="Overlap. Second."),
+        Mock(id=3, document_id=2, snippet="Beyond the budget of tokens."),
+    ]
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = (
+        items
+    )
+    mock_summarizer.summarize.return_value = "summarized_answer"
+
+    summarize_answer_service.handle("query", 1, "deploy-uuid", [1, 2, 3])
+
+    mock_summarizer.summarize.assert_called_once_with(
+        ["Closest. Overlap.", "Second."], "query"
+    )
+
+
+def test_submit_job_summarizes_options_in_job():
+    (
+        _,
+        mock_summarizer,
+        mock_items_repository,
+        summarize_answer_service,
+    ) = setup_summarize_mocks()
+    summarize_jobs = Mock()
+    summarize_jobs.submit.return_value = {"id": "job", "status": "pending"}
+    summarize_answer_service._summarize_jobs = summarize_jobs
+    item = Mock(id=1, document_id=1, snippet="text1")
+    item.to_dict.return_value = {"id": 1, "snippet": "text1"}
+    mock_items_repository.find_semantic_search_items_by_ids.return_value = [
+        item
+    ]
+    mock_summarizer.summarize.return_value = "summarized_answer"
+
+    job = summarize_answer_service.submit_job("query", 1, "deploy-uuid", [1])
+
+    assert job == {"id": "job", "status": "pending"}
+    org_id, query, options, generate = summarize_jobs.submit.call_args.args
+    assert (org_id, query, options) == (
+        1,
+        "query",
+        [{"id": 1, "snippet": "text1"}],
+    )
+    mock_summarizer.summarize.assert_not_called()
+    assert generate() == "summarized_answer"
+    mock_summarizer.summarize.assert_called_once_with(["text1"], "query")
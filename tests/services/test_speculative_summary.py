@@ -0,0 +1,176 @@
+import time
+from threading import Event, Timer
+from unittest.mock import Mock
+
+import pytest
+from fakeredis import FakeRedis
+
+from src.core.deps.metrics import get_metrics
+from src.services.speculative_summary import SpeculativeSummaryService
+from src.util.cache import RedisCache
+
+OPTIONS = [(2, 1, "snippet2"), (1, 1, "snippet1")]
+
+
+class BlockingSummarizer:
+    context_max_tokens = 0
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.started = Event()
+        self.release = Event()
+
+    def summarize(self, context, question):
+        self.calls.append((context, question))
+        self.started.set()
+        self.release.wait(5)
+        return f"summary of {question}"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_metrics().reset()
+    yield
+    get_metrics().reset()
+
+
+def _service(summarizer, **kwargs):
+    kwargs.setdefault("deployments", ["deploy-uuid"])
+    return SpeculativeSummaryService(
+        lambda: summarizer, RedisCache(FakeRedis()), **kwargs
+    )
+
+
+def _wait_done(service):
+    deadline = time.monotonic() + 5
+    while service._running and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def _counter(name):
+    return get_metrics().counter_value(f"speculative_summaries_{name}")
+
+
+def test_running_summary_is_waited_for():
+    summarizer = BlockingSummarizer()
+    service = _service(summarizer)
+
+    assert service.submit(1, "deploy-uuid", "query", OPTIONS)
+    summarizer.started.wait(5)
+    Timer(0.05, summarizer.release.set).start()
+
+    assert service.get(1, "query", [2, 1]) == "summary of query"
+    # Then read from the cache, whatever the order of the options
+    assert service.get(1, "query", [1, 2]) == "summary of query"
+    assert summarizer.calls == [(["snippet2", "snippet1"], "query")]
+    assert _counter("hits") == 2
+
+
+def test_other_query_or_org_is_a_miss():
+    summarizer = BlockingSummarizer()
+    summarizer.release.set()
+    service = _service(summarizer)
+    service.submit(1, "deploy-uuid", "query", OPTIONS)
+    _wait_done(service)
+
+    assert service.get(1, "another query", [2, 1]) is None
+    assert service.get(2, "query", [2, 1]) is None
+    assert service.get(1, "query", [2]) is None
+    assert _counter("misses") == 3
+
+
+def test_only_enabled_widgets_are_summarized():
+    summarizer = BlockingSummarizer()
+    service = _service(summarizer)
+
+    assert not service.submit(1, "another-uuid", "query", OPTIONS)
+    assert not service.submit(1, "deploy-uuid", "query", [])
+    assert service.enabled_for("deploy-uuid")
+    assert not service.enabled_for("another-uuid")
+    assert _service(summarizer, deployments=["*"]).enabled_for("any-uuid")
+
+
+def test_same_search_is_summarized_once():
+    summarizer = BlockingSummarizer()
+    service = _service(summarizer)
+
+    try:
+        assert service.submit(1, "deploy-uuid", "query", OPTIONS)
+        assert not service.submit(1, "deploy-uuid", "query", OPTIONS[::-1])
+    finally:
+        summarizer.release.set()
+    _wait_done(service)
+    assert not service.submit(1, "deploy-uuid", "query", OPTIONS)
+    assert len(summarizer.calls) == 1
+
+
+def test_searches_over_max_pending_are_dropped():
+    summarizer = BlockingSummarizer()
+    service = _service(summarizer, workers=1, max_pending=1)
+
+    try:
+        assert service.submit(1, "deploy-uuid", "query", OPTIONS)
+        assert not service.submit(1, "deploy-uuid", "other", OPTIONS)
+    finally:
+        summarizer.release.set()
+    assert _counter("dropped") == 1
+
+
+def test_summary_not_started_is_cancelled_when_asked_for():
+    summarizer = BlockingSummarizer()
+    service = _service(summarizer, workers=1)
+
+    try:
+        service.submit(1, "deploy-uuid", "first", OPTIONS)
+        summarizer.started.wait(5)
+        service.submit(1, "deploy-uuid", "second", OPTIONS)
+
+        assert service.get(1, "second", [1, 2]) is None
+    finally:
+        summarizer.release.set()
+    assert service.get(1, "first", [1, 2]) == "summary of first"
+    assert [call[1] for call in summarizer.calls] == ["first"]
+    assert _counter("cancelled") == 1
+    # The cancelled summary does not hold its place
+    assert service.submit(1, "deploy-uuid", "second", OPTIONS)
+
+
+def test_summary_waiting_too_long_expires():
+    summarizer = BlockingSummarizer()
+    summarizer.release.set()
+    clock = Mock(side_effect=[0.0, 11.0])
+    service = _service(summarizer, max_delay=10.0, clock=clock)
+
+    service.submit(1, "deploy-uuid", "query", OPTIONS)
+    _wait_done(service)
+
+    assert service.get(1, "query", [1, 2]) is None
+    assert summarizer.calls == []
+    assert _counter("expired") == 1
+
+
+def test_summaries_are_capped_per_org():
+    summarizer = BlockingSummarizer()
+    summarizer.release.set()
+    service = _service(summarizer, org_limit=1)
+
+    for org_id, query in ((1, "first"), (1, "second"), (2, "second")):
+        service.submit(org_id, "deploy-uuid", query, OPTIONS)
+        _wait_done(service)
+
+    assert service.get(1, "first", [1, 2]) == "summary of first"
+    assert service.get(1, "second", [1, 2]) is None
+    assert service.get(2, "second", [1, 2]) == "summary of second"
+    assert _counter("capped") == 1
+
+
+def test_failed_summary_is_a_miss():
+    summarizer = Mock(context_max_tokens=0)
+    summarizer.summarize.side_effect = RuntimeError("endpoint down")
+    service = _service(summarizer)
+
+    service.submit(1, "deploy-uuid", "query", OPTIONS)
+    _wait_done(service)
+
+    assert service.get(1, "query", [1, 2]) is None
+    assert _counter("failures") == 1
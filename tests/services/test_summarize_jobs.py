@@ -0,0 +1,172 @@
+import asyncio
+import time
+from threading import Event
+from unittest.mock import Mock
+
+import pytest
+from fakeredis import FakeRedis
+
+from src.core.deps.metrics import get_metrics
+from src.exceptions.summarizer import SummarizeJobsBusyException
+from src.services.summarize_jobs import SummarizeJobService
+from src.util.cache import RedisCache
+
+OPTIONS = [{"id": 2, "snippet": "snippet2"}, {"id": 1, "snippet": "snippet1"}]
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_metrics().reset()
+    yield
+    get_metrics().reset()
+
+
+def _service(cache=None, **kwargs):
+    kwargs.setdefault("poll_interval", 0.01)
+    return SummarizeJobService(cache or RedisCache(FakeRedis()), **kwargs)
+
+
+def _wait_status(service, job_id, org_id=1):
+    deadline = time.monotonic() + 5
+    job = service.get(job_id, org_id)
+    while job["status"] == "pending" and time.monotonic() < deadline:
+        time.sleep(0.001)
+        job = service.get(job_id, org_id)
+    return job
+
+
+def _counter(name):
+    return get_metrics().counter_value(f"summarize_jobs_{name}")
+
+
+def test_job_is_generated_in_background():
+    release = Event()
+
+    def generate():
+        release.wait(5)
+        return "answer"
+
+    service = _service()
+    job = service.submit(1, "query", OPTIONS, generate)
+
+    assert job["status"] == "pending"
+    assert service.get(job["id"], 1)["status"] == "pending"
+    release.set()
+    job = _wait_status(service, job["id"])
+    assert job["status"] == "done"
+    assert job["answer"] == "answer"
+    assert job["options"] == OPTIONS
+    assert _counter("completed") == 1
+
+
+def test_same_job_is_generated_once_across_services():
+    cache = RedisCache(FakeRedis())
+    release = Event()
+    generate = Mock(side_effect=lambda: release.wait(5) and "answer")
+    service, other = _service(cache), _service(cache)
+
+    job = service.submit(1, "query", OPTIONS, generate)
+    same = other.submit(1, "query", OPTIONS[::-1], generate)
+    release.set()
+
+    assert same["id"] == job["id"]
+    assert _wait_status(other, job["id"])["answer"] == "answer"
+    assert other.submit(1, "query", OPTIONS, generate)["status"] == "done"
+    assert generate.call_count == 1
+    assert _counter("deduplicated") == 2
+
+
+def test_job_of_another_org_is_not_found():
+    service = _service()
+    job = service.submit(1, "query", OPTIONS, lambda: "answer")
+
+    assert service.get(job["id"], 2) is None
+    assert service.get("unknown", 1) is None
+    assert service.submit(2, "query", OPTIONS, lambda: "answer")["id"] != (
+        job["id"]
+    )
+
+
+def test_jobs_over_max_pending_are_rejected():
+    release = Event()
+    service = _service(workers=1, max_pending=1)
+
+    try:
+        service.submit(1, "first", OPTIONS, lambda: release.wait(5))
+        with pytest.raises(SummarizeJobsBusyException):
+            service.submit(1, "second", OPTIONS, lambda: "answer")
+    finally:
+        release.set()
+    assert _counter("rejected") == 1
+
+
+def test_failed_job_is_generated_again_when_submitted_again():
+    service = _service()
+    generate = Mock(side_effect=[RuntimeError("endpoint down"), "answer"])
+
+    job = service.submit(1, "query", OPTIONS, generate)
+    assert _wait_status(service, job["id"])["status"] == "failed"
+
+    service.submit(1, "query", OPTIONS, generate)
+    assert _wait_status(service, job["id"])["answer"] == "answer"
+    assert _counter("failures") == 1
+
+
+def test_wait_returns_job_once_done():
+    release = Event()
+    service = _service()
+    job = service.submit(
+        1, "query", OPTIONS, lambda: release.wait(5) and "answer"
+    )
+
+    async def poll():
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        return await service.wait(job["id"], 1, timeout=5)
+
+    assert asyncio.run(poll())["answer"] == "answer"
+
+
+def test_wait_returns_pending_job_after_timeout():
+    release = Event()
+    service = _service()
+    try:
+        job = service.submit(
+            1, "query", OPTIONS, lambda: release.wait(5) and "answer"
+        )
+
+        start = time.monotonic()
+        job = asyncio.run(service.wait(job["id"], 1, timeout=0.05))
+
+        assert job["status"] == "pending"
+        assert 0.05 <= time.monotonic() - start < 1
+        assert asyncio.run(service.wait("unknown", 1, timeout=5)) is None
+    finally:
+        release.set()
+
+
+def test_wait_reads_job_off_the_event_loop():
+    cache = RedisCache(FakeRedis())
+    service = _service(cache)
+    job = service.submit(1, "query", OPTIONS, lambda: "answer")
+    _wait_status(service, job["id"])
+    read = cache.get
+    cache.get = lambda key: time.sleep(0.2) or read(key)
+
+    async def poll():
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        done = await service.wait(job["id"], 1, timeout=5)
+        ticker.cancel()
+        return done, len(ticks)
+
+    done, ticks = asyncio.run(poll())
+
+    assert done["answer"] == "answer"
+    # The loop kept running during the slow read
+    assert ticks >= 5
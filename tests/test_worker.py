@@ -0,0 +1,74 @@
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+
+from src.worker import app, on_startup, shutdown_event
+
+client = TestClient(app)
+
+
+def test_get_health(make_success_response_plain):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == make_success_response_plain(
+        status="ok",
+        version="v1",
+        release="test",
+    )
+
+
+@patch("src.worker.container")
+def test_get_health_consumer_stopped(container_mock):
+    container_mock.kafka_consumer().running = False
+
+    response = client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json()["error"] is True
+    assert response.json()["data"]["status"] == "consumer-stopped"
+
+
+@patch("src.worker.get_metrics")
+def test_get_metrics(get_metrics_mock):
+    get_metrics_mock.return_value.snapshot.return_value = {
+        "counters": {"kafka_consumer_processed{partition=0,topic=t}": 1},
+        "gauges": {},
+        "summaries": {},
+    }
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["counters"] == {
+        "kafka_consumer_processed{partition=0,topic=t}": 1
+    }
+
+
+@patch("src.worker.subscribe_embed_jobs")
+@patch("src.worker.container")
+def test_startup_and_shutdown(container_mock, subscribe_mock):
+    consumer = Mock()
+    producer = Mock()
+    container_mock.kafka_consumer.return_value = consumer
+    container_mock.kafka_producer.return_value = producer
+
+    on_startup()
+    subscribe_mock.assert_called_once_with(consumer, producer)
+    consumer.start.assert_called_once_with()
+
+    shutdown_event()
+    consumer.close.assert_called_once_with()
+    producer.close.assert_called_once_with()
+
+
+@patch("src.worker.container")
+def test_invalidate_connectors(container_mock):
+    resolver = container_mock.connector_resolver.return_value
+    resolver.invalidate.return_value = 2
+
+    response = client.delete("/connectors/cache?org_id=11")
+
+    assert response.status_code == 200
+    assert response.json() == {"invalidated": 2}
+    resolver.invalidate.assert_called_once_with(11, None)
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 
+import pytest
 from fakeredis import FakeRedis
 
 from src.util.cache import Cache, RedisCache
@@ -36,3 +37,23 @@ def test_redis_cache_crud():
     # Delete the key.
     delete_result = cache.delete("key")
     assert delete_result == 1
+
+
+@pytest.mark.parametrize("version", [6, 7])
+def test_redis_cache_incr_sets_ttl_once(version):
+    client = FakeRedis(version=version)
+    cache = RedisCache(client)
+
+    assert cache.incr("counter", 60) == 1
+    client.expire("ai-service-test:counter", 10)
+    assert cache.incr("counter", 60) == 2
+    assert 0 < client.ttl("ai-service-test:counter") <= 10
+
+
+def test_redis_cache_incr_without_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client)
+
+    assert cache.incr("counter") == 1
+    assert cache.incr("counter") == 2
+    assert client.ttl("ai-service-test:counter") == -1
@@ -0,0 +1,46 @@
+from src.util.coalescer import Coalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_add_keeps_latest_item_per_key():
+    coalescer = Coalescer(5, clock=FakeClock())
+
+    assert coalescer.add("a", 1) is None
+    assert coalescer.add("b", 2) is None
+    assert coalescer.add("a", 3) == 1
+    assert len(coalescer) == 2
+
+
+def test_pop_expired_does_not_extend_window():
+    clock = FakeClock()
+    coalescer = Coalescer(5, clock=clock)
+
+    coalescer.add("a", 1)
+    clock.now = 3
+    coalescer.add("b", 2)
+    coalescer.add("a", 3)
+    assert coalescer.pop_expired() == []
+
+    clock.now = 5
+    assert coalescer.pop_expired() == [3]
+
+    clock.now = 8
+    assert coalescer.pop_expired() == [2]
+    assert len(coalescer) == 0
+
+
+def test_pop_all_and_discard():
+    coalescer = Coalescer(5, clock=FakeClock())
+    for key, item in [("a", 1), ("b", 2), ("c", 3)]:
+        coalescer.add(key, item)
+
+    assert coalescer.discard(lambda item: item == 2) == [2]
+    assert coalescer.pop_all() == [1, 3]
+    assert len(coalescer) == 0
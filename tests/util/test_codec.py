@@ -0,0 +1,76 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from src.util import codec
+from src.util.codec import (
+    CodecJSONResponse,
+    JSONCodec,
+    ORJSONCodec,
+    get_codec,
+)
+
+VALUE = {"name": "Réponse", "ids": [1, 2], "score": 0.5, "ok": True}
+
+requires_orjson = pytest.mark.skipif(
+    codec.orjson is None, reason="orjson is not installed"
+)
+
+
+@pytest.mark.parametrize(
+    "json_codec",
+    [JSONCodec(), pytest.param(ORJSONCodec(), marks=requires_orjson)],
+)
+def test_codecs_encode_compact_utf8(json_codec):
+    encoded = json_codec.dumps(VALUE)
+
+    assert encoded == ('{"name":"Réponse","ids":[1,2],"score":0.5,"ok":true}')
+    assert json_codec.dumpb(VALUE) == encoded.encode("utf-8")
+    assert json_codec.loads(encoded) == VALUE
+    assert json_codec.loads(encoded.encode("utf-8")) == VALUE
+
+
+@requires_orjson
+def test_orjson_codec_falls_back_on_unsupported_values():
+    assert ORJSONCodec().dumps({"big": 2**70}) == '{"big":%d}' % 2**70
+
+    with pytest.raises(TypeError):
+        ORJSONCodec().dumps({"amount": Decimal("1.0")})
+
+
+def test_get_codec():
+    assert get_codec("json").name == "json"
+
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+@requires_orjson
+def test_get_codec_defaults_to_orjson():
+    get_codec.cache_clear()
+    assert get_codec().name == "orjson"
+    assert get_codec("orjson").name == "orjson"
+
+
+@patch("src.util.codec.orjson", None)
+def test_get_codec_without_orjson():
+    get_codec.cache_clear()
+    try:
+        assert get_codec("auto").name == "json"
+        with pytest.raises(ValueError):
+            get_codec("orjson")
+    finally:
+        get_codec.cache_clear()
+
+
+def test_module_functions_use_configured_codec():
+    assert codec.loads(codec.dumps(VALUE)) == VALUE
+    assert codec.loads(codec.dumpb(VALUE)) == VALUE
+
+
+def test_response_renders_with_codec():
+    response = CodecJSONResponse({"answer": "Réponse"})
+
+    assert response.body == '{"answer":"Réponse"}'.encode("utf-8")
+    assert response.media_type == "application/json"
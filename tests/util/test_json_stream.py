@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from src.util.json_stream import JSONStream, iter_text
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]  # noqa
+
+
+def _walk(stream: JSONStream) -> any:
+    kind = stream.peek_type()
+    if kind is dict:
+        return {key: _walk(stream) for key in stream.iter_object()}
+    if kind is list:
+        return [_walk(stream) for _ in stream.iter_array()]
+    if kind is str:
+        return "".join(stream.iter_string())
+    return stream.read_value()
+
+
+DOCUMENT = {
+    "id": 12345678901234567890,
+    "ratio": -1.5e-3,
+    "flags": [True, False, None, [], {}],
+    "text": 'Café "quoted" \\ back\nslash 😀 \ud800 end',
+    "nested": {"a": [1, {"b": "c"}], "": ""},
+}
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_walk_rebuilds_the_document(size, ensure_ascii):
+    text = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii, indent=1)
+
+    assert _walk(JSONStream(_chunks(text, size))) == DOCUMENT
+
+
+def test_read_value_builds_one_member():
+    stream = JSONStream(_chunks(json.dumps(DOCUMENT), 3))
+
+    keys = []
+    for key in stream.iter_object():
+        keys.append(key)
+        if key == "nested":
+            assert stream.read_value() == DOCUMENT["nested"]
+        else:
+            stream.skip_value()
+
+    assert keys == list(DOCUMENT)
+
+
+def test_iter_string_yields_pieces():
+    text = json.dumps("x" * 100)
+
+    pieces = list(JSONStream(_chunks(text, 10)).iter_string())
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == "x" * 100
+
+
+def test_iter_text_decodes_split_characters():
+    data = json.dumps({"a": "é😀"}, ensure_ascii=False).encode("utf-8")
+    chunks = [data[i : i + 1] for i in range(len(data))]  # noqa
+
+    assert JSONStream(iter_text(chunks)).read_value() == {"a": "é😀"}
+
+
+@pytest.mark.parametrize(
+    "text", ['{"a": 1', '{"a" 1}', '"abc', '"\\x"', "[1 2]", "{1: 2}"]
+)
+def test_invalid_documents_raise(text):
+    with pytest.raises(json.JSONDecodeError):
+        _walk(JSONStream(_chunks(text, 2)))
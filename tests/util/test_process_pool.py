@@ -0,0 +1,63 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+from src.util.process_pool import ProcessPool
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _pid(_: int) -> int:
+    return os.getpid()
+
+
+def test_disabled_pool_runs_in_thread():
+    pool = ProcessPool(workers=0)
+
+    assert not pool.enabled
+    assert pool.map(_pid, range(4)) == [os.getpid()] * 4
+    assert pool.run(_square, 3) == 9
+    assert pool._executor is None
+
+
+def test_map_keeps_the_order_of_the_items():
+    pool = ProcessPool(workers=2, chunk_size=3)
+    try:
+        assert pool.map(_square, range(50)) == [i * i for i in range(50)]
+        assert os.getpid() not in pool.map(_pid, range(4))
+        assert pool.run(_square, 4) == 16
+    finally:
+        pool.shutdown()
+
+
+def test_few_items_are_not_sent_to_processes():
+    pool = ProcessPool(workers=2, min_items=10)
+
+    assert pool.map(_pid, range(3)) == [os.getpid()] * 3
+    assert pool._executor is None
+
+
+def test_negative_workers_use_every_cpu():
+    with patch("src.util.process_pool.os.cpu_count", return_value=6):
+        assert ProcessPool(workers=-1)._workers == 6
+
+
+def test_broken_pool_falls_back_to_thread():
+    pool = ProcessPool(workers=2)
+    with patch.object(pool, "_get_executor") as get_executor:
+        get_executor.return_value.map.side_effect = BrokenProcessPool()
+
+        assert pool.map(_square, range(3)) == [0, 1, 4]
+
+
+def test_shutdown_disables_the_pool():
+    pool = ProcessPool(workers=2)
+    pool.map(_square, range(4))
+
+    pool.shutdown()
+
+    assert not pool.enabled
+    assert pool._executor is None
+    assert pool.map(_pid, range(3)) == [os.getpid()] * 3
@@ -5,7 +5,7 @@ import boto3
 import pytest
 from moto import mock_aws
 
-from src.util.storage import S3Storage
+from src.util.storage import PassThroughStorage, S3Storage
 
 
 # ----------------------------------------------
@@ -26,6 +26,21 @@ def test_get_file():
     assert s3_storage.get_file("fake") == '{"message": "readme"}'
 
 
+@mock_aws
+def test_iter_file_chunks():
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket="test-bucket")
+    s3.put_object(Bucket="test-bucket", Key="fake", Body=b"0123456789")
+
+    s3_storage = S3Storage(s3, "test-bucket")
+
+    assert list(s3_storage.iter_file_chunks("/fake", chunk_size=4)) == [
+        b"0123",
+        b"4567",
+        b"89",
+    ]
+
+
 @patch("src.util.storage.S3Storage.get_file")
 def test_get_json(mocked_get_file):
     mocked_get_file.return_value = '{"message": "readme"}'
@@ -60,7 +75,7 @@ def test_put_json(mocked_put_file):
     s3_storage.put_json("fake", {"message": "readme"})
 
     mocked_put_file.assert_called_once_with(
-        "fake", '{"message": "readme"}', None
+        "fake", '{"message":"readme"}', None
     )
 
 
@@ -85,6 +100,39 @@ def test_list_files():
     assert s3_storage.list_files(prefix="fake2") == ["fake2/fake"]
 
 
+@mock_aws
+def test_list_files_paginates():
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket="test-bucket")
+    keys = [f"fake/{i:04d}" for i in range(1005)]
+    for key in keys:
+        s3.put_object(Bucket="test-bucket", Key=key, Body="")
+
+    s3_storage = S3Storage(s3, "test-bucket")
+
+    assert s3_storage.list_files() == keys
+
+
+@mock_aws
+def test_iter_files_starts_after_key():
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket="test-bucket")
+    for key in ["a/1", "a/2", "a/3", "b/1"]:
+        s3.put_object(Bucket="test-bucket", Key=key, Body="")
+
+    s3_storage = S3Storage(s3, "test-bucket")
+
+    assert list(s3_storage.iter_files(prefix="a/", start_after="a/1")) == [
+        "a/2",
+        "a/3",
+    ]
+
+
+def test_iter_files_without_bucket_raises_():
+    with pytest.raises(ValueError):
+        S3Storage(Mock()).iter_files()
+
+
 def test_list_files_without_bucket_raises_():
     with pytest.raises(ValueError):
         s3_storage = S3Storage(Mock())
@@ -92,3 +140,85 @@ def test_list_files_without_bucket_raises_():
     with pytest.raises(ValueError):
         s3_storage = S3Storage(Mock())
         s3_storage.list_files(prefix="fake2")
+
+
+# ----------------------------------------------
+# PassThroughStorage
+# ----------------------------------------------
+def test_pass_through_get_json_returns_written_object():
+    storage = Mock()
+    uploader = Mock()
+    pass_through = PassThroughStorage(storage, uploader)
+    data = {"message": "readme"}
+
+    pass_through.put_json("/silver/fake.json", data, "bucket")
+
+    assert pass_through.get_json("silver/fake.json", "bucket") is data
+    assert pass_through.get_file("silver/fake.json", "bucket") == (
+        '{"message":"readme"}'
+    )
+    storage.get_json.assert_not_called()
+    storage.put_json.assert_not_called()
+    uploader.put_json.assert_called_once_with(
+        "/silver/fake.json", data, "bucket"
+    )
+
+
+def test_pass_through_reads_unknown_files_from_storage():
+    storage = Mock()
+    storage.get_json.return_value = {"message": "readme"}
+    pass_through = PassThroughStorage(storage)
+
+    pass_through.put_file("other.json", '{"a": 1}', "bucket")
+
+    assert pass_through.get_json("fake.json", "bucket") == {
+        "message": "readme"
+    }
+    assert pass_through.get_json("other.json", "bucket") == {"a": 1}
+    storage.get_json.assert_called_once_with("fake.json", "bucket")
+    storage.put_file.assert_not_called()
+
+
+def test_pass_through_delete_file():
+    storage = Mock()
+    uploader = Mock()
+    pass_through = PassThroughStorage(storage, uploader)
+    pass_through.put_json("fake.json", {}, "bucket")
+
+    pass_through.delete_file("fake.json", "bucket")
+
+    uploader.delete_file.assert_called_once_with("fake.json", "bucket")
+    storage.delete_file.assert_not_called()
+    pass_through.get_json("fake.json", "bucket")
+    storage.get_json.assert_called_once_with("fake.json", "bucket")
+
+    # Without uploader files are deleted right away
+    PassThroughStorage(storage).delete_file("fake.json", "bucket")
+    storage.delete_file.assert_called_once_with("fake.json", "bucket")
+
+
+def test_pass_through_iter_files_delegates():
+    storage = Mock()
+    storage.iter_files.return_value = iter(["a/2"])
+
+    pass_through = PassThroughStorage(storage)
+
+    assert list(pass_through.iter_files("bucket", "a/", "a/1")) == ["a/2"]
+    storage.iter_files.assert_called_once_with("bucket", "a/", "a/1")
+
+
+def test_pass_through_iter_file_chunks():
+    storage = Mock()
+    storage.iter_file_chunks.return_value = iter([b"{}"])
+    pass_through = PassThroughStorage(storage)
+    pass_through.put_json("fake.json", {"message": "é"}, "bucket")
+
+    assert list(pass_through.iter_file_chunks("fake.json", "bucket")) == [
+        '{"message":"é"}'.encode("utf-8")
+    ]
+    assert list(pass_through.iter_file_chunks("other.json", "bucket")) == [
+        b"{}"
+    ]
+    storage.iter_file_chunks.assert_called_once_with(
+        "other.json", "bucket", 65536
+    )
@@ -0,0 +1,52 @@
+from unittest.mock import Mock
+
+from src.util.uploader import BackgroundUploader
+
+
+def test_put_json_serializes_immediately():
+    storage = Mock()
+    uploader = BackgroundUploader(storage, workers=2)
+    data = {"message": "readme"}
+
+    uploader.put_json("fake.json", data, "bucket")
+    data["message"] = "changed"
+    assert uploader.flush(timeout=5)
+    uploader.close()
+
+    storage.put_file.assert_called_once_with(
+        "fake.json", '{"message":"readme"}', "bucket"
+    )
+
+
+def test_operations_on_a_file_keep_their_order():
+    calls = []
+    storage = Mock()
+    storage.put_file.side_effect = lambda key, data, bucket: calls.append(
+        ("put", key, data)
+    )
+    storage.delete_file.side_effect = lambda key, bucket: calls.append(
+        ("delete", key)
+    )
+    uploader = BackgroundUploader(storage, workers=4)
+
+    for i in range(10):
+        uploader.put_file("a.json", str(i), "bucket")
+    uploader.delete_file("/a.json", "bucket")
+    assert uploader.flush(timeout=5)
+    uploader.close()
+
+    assert calls == [("put", "a.json", str(i)) for i in range(10)] + [
+        ("delete", "/a.json")
+    ]
+
+
+def test_failures_are_logged(check_log_message):
+    storage = Mock()
+    storage.put_file.side_effect = ValueError("boom")
+    uploader = BackgroundUploader(storage)
+
+    uploader.put_file("fake.json", "data", "bucket")
+    assert uploader.flush(timeout=5)
+    uploader.close()
+
+    check_log_message("ERROR", "Background put of fake.json failed: boom")
@@ -0,0 +1,189 @@
+import threading
+import time
+
+from src.util.worker_pool import KeyedWorkerPool
+
+
+def test_submit_keeps_order_per_key():
+    pool = KeyedWorkerPool(3, 100)
+    pool.start()
+    processed = []
+    lock = threading.Lock()
+
+    def work(key, value):
+        time.sleep(0.001)
+        with lock:
+            processed.append((key, value))
+
+    for value in range(20):
+        for key in ["a", "b", "c", "d"]:
+            pool.submit(key, work, key, value)
+
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()
+
+    for key in ["a", "b", "c", "d"]:
+        assert [v for k, v in processed if k == key] == list(range(20))
+
+
+def test_different_keys_run_concurrently():
+    pool = KeyedWorkerPool(2, 10)
+    pool.start()
+    barrier = threading.Barrier(2, timeout=2)
+    errors = []
+
+    def work():
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError as e:
+            errors.append(e)
+
+    pool.submit("a", work)
+    pool.submit("b", work)
+
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()
+    assert errors == []
+
+
+def test_in_flight_full_and_on_done():
+    pool = KeyedWorkerPool(1, 2)
+    release = threading.Event()
+    done = []
+
+    pool.submit("a", release.wait)
+    pool.submit("a", lambda: None, on_done=done.append)
+
+    assert pool.in_flight == 2
+    assert pool.full is True
+
+    pool.start()
+    release.set()
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()
+
+    assert pool.in_flight == 0
+    assert pool.full is False
+    assert done == [None]
+
+
+def test_failed_item_reports_error_and_keeps_working():
+    pool = KeyedWorkerPool(1, 2)
+    pool.start()
+    errors = []
+    processed = []
+
+    def fail():
+        raise ValueError("boom")
+
+    pool.submit("a", fail, on_done=errors.append)
+    pool.submit("a", processed.append, 1)
+
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()
+
+    assert isinstance(errors[0], ValueError)
+    assert processed == [1]
+
+
+def run_to_completion(pool):
+    pool.start()
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()
+
+
+def test_groups_are_served_round_robin():
+    pool = KeyedWorkerPool(1, 100)
+    processed = []
+
+    for value in range(5):
+        pool.submit(f"big-{value}", processed.append, ("big", value), group=1)
+    pool.submit("small-0", processed.append, ("small", 0), group=2)
+    pool.submit("small-1", processed.append, ("small", 1), group=2)
+    assert pool.queued(1) == 5
+
+    run_to_completion(pool)
+
+    assert processed == [
+        ("big", 0),
+        ("small", 0),
+        ("big", 1),
+        ("small", 1),
+        ("big", 2),
+        ("big", 3),
+        ("big", 4),
+    ]
+
+
+def test_group_weights():
+    pool = KeyedWorkerPool(1, 100, weights={1: 2})
+    processed = []
+
+    for value in range(4):
+        pool.submit(None, processed.append, (1, value), group=1)
+        pool.submit(None, processed.append, (2, value), group=2)
+
+    run_to_completion(pool)
+
+    assert [group for group, _ in processed] == [1, 1, 2, 1, 1, 2, 2, 2]
+
+
+def test_higher_priority_runs_first():
+    pool = KeyedWorkerPool(1, 100)
+    processed = []
+
+    pool.submit(None, processed.append, "bulk-0", group=1)
+    pool.submit(None, processed.append, "bulk-1", group=1)
+    pool.submit(None, processed.append, "interactive", group=2, priority=1)
+
+    run_to_completion(pool)
+
+    assert processed == ["interactive", "bulk-0", "bulk-1"]
+
+
+def test_key_order_is_kept_across_priorities():
+    pool = KeyedWorkerPool(2, 100)
+    processed = []
+
+    pool.submit("a", processed.append, "bulk", group=1)
+    pool.submit("a", processed.append, "interactive", group=1, priority=1)
+
+    run_to_completion(pool)
+
+    assert processed == ["bulk", "interactive"]
+
+
+def test_group_concurrency():
+    pool = KeyedWorkerPool(3, 100, group_concurrency=1)
+    lock = threading.Lock()
+    running = {1: 0, 2: 0}
+    peaks = {1: 0, 2: 0}
+
+    def work(group):
+        with lock:
+            running[group] += 1
+            peaks[group] = max(peaks[group], running[group])
+        time.sleep(0.01)
+        with lock:
+            running[group] -= 1
+
+    for value in range(4):
+        pool.submit(f"a-{value}", work, 1, group=1)
+        pool.submit(f"b-{value}", work, 2, group=2)
+
+    run_to_completion(pool)
+
+    assert peaks == {1: 1, 2: 1}
+
+
+def test_wait_available():
+    pool = KeyedWorkerPool(1, 1)
+    release = threading.Event()
+    pool.submit("a", release.wait)
+
+    assert pool.wait_available(timeout=0.01) is False
+
+    pool.start()
+    release.set()
+    assert pool.wait_available(timeout=5) is True
+    pool.shutdown()